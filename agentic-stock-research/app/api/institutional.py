@@ -18,7 +18,7 @@ from app.config import AppSettings, get_settings
 from app.schemas.input import ResearchRequest
 from app.schemas.institutional_output import InstitutionalResearchResponse
 from app.tools.institutional_formatter import institutional_formatter
-from app.graph.workflow import build_research_graph
+from app.graph.workflow import get_research_graph
 from app.utils.async_utils import monitor_performance
 
 logger = logging.getLogger(__name__)
@@ -58,8 +58,8 @@ async def institutional_analyze(
     try:
         logger.info(f"Starting institutional analysis for {request.tickers}")
         
-        # Build research graph with enhanced synthesis
-        graph = build_research_graph(settings)
+        # Shared compiled research graph (conditional synthesis picks the institutional path)
+        graph = get_research_graph(settings)
         
         # Prepare research state
         research_state = {
@@ -25,11 +25,21 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.price_store import load_price_range
+from app.cache.redis_cache import CacheManager, get_cache_manager
+from app.utils.async_utils import run_data_io
 
 logger = logging.getLogger(__name__)
 
 
+def _close_prices(hist: pd.DataFrame) -> pd.DataFrame:
+    """Single 'price' column from an OHLCV frame (flat or ticker-grouped columns)"""
+    close = hist['Close']
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.to_frame('price')
+
+
 class RecommendationAction(Enum):
     """Recommendation actions"""
     STRONG_BUY = "strong_buy"
@@ -114,9 +124,14 @@ class RecommendationTracker:
     """Tracks historical recommendations and their outcomes"""
     
     def __init__(self):
-        self.cache = get_cache_manager()
+        self.cache: Optional[CacheManager] = None
         self.recommendations: Dict[str, Recommendation] = {}
     
+    async def _get_cache(self) -> CacheManager:
+        if self.cache is None:
+            self.cache = await get_cache_manager()
+        return self.cache
+    
     async def record_recommendation(
         self,
         ticker: str,
@@ -181,6 +196,8 @@ class RecommendationTracker:
         action: Optional[RecommendationAction] = None
     ) -> List[Recommendation]:
         """Get recommendations with optional filters"""
+        if ticker:
+            await self.load_recommendations([ticker])
         recommendations = list(self.recommendations.values())
         
         # Apply filters
@@ -201,11 +218,35 @@ class RecommendationTracker:
         
         return recommendations
     
+    async def load_recommendations(self, tickers: List[str]) -> int:
+        """
+        Load cached recommendations for ``tickers`` into memory.
+
+        Costs two bulk reads regardless of the number of tickers: one for the
+        per-ticker id lists and one for the recommendations themselves.
+        Returns the number of recommendations loaded.
+        """
+        cache = await self._get_cache()
+        id_lists = await cache.get_many([f"recommendations:{t}" for t in tickers])
+        keys = [
+            f"recommendation:{rec_id}"
+            for ids in id_lists.values() for rec_id in ids
+            if rec_id not in self.recommendations
+        ]
+        cached = await cache.get_many(keys)
+        for data in cached.values():
+            try:
+                recommendation = Recommendation(**data)
+            except TypeError as e:
+                logger.warning(f"Skipping malformed cached recommendation: {e}")
+                continue
+            self.recommendations[recommendation.id] = recommendation
+        return len(cached)
+    
     async def _get_current_price(self, ticker: str) -> float:
         """Get current market price for a ticker"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = await run_data_io(lambda: yf.Ticker(ticker).info)
             return info.get('currentPrice') or info.get('regularMarketPrice') or 0.0
         except Exception as e:
             logger.warning(f"Error getting current price for {ticker}: {e}")
@@ -213,21 +254,23 @@ class RecommendationTracker:
     
     async def _cache_recommendation(self, recommendation: Recommendation):
         """Cache recommendation data"""
+        cache = await self._get_cache()
         cache_key = f"recommendation:{recommendation.id}"
-        await self.cache.set(cache_key, recommendation.__dict__, ttl=86400 * 30)  # 30 days
         
         # Also cache by ticker for quick lookup
         ticker_key = f"recommendations:{recommendation.ticker}"
-        ticker_recommendations = await self.cache.get(ticker_key) or []
+        ticker_recommendations = await cache.get(ticker_key) or []
         ticker_recommendations.append(recommendation.id)
-        await self.cache.set(ticker_key, ticker_recommendations, ttl=86400 * 30)
+        await cache.set_many(
+            {cache_key: recommendation.__dict__, ticker_key: ticker_recommendations},
+            ttl=86400 * 30,  # 30 days
+        )
 
 
 class BacktestEngine:
     """Backtesting engine for recommendation validation"""
     
     def __init__(self):
-        self.cache = get_cache_manager()
         self.tracker = RecommendationTracker()
     
     async def run_backtest(
@@ -292,10 +335,9 @@ class BacktestEngine:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=730)
             
-            stock = yf.Ticker(benchmark_ticker)
-            hist = stock.history(start=start_date, end=end_date)
+            hist = await load_price_range(benchmark_ticker, start_date, end_date)
             
-            return hist[['Close']].rename(columns={'Close': 'price'})
+            return _close_prices(hist)
         
         except Exception as e:
             logger.error(f"Error getting benchmark data for {benchmark_ticker}: {e}")
@@ -398,13 +440,12 @@ class BacktestEngine:
         try:
             end_date = start_date + timedelta(days=days)
             
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
+            hist = await load_price_range(ticker, start_date, end_date)
             
             if hist.empty:
                 return pd.DataFrame()
             
-            return hist[['Close']].rename(columns={'Close': 'price'})
+            return _close_prices(hist)
         
         except Exception as e:
             logger.warning(f"Error getting ticker data for {ticker}: {e}")
@@ -683,7 +724,6 @@ class ContinuousLearningSystem:
     """Continuous learning system for model improvement"""
     
     def __init__(self):
-        self.cache = get_cache_manager()
         self.tracker = RecommendationTracker()
         self.backtest_engine = BacktestEngine()
     
@@ -835,12 +875,15 @@ class ContinuousLearningSystem:
     
     async def _store_updated_weights(self, weights: Dict[str, float]):
         """Store updated weights in cache"""
+        cache = await get_cache_manager()
         cache_key = "model_weights"
-        await self.cache.set(cache_key, weights, ttl=86400 * 7)  # 7 days
         
         # Also store with timestamp
         timestamped_key = f"model_weights_{datetime.now().strftime('%Y%m%d')}"
-        await self.cache.set(timestamped_key, weights, ttl=86400 * 30)  # 30 days
+        await cache.set_many(
+            {cache_key: weights, timestamped_key: weights},
+            ttls={cache_key: 86400 * 7, timestamped_key: 86400 * 30},  # 7 / 30 days
+        )
 
 
 # Global instances
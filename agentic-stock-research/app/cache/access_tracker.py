@@ -0,0 +1,140 @@
+"""
+Access-frequency tracking for cache warming
+
+Counts how often each (ticker, data type) pair is requested with a decaying
+count-min sketch, and keeps a small heavy-hitters table of the hottest pairs
+so the cache warmer can refresh what users actually ask for. Counts halve every
+``half_life`` seconds, so yesterday's favourites fade out.
+
+The tracker also measures warming: a hit counts as produced by the warmer only
+when it lands on a warmed entry after the moment the previous entry would have
+gone stale (or immediately, if there was no entry).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Item = Tuple[str, str]  # (ticker, data type), e.g. ("TCS.NS", "ohlcv:1y:1d")
+
+
+class CountMinSketch:
+    """Fixed-size frequency sketch; estimates never undercount"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._table = np.zeros((depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+
+    def _columns(self, item: str) -> np.ndarray:
+        digest = hashlib.blake2b(item.encode(), digest_size=4 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Add ``count`` occurrences of ``item`` and return its new estimate"""
+        columns = self._columns(item)
+        self._table[self._rows, columns] += np.uint32(count)
+        return int(self._table[self._rows, columns].min())
+
+    def estimate(self, item: str) -> int:
+        return int(self._table[self._rows, self._columns(item)].min())
+
+    def halve(self) -> None:
+        self._table >>= 1
+
+
+class AccessTracker:
+    """Decaying access counts with a top-K table of hot (ticker, data type) pairs"""
+
+    def __init__(self, capacity: int = 256, half_life: float = 3600, width: int = 2048, depth: int = 4):
+        self.capacity = capacity
+        self.half_life = half_life
+        self.sketch = CountMinSketch(width, depth)
+        self._heavy: Dict[Item, int] = {}
+        self._last_decay = time.monotonic()
+        # item -> [produces_hits_after (wall clock), hits since warmed]
+        self._warmed: Dict[Item, List[float]] = {}
+        self.stats = {"accesses": 0, "hits": 0, "warms": 0, "warmed_hits": 0, "unused_warms": 0}
+
+    @staticmethod
+    def _name(item: Item) -> str:
+        return f"{item[0]}|{item[1]}"
+
+    def record(self, ticker: str, data_type: str, hit: bool) -> None:
+        """Count one user request; ``hit`` is whether the cache served it"""
+        self._maybe_decay()
+        item = (ticker, data_type)
+        count = self.sketch.add(self._name(item))
+        self.stats["accesses"] += 1
+        self.stats["hits"] += int(hit)
+
+        if item in self._heavy or len(self._heavy) < self.capacity:
+            self._heavy[item] = count
+        else:
+            coldest = min(self._heavy, key=self._heavy.get)
+            if count > self._heavy[coldest]:
+                del self._heavy[coldest]
+                self._heavy[item] = count
+
+        warmed = self._warmed.get(item)
+        if hit and warmed is not None and time.time() >= warmed[0]:
+            warmed[1] += 1
+            self.stats["warmed_hits"] += 1
+
+    def _maybe_decay(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decay < self.half_life:
+            return
+        self._last_decay = now
+        self.sketch.halve()
+        self._heavy = {item: count >> 1 for item, count in self._heavy.items() if count > 1}
+
+    def top(self, k: int) -> List[Tuple[Item, int]]:
+        """The ``k`` most frequently requested pairs, hottest first"""
+        return sorted(self._heavy.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+    def estimate(self, ticker: str, data_type: str) -> int:
+        return self.sketch.estimate(self._name((ticker, data_type)))
+
+    def mark_warmed(self, ticker: str, data_type: str, produces_hits_after: Optional[float] = None) -> None:
+        """
+        Note that the warmer refreshed ``(ticker, data_type)``.
+
+        ``produces_hits_after`` is when the entry it replaced would have gone
+        stale; hits before then would have happened anyway and are not counted.
+        """
+        item = (ticker, data_type)
+        previous = self._warmed.get(item)
+        if previous is not None and previous[1] == 0:
+            self.stats["unused_warms"] += 1
+        self._warmed[item] = [time.time() if produces_hits_after is None else produces_hits_after, 0]
+        self.stats["warms"] += 1
+        if len(self._warmed) > 4 * self.capacity:
+            for stale in [i for i in self._warmed if i not in self._heavy]:
+                del self._warmed[stale]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / self.stats["accesses"] * 100, 2) if self.stats["accesses"] else 0,
+            "tracked": len(self._heavy),
+            "top": [{"ticker": t, "data_type": d, "count": c} for (t, d), c in self.top(10)],
+        }
+
+
+_access_tracker: Optional[AccessTracker] = None
+
+
+def get_access_tracker() -> AccessTracker:
+    """Get global access tracker instance"""
+    global _access_tracker
+    if _access_tracker is None:
+        _access_tracker = AccessTracker()
+    return _access_tracker
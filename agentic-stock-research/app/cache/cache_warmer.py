@@ -1,47 +1,58 @@
 """
 Cache Warming System for High-Performance Data Access
 
-This module provides intelligent cache warming for frequently accessed data
-to improve response times and reduce API calls.
+This module warms the cache with the data users actually request: an access
+tracker counts requests per (ticker, data type) and the warmer refreshes the
+hottest pairs shortly before their entries go stale. It runs often while a
+market is open and rarely when none is, and its effect is measured as the
+cache hits that warmed entries produced.
 """
 
 import asyncio
 import logging
 import time
-from typing import Dict, List, Optional, Any, Callable
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-import json
 
+from app.cache.access_tracker import AccessTracker, get_access_tracker
 from app.cache.optimized_cache import get_optimized_cache_manager
-from app.tools.finance import fetch_info, fetch_ohlcv
-from app.tools.indian_market_data import get_indian_market_data
+from app.tools.finance import (
+    INFO_HARD_TTL, INFO_SOFT_TTL, OHLCV_HARD_TTL, OHLCV_SOFT_TTL,
+    fetch_info, ohlcv_data_type, refresh_info, refresh_ohlcv,
+)
 from app.tools.sector_rotation import SectorRotationAnalyzer
+from app.utils.market_hours import any_market_open, is_market_open, market_for_ticker
 
 logger = logging.getLogger(__name__)
 
+# (cache key, refresh, soft TTL, hard TTL) for one tracked data type
+WarmTarget = Tuple[str, Callable[[], Awaitable[Any]], float, float]
+
 
 @dataclass
 class CacheWarmingConfig:
     """Configuration for cache warming"""
     enabled: bool = True
     warm_on_startup: bool = True
-    warm_popular_stocks: bool = True
+    warm_hot_keys: bool = True
     warm_sector_data: bool = True
     warm_market_data: bool = True
     max_concurrent_warming: int = 5
-    warming_interval_minutes: int = 30
-    popular_stocks: List[str] = None
+    top_k: int = 50
+    # Warming cadence follows market hours
+    open_interval_minutes: int = 5
+    closed_interval_minutes: int = 60
     cache_ttl_hours: int = 24
 
 
 class CacheWarmer:
     """
-    Intelligent cache warming system for frequently accessed data
+    Access-frequency-driven cache warming for frequently requested data
     """
     
-    def __init__(self, config: Optional[CacheWarmingConfig] = None):
+    def __init__(self, config: Optional[CacheWarmingConfig] = None, tracker: Optional[AccessTracker] = None):
         self.config = config or CacheWarmingConfig()
+        self.tracker = tracker or get_access_tracker()
         self.cache = None
         self.warming_tasks: Dict[str, asyncio.Task] = {}
         self.last_warming_time: Dict[str, float] = {}
@@ -49,19 +60,11 @@ class CacheWarmer:
             "total_warming_operations": 0,
             "successful_warmings": 0,
             "failed_warmings": 0,
-            "cache_hits_after_warming": 0,
-            "time_saved_seconds": 0.0
+            "keys_warmed": 0,
+            "keys_skipped_locked": 0,
         }
         
-        # Popular Indian stocks for warming
-        if self.config.popular_stocks is None:
-            self.config.popular_stocks = [
-                "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "HINDUNILVR.NS",
-                "ITC.NS", "KOTAKBANK.NS", "BHARTIARTL.NS", "SBIN.NS", "ASIANPAINT.NS",
-                "MARUTI.NS", "AXISBANK.NS", "LT.NS", "WIPRO.NS", "NESTLEIND.NS"
-            ]
-        
-        logger.info(f"CacheWarmer initialized with {len(self.config.popular_stocks)} popular stocks")
+        logger.info(f"CacheWarmer initialized for the top {self.config.top_k} requested keys")
     
     async def initialize(self):
         """Initialize the cache warmer"""
@@ -78,8 +81,8 @@ class CacheWarmer:
         
         warming_tasks = []
         
-        if self.config.warm_popular_stocks:
-            warming_tasks.append(self.warm_popular_stocks())
+        if self.config.warm_hot_keys:
+            warming_tasks.append(self.warm_hot_keys())
         
         if self.config.warm_sector_data:
             warming_tasks.append(self.warm_sector_data())
@@ -103,81 +106,79 @@ class CacheWarmer:
         logger.info(f"Cache warming completed in {duration:.2f} seconds")
         self.warming_stats["total_warming_operations"] += 1
     
-    async def warm_popular_stocks(self):
-        """Warm cache for popular stocks"""
-        logger.info(f"Warming cache for {len(self.config.popular_stocks)} popular stocks")
+    def warming_interval(self) -> float:
+        """Seconds until the next warming run: short while any market is open"""
+        minutes = self.config.open_interval_minutes if any_market_open() else self.config.closed_interval_minutes
+        return minutes * 60
+    
+    def _target(self, ticker: str, data_type: str) -> Optional[WarmTarget]:
+        if data_type == "info":
+            return self.cache.info_key(ticker), lambda: refresh_info(ticker), INFO_SOFT_TTL, INFO_HARD_TTL
+        kind, _, params = data_type.partition(":")
+        if kind == "ohlcv" and params.count(":") == 1:
+            period, interval = params.split(":")
+            return (
+                self.cache.ohlcv_key(ticker, period, interval),
+                lambda: refresh_ohlcv(ticker, period, interval),
+                OHLCV_SOFT_TTL, OHLCV_HARD_TTL,
+            )
+        return None
+    
+    async def warm_hot_keys(self) -> int:
+        """
+        Refresh the most requested (ticker, data type) pairs that would go
+        stale before the next run.
+
+        While a ticker's market is open its entries are refreshed ahead of
+        their soft TTL; while it is closed the data cannot change, so entries
+        are only kept from expiring. Returns the number of keys refreshed.
+        """
+        hot = self.tracker.top(self.config.top_k)
+        targets: Dict[str, Tuple[str, str, WarmTarget]] = {}
+        for (ticker, data_type), _ in hot:
+            target = self._target(ticker, data_type)
+            if target is not None:
+                targets[target[0]] = (ticker, data_type, target)
+        if not targets:
+            return 0
         
-        # Process stocks in batches to avoid overwhelming APIs
-        batch_size = self.config.max_concurrent_warming
+        # One bulk read for the remaining TTL of every hot key
+        found = await self.cache.get_many_with_ttl(list(targets))
+        horizon = self.warming_interval()
+        now = time.time()
+        due = []
+        for key, (ticker, data_type, (_, refresh, soft_ttl, hard_ttl)) in targets.items():
+            if key not in found:
+                stale_at = now
+            else:
+                remaining = found[key][1]
+                if remaining is None:
+                    continue
+                if is_market_open(market_for_ticker(ticker)):
+                    left = self.cache.fresh_for(key, remaining, soft_ttl, hard_ttl)
+                else:
+                    left = remaining
+                if left > horizon:
+                    continue
+                stale_at = now + max(left, 0)
+            due.append((key, ticker, data_type, refresh, stale_at))
         
-        for i in range(0, len(self.config.popular_stocks), batch_size):
-            batch = self.config.popular_stocks[i:i + batch_size]
-            
-            # Warm each stock in the batch
-            warming_tasks = []
-            for ticker in batch:
-                warming_tasks.append(self._warm_single_stock(ticker))
-            
-            # Execute batch warming
-            await asyncio.gather(*warming_tasks, return_exceptions=True)
-            
-            # Small delay between batches to be respectful to APIs
-            if i + batch_size < len(self.config.popular_stocks):
-                await asyncio.sleep(1.0)
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_warming)
         
-        logger.info("Popular stocks cache warming completed")
-    
-    async def _warm_single_stock(self, ticker: str):
-        """Warm cache for a single stock"""
-        try:
-            # Check if already warmed recently
-            last_warmed = self.last_warming_time.get(ticker, 0)
-            if time.time() - last_warmed < 1800:  # 30 minutes
-                return
-            
-            # Warm stock data
-            await self._warm_stock_data(ticker)
-            
-            # Update last warming time
-            self.last_warming_time[ticker] = time.time()
-            
-            logger.debug(f"Cache warmed for {ticker}")
-            
-        except Exception as e:
-            logger.warning(f"Failed to warm cache for {ticker}: {e}")
-    
-    async def _warm_stock_data(self, ticker: str):
-        """Warm specific stock data"""
-        try:
-            # Warm basic info data
-            cache_key_info = f"yfinance_info:{ticker}"
-            if not await self.cache.get(cache_key_info):
-                info_data = await fetch_info(ticker)
-                if info_data:
-                    await self.cache.set(cache_key_info, info_data, ttl=self.config.cache_ttl_hours * 3600)
-            
-            # Warm OHLCV data
-            cache_key_ohlcv = f"yfinance_ohlcv:{ticker}:1y:1d"
-            if not await self.cache.get(cache_key_ohlcv):
-                ohlcv_data = await fetch_ohlcv(ticker, period="1y", interval="1d")
-                if not ohlcv_data.empty:
-                    # Convert DataFrame to dict for caching
-                    ohlcv_dict = {
-                        "data": ohlcv_data.to_dict('records'),
-                        "index": ohlcv_data.index.tolist()
-                    }
-                    await self.cache.set(cache_key_ohlcv, ohlcv_dict, ttl=self.config.cache_ttl_hours * 3600)
-            
-            # Warm Indian market data for Indian stocks
-            if ticker.endswith(('.NS', '.BO')):
-                cache_key_indian = f"indian_market_data:{ticker}"
-                if not await self.cache.get(cache_key_indian):
-                    indian_data = await get_indian_market_data(ticker)
-                    if indian_data:
-                        await self.cache.set(cache_key_indian, indian_data, ttl=self.config.cache_ttl_hours * 3600)
-            
-        except Exception as e:
-            logger.warning(f"Failed to warm stock data for {ticker}: {e}")
+        async def warm(key: str, ticker: str, data_type: str, refresh, stale_at: float) -> bool:
+            async with semaphore:
+                if not await self.cache.refresh_now(key, refresh):
+                    self.warming_stats["keys_skipped_locked"] += 1
+                    return False
+            self.tracker.mark_warmed(ticker, data_type, produces_hits_after=stale_at)
+            self.last_warming_time[key] = time.time()
+            return True
+        
+        results = await asyncio.gather(*(warm(*entry) for entry in due), return_exceptions=True)
+        warmed = sum(1 for r in results if r is True)
+        self.warming_stats["keys_warmed"] += warmed
+        logger.info(f"Warmed {warmed}/{len(due)} due keys among {len(targets)} hot keys")
+        return warmed
     
     async def warm_sector_data(self):
         """Warm sector rotation and market data"""
@@ -185,20 +186,18 @@ class CacheWarmer:
         
         try:
             sector_analyzer = SectorRotationAnalyzer()
+            markets = {"India": "sector_rotation:India", "United States": "sector_rotation:United States"}
+            cached = await self.cache.get_many(list(markets.values()))
             
-            # Warm Indian sector data
-            cache_key_india = "sector_rotation:India"
-            if not await self.cache.get(cache_key_india):
-                india_data = await sector_analyzer.analyze_sector_rotation("India")
-                if india_data:
-                    await self.cache.set(cache_key_india, india_data, ttl=self.config.cache_ttl_hours * 3600)
-            
-            # Warm US sector data
-            cache_key_us = "sector_rotation:United States"
-            if not await self.cache.get(cache_key_us):
-                us_data = await sector_analyzer.analyze_sector_rotation("United States")
-                if us_data:
-                    await self.cache.set(cache_key_us, us_data, ttl=self.config.cache_ttl_hours * 3600)
+            # Warm Indian and US sector data
+            items = {}
+            for market, cache_key in markets.items():
+                if cache_key not in cached:
+                    sector_data = await sector_analyzer.analyze_sector_rotation(market)
+                    if sector_data:
+                        items[cache_key] = sector_data
+            if items:
+                await self.cache.set_many(items, ttl=self.config.cache_ttl_hours * 3600)
             
             logger.info("Sector data cache warming completed")
             
@@ -219,15 +218,19 @@ class CacheWarmer:
                 "^BSESN"  # BSE Sensex
             ]
             
+            cached = await self.cache.get_many([f"market_index:{index}" for index in market_indices])
+            items = {}
             for index in market_indices:
                 cache_key = f"market_index:{index}"
-                if not await self.cache.get(cache_key):
+                if cache_key not in cached:
                     try:
                         info_data = await fetch_info(index)
                         if info_data:
-                            await self.cache.set(cache_key, info_data, ttl=self.config.cache_ttl_hours * 3600)
+                            items[cache_key] = info_data
                     except Exception as e:
                         logger.debug(f"Failed to warm market index {index}: {e}")
+            if items:
+                await self.cache.set_many(items, ttl=self.config.cache_ttl_hours * 3600)
             
             logger.info("Market data cache warming completed")
             
@@ -235,61 +238,33 @@ class CacheWarmer:
             logger.warning(f"Failed to warm market data: {e}")
     
     async def warm_specific_data(self, ticker: str, data_types: List[str]):
-        """Warm specific data types for a ticker"""
+        """Refresh specific data types for a ticker (``info``, ``ohlcv`` or ``ohlcv:<period>:<interval>``)"""
         logger.info(f"Warming specific data for {ticker}: {data_types}")
         
-        warming_tasks = []
-        
-        if "info" in data_types:
-            warming_tasks.append(self._warm_stock_info(ticker))
-        
-        if "ohlcv" in data_types:
-            warming_tasks.append(self._warm_stock_ohlcv(ticker))
-        
-        if "indian_data" in data_types and ticker.endswith(('.NS', '.BO')):
-            warming_tasks.append(self._warm_indian_data(ticker))
+        async def warm(data_type: str) -> None:
+            target = self._target(ticker, data_type)
+            if target is not None and await self.cache.refresh_now(target[0], target[1]):
+                self.tracker.mark_warmed(ticker, data_type)
+                self.last_warming_time[target[0]] = time.time()
         
-        if warming_tasks:
-            await asyncio.gather(*warming_tasks, return_exceptions=True)
-    
-    async def _warm_stock_info(self, ticker: str):
-        """Warm stock info data"""
-        cache_key = f"yfinance_info:{ticker}"
-        if not await self.cache.get(cache_key):
-            info_data = await fetch_info(ticker)
-            if info_data:
-                await self.cache.set(cache_key, info_data, ttl=self.config.cache_ttl_hours * 3600)
-    
-    async def _warm_stock_ohlcv(self, ticker: str):
-        """Warm stock OHLCV data"""
-        cache_key = f"yfinance_ohlcv:{ticker}:1y:1d"
-        if not await self.cache.get(cache_key):
-            ohlcv_data = await fetch_ohlcv(ticker, period="1y", interval="1d")
-            if not ohlcv_data.empty:
-                ohlcv_dict = {
-                    "data": ohlcv_data.to_dict('records'),
-                    "index": ohlcv_data.index.tolist()
-                }
-                await self.cache.set(cache_key, ohlcv_dict, ttl=self.config.cache_ttl_hours * 3600)
-    
-    async def _warm_indian_data(self, ticker: str):
-        """Warm Indian market data"""
-        cache_key = f"indian_market_data:{ticker}"
-        if not await self.cache.get(cache_key):
-            indian_data = await get_indian_market_data(ticker)
-            if indian_data:
-                await self.cache.set(cache_key, indian_data, ttl=self.config.cache_ttl_hours * 3600)
+        data_types = [ohlcv_data_type("1y", "1d") if d == "ohlcv" else d for d in data_types]
+        await asyncio.gather(*(warm(d) for d in data_types), return_exceptions=True)
     
     def get_warming_stats(self) -> Dict[str, Any]:
-        """Get cache warming statistics"""
+        """Get cache warming statistics; hits are measured by the access tracker"""
+        tracked = self.tracker.get_stats()
         return {
             **self.warming_stats,
-            "popular_stocks_count": len(self.config.popular_stocks),
+            "cache_hits_after_warming": tracked["warmed_hits"],
+            "unused_warms": tracked["unused_warms"],
+            "access": tracked,
             "last_warming_times": len(self.last_warming_time),
             "config": {
                 "enabled": self.config.enabled,
                 "warm_on_startup": self.config.warm_on_startup,
-                "warming_interval_minutes": self.config.warming_interval_minutes,
+                "top_k": self.config.top_k,
+                "open_interval_minutes": self.config.open_interval_minutes,
+                "closed_interval_minutes": self.config.closed_interval_minutes,
                 "cache_ttl_hours": self.config.cache_ttl_hours
             }
         }
@@ -298,7 +273,7 @@ class CacheWarmer:
         """Schedule periodic cache warming"""
         while True:
             try:
-                await asyncio.sleep(self.config.warming_interval_minutes * 60)
+                await asyncio.sleep(self.warming_interval())
                 await self.warm_all_data()
             except Exception as e:
                 logger.error(f"Error in periodic cache warming: {e}")
@@ -323,8 +298,7 @@ async def get_cache_warmer() -> CacheWarmer:
 async def warm_cache_for_stocks(tickers: List[str]):
     """Warm cache for specific stocks"""
     warmer = await get_cache_warmer()
-    for ticker in tickers:
-        await warmer._warm_single_stock(ticker)
+    await asyncio.gather(*(warmer.warm_specific_data(t, ["info", "ohlcv"]) for t in tickers))
 
 
 async def warm_cache_for_data_types(ticker: str, data_types: List[str]):
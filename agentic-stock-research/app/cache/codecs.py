@@ -0,0 +1,349 @@
+"""
+Binary serialization codecs for the shared cache
+
+Values written to Redis are framed as ``MAGIC | format | compression | payload``
+so any codec can read what any other wrote, and a value's format can change
+(e.g. once pyarrow is installed) without flushing the cache:
+
+- ``A`` - pandas DataFrame as an Arrow IPC stream (requires pyarrow)
+- ``J`` - JSON-safe dicts/lists/scalars via orjson
+- ``M`` - msgpack, for containers orjson cannot round-trip: bytes, NaN/inf,
+  datetimes and nested DataFrames (the latter as Arrow IPC extension types)
+- ``P`` - pickle, only for anything else and only when ``CACHE_ALLOW_PICKLE``
+  is enabled (off by default: the cache may be shared, and unpickling runs
+  code); with it disabled such values are not cached and pickled entries
+  are never deserialized
+
+Payloads above ``CACHE_COMPRESSION_MIN_BYTES`` are compressed with zstd or lz4
+when available. Values that predate the framing (raw pickles) and ``P``
+entries written before pickle was turned off are only read while the
+temporary ``CACHE_PICKLE_MIGRATION`` flag is set; it never writes pickles and
+should be removed once old entries have expired.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import pickle
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import orjson
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+    _ENCODE_ERRORS: tuple = (pa.ArrowException, TypeError, ValueError)
+except ImportError:
+    PYARROW_AVAILABLE = False
+    _ENCODE_ERRORS = (TypeError, ValueError)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\xfe"  # never the first byte of a protocol 2+ pickle
+HEADER_SIZE = 3
+
+FORMAT_ARROW = b"A"
+FORMAT_JSON = b"J"
+FORMAT_MSGPACK = b"M"
+FORMAT_PICKLE = b"P"
+
+COMPRESSION_NONE = b"N"
+COMPRESSION_ZSTD = b"Z"
+COMPRESSION_LZ4 = b"L"
+
+_FORMAT_NAMES = {FORMAT_ARROW: "arrow", FORMAT_JSON: "json", FORMAT_MSGPACK: "msgpack", FORMAT_PICKLE: "pickle"}
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+class CodecError(ValueError):
+    """Raised when a value cannot be encoded or a payload cannot be trusted"""
+
+
+# msgpack extension types for values nested inside containers
+_EXT_FRAME = 1
+_EXT_DATETIME = 2
+_EXT_TIMESTAMP = 3
+_EXT_DATE = 4
+
+
+def _classify(value: Any) -> Optional[bytes]:
+    """
+    Cheapest lossless format for a container value: JSON if orjson round-trips
+    it, msgpack if it needs bytes, non-finite floats, datetimes or nested
+    DataFrames, None if neither can represent it.
+    """
+    needs_msgpack = False
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if item is None or isinstance(item, (str, bool, int, np.bool_, np.integer)):
+            continue
+        if isinstance(item, (float, np.floating)):
+            needs_msgpack |= not math.isfinite(item)
+        elif isinstance(item, dict):
+            if not all(type(k) is str for k in item):
+                return None
+            stack.extend(item.values())
+        elif type(item) is list:
+            stack.extend(item)
+        elif isinstance(item, (bytes, datetime, date)):
+            needs_msgpack = True
+        elif isinstance(item, pd.DataFrame) and PYARROW_AVAILABLE:
+            needs_msgpack = True
+        else:
+            return None
+    if needs_msgpack:
+        return FORMAT_MSGPACK if MSGPACK_AVAILABLE else None
+    return FORMAT_JSON
+
+
+def _encode_arrow(frame: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(frame, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_arrow(payload: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, pd.DataFrame):
+        return msgpack.ExtType(_EXT_FRAME, _encode_arrow(obj))
+    if isinstance(obj, pd.Timestamp):
+        return msgpack.ExtType(_EXT_TIMESTAMP, obj.isoformat().encode())
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot msgpack {type(obj).__name__}")
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_FRAME:
+        return _decode_arrow(data)
+    if code == _EXT_TIMESTAMP:
+        return pd.Timestamp(data.decode())
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+class CacheCodec:
+    """Encodes cache values to tagged bytes and back"""
+
+    def __init__(
+        self,
+        allow_pickle: bool = False,
+        pickle_migration: bool = False,
+        compression: str = "auto",
+        compression_min_bytes: int = 4096,
+        compression_level: int = 3,
+    ):
+        self.allow_pickle = allow_pickle
+        self.pickle_migration = pickle_migration
+        if pickle_migration and not allow_pickle:
+            logger.warning("Cache pickle migration is on: legacy pickled entries are still read")
+        self.compression_min_bytes = compression_min_bytes
+        self.compression_level = compression_level
+        self.compression = self._resolve_compression(compression)
+        self._zstd_compressor = zstandard.ZstdCompressor(level=compression_level) if ZSTD_AVAILABLE else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+        self._lock = threading.Lock()
+        # Value types already reported as uncacheable (warned once each)
+        self._dropped_types: set = set()
+        self.stats: Dict[str, Any] = {
+            "encoded": {name: 0 for name in _FORMAT_NAMES.values()},
+            "decoded": {name: 0 for name in _FORMAT_NAMES.values()},
+            "legacy_pickle_reads": 0,
+            "rejected": 0,
+            "compressed": 0,
+            "raw_bytes": 0,
+            "stored_bytes": 0,
+        }
+
+    @staticmethod
+    def _resolve_compression(compression: str) -> bytes:
+        compression = (compression or "none").lower()
+        if compression == "auto":
+            compression = "zstd" if ZSTD_AVAILABLE else "lz4" if LZ4_AVAILABLE else "none"
+        if compression == "zstd" and ZSTD_AVAILABLE:
+            return COMPRESSION_ZSTD
+        if compression == "lz4" and LZ4_AVAILABLE:
+            return COMPRESSION_LZ4
+        if compression not in ("none", "zstd", "lz4"):
+            logger.warning(f"Unknown cache compression '{compression}', storing uncompressed")
+        elif compression != "none":
+            logger.warning(f"Cache compression '{compression}' not installed, storing uncompressed")
+        return COMPRESSION_NONE
+
+    # Payload formats
+
+    def _serialize(self, value: Any) -> tuple[bytes, bytes]:
+        if isinstance(value, pd.DataFrame) and PYARROW_AVAILABLE:
+            try:
+                return FORMAT_ARROW, _encode_arrow(value)
+            except _ENCODE_ERRORS as e:
+                logger.debug(f"Arrow encoding failed ({e}), falling back")
+        fmt = _classify(value)
+        if fmt == FORMAT_JSON:
+            return fmt, orjson.dumps(value, option=_JSON_OPTIONS)
+        if fmt == FORMAT_MSGPACK:
+            try:
+                return fmt, msgpack.packb(value, use_bin_type=True, default=_msgpack_default)
+            except _ENCODE_ERRORS as e:
+                logger.debug(f"msgpack encoding failed ({e}), falling back")
+        if self.allow_pickle:
+            return FORMAT_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._warn_dropped(value)
+        raise CodecError(f"No safe codec for {type(value).__name__} and pickle is disabled")
+
+    def _warn_dropped(self, value: Any) -> None:
+        name = type(value).__name__
+        with self._lock:
+            if name in self._dropped_types:
+                return
+            self._dropped_types.add(name)
+        missing = [pkg for pkg, ok in (("pyarrow", PYARROW_AVAILABLE), ("msgpack", MSGPACK_AVAILABLE)) if not ok]
+        hint = f" ({', '.join(missing)} not installed)" if missing else ""
+        logger.warning(f"Cache values of type {name} have no safe codec{hint} and are not cached")
+
+    def _deserialize(self, fmt: bytes, payload: bytes) -> Any:
+        if fmt == FORMAT_ARROW:
+            if not PYARROW_AVAILABLE:
+                raise CodecError("Arrow payload but pyarrow is not installed")
+            return _decode_arrow(payload)
+        if fmt == FORMAT_JSON:
+            return orjson.loads(payload)
+        if fmt == FORMAT_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise CodecError("msgpack payload but msgpack is not installed")
+            return msgpack.unpackb(payload, raw=False, ext_hook=_msgpack_ext_hook)
+        if fmt == FORMAT_PICKLE:
+            if not (self.allow_pickle or self.pickle_migration):
+                raise CodecError("Refusing to unpickle cache payload (CACHE_ALLOW_PICKLE is off)")
+            return pickle.loads(payload)
+        raise CodecError(f"Unknown cache payload format {fmt!r}")
+
+    # Compression
+
+    def _compress(self, payload: bytes) -> tuple[bytes, bytes]:
+        if self.compression == COMPRESSION_NONE or len(payload) < self.compression_min_bytes:
+            return COMPRESSION_NONE, payload
+        if self.compression == COMPRESSION_ZSTD:
+            compressed = self._zstd_compressor.compress(payload)
+        else:
+            compressed = lz4.frame.compress(payload)
+        if len(compressed) >= len(payload):
+            return COMPRESSION_NONE, payload
+        return self.compression, compressed
+
+    def _decompress(self, compression: bytes, payload: bytes) -> bytes:
+        if compression == COMPRESSION_NONE:
+            return payload
+        if compression == COMPRESSION_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise CodecError("zstd payload but zstandard is not installed")
+            return self._zstd_decompressor.decompress(payload)
+        if compression == COMPRESSION_LZ4:
+            if not LZ4_AVAILABLE:
+                raise CodecError("lz4 payload but lz4 is not installed")
+            return lz4.frame.decompress(payload)
+        raise CodecError(f"Unknown cache compression {compression!r}")
+
+    # Public API
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize ``value`` to framed bytes; raises CodecError if it cannot be stored safely"""
+        try:
+            fmt, payload = self._serialize(value)
+        except CodecError:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise
+        compression, body = self._compress(payload)
+        with self._lock:
+            self.stats["encoded"][_FORMAT_NAMES[fmt]] += 1
+            self.stats["raw_bytes"] += len(payload)
+            self.stats["stored_bytes"] += len(body) + HEADER_SIZE
+            if compression != COMPRESSION_NONE:
+                self.stats["compressed"] += 1
+        return MAGIC + fmt + compression + body
+
+    def decode(self, data: bytes) -> Any:
+        """Deserialize framed bytes (or a legacy raw pickle) back to a value"""
+        data = bytes(data)
+        if not data.startswith(MAGIC):
+            if not self.pickle_migration:
+                raise CodecError("Refusing to unpickle legacy cache payload (CACHE_PICKLE_MIGRATION is off)")
+            with self._lock:
+                self.stats["legacy_pickle_reads"] += 1
+            return pickle.loads(data)
+        fmt, compression = data[1:2], data[2:3]
+        value = self._deserialize(fmt, self._decompress(compression, data[HEADER_SIZE:]))
+        with self._lock:
+            self.stats["decoded"][_FORMAT_NAMES[fmt]] += 1
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                **self.stats,
+                "encoded": dict(self.stats["encoded"]),
+                "decoded": dict(self.stats["decoded"]),
+            }
+        stats["compression"] = {
+            COMPRESSION_NONE: "none", COMPRESSION_ZSTD: "zstd", COMPRESSION_LZ4: "lz4"
+        }[self.compression]
+        stats["allow_pickle"] = self.allow_pickle
+        stats["pickle_migration"] = self.pickle_migration
+        stats["compression_ratio"] = (
+            round(stats["raw_bytes"] / stats["stored_bytes"], 2) if stats["stored_bytes"] else 0
+        )
+        return stats
+
+
+_cache_codec: Optional[CacheCodec] = None
+
+
+def get_cache_codec() -> CacheCodec:
+    """Get global cache codec configured from settings"""
+    global _cache_codec
+    if _cache_codec is None:
+        from app.config import get_settings
+        settings = get_settings()
+        _cache_codec = CacheCodec(
+            allow_pickle=settings.cache_allow_pickle,
+            pickle_migration=settings.cache_pickle_migration,
+            compression=settings.cache_compression,
+            compression_min_bytes=settings.cache_compression_min_bytes,
+        )
+    return _cache_codec
@@ -0,0 +1,246 @@
+"""
+Persistent local disk cache tier
+
+A SQLite database in WAL mode that sits between each worker's in-process L1
+tier and Redis, and takes over from Redis when it is unavailable. Unlike the
+in-memory fallback it survives restarts and is shared by every uvicorn worker
+on the host: WAL lets readers run alongside the single writer, and writers
+from other processes wait on ``busy_timeout`` instead of failing.
+
+Values are stored as the cache codec's framed bytes, so entries read from
+Redis can be written through without re-encoding. Every entry carries an
+absolute expiry; once the file grows past ``max_bytes`` expired entries are
+dropped first, then the least recently read ones.
+
+The API is synchronous; ``CacheManager`` calls it through ``asyncio.to_thread``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on host parameters is 999 on older builds
+_CHUNK = 500
+# Reads refresh ``accessed_at`` at most this often, so hot keys do not turn every read into a write
+_TOUCH_INTERVAL = 60.0
+# Writes between size checks (per process)
+_EVICT_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_key ON tags (key);
+"""
+
+
+def _placeholders(n: int) -> str:
+    return ",".join("?" * n)
+
+
+class DiskCache:
+    """Size-bounded key/value store with TTLs and tag invalidation on one SQLite file"""
+
+    def __init__(self, path: str | os.PathLike, max_bytes: int = 512 * 1024 * 1024, busy_timeout: float = 5.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and process; a connection inherited across fork is unusable
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Tuple[bytes, float]]:
+        """Unexpired entries as ``key -> (data, remaining TTL in seconds)``"""
+        now = time.time()
+        found: Dict[str, Tuple[bytes, float]] = {}
+        touch: List[str] = []
+        conn = self._conn()
+        for i in range(0, len(keys), _CHUNK):
+            chunk = list(keys[i:i + _CHUNK])
+            rows = conn.execute(
+                f"SELECT key, value, expires_at, accessed_at FROM entries "
+                f"WHERE key IN ({_placeholders(len(chunk))}) AND expires_at > ?",
+                (*chunk, now),
+            ).fetchall()
+            for key, value, expires_at, accessed_at in rows:
+                found[key] = (value, expires_at - now)
+                if now - accessed_at > _TOUCH_INTERVAL:
+                    touch.append(key)
+        if touch:
+            try:
+                with self._transaction() as tx:
+                    for i in range(0, len(touch), _CHUNK):
+                        chunk = touch[i:i + _CHUNK]
+                        tx.execute(
+                            f"UPDATE entries SET accessed_at = ? WHERE key IN ({_placeholders(len(chunk))})",
+                            (now, *chunk),
+                        )
+            except sqlite3.OperationalError as e:
+                logger.debug(f"Disk cache access-time update skipped: {e}")
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def set_many(
+        self,
+        entries: Iterable[Tuple[str, bytes, float]],
+        tags: Optional[Mapping[str, Iterable[str]]] = None,
+    ) -> None:
+        """Store ``(key, data, ttl)`` entries and index them under ``tags``"""
+        now = time.time()
+        rows = [(key, data, now + ttl, now, len(data)) for key, data, ttl in entries if ttl > 0]
+        if not rows:
+            return
+        tags = tags or {}
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            tag_rows = [(tag, key) for key, *_ in rows for tag in tags.get(key, ())]
+            if tag_rows:
+                conn.executemany("INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)", tag_rows)
+        self.stats["writes"] += len(rows)
+
+        with self._lock:
+            self._writes += len(rows)
+            due = self._writes >= _EVICT_EVERY
+            if due:
+                self._writes = 0
+        if due:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.execute("DELETE FROM tags WHERE key = ?", (key,))
+
+    def invalidate_tag(self, tag: str) -> List[str]:
+        """Delete every entry indexed under ``tag`` in one transaction; returns their keys"""
+        with self._transaction() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM tags WHERE tag = ?", (tag,))]
+            conn.execute("DELETE FROM entries WHERE key IN (SELECT key FROM tags WHERE tag = ?)", (tag,))
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                conn.execute(f"DELETE FROM tags WHERE key IN ({_placeholders(len(chunk))})", chunk)
+        return keys
+
+    def delete_matching(self, needle: str, predicate: Callable[[str], bool]) -> List[str]:
+        """Delete entries whose key contains ``needle`` and satisfies ``predicate``; returns their keys"""
+        with self._transaction() as conn:
+            candidates = [row[0] for row in conn.execute("SELECT key FROM entries WHERE instr(key, ?) > 0", (needle,))]
+            keys = [key for key in candidates if predicate(key)]
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                conn.execute(f"DELETE FROM entries WHERE key IN ({_placeholders(len(chunk))})", chunk)
+                conn.execute(f"DELETE FROM tags WHERE key IN ({_placeholders(len(chunk))})", chunk)
+        return keys
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently read ones until under 90% of ``max_bytes``"""
+        now = time.time()
+        with self._transaction() as conn:
+            expired = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            evicted = 0
+            if total > self.max_bytes:
+                excess = total - int(self.max_bytes * 0.9)
+                victims: List[str] = []
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    victims.append(key)
+                    excess -= size
+                    if excess <= 0:
+                        break
+                for i in range(0, len(victims), _CHUNK):
+                    chunk = victims[i:i + _CHUNK]
+                    conn.execute(f"DELETE FROM entries WHERE key IN ({_placeholders(len(chunk))})", chunk)
+                evicted = len(victims)
+            if expired or evicted:
+                conn.execute("DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)")
+        self.stats["expired"] += expired
+        self.stats["evictions"] += evicted
+        if evicted:
+            logger.info(f"Disk cache over {self.max_bytes} bytes, evicted {evicted} entries")
+        return expired + evicted
+
+    def clear(self) -> int:
+        with self._transaction() as conn:
+            count = conn.execute("DELETE FROM entries").rowcount
+            conn.execute("DELETE FROM tags")
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 2) if lookups else 0,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "path": str(self.path),
+        }
+
+
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_initialized = False
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """Get global disk cache configured from settings; None when disabled or unusable"""
+    global _disk_cache, _disk_cache_initialized
+    if not _disk_cache_initialized:
+        _disk_cache_initialized = True
+        from app.config import get_settings
+        settings = get_settings()
+        if settings.disk_cache_enabled:
+            try:
+                _disk_cache = DiskCache(settings.disk_cache_path, max_bytes=settings.disk_cache_max_mb * 1024 * 1024)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Disk cache unavailable at {settings.disk_cache_path}: {e}")
+    return _disk_cache
@@ -0,0 +1,274 @@
+"""
+Incremental OHLCV history store
+
+Keeps one full price series per (ticker, interval) and records its last-bar
+timestamp. When the series goes stale only the window since the last bar is
+downloaded and appended; any ``period`` is then served as a slice of the stored
+series instead of re-downloading a full 1y/5y history to pick up one new bar.
+
+Every downloaded window is also written to the on-disk columnar price store,
+which seeds the series after a restart or when the cache entry has expired.
+
+Prices are auto-adjusted, so a split or dividend since the last refresh
+rescales the whole history. Each delta therefore starts at the last complete
+stored bar, and when that bar's close no longer matches the stored close the
+series (and its persisted copy) is replaced by a full refetch instead of being
+extended with bars on a different adjustment basis.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import pandas as pd
+
+from app.cache.price_store import flatten_ohlcv_columns, get_price_store
+from app.cache.redis_cache import get_cache_manager, ticker_tag
+from app.utils.rate_limiter import get_yahoo_client
+
+logger = logging.getLogger(__name__)
+
+# Intervals served from the store; intraday bars have short, provider-specific
+# look-back limits and keep using the plain per-period download.
+INCREMENTAL_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+# Look-back of each yfinance period in days ("max" is unbounded, "ytd" is computed)
+_PERIOD_DAYS: Dict[str, Optional[int]] = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "max": None,
+}
+
+# Relative close difference on the overlap bar above which the stored series
+# is treated as adjusted on a different basis (split/dividend) and refetched
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def _period_days(period: str, now: Optional[pd.Timestamp] = None) -> Optional[int]:
+    if period == "ytd":
+        now = now or pd.Timestamp.now()
+        return int((now - pd.Timestamp(year=now.year, month=1, day=1)).days) + 1
+    return _PERIOD_DAYS.get(period, _PERIOD_DAYS["1y"])
+
+
+def _covers(stored_period: str, requested_period: str) -> bool:
+    """True when a series fetched for ``stored_period`` contains ``requested_period``"""
+    stored = _period_days(stored_period)
+    requested = _period_days(requested_period)
+    if stored is None:
+        return True
+    if requested is None:
+        return False
+    return stored >= requested
+
+
+def _spanned_period(data: pd.DataFrame) -> Optional[str]:
+    """Longest yfinance period fully contained in ``data``'s date span"""
+    span = (data.index[-1] - data.index[0]).days + 7  # weekend/holiday slack at the edges
+    fitting = [p for p, days in _PERIOD_DAYS.items() if days is not None and days <= span]
+    return max(fitting, key=lambda p: _PERIOD_DAYS[p]) if fitting else None
+
+
+def slice_period(data: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Return the trailing ``period`` of ``data`` measured back from its last bar"""
+    if data.empty or period == "max":
+        return data
+    last_bar = data.index[-1]
+    if period == "ytd":
+        cutoff = pd.Timestamp(year=last_bar.year, month=1, day=1, tz=getattr(last_bar, "tz", None))
+    else:
+        cutoff = last_bar - pd.Timedelta(days=_period_days(period))
+    return data[data.index > cutoff]
+
+
+class OHLCVHistoryStore:
+    """
+    Full-series OHLCV store with delta refresh.
+
+    Entries live in the shared CacheManager under ``ohlcv_history:<ticker>``
+    with a long retention TTL; ``refresh_interval`` bounds how often a delta
+    download is attempted for the same series.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: int = 900,
+        retention_ttl: int = 7 * 24 * 3600,
+        max_staleness_days: int = 7,
+    ):
+        self.refresh_interval = refresh_interval
+        self.retention_ttl = retention_ttl
+        self.max_staleness_days = max_staleness_days
+        # One lock per series while anyone holds or waits on it: (lock, users)
+        self._locks: Dict[str, tuple[asyncio.Lock, int]] = {}
+        self.stats = {
+            "full_fetches": 0,
+            "delta_fetches": 0,
+            "fresh_hits": 0,
+            "bars_appended": 0,
+            "persisted_loads": 0,
+            "adjustment_refetches": 0,
+        }
+
+    @staticmethod
+    def _key(ticker: str, interval: str) -> str:
+        return f"ohlcv_history:{ticker}:interval={interval}"
+
+    @asynccontextmanager
+    async def _series_lock(self, key: str) -> AsyncIterator[None]:
+        """Serialize refreshes of one series; the lock is dropped once nobody holds or waits on it"""
+        lock, users = self._locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def get(self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Return ``period`` of history, refreshing the stored series as needed"""
+        key = self._key(ticker, interval)
+        async with self._series_lock(key):
+            cache = await get_cache_manager()
+            entry: Optional[Dict[str, Any]] = await cache.get(key)
+            if entry is None:
+                entry = await self._load_persisted(ticker, interval)
+
+            if entry is None or not _covers(entry["period"], period):
+                entry = await self._full_fetch(ticker, period, interval)
+            elif time.time() - entry["refreshed_at"] >= self.refresh_interval:
+                entry = await self._delta_fetch(ticker, interval, entry)
+            else:
+                # Fresh and already stored: nothing to write back
+                self.stats["fresh_hits"] += 1
+                return slice_period(entry["data"], period)
+
+            if entry is None:
+                return pd.DataFrame()
+            await cache.set(key, entry, ttl=self.retention_ttl, tags=[ticker_tag(ticker)])
+            return slice_period(entry["data"], period)
+
+    async def _load_persisted(self, ticker: str, interval: str) -> Optional[Dict[str, Any]]:
+        """Rebuild an entry from the columnar price store; it is delta-refreshed next"""
+        store = get_price_store()
+        if not store.enabled:
+            return None
+        try:
+            data = await asyncio.to_thread(store.read, ticker, None, None, interval)
+        except Exception as e:
+            logger.warning(f"History store: could not read persisted {ticker} ({interval}): {e}")
+            return None
+        try:
+            data = flatten_ohlcv_columns(data, ticker)
+        except ValueError as e:
+            logger.warning(f"History store: ignoring persisted {ticker} ({interval}): {e}")
+            return None
+        if data.empty or _spanned_period(data) is None:
+            return None
+        self.stats["persisted_loads"] += 1
+        return {
+            "data": data,
+            "period": _spanned_period(data),
+            "last_bar": data.index[-1],
+            "refreshed_at": 0.0,
+        }
+
+    async def _persist(self, ticker: str, interval: str, data: pd.DataFrame) -> None:
+        store = get_price_store()
+        if not store.enabled:
+            return
+        try:
+            await asyncio.to_thread(store.write, ticker, data, interval)
+        except Exception as e:
+            logger.warning(f"History store: could not persist {ticker} ({interval}): {e}")
+
+    async def _full_fetch(
+        self, ticker: str, period: str, interval: str, replace: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Download ``period`` in full; ``replace`` drops the persisted series first"""
+        self.stats["full_fetches"] += 1
+        data = await get_yahoo_client().download(ticker, period, interval)
+        if data is None or data.empty:
+            return None
+        data = flatten_ohlcv_columns(data, ticker)
+        logger.debug(f"History store: full {period}/{interval} fetch for {ticker} ({len(data)} bars)")
+        if replace:
+            store = get_price_store()
+            if store.enabled:
+                await asyncio.to_thread(store.delete, ticker, interval)
+        await self._persist(ticker, interval, data)
+        return {
+            "data": data,
+            "period": period,
+            "last_bar": data.index[-1],
+            "refreshed_at": time.time(),
+        }
+
+    async def _delta_fetch(self, ticker: str, interval: str, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.stats["delta_fetches"] += 1
+        stored: pd.DataFrame = flatten_ohlcv_columns(entry["data"], ticker)
+        last_bar: pd.Timestamp = entry["last_bar"]
+        # The last stored bar may have been a partial session; the one before it
+        # is complete and anchors the adjustment check
+        anchor = stored.index[-2] if len(stored) > 1 else last_bar
+
+        delta = await get_yahoo_client().download_since(ticker, anchor, interval)
+        if delta is None or delta.empty:
+            age_days = (pd.Timestamp.now(tz=getattr(last_bar, "tz", None)) - last_bar).days
+            if age_days > self.max_staleness_days:
+                logger.info(f"History store: empty delta for {ticker} and last bar {age_days}d old, refetching")
+                return await self._full_fetch(ticker, entry["period"], interval)
+            return {**entry, "refreshed_at": time.time()}
+
+        delta = flatten_ohlcv_columns(delta, ticker)
+        if getattr(delta.index, "tz", None) != getattr(stored.index, "tz", None):
+            delta = delta.tz_localize(None) if stored.index.tz is None else delta.tz_convert(stored.index.tz)
+        if not delta.columns.equals(stored.columns):
+            delta = delta.reindex(columns=stored.columns)
+
+        if not self._same_adjustment(stored, delta, anchor):
+            self.stats["adjustment_refetches"] += 1
+            logger.info(f"History store: {ticker} ({interval}) re-adjusted since {anchor.date()}, refetching in full")
+            return await self._full_fetch(ticker, entry["period"], interval, replace=True)
+
+        await self._persist(ticker, interval, delta)
+        merged = pd.concat([stored[stored.index < delta.index[0]], delta])
+        self.stats["bars_appended"] += int((delta.index > last_bar).sum())
+        logger.debug(f"History store: appended {len(delta)} bars for {ticker} ({interval})")
+        return {
+            "data": merged,
+            "period": entry["period"],
+            "last_bar": merged.index[-1],
+            "refreshed_at": time.time(),
+        }
+
+    @staticmethod
+    def _same_adjustment(stored: pd.DataFrame, delta: pd.DataFrame, anchor: pd.Timestamp) -> bool:
+        """True when ``delta`` repeats the stored close of the overlap bar within tolerance"""
+        if anchor not in delta.index or "Close" not in stored.columns:
+            return False
+        old, new = stored.at[anchor, "Close"], delta.at[anchor, "Close"]
+        if pd.isna(old) or pd.isna(new):
+            return False
+        return abs(new - old) <= ADJUSTMENT_TOLERANCE * max(abs(old), 1e-9)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+_history_store: Optional[OHLCVHistoryStore] = None
+
+
+def get_history_store() -> OHLCVHistoryStore:
+    """Get global OHLCV history store instance"""
+    global _history_store
+    if _history_store is None:
+        _history_store = OHLCVHistoryStore()
+    return _history_store
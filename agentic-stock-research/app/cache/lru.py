@@ -0,0 +1,420 @@
+"""
+Bounded in-process caches with TTL and byte-size accounting
+
+Used for process-local caches that hold DataFrames and payload dicts, where an
+unbounded dict would grow for the lifetime of the worker and keep serving
+stale prices. ``SizedLRUCache`` admits everything; ``TinyLFUCache`` adds a
+W-TinyLFU admission filter so one large, rarely used value cannot push out
+many small, frequently used ones.
+"""
+from __future__ import annotations
+
+import heapq
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from app.cache.access_tracker import CountMinSketch
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory size of a cached value in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        try:
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except Exception:
+            return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SizedLRUCache:
+    """
+    LRU cache bounded by entry count and total estimated bytes.
+
+    Entries expire ``ttl`` seconds after they are stored (or after a per-entry
+    ``ttl`` passed to ``set``). Reads move an entry to the most-recently-used
+    end; inserts evict from the least-recently-used end until both limits hold.
+    A single value larger than ``max_bytes`` is not cached at all.
+
+    All operations are O(1) apart from expiry, which is lazy: an expiry heap is
+    drained on each insert, so entries that are never read again still release
+    their bytes once they expire, at O(log n) amortised per entry.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 128 * 1024 * 1024, ttl: float = 900):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()  # key -> (value, expiry, size)
+        self._bytes = 0
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []  # (expiry, seq, key)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expiry, _ = entry
+            if time.monotonic() >= expiry:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store ``value``; returns False when it is too large to cache"""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if size > self.max_bytes:
+                self.rejections += 1
+                return False
+            now = time.monotonic()
+            self._purge_expired(now)
+            expiry = now + (self.ttl if ttl is None else ttl)
+            self._data[key] = (value, expiry, size)
+            self._bytes += size
+            self._seq += 1
+            heapq.heappush(self._expiry_heap, (expiry, self._seq, key))
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def _purge_expired(self, now: float) -> int:
+        """Drop expired entries from the heap head; stale heap items are skipped"""
+        purged = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expiry, _, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expiry:
+                self._remove(key)
+                self.expirations += 1
+                purged += 1
+        # Overwrites, deletes and evictions leave stale heap items behind
+        if len(heap) > 2 * len(self._data) + 64:
+            self._expiry_heap = [(entry[1], i, k) for i, (k, entry) in enumerate(self._data.items())]
+            heapq.heapify(self._expiry_heap)
+            self._seq = len(self._expiry_heap)
+        return purged
+
+    def purge_expired(self) -> int:
+        """Release every expired entry now; returns how many were dropped"""
+        with self._lock:
+            return self._purge_expired(time.monotonic())
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        """Seconds until ``key`` expires, or None if it is not cached"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            remaining = entry[1] - time.monotonic()
+            return remaining if remaining > 0 else None
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() < entry[1]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self) -> List[Hashable]:
+        """Snapshot of the stored keys, including ones that expired but were not purged yet"""
+        with self._lock:
+            return list(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected_oversize": self.rejections,
+        }
+
+
+def key_type(key: Hashable) -> str:
+    """Data type of a cache key: the prefix before the first ``:`` (``info:AAPL`` -> ``info``)"""
+    if isinstance(key, tuple) and key:
+        key = key[0]
+    return str(key).split(":", 1)[0]
+
+
+# Misses remembered so the value stored afterwards counts towards missed bytes
+_RECENT_MISSES = 4096
+_ABSENT = object()
+
+_WINDOW, _PROBATION, _PROTECTED = "window", "probation", "protected"
+
+
+class TinyLFUCache(SizedLRUCache):
+    """
+    Byte-budgeted cache with W-TinyLFU admission.
+
+    New entries land in a small LRU window (``window_fraction`` of the bytes).
+    An entry pushed out of the window only enters the main region if its
+    estimated access frequency beats every entry it would displace there;
+    otherwise it is dropped and counted as a rejected admission. The main
+    region is a segmented LRU: entries read again while on probation move to
+    the protected segment (``protected_fraction`` of the main bytes).
+
+    Access frequencies come from a count-min sketch that is halved every
+    ``sample_size`` accesses, so popularity decays. ``max_entries`` is only a
+    safety cap; the byte budget drives eviction. Hit ratio, byte hit ratio and
+    rejected admissions are reported per data type (see ``key_type``).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 900,
+        max_entries: Optional[int] = None,
+        window_fraction: float = 0.01,
+        protected_fraction: float = 0.8,
+        sample_size: int = 100_000,
+        classify: Callable[[Hashable], str] = key_type,
+    ):
+        super().__init__(max_entries=max_entries or sys.maxsize, max_bytes=max_bytes, ttl=ttl)
+        self.window_bytes = max(1, int(max_bytes * window_fraction))
+        self.protected_bytes = int((max_bytes - self.window_bytes) * protected_fraction)
+        self.sample_size = sample_size
+        self.classify = classify
+        self.sketch = CountMinSketch(width=max(1024, sample_size // 10))
+        self._accesses = 0
+        self._segments: Dict[str, "OrderedDict[Hashable, None]"] = {
+            _WINDOW: OrderedDict(), _PROBATION: OrderedDict(), _PROTECTED: OrderedDict(),
+        }
+        self._segment_of: Dict[Hashable, str] = {}
+        self._segment_size = {_WINDOW: 0, _PROBATION: 0, _PROTECTED: 0}
+        self._recent_misses: "OrderedDict[Hashable, None]" = OrderedDict()
+        self.admission_rejections = 0
+        self.type_stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "hit_bytes": 0, "miss_bytes": 0, "rejected_admissions": 0}
+        )
+
+    def _record_access(self, key: Hashable) -> None:
+        self.sketch.add(str(key))
+        self._accesses += 1
+        if self._accesses >= self.sample_size:
+            self._accesses = 0
+            self.sketch.halve()
+
+    def _place(self, key: Hashable, segment: str, size: int) -> None:
+        self._segments[segment][key] = None
+        self._segment_of[key] = segment
+        self._segment_size[segment] += size
+
+    def _unplace(self, key: Hashable, size: int) -> str:
+        segment = self._segment_of.pop(key)
+        del self._segments[segment][key]
+        self._segment_size[segment] -= size
+        return segment
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+        self._unplace(key, size)
+
+    def _miss(self, key: Hashable) -> None:
+        self.misses += 1
+        self.type_stats[self.classify(key)]["misses"] += 1
+        self._recent_misses[key] = None
+        self._recent_misses.move_to_end(key)
+        if len(self._recent_misses) > _RECENT_MISSES:
+            self._recent_misses.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            self._record_access(key)
+            entry = self._data.get(key)
+            if entry is None:
+                self._miss(key)
+                return default
+            value, expiry, size = entry
+            if time.monotonic() >= expiry:
+                self._remove(key)
+                self.expirations += 1
+                self._miss(key)
+                return default
+            segment = self._segment_of[key]
+            if segment == _PROBATION:
+                # Second hit in the main region: promote, demoting protected LRU entries if full
+                self._unplace(key, size)
+                self._place(key, _PROTECTED, size)
+                protected = self._segments[_PROTECTED]
+                while self._segment_size[_PROTECTED] > self.protected_bytes and len(protected) > 1:
+                    demoted = next(iter(protected))
+                    demoted_size = self._data[demoted][2]
+                    self._unplace(demoted, demoted_size)
+                    self._place(demoted, _PROBATION, demoted_size)
+            else:
+                self._segments[segment].move_to_end(key)
+            self.hits += 1
+            stats = self.type_stats[self.classify(key)]
+            stats["hits"] += 1
+            stats["hit_bytes"] += size
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store ``value`` in the window; returns False when it is too large to cache"""
+        size = estimate_size(value)
+        with self._lock:
+            if self._recent_misses.pop(key, _ABSENT) is not _ABSENT:
+                self.type_stats[self.classify(key)]["miss_bytes"] += size
+            if size > self.max_bytes:
+                if key in self._data:
+                    self._remove(key)
+                self.rejections += 1
+                return False
+            now = time.monotonic()
+            self._purge_expired(now)
+            expiry = now + (self.ttl if ttl is None else ttl)
+            self._seq += 1
+            heapq.heappush(self._expiry_heap, (expiry, self._seq, key))
+            if key in self._data:
+                # Refresh in place: an entry that earned its segment keeps it
+                old_size = self._data[key][2]
+                segment = self._segment_of[key]
+                self._data[key] = (value, expiry, size)
+                self._bytes += size - old_size
+                self._segment_size[segment] += size - old_size
+                self._segments[segment].move_to_end(key)
+                while self._bytes > self.max_bytes:
+                    self._evict_one()
+                return True
+            self._data[key] = (value, expiry, size)
+            self._bytes += size
+            self._place(key, _WINDOW, size)
+
+            window = self._segments[_WINDOW]
+            while self._segment_size[_WINDOW] > self.window_bytes and window:
+                self._admit(next(iter(window)))
+            while len(self._data) > self.max_entries:
+                self._evict_one()
+            return True
+
+    def _admit(self, candidate: Hashable) -> None:
+        """Move ``candidate`` from the window into probation if it beats the victims it needs"""
+        size = self._data[candidate][2]
+        self._unplace(candidate, size)
+        main_budget = self.max_bytes - self.window_bytes
+        needed = self._segment_size[_PROBATION] + self._segment_size[_PROTECTED] + size - main_budget
+        victims: List[Hashable] = []
+        if needed > 0:
+            for segment in (_PROBATION, _PROTECTED):
+                for victim in self._segments[segment]:
+                    victims.append(victim)
+                    needed -= self._data[victim][2]
+                    if needed <= 0:
+                        break
+                if needed <= 0:
+                    break
+            frequency = self.sketch.estimate(str(candidate))
+            if needed > 0 or any(self.sketch.estimate(str(v)) >= frequency for v in victims):
+                # Hotter entries would be displaced: drop the candidate instead
+                _, _, size = self._data.pop(candidate)
+                self._bytes -= size
+                self.admission_rejections += 1
+                self.type_stats[self.classify(candidate)]["rejected_admissions"] += 1
+                return
+        for victim in victims:
+            self._remove(victim)
+            self.evictions += 1
+        self._place(candidate, _PROBATION, size)
+
+    def _evict_one(self) -> None:
+        for segment in (_PROBATION, _WINDOW, _PROTECTED):
+            if self._segments[segment]:
+                self._remove(next(iter(self._segments[segment])))
+                self.evictions += 1
+                return
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+            for segment in self._segments.values():
+                segment.clear()
+            self._segment_of.clear()
+            self._segment_size = {name: 0 for name in self._segment_size}
+            self._recent_misses.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.pop("max_entries")
+        by_type = {}
+        for data_type, counts in sorted(self.type_stats.items()):
+            lookups = counts["hits"] + counts["misses"]
+            requested_bytes = counts["hit_bytes"] + counts["miss_bytes"]
+            by_type[data_type] = {
+                **counts,
+                "hit_rate": round(counts["hits"] / lookups * 100, 2) if lookups else 0,
+                "byte_hit_rate": round(counts["hit_bytes"] / requested_bytes * 100, 2) if requested_bytes else 0,
+            }
+        return {
+            **stats,
+            "admission": "w-tinylfu",
+            "rejected_admissions": self.admission_rejections,
+            "segment_bytes": dict(self._segment_size),
+            "by_type": by_type,
+        }
+
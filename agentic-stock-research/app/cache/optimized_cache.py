@@ -7,21 +7,56 @@ This module provides enhanced caching capabilities with:
 - Batch operations
 - Performance monitoring
 - Smart invalidation strategies
+- Stale-while-revalidate reads with per-request staleness reporting
+- Stampede protection: XFetch early refresh and a fleet-wide refresh lock
+- A host-wide shared-memory tier for OHLCV frames and company info, so hot
+  entries are held once per host instead of once per worker
 """
 
 import asyncio
 import logging
+import math
+import random
 import time
-from typing import Any, Dict, List, Optional, Union, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Union, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 import json
 import pickle
 
-from app.cache.redis_cache import CacheManager, get_cache_manager
+from app.cache.lru import TinyLFUCache
+from app.cache.redis_cache import CacheManager, get_cache_manager, key_mentions_ticker, ticker_tag
+from app.cache.shared_memory import SharedMemoryCache, get_shared_memory_cache
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Key prefixes held in the shared-memory tier (when configured) instead of each worker's L1
+SHARED_PREFIXES = ("ohlcv", "info")
+
+# Collects the age of every value served stale during the current request
+_staleness: ContextVar[Optional[Dict[str, float]]] = ContextVar("cache_staleness", default=None)
+
+
+@contextmanager
+def track_staleness() -> Iterator[Dict[str, float]]:
+    """
+    Record stale-while-revalidate reads made inside the block.
+
+    Yields a dict that fills with ``cache key -> age in seconds`` for every
+    value served past its soft TTL; it stays empty when all data was fresh.
+    Tasks and data I/O threads started inside the block share the same dict.
+    """
+    report: Dict[str, float] = {}
+    token = _staleness.set(report)
+    try:
+        yield report
+    finally:
+        _staleness.reset(token)
+
 
 @dataclass
 class CacheMetrics:
@@ -41,15 +76,37 @@ class OptimizedCacheManager:
     High-performance cache manager with multi-level caching and optimizations
     """
     
-    def __init__(self, redis_cache: Optional[CacheManager] = None):
+    def __init__(
+        self,
+        redis_cache: Optional[CacheManager] = None,
+        memory_cache_size_limit: Optional[int] = None,
+        memory_cache_max_bytes: int = 64 * 1024 * 1024,
+        xfetch_beta: float = 1.0,
+        refresh_lock_ttl: float = 60,
+        shared_cache: Optional[SharedMemoryCache] = None,
+    ):
         self.redis_cache = redis_cache or CacheManager()
-        self.memory_cache: Dict[str, Tuple[Any, float]] = {}  # key -> (value, expiry)
+        self.shared_cache = shared_cache
+        # L1: byte-budgeted W-TinyLFU with lazy heap expiry; entries keep the TTL they had in Redis
+        self.default_memory_ttl = 3600  # only for values stored without a TTL
+        self.memory_cache = TinyLFUCache(
+            max_bytes=memory_cache_max_bytes, ttl=self.default_memory_ttl, max_entries=memory_cache_size_limit
+        )
         self.metrics = CacheMetrics()
         self.batch_operations: Dict[str, List[Tuple[str, Any, Optional[float]]]] = defaultdict(list)
         self.cache_warming_queue: List[str] = []
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self.swr_stats = {
+            "stale_served": 0, "early_refreshes": 0, "refreshes": 0, "refresh_failures": 0,
+            "deduplicated": 0, "lock_contended": 0,
+        }
+        # XFetch: recompute time per key prefix (EWMA seconds) scales early refreshes
+        self.xfetch_beta = xfetch_beta
+        self.refresh_lock_ttl = refresh_lock_ttl
+        self._recompute_time: Dict[str, float] = {}
         
         # Performance settings
-        self.memory_cache_size_limit = 1000  # Max items in memory cache
+        self.memory_cache_size_limit = memory_cache_size_limit  # Optional entry cap; bytes drive eviction
         self.batch_size = 50  # Batch operations size
         self.warming_concurrency = 10  # Concurrent cache warming
         
@@ -57,31 +114,40 @@ class OptimizedCacheManager:
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache with multi-level fallback"""
+        value, _ = await self.get_with_ttl(key)
+        return value
+    
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Get a value and its remaining TTL in seconds; (None, None) on a miss"""
         start_time = time.time()
         self.metrics.total_requests += 1
         
         # Level 1: Memory cache (fastest)
-        if key in self.memory_cache:
-            value, expiry = self.memory_cache[key]
-            if time.time() < expiry:
-                self.metrics.hits += 1
-                self.metrics.hit_rate = self.metrics.hits / self.metrics.total_requests
-                self.metrics.average_get_time = (self.metrics.average_get_time + (time.time() - start_time)) / 2
-                return value
-            else:
-                # Expired, remove from memory cache
-                del self.memory_cache[key]
+        value = self.memory_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.metrics.hits += 1
+            self.metrics.hit_rate = self.metrics.hits / self.metrics.total_requests
+            self.metrics.average_get_time = (self.metrics.average_get_time + (time.time() - start_time)) / 2
+            return value, self.memory_cache.ttl_remaining(key)
+        
+        # Shared-memory tier (same host, other workers' reads)
+        shared = self._shared_get(key)
+        if shared is not None:
+            self.metrics.hits += 1
+            self.metrics.hit_rate = self.metrics.hits / self.metrics.total_requests
+            self.metrics.average_get_time = (self.metrics.average_get_time + (time.time() - start_time)) / 2
+            return shared
         
         # Level 2: Redis cache
         try:
-            value = await self.redis_cache.get(key)
+            value, remaining_ttl = await self.redis_cache.get_with_ttl(key)
             if value is not None:
-                # Store in memory cache for faster future access
-                await self._store_in_memory(key, value, ttl=3600)  # 1 hour in memory
+                # Store in memory cache for the rest of the entry's Redis lifetime
+                await self._store_in_memory(key, value, ttl=remaining_ttl)
                 self.metrics.hits += 1
                 self.metrics.hit_rate = self.metrics.hits / self.metrics.total_requests
                 self.metrics.average_get_time = (self.metrics.average_get_time + (time.time() - start_time)) / 2
-                return value
+                return value, remaining_ttl
         except Exception as e:
             logger.warning(f"Redis cache get failed for {key}: {e}")
         
@@ -89,17 +155,115 @@ class OptimizedCacheManager:
         self.metrics.misses += 1
         self.metrics.hit_rate = self.metrics.hits / self.metrics.total_requests
         self.metrics.average_get_time = (self.metrics.average_get_time + (time.time() - start_time)) / 2
-        return None
+        return None, None
+    
+    async def get_stale_while_revalidate(
+        self,
+        key: str,
+        refresh: Callable[[], Awaitable[Any]],
+        soft_ttl: float,
+        hard_ttl: float,
+    ) -> Optional[Any]:
+        """
+        Read a key stored with ``hard_ttl``, treating it as fresh for ``soft_ttl``.
+
+        Between the soft and hard TTL the stale value is returned immediately
+        and ``refresh`` (which must rewrite the key) is started in the
+        background, at most once per key across the fleet at a time. Fresh
+        values are also refreshed early with XFetch probability, which rises as
+        the soft TTL approaches and with how long the key takes to recompute.
+        Returns None on a miss, so the caller fetches synchronously only once
+        the hard TTL has passed.
+        """
+        value, remaining = await self.get_with_ttl(key)
+        if value is None or remaining is None:
+            return value
+        fresh_for = self.fresh_for(key, remaining, soft_ttl, hard_ttl)
+        if fresh_for < 0:
+            self.swr_stats["stale_served"] += 1
+            report = _staleness.get()
+            if report is not None:
+                report[key] = round(self.redis_cache.effective_ttl(key, hard_ttl) - remaining, 1)
+            self._revalidate(key, refresh)
+        elif self._xfetch(key, fresh_for):
+            self.swr_stats["early_refreshes"] += 1
+            self._revalidate(key, refresh)
+        return value
+    
+    def fresh_for(self, key: str, remaining: float, soft_ttl: float, hard_ttl: float) -> float:
+        """
+        Seconds until an entry stored with ``hard_ttl`` passes its soft TTL
+        (negative once it is stale), given its ``remaining`` TTL.
+        """
+        # TTLs are stored jittered per key; scale both bounds the same way
+        stored_ttl = self.redis_cache.effective_ttl(key, hard_ttl)
+        return soft_ttl * stored_ttl / hard_ttl - (stored_ttl - remaining)
+    
+    def _xfetch(self, key: str, time_left: float) -> bool:
+        """XFetch test: refresh when delta * beta * -ln(U) reaches the time left"""
+        if self.xfetch_beta <= 0:
+            return False
+        delta = self._recompute_time.get(key.split(":", 1)[0], 1.0)
+        return delta * self.xfetch_beta * -math.log(1.0 - random.random()) >= time_left
+    
+    def _revalidate(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> None:
+        task = self._revalidating.get(key)
+        if task is not None and not task.done():
+            self.swr_stats["deduplicated"] += 1
+            return
+        task = asyncio.get_running_loop().create_task(self._run_refresh(key, refresh))
+        self._revalidating[key] = task
+        task.add_done_callback(
+            lambda t: self._revalidating.pop(key, None) if self._revalidating.get(key) is t else None
+        )
+    
+    async def refresh_now(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Run ``refresh`` for ``key`` under the fleet-wide refresh lock.
+
+        Returns False if another worker already holds the lock or it failed.
+        """
+        task = self._revalidating.get(key)
+        if task is not None and not task.done():
+            self.swr_stats["deduplicated"] += 1
+            return False
+        return await self._run_refresh(key, refresh)
     
-    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+    async def _run_refresh(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> bool:
+        lock = f"refresh:{key}"
+        token = await self.redis_cache.acquire_lock(lock, self.refresh_lock_ttl)
+        if token is None:
+            # Another worker is recomputing; keep serving the old value
+            self.swr_stats["lock_contended"] += 1
+            return False
+        start = time.monotonic()
+        try:
+            await refresh()
+            self.swr_stats["refreshes"] += 1
+            prefix = key.split(":", 1)[0]
+            elapsed = time.monotonic() - start
+            previous = self._recompute_time.get(prefix)
+            self._recompute_time[prefix] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+            return True
+        except Exception as e:
+            self.swr_stats["refresh_failures"] += 1
+            logger.warning(f"Background refresh failed for {key}, keeping stale value: {e}")
+            return False
+        finally:
+            await self.redis_cache.release_lock(lock, token)
+    
+    async def set(
+        self, key: str, value: Any, ttl: Optional[float] = None, tags: Optional[Iterable[str]] = None
+    ) -> bool:
         """Set value in cache with multi-level storage"""
         start_time = time.time()
         self.metrics.sets += 1
+        ttl = ttl or self.redis_cache.default_ttl
         
         try:
-            # Store in both memory and Redis
-            await self._store_in_memory(key, value, ttl)
-            await self.redis_cache.set(key, value, ttl)
+            # Store in both memory and Redis (L1 keeps the jittered TTL Redis stores)
+            await self._store_in_memory(key, value, self.redis_cache.effective_ttl(key, ttl))
+            await self.redis_cache.set(key, value, ttl, tags=tags)
             
             self.metrics.average_set_time = (self.metrics.average_set_time + (time.time() - start_time)) / 2
             return True
@@ -108,68 +272,83 @@ class OptimizedCacheManager:
             logger.error(f"Cache set failed for {key}: {e}")
             return False
     
+    def _shares(self, key: str) -> bool:
+        return self.shared_cache is not None and key.split(":", 1)[0] in SHARED_PREFIXES
+    
+    def _shared_get(self, key: str) -> Optional[Tuple[Any, float]]:
+        if not self._shares(key):
+            return None
+        try:
+            return self.shared_cache.get(key)
+        except Exception as e:
+            logger.warning(f"Shared-memory cache get failed for {key}: {e}")
+            return None
+    
     async def _store_in_memory(self, key: str, value: Any, ttl: Optional[float] = None):
-        """Store value in memory cache with size management"""
-        # Clean up expired entries
-        current_time = time.time()
-        expired_keys = [
-            k for k, (_, expiry) in self.memory_cache.items() 
-            if current_time >= expiry
-        ]
-        for k in expired_keys:
-            del self.memory_cache[k]
-        
-        # Manage cache size
-        if len(self.memory_cache) >= self.memory_cache_size_limit:
-            # Remove oldest entries (simple LRU approximation)
-            oldest_keys = list(self.memory_cache.keys())[:len(self.memory_cache) // 2]
-            for k in oldest_keys:
-                del self.memory_cache[k]
-        
-        # Store new value
-        expiry = current_time + (ttl or 3600)  # Default 1 hour
-        self.memory_cache[key] = (value, expiry)
+        """
+        Store value in the shared-memory tier when its prefix is shared, else in
+        the L1 tier; eviction and expiry are handled by the tier
+        """
+        ttl = ttl or self.default_memory_ttl
+        if self._shares(key):
+            try:
+                if self.shared_cache.put(key, value, ttl):
+                    return
+            except Exception as e:
+                logger.warning(f"Shared-memory cache publish failed for {key}: {e}")
+        self.memory_cache.set(key, value, ttl=ttl)
     
     async def get_many(self, keys: List[str]) -> Dict[str, Any]:
         """Get multiple values efficiently"""
-        results = {}
+        return {key: value for key, (value, _) in (await self.get_many_with_ttl(keys)).items()}
+    
+    async def get_many_with_ttl(self, keys: List[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """Get multiple values with their remaining TTLs (hits only)"""
+        results: Dict[str, Tuple[Any, Optional[float]]] = {}
         
         # Check memory cache first
-        memory_hits = {}
-        current_time = time.time()
-        
         for key in keys:
-            if key in self.memory_cache:
-                value, expiry = self.memory_cache[key]
-                if current_time < expiry:
-                    memory_hits[key] = value
-                    results[key] = value
+            value = self.memory_cache.get(key, _MISSING)
+            if value is not _MISSING:
+                results[key] = (value, self.memory_cache.ttl_remaining(key))
+                continue
+            shared = self._shared_get(key)
+            if shared is not None:
+                results[key] = shared
         
         # Get remaining keys from Redis
-        remaining_keys = [k for k in keys if k not in memory_hits]
+        remaining_keys = [k for k in keys if k not in results]
         if remaining_keys:
             try:
-                redis_results = await self.redis_cache.get_many(remaining_keys)
-                results.update(redis_results)
+                redis_results = await self.redis_cache.get_many_with_ttl(remaining_keys)
                 
-                # Store Redis results in memory cache
-                for key, value in redis_results.items():
-                    await self._store_in_memory(key, value, ttl=3600)
+                # Store Redis results in memory cache with their remaining TTL
+                for key, (value, remaining_ttl) in redis_results.items():
+                    results[key] = (value, remaining_ttl)
+                    await self._store_in_memory(key, value, ttl=remaining_ttl)
                     
             except Exception as e:
                 logger.warning(f"Redis batch get failed: {e}")
         
         return results
     
-    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> bool:
-        """Set multiple values efficiently"""
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[float] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        tags: Optional[Dict[str, Iterable[str]]] = None,
+    ) -> bool:
+        """Set multiple values efficiently (``ttls`` overrides ``ttl`` per key)"""
+        ttl = ttl or self.redis_cache.default_ttl
+        ttls = ttls or {}
         try:
             # Store in memory cache
             for key, value in items.items():
-                await self._store_in_memory(key, value, ttl)
+                await self._store_in_memory(key, value, self.redis_cache.effective_ttl(key, ttls.get(key, ttl)))
             
             # Store in Redis
-            await self.redis_cache.set_many(items, ttl)
+            await self.redis_cache.set_many(items, ttl, ttls, tags=tags)
             return True
             
         except Exception as e:
@@ -181,8 +360,9 @@ class OptimizedCacheManager:
         self.metrics.deletes += 1
         
         # Remove from memory cache
-        if key in self.memory_cache:
-            del self.memory_cache[key]
+        self.memory_cache.delete(key)
+        if self._shares(key):
+            self.shared_cache.delete(key)
         
         # Remove from Redis
         try:
@@ -191,6 +371,79 @@ class OptimizedCacheManager:
             logger.warning(f"Redis delete failed for {key}: {e}")
             return False
     
+    async def clear_ticker(self, ticker: str, include_untagged: bool = False) -> bool:
+        """
+        Invalidate a ticker's tagged keys in Redis and drop them from this
+        worker's L1 and shared tiers; ``include_untagged`` adds the one-off
+        keyspace scan for entries written before ticker tags
+        """
+        try:
+            keys = await self.redis_cache.clear_ticker_keys(ticker, include_untagged)
+        except Exception as e:
+            logger.error(f"Cache clear error for {ticker}: {e}")
+            return False
+        if include_untagged:
+            keys.extend(
+                key for key in self.memory_cache.keys() if isinstance(key, str) and key_mentions_ticker(key, ticker)
+            )
+        for key in keys:
+            self.memory_cache.delete(key)
+            if self._shares(key):
+                self.shared_cache.delete(key)
+        return True
+    
+    # Financial data helpers (same keys and TTLs as CacheManager)
+    def _key(self, prefix: str, ticker: str, **kwargs) -> str:
+        return self.redis_cache._make_key(prefix, ticker, **kwargs)
+    
+    def ohlcv_key(self, ticker: str, period: str = "1y", interval: str = "1d") -> str:
+        return self._key("ohlcv", ticker, period=period, interval=interval)
+    
+    def info_key(self, ticker: str) -> str:
+        return self._key("info", ticker)
+    
+    async def get_ohlcv(self, ticker: str, period: str = "1y", interval: str = "1d") -> Any:
+        return await self.get(self.ohlcv_key(ticker, period, interval))
+    
+    async def set_ohlcv(self, ticker: str, data: Any, period: str = "1y", interval: str = "1d", ttl: int = 900) -> bool:
+        return await self.set(self.ohlcv_key(ticker, period, interval), data, ttl, tags=[ticker_tag(ticker)])
+    
+    async def get_many_ohlcv(
+        self,
+        tickers: List[str],
+        period: str = "1y",
+        interval: str = "1d",
+        soft_ttl: Optional[float] = None,
+        hard_ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Cached OHLCV by ticker; with soft/hard TTLs, entries past the soft TTL count as misses"""
+        keys = {self.ohlcv_key(t, period, interval): t for t in tickers}
+        found = await self.get_many_with_ttl(list(keys))
+        if soft_ttl is None or hard_ttl is None:
+            return {keys[k]: value for k, (value, _) in found.items()}
+        return {
+            keys[k]: value for k, (value, remaining) in found.items()
+            if remaining is None or self.fresh_for(k, remaining, soft_ttl, hard_ttl) >= 0
+        }
+    
+    async def set_many_ohlcv(
+        self, frames: Dict[str, Any], period: str = "1y", interval: str = "1d", ttl: int = 900
+    ) -> bool:
+        keys = {t: self.ohlcv_key(t, period, interval) for t in frames}
+        return await self.set_many(
+            {keys[t]: f for t, f in frames.items()}, ttl, tags={keys[t]: [ticker_tag(t)] for t in frames}
+        )
+    
+    async def get_company_info(self, ticker: str) -> Any:
+        return await self.get(self.info_key(ticker))
+    
+    async def set_company_info(self, ticker: str, data: Any, ttl: int = 3600) -> bool:
+        return await self.set(self.info_key(ticker), data, ttl, tags=[ticker_tag(ticker)])
+    
+    async def get_many_company_info(self, tickers: List[str]) -> Dict[str, Any]:
+        keys = {self._key("info", t): t for t in tickers}
+        return {keys[k]: v for k, v in (await self.get_many(list(keys))).items()}
+    
     async def warm_cache(self, keys: List[str], fetch_func, ttl: Optional[float] = None):
         """Warm cache with frequently accessed data"""
         logger.info(f"Warming cache with {len(keys)} keys")
@@ -226,28 +479,25 @@ class OptimizedCacheManager:
             "average_get_time": f"{self.metrics.average_get_time:.3f}s",
             "average_set_time": f"{self.metrics.average_set_time:.3f}s",
             "memory_cache_size": len(self.memory_cache),
-            "memory_cache_limit": self.memory_cache_size_limit
+            "memory_cache_limit": self.memory_cache_size_limit,
+            "memory_cache": self.memory_cache.get_stats(),
+            "shared_cache": self.shared_cache.get_stats() if self.shared_cache is not None else None,
+            "stale_while_revalidate": {**self.swr_stats, "in_flight": len(self._revalidating)},
         }
     
     async def clear_memory_cache(self):
-        """Clear memory cache"""
+        """Clear memory cache (this worker's L1 and the host's shared-memory tier)"""
         self.memory_cache.clear()
+        if self.shared_cache is not None:
+            self.shared_cache.clear()
         logger.info("Memory cache cleared")
     
     async def optimize_cache(self):
         """Optimize cache performance"""
         # Clean up expired entries
-        current_time = time.time()
-        expired_keys = [
-            k for k, (_, expiry) in self.memory_cache.items() 
-            if current_time >= expiry
-        ]
-        
-        for key in expired_keys:
-            del self.memory_cache[key]
-        
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+        expired = self.memory_cache.purge_expired()
+        if expired:
+            logger.info(f"Cleaned up {expired} expired cache entries")
 
 
 # Global optimized cache manager instance
@@ -259,8 +509,16 @@ async def get_optimized_cache_manager() -> OptimizedCacheManager:
     global _optimized_cache_manager
     
     if _optimized_cache_manager is None:
+        from app.config import get_settings
+        settings = get_settings()
         redis_cache = await get_cache_manager()
-        _optimized_cache_manager = OptimizedCacheManager(redis_cache)
+        _optimized_cache_manager = OptimizedCacheManager(
+            redis_cache,
+            memory_cache_max_bytes=settings.l1_cache_max_mb * 1024 * 1024,
+            xfetch_beta=settings.cache_xfetch_beta,
+            refresh_lock_ttl=settings.cache_refresh_lock_ttl,
+            shared_cache=get_shared_memory_cache(),
+        )
     
     return _optimized_cache_manager
 
@@ -0,0 +1,285 @@
+"""
+Local columnar price store
+
+Persists OHLCV history on disk as Arrow IPC files partitioned by interval,
+symbol and calendar year::
+
+    <root>/<interval>/<SYMBOL>/<year>.arrow
+
+Partitions are written uncompressed and read through ``pyarrow.memory_map`` so
+range queries only touch the years they need and the pages are shared through
+the OS page cache by every uvicorn worker instead of each worker holding its
+own copy. Data survives restarts; writes go to a temp file and are swapped in
+with ``os.replace`` so readers never see a partial partition.
+
+Frames are stored with flat OHLCV columns. yfinance returns single-symbol
+downloads with ``(Price, Ticker)`` MultiIndex columns while batched downloads
+are split into flat frames, so both are normalised on write (and on read, for
+partitions written before this was enforced). A partition whose stored rows
+cannot be merged with new ones is left untouched rather than overwritten.
+
+pyarrow is optional: without it the store reports ``enabled = False``, reads
+return empty frames and writes are no-ops.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, datetime, pd.Timestamp, None]
+
+# Daily bars can be missing around weekends and exchange holidays, so a stored
+# range is treated as covering a request if it reaches within this many days.
+_COVERAGE_SLACK = timedelta(days=5)
+
+_OHLCV_FIELDS = {"Open", "High", "Low", "Close", "Adj Close", "Volume", "Dividends", "Stock Splits"}
+
+
+def flatten_ohlcv_columns(frame: pd.DataFrame, symbol: Optional[str] = None) -> pd.DataFrame:
+    """
+    Return a single-symbol frame with flat OHLCV columns.
+
+    Drops the ticker level of yfinance's ``(Price, Ticker)`` or ticker-grouped
+    MultiIndex columns; when the frame holds several tickers, ``symbol``
+    selects one. Raises ValueError when the columns cannot be flattened.
+    """
+    columns = frame.columns
+    if not isinstance(columns, pd.MultiIndex):
+        return frame
+    if columns.nlevels != 2:
+        raise ValueError(f"unexpected {columns.nlevels}-level OHLCV columns")
+    field_level = 0 if _OHLCV_FIELDS & set(columns.get_level_values(0)) else 1
+    ticker_level = 1 - field_level
+    tickers = columns.get_level_values(ticker_level).unique()
+    if len(tickers) == 1:
+        flat = frame.droplevel(ticker_level, axis=1)
+    elif symbol is not None and symbol in tickers:
+        flat = frame.xs(symbol, axis=1, level=ticker_level)
+    else:
+        raise ValueError(f"OHLCV columns hold several tickers {list(tickers)}")
+    flat.columns.name = None
+    return flat
+
+
+def _align(ts: DateLike, index: pd.Index) -> Optional[pd.Timestamp]:
+    """Convert ``ts`` to a Timestamp comparable with ``index`` (tz-aware or naive)"""
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    tz = getattr(index, "tz", None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_convert(None)
+    return ts
+
+
+class ColumnarPriceStore:
+    """Year-partitioned, memory-mapped Arrow store for OHLCV frames"""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.enabled = PYARROW_AVAILABLE
+        self.stats = {"partition_reads": 0, "partition_writes": 0, "rows_written": 0, "partitions_skipped": 0}
+        if not self.enabled:
+            logger.info("pyarrow not installed - columnar price store disabled")
+
+    @staticmethod
+    def _symbol_dir_name(symbol: str) -> str:
+        # Index symbols such as ^NSEBANK and class shares such as BRK-B stay readable
+        return re.sub(r"[^A-Za-z0-9._^-]", "_", symbol.upper())
+
+    def _symbol_dir(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / self._symbol_dir_name(symbol)
+
+    def _partitions(self, symbol: str, interval: str) -> Dict[int, Path]:
+        directory = self._symbol_dir(symbol, interval)
+        if not directory.is_dir():
+            return {}
+        return {int(p.stem): p for p in directory.glob("*.arrow") if p.stem.isdigit()}
+
+    def _read_partition(self, path: Path) -> pd.DataFrame:
+        with pa.memory_map(str(path), "r") as source:
+            table = pa_ipc.open_file(source).read_all()
+        self.stats["partition_reads"] += 1
+        return flatten_ohlcv_columns(table.to_pandas())
+
+    def _write_partition(self, path: Path, frame: pd.DataFrame) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.stats["partition_writes"] += 1
+
+    def write(self, symbol: str, frame: pd.DataFrame, interval: str = "1d") -> int:
+        """
+        Merge ``frame`` into the stored series for ``symbol``.
+
+        Rows are upserted by timestamp (new values win) one year partition at a
+        time. A year whose stored partition cannot be read or merged is skipped
+        and keeps its stored rows. Returns the number of rows written.
+        """
+        if not self.enabled or frame is None or frame.empty:
+            return 0
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            logger.warning(f"Price store: refusing to store {symbol} without a DatetimeIndex")
+            return 0
+        try:
+            frame = flatten_ohlcv_columns(frame, symbol)
+        except ValueError as e:
+            logger.warning(f"Price store: refusing to store {symbol}: {e}")
+            return 0
+
+        written = 0
+        partitions = self._partitions(symbol, interval)
+        for year, rows in frame.groupby(frame.index.year):
+            path = partitions.get(year, self._symbol_dir(symbol, interval) / f"{year}.arrow")
+            merged = rows
+            if path.exists():
+                try:
+                    merged = pd.concat([self._read_partition(path), rows])
+                    merged = merged[~merged.index.duplicated(keep="last")]
+                except Exception as e:
+                    self.stats["partitions_skipped"] += 1
+                    logger.error(f"Price store: not merging {len(rows)} rows into {path}: {e}")
+                    continue
+            self._write_partition(path, merged.sort_index())
+            written += len(rows)
+        self.stats["rows_written"] += written
+        return written
+
+    def ingest(self, frames: Dict[str, pd.DataFrame], interval: str = "1d") -> int:
+        """Bulk-write several symbols; returns the total number of rows written"""
+        total = 0
+        for symbol, frame in frames.items():
+            try:
+                total += self.write(symbol, frame, interval)
+            except Exception as e:
+                logger.warning(f"Price store: ingest failed for {symbol}: {e}")
+        return total
+
+    def read(
+        self, symbol: str, start: DateLike = None, end: DateLike = None, interval: str = "1d"
+    ) -> pd.DataFrame:
+        """Return stored bars in ``[start, end]``, reading only the overlapping year partitions"""
+        if not self.enabled:
+            return pd.DataFrame()
+        partitions = self._partitions(symbol, interval)
+        if not partitions:
+            return pd.DataFrame()
+
+        first_year = pd.Timestamp(start).year if start is not None else min(partitions)
+        last_year = pd.Timestamp(end).year if end is not None else max(partitions)
+        frames = [
+            self._read_partition(partitions[year])
+            for year in sorted(partitions)
+            if first_year <= year <= last_year
+        ]
+        if not frames:
+            return pd.DataFrame()
+
+        data = pd.concat(frames) if len(frames) > 1 else frames[0]
+        lo, hi = _align(start, data.index), _align(end, data.index)
+        if lo is not None:
+            data = data[data.index >= lo]
+        if hi is not None:
+            data = data[data.index <= hi]
+        return data
+
+    def covers(self, data: pd.DataFrame, start: DateLike, end: DateLike) -> bool:
+        """True when ``data`` spans ``[start, end]`` up to the holiday slack"""
+        if data.empty:
+            return False
+        lo = _align(start, data.index)
+        hi = _align(min(pd.Timestamp(end or datetime.now()), pd.Timestamp(datetime.now())), data.index)
+        if lo is not None and data.index[0] > lo + _COVERAGE_SLACK:
+            return False
+        return data.index[-1] >= hi - _COVERAGE_SLACK
+
+    def delete(self, symbol: str, interval: str = "1d") -> int:
+        """Drop every stored partition of ``symbol``; returns the number removed"""
+        removed = 0
+        for path in self._partitions(symbol, interval).values():
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def symbols(self, interval: str = "1d") -> List[str]:
+        directory = self.root / interval
+        if not directory.is_dir():
+            return []
+        return sorted(p.name for p in directory.iterdir() if p.is_dir())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "root": str(self.root),
+            "symbols": len(self.symbols()) if self.enabled else 0,
+            **self.stats,
+        }
+
+
+async def load_price_range(
+    symbol: str, start: DateLike, end: DateLike = None, interval: str = "1d"
+) -> pd.DataFrame:
+    """
+    Read ``[start, end]`` bars for ``symbol`` from the price store.
+
+    When the stored range does not cover the request the missing history is
+    downloaded once through the rate-limited Yahoo client, ingested, and the
+    range is served from the store from then on.
+    """
+    from app.utils.rate_limiter import get_yahoo_client
+
+    store = get_price_store()
+    data = await asyncio.to_thread(store.read, symbol, start, end, interval)
+    if store.covers(data, start, end):
+        return data
+
+    fetched = await get_yahoo_client().download_since(symbol, pd.Timestamp(start), interval)
+    if fetched is None or fetched.empty:
+        return data
+    fetched = flatten_ohlcv_columns(fetched, symbol)
+    if store.enabled:
+        await asyncio.to_thread(store.write, symbol, fetched, interval)
+    hi = _align(end, fetched.index)
+    return fetched[fetched.index <= hi] if hi is not None else fetched
+
+
+_price_store: Optional[ColumnarPriceStore] = None
+
+
+def get_price_store() -> ColumnarPriceStore:
+    """Get global columnar price store instance"""
+    global _price_store
+    if _price_store is None:
+        from app.config import get_settings
+        _price_store = ColumnarPriceStore(get_settings().price_store_dir)
+    return _price_store
@@ -5,12 +5,18 @@ from __future__ import annotations
 
 import json
 import logging
-import pickle
-from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+import re
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
 import asyncio
 import os
 
+from app.cache.codecs import CacheCodec, CodecError, get_cache_codec
+from app.cache.disk_cache import DiskCache, get_disk_cache
+from app.cache.lru import TinyLFUCache
+
 try:
     import redis.asyncio as redis
     REDIS_AVAILABLE = True
@@ -19,9 +25,65 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Keys per MGET / pipeline in get_many and set_many
+BULK_CHUNK_SIZE = 500
+
+# Memory fallback writes between tag-index cleanups
+_MEMORY_CLEANUP_EVERY = 1000
+
+_MISSING = object()
+
+# Tag index: every key written for a ticker is added to the Redis SET
+# ``tag:ticker:<TICKER>`` so invalidation reads one set instead of scanning the
+# keyspace. Tag sets outlive their members; deleting an expired member is a no-op.
+TAG_TTL = 30 * 24 * 3600
+
+# Deletes every key in the tag set and the set itself in one atomic step
+_INVALIDATE_TAG_LUA = """
+local keys = redis.call('SMEMBERS', KEYS[1])
+for i = 1, #keys, 500 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+end
+redis.call('DEL', KEYS[1])
+return keys
+"""
+
+
+# Releases a lock only if it still holds the caller's token
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def ticker_tag(ticker: str) -> str:
+    """Tag for cache entries belonging to ``ticker`` (exact symbol match)"""
+    return f"tag:ticker:{ticker.upper()}"
+
+
+_KEY_SEPARATORS = re.compile(r"[:_]")
+
+
+def key_mentions_ticker(key: str, ticker: str) -> bool:
+    """
+    True when ``ticker`` is a whole ``:``/``_``-separated token of ``key``.
+
+    Used to find entries written before ticker tags existed, so clearing
+    TCS leaves TCSX alone.
+    """
+    symbols = {ticker, ticker.upper()}
+    return any(token in symbols for token in _KEY_SEPARATORS.split(key))
+
+
 class CacheManager:
     """
-    Redis-based cache manager with fallback to in-memory caching
+    Redis-based cache manager with an optional local disk tier in front of Redis
+
+    Lookups go disk -> Redis; Redis hits are written through to the disk tier
+    with their remaining TTL. Without Redis the disk tier serves alone, and
+    without either an in-process dict is the last resort.
     """
     
     def __init__(
@@ -30,7 +92,11 @@ class CacheManager:
         default_ttl: int = 300,
         max_connections: int = 10,
         socket_timeout: float = 5.0,
-        socket_connect_timeout: float = 5.0
+        socket_connect_timeout: float = 5.0,
+        codec: Optional[CacheCodec] = None,
+        ttl_jitter: Optional[float] = None,
+        disk: Optional[DiskCache] = None,
+        memory_max_bytes: Optional[int] = None
     ):
         """
         Initialize cache manager
@@ -41,14 +107,32 @@ class CacheManager:
             max_connections: Maximum connections in the pool
             socket_timeout: Socket timeout (seconds)
             socket_connect_timeout: Socket connect timeout (seconds)
+            codec: Serializer for Redis values (defaults to the settings-configured codec)
+            ttl_jitter: Max fraction by which stored TTLs are shortened (defaults to settings)
+            disk: Host-local persistent tier shared by all workers (None disables it)
+            memory_max_bytes: Byte budget of the in-process fallback (defaults to settings)
         """
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
         self.default_ttl = default_ttl
         self.max_connections = max_connections
         self.socket_timeout = socket_timeout
         self.socket_connect_timeout = socket_connect_timeout
+        self.codec = codec or get_cache_codec()
+        if ttl_jitter is None or memory_max_bytes is None:
+            from app.config import get_settings
+            settings = get_settings()
+            ttl_jitter = settings.cache_ttl_jitter if ttl_jitter is None else ttl_jitter
+            memory_max_bytes = memory_max_bytes or settings.memory_cache_max_mb * 1024 * 1024
+        self.ttl_jitter = max(0.0, min(float(ttl_jitter), 0.5))
         self.redis_client: Optional[redis.Redis] = None
-        self._memory_cache: dict[str, tuple[Any, datetime]] = {}
+        self.disk = disk
+        # Last-resort in-process tier: byte budget with W-TinyLFU admission
+        self._memory_cache = TinyLFUCache(max_bytes=memory_max_bytes, ttl=default_ttl)
+        self._memory_writes = 0
+        self._memory_tags: dict[str, set[str]] = {}
+        self._invalidate_script = None
+        self._release_lock_script = None
+        self._memory_locks: dict[str, tuple[str, float]] = {}
         self._use_redis = REDIS_AVAILABLE
         self._connected = False
         
@@ -59,7 +143,7 @@ class CacheManager:
     async def connect(self) -> bool:
         """Initialize Redis connection with connection pooling"""
         if not self._use_redis:
-            logger.warning("Redis not available, falling back to in-memory cache")
+            logger.warning(f"Redis not available, falling back to {self._fallback_name} cache")
             return False
             
         try:
@@ -74,6 +158,8 @@ class CacheManager:
             
             self.redis_client = redis.Redis(connection_pool=pool)
             await self.redis_client.ping()
+            self._invalidate_script = self.redis_client.register_script(_INVALIDATE_TAG_LUA)
+            self._release_lock_script = self.redis_client.register_script(_RELEASE_LOCK_LUA)
             self._connected = True
             logger.info(
                 f"Connected to Redis at {self.redis_url} "
@@ -81,7 +167,7 @@ class CacheManager:
             )
             return True
         except Exception as e:
-            logger.warning(f"Failed to connect to Redis ({e}), using in-memory cache")
+            logger.warning(f"Failed to connect to Redis ({e}), using {self._fallback_name} cache")
             self._use_redis = False
             return False
     
@@ -91,6 +177,10 @@ class CacheManager:
             await self.redis_client.close()
             self._connected = False
     
+    @property
+    def _fallback_name(self) -> str:
+        return "disk" if self.disk is not None else "in-memory"
+    
     def _make_key(self, prefix: str, identifier: str, **kwargs) -> str:
         """Create cache key with optional parameters"""
         key_parts = [prefix, identifier]
@@ -100,64 +190,220 @@ class CacheManager:
             key_parts.append(params)
         return ":".join(key_parts)
     
+    def effective_ttl(self, key: str, ttl: float) -> int:
+        """
+        TTL actually stored for ``key``: ``ttl`` shortened by up to ``ttl_jitter``.
+
+        The fraction is derived from the key, so entries written together (a
+        bulk run, the warmer) expire spread out, while readers can still work
+        out an entry's age from its remaining TTL.
+        """
+        ttl = int(ttl)
+        if ttl <= 0 or not self.ttl_jitter:
+            return ttl
+        spread = zlib.crc32(key.encode()) / 0x100000000
+        return max(1, int(ttl * (1 - self.ttl_jitter * spread)))
+    
     async def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache with hit/miss tracking"""
+        value, _ = (await self._lookup([key], with_ttl=False)).get(key, (default, None))
+        return value
+    
+    async def set(
+        self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Set value in cache with TTL, adding the key to each tag in ``tags``"""
+        ttl = self.effective_ttl(key, ttl or self.default_ttl)
+        
         try:
-            if self._use_redis and self.redis_client and self._connected:
-                data = await self.redis_client.get(key)
-                if data:
-                    self.cache_hits += 1
-                    return pickle.loads(data)
+            redis_ready = self._use_redis and self.redis_client and self._connected
+            if self.disk is not None or redis_ready:
+                data = self.codec.encode(value)
+            if self.disk is not None:
+                await self._disk_write([(key, data, ttl)], {key: list(tags)} if tags else None)
+            if redis_ready:
+                if tags:
+                    # Value and tag membership land together
+                    pipe = self.redis_client.pipeline(transaction=True)
+                    pipe.setex(key, ttl, data)
+                    self._queue_tags(pipe, key, tags, ttl)
+                    await pipe.execute()
                 else:
-                    self.cache_misses += 1
+                    await self.redis_client.setex(key, ttl, data)
+                return True
+            elif self.disk is not None:
+                return True
             else:
                 # In-memory fallback
-                if key in self._memory_cache:
-                    value, expiry = self._memory_cache[key]
-                    if datetime.now() < expiry:
-                        self.cache_hits += 1
-                        return value
-                    else:
-                        del self._memory_cache[key]
-                        self.cache_misses += 1
-                else:
-                    self.cache_misses += 1
-            
-            return default
+                self._memory_cache.set(key, value, ttl=ttl)
+                for tag in tags or ():
+                    self._memory_tags.setdefault(tag, set()).add(key)
+                await self._note_memory_writes(1)
+                return True
+        except CodecError as e:
+            logger.debug(f"Not caching {key}: {e}")
+            return False
         except Exception as e:
-            logger.error(f"Cache get error for key {key}: {e}")
-            return default
+            logger.error(f"Cache set error for key {key}: {e}")
+            return False
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache with TTL"""
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values in as few round-trips as possible.
+
+        Uses one MGET per ``BULK_CHUNK_SIZE`` keys on Redis. Only hits are
+        returned; missing, expired or undecodable keys are simply absent.
+        """
+        return {key: value for key, (value, _) in (await self._lookup(keys, with_ttl=False)).items()}
+
+    async def get_many_with_ttl(self, keys: Iterable[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """
+        Like ``get_many`` but also returns each hit's remaining TTL in seconds.
+
+        On Redis this pipelines GET + PTTL per key (one round-trip per
+        ``BULK_CHUNK_SIZE`` keys). The TTL is None when the key has no expiry.
+        """
+        return await self._lookup(keys, with_ttl=True)
+
+    async def _lookup(self, keys: Iterable[str], with_ttl: bool) -> Dict[str, Tuple[Any, Optional[float]]]:
+        keys = list(dict.fromkeys(keys))
+        results: Dict[str, Tuple[Any, Optional[float]]] = {}
+        if not keys:
+            return results
+        try:
+            if self.disk is not None:
+                results.update(await self._disk_read(keys))
+            remaining = [key for key in keys if key not in results]
+            if remaining and self._use_redis and self.redis_client and self._connected:
+                # TTLs are needed to write Redis hits through to the disk tier
+                results.update(await self._redis_lookup(remaining, with_ttl or self.disk is not None))
+            elif remaining and self.disk is None:
+                for key in remaining:
+                    value = self._memory_cache.get(key, _MISSING)
+                    if value is not _MISSING:
+                        results[key] = (value, self._memory_cache.ttl_remaining(key))
+        except Exception as e:
+            logger.error(f"Cache get_many error for {len(keys)} keys: {e}")
+        self.cache_hits += len(results)
+        self.cache_misses += len(keys) - len(results)
+        return results
+
+    async def _redis_lookup(self, keys: list[str], with_ttl: bool) -> Dict[str, Tuple[Any, Optional[float]]]:
+        results: Dict[str, Tuple[Any, Optional[float]]] = {}
+        write_through: list[tuple[str, bytes, float]] = []
+        for i in range(0, len(keys), BULK_CHUNK_SIZE):
+            chunk = keys[i:i + BULK_CHUNK_SIZE]
+            if with_ttl:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key in chunk:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                replies = await pipe.execute()
+                rows = zip(chunk, replies[::2], replies[1::2])
+            else:
+                rows = ((key, data, None) for key, data in zip(chunk, await self.redis_client.mget(chunk)))
+            for key, data, pttl in rows:
+                if not data:
+                    continue
+                try:
+                    value = self.codec.decode(data)
+                except Exception as e:
+                    logger.error(f"Cache decode error for key {key}: {e}")
+                    continue
+                remaining = pttl / 1000.0 if pttl and pttl > 0 else None
+                results[key] = (value, remaining)
+                if remaining is not None:
+                    write_through.append((key, data, remaining))
+        if self.disk is not None and write_through:
+            await self._disk_write(write_through)
+        return results
+
+    async def _disk_read(self, keys: list[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        def read() -> Dict[str, Tuple[Any, Optional[float]]]:
+            found = {}
+            for key, (data, remaining) in self.disk.get_many(keys).items():
+                try:
+                    found[key] = (self.codec.decode(data), remaining)
+                except Exception as e:
+                    logger.error(f"Disk cache decode error for key {key}: {e}")
+            return found
+        try:
+            return await asyncio.to_thread(read)
+        except Exception as e:
+            logger.warning(f"Disk cache read failed for {len(keys)} keys: {e}")
+            return {}
+
+    async def _disk_write(
+        self, entries: list[tuple[str, bytes, float]], tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> None:
+        try:
+            await asyncio.to_thread(self.disk.set_many, entries, tags)
+        except Exception as e:
+            logger.warning(f"Disk cache write failed for {len(entries)} keys: {e}")
+
+    async def get_with_ttl(self, key: str) -> Tuple[Any, Optional[float]]:
+        """Get a value and its remaining TTL in seconds; (None, None) on a miss"""
+        return (await self.get_many_with_ttl([key])).get(key, (None, None))
+
+    async def set_many(
+        self,
+        items: Mapping[str, Any],
+        ttl: Optional[int] = None,
+        ttls: Optional[Mapping[str, int]] = None,
+        tags: Optional[Mapping[str, Iterable[str]]] = None,
+    ) -> bool:
+        """
+        Set several values with one pipelined round-trip per ``BULK_CHUNK_SIZE`` keys.
+
+        ``ttl`` applies to every key unless ``ttls`` gives a per-key override;
+        ``tags`` maps keys to the tags they are indexed under.
+        Values the codec refuses are skipped; returns False if any were.
+        """
+        if not items:
+            return True
         ttl = ttl or self.default_ttl
-        
+        ttls = ttls or {}
+        tags = tags or {}
         try:
-            if self._use_redis and self.redis_client and self._connected:
-                data = pickle.dumps(value)
-                await self.redis_client.setex(key, ttl, data)
-                return True
+            redis_ready = self._use_redis and self.redis_client and self._connected
+            if self.disk is not None or redis_ready:
+                encoded = []
+                for key, value in items.items():
+                    try:
+                        encoded.append((key, self.effective_ttl(key, ttls.get(key, ttl)), self.codec.encode(value)))
+                    except CodecError as e:
+                        logger.debug(f"Not caching {key}: {e}")
+                if self.disk is not None:
+                    await self._disk_write([(key, data, key_ttl) for key, key_ttl, data in encoded], tags)
+                if not redis_ready:
+                    return len(encoded) == len(items)
+                for i in range(0, len(encoded), BULK_CHUNK_SIZE):
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for key, key_ttl, data in encoded[i:i + BULK_CHUNK_SIZE]:
+                        pipe.setex(key, key_ttl, data)
+                        self._queue_tags(pipe, key, tags.get(key, ()), key_ttl)
+                    await pipe.execute()
+                return len(encoded) == len(items)
             else:
-                # In-memory fallback
-                expiry = datetime.now() + timedelta(seconds=ttl)
-                self._memory_cache[key] = (value, expiry)
-                
-                # Cleanup expired entries occasionally
-                if len(self._memory_cache) > 1000:
-                    await self._cleanup_memory_cache()
-                
+                for key, value in items.items():
+                    self._memory_cache.set(key, value, ttl=self.effective_ttl(key, ttls.get(key, ttl)))
+                    for tag in tags.get(key, ()):
+                        self._memory_tags.setdefault(tag, set()).add(key)
+                await self._note_memory_writes(len(items))
                 return True
         except Exception as e:
-            logger.error(f"Cache set error for key {key}: {e}")
+            logger.error(f"Cache set_many error for {len(items)} keys: {e}")
             return False
-    
+
     async def delete(self, key: str) -> bool:
         """Delete value from cache"""
         try:
+            if self.disk is not None:
+                await asyncio.to_thread(self.disk.delete, key)
             if self._use_redis and self.redis_client and self._connected:
                 await self.redis_client.delete(key)
             else:
-                self._memory_cache.pop(key, None)
+                self._memory_cache.delete(key)
             return True
         except Exception as e:
             logger.error(f"Cache delete error for key {key}: {e}")
@@ -173,9 +419,15 @@ class CacheManager:
                 cleared_count = await self.redis_client.dbsize()
                 logger.info(f"Cleared all Redis cache data ({cleared_count} keys)")
             
+            if self.disk is not None:
+                disk_count = await asyncio.to_thread(self.disk.clear)
+                cleared_count += disk_count
+                logger.info(f"Cleared disk cache ({disk_count} entries)")
+            
             # Clear in-memory cache
             memory_count = len(self._memory_cache)
             self._memory_cache.clear()
+            self._memory_tags.clear()
             cleared_count += memory_count
             logger.info(f"Cleared in-memory cache ({memory_count} entries)")
             
@@ -189,30 +441,122 @@ class CacheManager:
             logger.error(f"Cache clear error: {e}")
             return False
     
-    async def clear_ticker(self, ticker: str) -> bool:
-        """Clear all cache data for a specific ticker"""
+    @staticmethod
+    def _queue_tags(pipe: Any, key: str, tags: Iterable[str], ttl: int) -> None:
+        for tag in tags:
+            pipe.sadd(tag, key)
+            pipe.expire(tag, max(TAG_TTL, int(ttl)))
+    
+    async def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        """
+        Take the fleet-wide lock ``lock:<name>`` for at most ``ttl`` seconds.
+
+        Returns a token for ``release_lock``, or None if another holder has it.
+        Fails open when Redis errors, since callers only use it to avoid
+        duplicate work.
+        """
+        token = uuid.uuid4().hex
+        lock_key = f"lock:{name}"
+        if self._use_redis and self.redis_client and self._connected:
+            try:
+                acquired = await self.redis_client.set(lock_key, token, nx=True, px=max(1, int(ttl * 1000)))
+                return token if acquired else None
+            except Exception as e:
+                logger.warning(f"Lock {lock_key} unavailable, proceeding without it: {e}")
+                return token
+        
+        now = time.monotonic()
+        holder = self._memory_locks.get(lock_key)
+        if holder is not None and holder[1] > now:
+            return None
+        self._memory_locks[lock_key] = (token, now + ttl)
+        return token
+    
+    async def release_lock(self, name: str, token: str) -> None:
+        """Release ``lock:<name>`` if ``token`` still holds it"""
+        lock_key = f"lock:{name}"
+        if self._use_redis and self.redis_client and self._connected:
+            try:
+                await self._release_lock_script(keys=[lock_key], args=[token])
+            except Exception as e:
+                logger.debug(f"Lock release failed for {lock_key}, it will expire: {e}")
+            return
+        holder = self._memory_locks.get(lock_key)
+        if holder is not None and holder[0] == token:
+            del self._memory_locks[lock_key]
+    
+    async def invalidate_tag(self, tag: str) -> list[str]:
+        """
+        Delete every key indexed under ``tag`` (and the tag itself).
+
+        Redis runs this as one Lua script, so a concurrent write either lands
+        before and is deleted or after and is kept with a fresh tag entry.
+        Returns the deleted keys so callers can drop process-local copies.
+        """
+        keys: list[str] = []
+        if self.disk is not None:
+            keys.extend(await asyncio.to_thread(self.disk.invalidate_tag, tag))
+        if self._use_redis and self.redis_client and self._connected:
+            deleted = await self._invalidate_script(keys=[tag])
+            keys.extend(k.decode() if isinstance(k, bytes) else k for k in deleted or [])
+        
+        # In-memory fallback keeps the same index
+        memory_keys = self._memory_tags.pop(tag, set())
+        for key in memory_keys:
+            self._memory_cache.delete(key)
+        keys.extend(memory_keys)
+        return list(dict.fromkeys(keys))
+    
+    async def clear_ticker_keys(self, ticker: str, include_untagged: bool = False) -> list[str]:
+        """
+        Delete every entry tagged for ``ticker`` and return the deleted keys.
+
+        ``include_untagged`` also runs ``purge_untagged_ticker_keys``, a
+        keyspace scan meant only for migrating entries written before ticker
+        tags existed.
+        """
+        keys = await self.invalidate_tag(ticker_tag(ticker))
+        if include_untagged:
+            keys.extend(await self.purge_untagged_ticker_keys(ticker))
+        return list(dict.fromkeys(keys))
+    
+    async def purge_untagged_ticker_keys(self, ticker: str) -> list[str]:
+        """
+        One-off migration: delete untagged entries whose key names ``ticker``
+        as a whole ``:``/``_`` token. Scans the whole Redis keyspace, disk
+        cache and memory tier, so it is never part of a normal clear.
+        """
+        def matches(key: str) -> bool:
+            return key_mentions_ticker(key, ticker) and not key.startswith("tag:")
+
+        legacy: list[str] = []
+        if self.disk is not None:
+            legacy.extend(await asyncio.to_thread(self.disk.delete_matching, ticker, matches))
+        if self._use_redis and self.redis_client and self._connected:
+            found = []
+            async for key in self.redis_client.scan_iter(match=f"*{ticker}*"):
+                key = key.decode() if isinstance(key, bytes) else key
+                if matches(key):
+                    found.append(key)
+            if found:
+                await self.redis_client.delete(*found)
+                legacy.extend(found)
+        
+        # In-memory fallback, same token match
+        for key in self._memory_cache.keys():
+            if isinstance(key, str) and matches(key) and self._memory_cache.delete(key):
+                legacy.append(key)
+        
+        if legacy:
+            logger.info(f"[{ticker}] Cleared {len(set(legacy))} untagged cache entries")
+        return list(dict.fromkeys(legacy))
+    
+    async def clear_ticker(self, ticker: str, include_untagged: bool = False) -> bool:
+        """Clear all cache data tagged for a specific ticker (see ``clear_ticker_keys``)"""
         try:
-            cleared_count = 0
-            if self._use_redis and self.redis_client and self._connected:
-                # Find and delete all keys for this ticker
-                pattern = f"*:{ticker}*"
-                keys = []
-                async for key in self.redis_client.scan_iter(match=pattern):
-                    keys.append(key)
-                
-                if keys:
-                    await self.redis_client.delete(*keys)
-                    cleared_count = len(keys)
-                    logger.info(f"[{ticker}] Cleared {cleared_count} Redis cache entries")
-            
-            # Clear in-memory cache for this ticker
-            memory_keys = [k for k in self._memory_cache.keys() if ticker in k]
-            for key in memory_keys:
-                del self._memory_cache[key]
-            cleared_count += len(memory_keys)
-            
-            if cleared_count > 0:
-                logger.info(f"[{ticker}] Cleared {cleared_count} total cache entries")
+            cleared = await self.clear_ticker_keys(ticker, include_untagged)
+            if cleared:
+                logger.info(f"[{ticker}] Cleared {len(cleared)} total cache entries")
             return True
         except Exception as e:
             logger.error(f"Cache clear error for {ticker}: {e}")
@@ -221,31 +565,33 @@ class CacheManager:
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
         try:
+            if self.disk is not None and await asyncio.to_thread(self.disk.get_many, [key]):
+                return True
             if self._use_redis and self.redis_client and self._connected:
                 return bool(await self.redis_client.exists(key))
             else:
-                if key in self._memory_cache:
-                    _, expiry = self._memory_cache[key]
-                    if datetime.now() < expiry:
-                        return True
-                    else:
-                        del self._memory_cache[key]
-                return False
+                return key in self._memory_cache
         except Exception as e:
             logger.error(f"Cache exists error for key {key}: {e}")
             return False
     
+    async def _note_memory_writes(self, count: int) -> None:
+        self._memory_writes += count
+        if self._memory_writes >= _MEMORY_CLEANUP_EVERY:
+            self._memory_writes = 0
+            await self._cleanup_memory_cache()
+    
     async def _cleanup_memory_cache(self):
-        """Remove expired entries from memory cache"""
-        now = datetime.now()
-        expired_keys = [
-            key for key, (_, expiry) in self._memory_cache.items() 
-            if now >= expiry
-        ]
-        for key in expired_keys:
-            del self._memory_cache[key]
+        """Remove expired entries from memory cache and drop evicted keys from the tag index"""
+        expired = self._memory_cache.purge_expired()
+        for tag, members in list(self._memory_tags.items()):
+            live = {key for key in members if key in self._memory_cache}
+            if live:
+                self._memory_tags[tag] = live
+            else:
+                del self._memory_tags[tag]
         
-        logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+        logger.debug(f"Cleaned up {expired} expired cache entries")
 
     # Financial data specific cache methods
     async def get_ohlcv(self, ticker: str, period: str = "1y", interval: str = "1d") -> Any:
@@ -256,17 +602,38 @@ class CacheManager:
     async def set_ohlcv(self, ticker: str, data: Any, period: str = "1y", interval: str = "1d", ttl: int = 900) -> bool:
         """Cache OHLCV data (15 min TTL for market data)"""
         key = self._make_key("ohlcv", ticker, period=period, interval=interval)
-        return await self.set(key, data, ttl)
+        return await self.set(key, data, ttl, tags=[ticker_tag(ticker)])
     
+    async def get_many_ohlcv(self, tickers: Iterable[str], period: str = "1y", interval: str = "1d") -> Dict[str, Any]:
+        """Get cached OHLCV data for several tickers, keyed by ticker (hits only)"""
+        keys = {self._make_key("ohlcv", t, period=period, interval=interval): t for t in tickers}
+        found = await self.get_many(keys)
+        return {keys[k]: v for k, v in found.items()}
+
+    async def set_many_ohlcv(
+        self, frames: Mapping[str, Any], period: str = "1y", interval: str = "1d", ttl: int = 900
+    ) -> bool:
+        """Cache OHLCV data for several tickers in one pipelined write"""
+        keys = {t: self._make_key("ohlcv", t, period=period, interval=interval) for t in frames}
+        return await self.set_many(
+            {keys[t]: f for t, f in frames.items()}, ttl, tags={keys[t]: [ticker_tag(t)] for t in frames}
+        )
+
     async def get_company_info(self, ticker: str) -> Any:
         """Get company info from cache"""
         key = self._make_key("info", ticker)
         return await self.get(key)
     
+    async def get_many_company_info(self, tickers: Iterable[str]) -> Dict[str, Any]:
+        """Get cached company info for several tickers, keyed by ticker (hits only)"""
+        keys = {self._make_key("info", t): t for t in tickers}
+        found = await self.get_many(keys)
+        return {keys[k]: v for k, v in found.items()}
+
     async def set_company_info(self, ticker: str, data: Any, ttl: int = 3600) -> bool:
         """Cache company info (1 hour TTL)"""
         key = self._make_key("info", ticker)
-        return await self.set(key, data, ttl)
+        return await self.set(key, data, ttl, tags=[ticker_tag(ticker)])
     
     async def get_news(self, ticker: str) -> Any:
         """Get news from cache"""
@@ -276,7 +643,7 @@ class CacheManager:
     async def set_news(self, ticker: str, data: Any, ttl: int = 600) -> bool:
         """Cache news data (10 min TTL)"""
         key = self._make_key("news", ticker)
-        return await self.set(key, data, ttl)
+        return await self.set(key, data, ttl, tags=[ticker_tag(ticker)])
     
     def get_cache_stats(self) -> dict[str, Any]:
         """Get cache statistics"""
@@ -284,12 +651,14 @@ class CacheManager:
         hit_rate = (self.cache_hits / total_requests * 100) if total_requests > 0 else 0
         
         stats = {
-            "cache_type": "redis" if (self._use_redis and self._connected) else "in_memory",
+            "cache_type": "redis" if (self._use_redis and self._connected) else "disk" if self.disk else "in_memory",
             "connected": self._connected,
             "hits": self.cache_hits,
             "misses": self.cache_misses,
             "total_requests": total_requests,
             "hit_rate": round(hit_rate, 2),
+            "serialization": self.codec.get_stats(),
+            "ttl_jitter": self.ttl_jitter,
         }
         
         if self._use_redis and self.redis_client:
@@ -298,8 +667,14 @@ class CacheManager:
                 "socket_timeout": self.socket_timeout
             }
         
-        if not self._use_redis:
+        if self.disk is not None:
+            try:
+                stats["disk"] = self.disk.get_stats()
+            except Exception as e:
+                stats["disk"] = {"error": str(e)}
+        elif not self._use_redis:
             stats["memory_cache_size"] = len(self._memory_cache)
+            stats["memory_cache"] = self._memory_cache.get_stats()
         
         return stats
 
@@ -311,7 +686,7 @@ async def get_cache_manager() -> CacheManager:
     """Get global cache manager instance"""
     global _cache_manager
     if _cache_manager is None:
-        _cache_manager = CacheManager()
+        _cache_manager = CacheManager(disk=get_disk_cache())
         await _cache_manager.connect()
     return _cache_manager
 
@@ -327,7 +702,7 @@ async def clear_all_cache():
     cache = await get_cache_manager()
     return await cache.clear_all()
 
-async def clear_ticker_cache(ticker: str):
+async def clear_ticker_cache(ticker: str, include_untagged: bool = False):
     """Clear cache data for a specific ticker"""
     cache = await get_cache_manager()
-    return await cache.clear_ticker(ticker)
+    return await cache.clear_ticker(ticker, include_untagged)
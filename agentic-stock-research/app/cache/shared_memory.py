@@ -0,0 +1,383 @@
+"""
+Host-wide shared-memory tier for hot, immutable cache entries
+
+Every uvicorn worker used to keep its own L1 copy of the hottest OHLCV frames
+and company info, so resident memory grew with the worker count. This tier
+publishes those entries once per host as files on a RAM-backed filesystem
+(``/dev/shm`` on Linux) that every worker memory-maps:
+
+- DataFrames are stored as an uncompressed Arrow IPC stream and read as
+  zero-copy pandas views over the shared pages (requires pyarrow)
+- Other values are stored in the cache codec's framed format and decoded on
+  each read; they are small, so only the large frames are worth sharing
+
+Entries are immutable. Publishing writes a new file and renames it over the
+old one, so readers never see a partial write and frames already handed out
+keep the version they were built from. A reader notices a new version from
+the file's inode and re-maps it; the header carries the version (publish time
+in nanoseconds) and the absolute expiry.
+
+Frames are backed by read-only memory, so every read returns a shallow copy:
+with pandas copy-on-write, assigning into it copies the touched columns
+instead of failing.
+
+Each worker keeps at most ``max_mapped`` mappings, least recently read first
+out. A mapping is also dropped when its entry expires or is evicted, so an
+unlinked file's pages are released once no frame handed out still uses them.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from app.cache.codecs import CacheCodec, CodecError, get_cache_codec
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# magic, format, version (ns), expires_at (epoch seconds), key length
+_HEADER = struct.Struct("<4sc3xqdI")
+_MAGIC = b"EQS1"
+_FORMAT_ARROW = b"A"
+_FORMAT_CODEC = b"C"
+# Arrow buffers stay 64-byte aligned when the stream starts on a 64-byte boundary
+_ALIGN = 64
+_SUFFIX = ".seg"
+# Publishes between size checks (per process)
+_EVICT_EVERY = 50
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def default_shared_cache_dir() -> Path:
+    """``/dev/shm`` when the host has it, otherwise the temp directory (disk-backed)"""
+    base = Path("/dev/shm") if os.path.isdir("/dev/shm") else Path(tempfile.gettempdir())
+    return base / "equisense-cache"
+
+
+class _Segment:
+    """One mapped version of an entry"""
+
+    __slots__ = ("inode", "version", "expires_at", "fmt", "mapped", "view", "buffer", "value")
+
+    def __init__(self, inode: Tuple[int, int], version: int, expires_at: float, fmt: bytes, mapped: mmap.mmap, offset: int):
+        self.inode = inode
+        self.version = version
+        self.expires_at = expires_at
+        self.fmt = fmt
+        self.mapped = mapped
+        self.view = memoryview(mapped)
+        self.buffer = self.view[offset:]
+        self.value: Any = None
+
+    def close(self) -> bool:
+        """Unmap now; False when frames handed out still use the pages (they unmap on collection)"""
+        self.value = None
+        try:
+            self.buffer.release()
+            self.view.release()
+            self.mapped.close()
+            return True
+        except BufferError:
+            return False
+
+
+class SharedMemoryCache:
+    """Versioned, byte-bounded cache of immutable entries memory-mapped by every worker"""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: int = 256 * 1024 * 1024,
+        codec: Optional[CacheCodec] = None,
+        max_mapped: int = 256,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_mapped = max_mapped
+        self.codec = codec or get_cache_codec()
+        self._segments: "OrderedDict[str, _Segment]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._publishes = 0
+        self.stats = {
+            "hits": 0, "misses": 0, "publishes": 0, "maps": 0, "unmaps": 0,
+            "rejected": 0, "evictions": 0, "expired": 0,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + _SUFFIX)
+
+    # Reads
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """``(value, remaining TTL in seconds)`` for a live entry, else None"""
+        segment = self._segment(key)
+        remaining = segment.expires_at - time.time() if segment is not None else 0
+        if segment is None or remaining <= 0:
+            if segment is not None:
+                self._drop(key)
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        if segment.fmt == _FORMAT_ARROW:
+            value = segment.value
+            if value is not None:
+                return value.copy(deep=False), remaining
+        else:
+            try:
+                return self.codec.decode(segment.buffer), remaining
+            except ValueError:
+                pass
+        # Unmapped by another thread between lookup and read
+        self.stats["hits"] -= 1
+        self.stats["misses"] += 1
+        return None
+
+    def version(self, key: str) -> Optional[int]:
+        """Version (publish time in ns) of the entry currently published under ``key``"""
+        segment = self._segment(key)
+        return segment.version if segment is not None else None
+
+    def _segment(self, key: str) -> Optional[_Segment]:
+        path = self._path(key)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._drop(key)
+            return None
+        inode = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is not None and segment.inode == inode:
+                self._segments.move_to_end(key)
+                return segment
+        try:
+            segment = self._map(key, path, inode)
+        except (OSError, ValueError, CodecError) as e:
+            # Replaced or removed between stat and open, or not ours
+            logger.debug(f"Shared cache entry {key} unreadable: {e}")
+            segment = None
+        if segment is None:
+            self._drop(key)
+        else:
+            self._remember(key, segment)
+        return segment
+
+    def _remember(self, key: str, segment: _Segment) -> None:
+        """Track ``segment`` as the mapping for ``key``, unmapping the least recently read past ``max_mapped``"""
+        with self._lock:
+            stale = [self._segments.pop(key)] if key in self._segments else []
+            self._segments[key] = segment
+            while len(self._segments) > self.max_mapped:
+                stale.append(self._segments.popitem(last=False)[1])
+        self._close(stale)
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            segment = self._segments.pop(key, None)
+        self._close([segment] if segment is not None else [])
+
+    def _drop_paths(self, paths: set) -> None:
+        """Unmap this worker's views of files that were just unlinked"""
+        if not paths:
+            return
+        with self._lock:
+            keys = [key for key in self._segments if str(self._path(key)) in paths]
+            stale = [self._segments.pop(key) for key in keys]
+        self._close(stale)
+
+    def _close(self, segments) -> None:
+        for segment in segments:
+            segment.close()
+            self.stats["unmaps"] += 1
+
+    def _map(self, key: str, path: Path, inode: Tuple[int, int]) -> Optional[_Segment]:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, version, expires_at, key_len = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or mapped[_HEADER.size:_HEADER.size + key_len] != key.encode():
+            mapped.close()
+            return None
+        if fmt == _FORMAT_ARROW and not PYARROW_AVAILABLE:
+            mapped.close()
+            return None
+        offset = _align(_HEADER.size + key_len)
+        segment = _Segment(inode, version, expires_at, fmt, mapped, offset)
+        if fmt == _FORMAT_ARROW:
+            # Zero-copy: the frame's columns point into the mapping, which they keep alive
+            table = pa.ipc.open_stream(pa.py_buffer(mapped)[offset:]).read_all()
+            segment.value = table.to_pandas(split_blocks=True)
+        self.stats["maps"] += 1
+        return segment
+
+    # Writes
+
+    def put(self, key: str, value: Any, ttl: float) -> bool:
+        """Publish a new version of ``key``; False if ``value`` cannot be shared"""
+        if ttl <= 0:
+            return False
+        if isinstance(value, pd.DataFrame) and PYARROW_AVAILABLE:
+            fmt = _FORMAT_ARROW
+            try:
+                table = pa.Table.from_pandas(value, preserve_index=True)
+            except (pa.ArrowException, TypeError, ValueError) as e:
+                self.stats["rejected"] += 1
+                logger.debug(f"Shared cache cannot store {key}: {e}")
+                return False
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            payload: Any = sink.getvalue()
+        else:
+            fmt = _FORMAT_CODEC
+            try:
+                payload = self.codec.encode(value)
+            except CodecError:
+                self.stats["rejected"] += 1
+                return False
+
+        encoded_key = key.encode()
+        header = _HEADER.pack(_MAGIC, fmt, time.time_ns(), time.time() + ttl, len(encoded_key)) + encoded_key
+        header += b"\0" * (_align(len(header)) - len(header))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            logger.warning(f"Shared cache publish failed for {key}: {e}")
+            return False
+        self.stats["publishes"] += 1
+
+        with self._lock:
+            self._publishes += 1
+            due = self._publishes >= _EVICT_EVERY
+            if due:
+                self._publishes = 0
+        if due:
+            self.evict()
+        return True
+
+    def delete(self, key: str) -> None:
+        self._drop(key)
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        """``(path, size, mtime_ns, expires_at)`` for every published entry"""
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(_SUFFIX):
+                continue
+            try:
+                st = entry.stat()
+                with open(entry.path, "rb") as f:
+                    expires_at = _HEADER.unpack(f.read(_HEADER.size))[3]
+            except (OSError, struct.error):
+                continue
+            yield entry.path, st.st_size, st.st_mtime_ns, expires_at
+
+    def evict(self) -> int:
+        """Drop expired entries, then the oldest versions until under 90% of ``max_bytes``"""
+        now = time.time()
+        live, total, expired = [], 0, 0
+        unlinked = set()
+        for path, size, mtime_ns, expires_at in self._entries():
+            if expires_at <= now:
+                expired += self._unlink(path)
+                unlinked.add(path)
+            else:
+                live.append((mtime_ns, size, path))
+                total += size
+        evicted = 0
+        if total > self.max_bytes:
+            excess = total - int(self.max_bytes * 0.9)
+            for _, size, path in sorted(live):
+                evicted += self._unlink(path)
+                unlinked.add(path)
+                excess -= size
+                if excess <= 0:
+                    break
+        self._drop_paths(unlinked)
+        self.stats["expired"] += expired
+        self.stats["evictions"] += evicted
+        if evicted:
+            logger.info(f"Shared cache over {self.max_bytes} bytes, evicted {evicted} entries")
+        return expired + evicted
+
+    @staticmethod
+    def _unlink(path: str) -> int:
+        # Mapped readers keep their pages until they drop the old version
+        try:
+            os.unlink(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def clear(self) -> int:
+        with self._lock:
+            stale = list(self._segments.values())
+            self._segments.clear()
+        self._close(stale)
+        return sum(self._unlink(path) for path, *_ in self._entries())
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = list(self._entries())
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 2) if lookups else 0,
+            "entries": len(entries),
+            "mapped": len(self._segments),
+            "max_mapped": self.max_mapped,
+            "size_mb": round(sum(size for _, size, *_ in entries) / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "directory": str(self.directory),
+        }
+
+
+_shared_memory_cache: Optional[SharedMemoryCache] = None
+_shared_memory_cache_initialized = False
+
+
+def get_shared_memory_cache() -> Optional[SharedMemoryCache]:
+    """Get global shared-memory tier configured from settings; None when disabled or unusable"""
+    global _shared_memory_cache, _shared_memory_cache_initialized
+    if not _shared_memory_cache_initialized:
+        _shared_memory_cache_initialized = True
+        from app.config import get_settings
+        settings = get_settings()
+        if settings.shared_cache_enabled:
+            directory = settings.shared_cache_dir or default_shared_cache_dir()
+            try:
+                _shared_memory_cache = SharedMemoryCache(
+                    directory,
+                    max_bytes=settings.shared_cache_max_mb * 1024 * 1024,
+                    max_mapped=settings.shared_cache_max_mapped,
+                )
+            except OSError as e:
+                logger.warning(f"Shared-memory cache unavailable at {directory}: {e}")
+    return _shared_memory_cache
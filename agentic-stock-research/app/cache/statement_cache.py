@@ -0,0 +1,147 @@
+"""
+Earnings-calendar-aware cache for financial statements
+
+Annual and quarterly income statements, balance sheets and cash flow
+statements only change when a company reports, yet they are the slowest
+upstream calls in an analysis. Entries here stay valid until the next expected
+reporting date taken from the info payload's earnings timestamps, falling back
+to a long TTL when no date is known.
+
+Frames are stored as-is; the cache codec writes them to Redis as Arrow IPC.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from app.cache.redis_cache import get_cache_manager, ticker_tag
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_ARTIFACTS = (
+    "financials", "quarterly_financials",
+    "balance_sheet", "quarterly_balance_sheet",
+    "cashflow", "quarterly_cashflow",
+)
+
+DAY = 24 * 3600
+FALLBACK_TTL = 30 * DAY
+MAX_TTL = 120 * DAY
+# After a reporting date has passed Yahoo can take a few days to publish the
+# new statements, so re-check daily during that window.
+POST_REPORT_WINDOW = 14 * DAY
+POST_REPORT_TTL = DAY
+# Quarter end to filing: 10-Q within ~45 days, Indian results within ~60
+_QUARTER_TO_REPORT = 135 * DAY
+
+
+def _epoch(value: Any) -> Optional[float]:
+    try:
+        ts = float(value)
+    except (TypeError, ValueError):
+        return None
+    if ts > 1e12:  # milliseconds
+        ts /= 1000.0
+    return ts if ts > 0 else None
+
+
+def statement_ttl(info: Optional[Dict[str, Any]], now: Optional[float] = None) -> int:
+    """Seconds until the next expected reporting date for the company in ``info``"""
+    now = time.time() if now is None else now
+    info = info or {}
+    dates = [
+        ts for ts in (
+            _epoch(info.get(k)) for k in
+            ("earningsTimestampStart", "earningsTimestamp", "earningsTimestampEnd", "earningsCallTimestampStart")
+        ) if ts is not None
+    ]
+    upcoming = [ts for ts in dates if ts > now]
+    if upcoming:
+        return int(min(max(min(upcoming) - now, POST_REPORT_TTL), MAX_TTL))
+    if dates and now - max(dates) < POST_REPORT_WINDOW:
+        return POST_REPORT_TTL
+
+    most_recent_quarter = _epoch(info.get("mostRecentQuarter"))
+    if most_recent_quarter is not None:
+        expected = most_recent_quarter + _QUARTER_TO_REPORT
+        if expected > now:
+            return int(min(max(expected - now, POST_REPORT_TTL), MAX_TTL))
+    return FALLBACK_TTL
+
+
+class StatementCache:
+    """Shared statement cache keyed by ticker and statement name"""
+
+    def __init__(self):
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def _key(ticker: str, name: str) -> str:
+        return f"statements:{ticker}:{name}"
+
+    async def get(self, ticker: str, name: str) -> Optional[pd.DataFrame]:
+        cache = await get_cache_manager()
+        frame = await cache.get(self._key(ticker, name))
+        if not isinstance(frame, pd.DataFrame):
+            frame = None
+        self.stats["hits" if frame is not None else "misses"] += 1
+        return frame
+
+    async def set(self, ticker: str, name: str, frame: pd.DataFrame, info: Optional[Dict[str, Any]] = None) -> None:
+        if frame is None or getattr(frame, "empty", True):
+            return
+        cache = await get_cache_manager()
+        ttl = statement_ttl(info)
+        await cache.set(self._key(ticker, name), frame, ttl=ttl, tags=[ticker_tag(ticker)])
+        self.stats["stores"] += 1
+        logger.debug(f"Cached {name} for {ticker} for {ttl / DAY:.1f} days")
+
+    async def attach(self, snapshot) -> int:
+        """
+        Seed ``snapshot`` with cached statements and write back fresh fetches.
+
+        Returns the number of statements served from the cache. Statements not
+        in the cache are still fetched lazily by the snapshot; once fetched they
+        are stored here from whatever thread loaded them.
+        """
+        ticker = snapshot.ticker
+        cached = await asyncio.gather(
+            *(self.get(ticker, name) for name in STATEMENT_ARTIFACTS), return_exceptions=True
+        )
+        seeded = 0
+        for name, frame in zip(STATEMENT_ARTIFACTS, cached):
+            if isinstance(frame, pd.DataFrame) and snapshot.seed(name, frame):
+                seeded += 1
+
+        loop = asyncio.get_running_loop()
+
+        def _write_back(snap, name: str, value: Any) -> None:
+            if name not in STATEMENT_ARTIFACTS or not isinstance(value, pd.DataFrame) or value.empty:
+                return
+            info = snap.info
+            asyncio.run_coroutine_threadsafe(self.set(snap.ticker, name, value, info), loop)
+
+        snapshot.add_fetch_listener(_write_back)
+        return seeded
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 2) if lookups else 0,
+        }
+
+
+_statement_cache: Optional[StatementCache] = None
+
+
+def get_statement_cache() -> StatementCache:
+    """Get global statement cache instance"""
+    global _statement_cache
+    if _statement_cache is None:
+        _statement_cache = StatementCache()
+    return _statement_cache
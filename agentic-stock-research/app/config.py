@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -44,6 +45,74 @@ class AppSettings(BaseSettings):
 
     confidence_threshold: float = Field(default=0.7, alias="CONFIDENCE_THRESHOLD")
 
+    # Threads for blocking market-data calls (yfinance), separate from CPU-bound work
+    data_io_max_workers: int = Field(default=16, alias="DATA_IO_MAX_WORKERS")
+
+    # Upstream data record/replay: live | record | replay
+    data_provider_mode: str = Field(default="live", alias="DATA_PROVIDER_MODE")
+    data_provider_archive_dir: str = Field(
+        default=str(Path(__file__).resolve().parents[1] / "data" / "provider_fixtures"),
+        alias="DATA_PROVIDER_ARCHIVE_DIR",
+    )
+    data_provider_replay_latency_ms: float = Field(default=0.0, alias="DATA_PROVIDER_REPLAY_LATENCY_MS")
+    data_provider_replay_jitter_ms: float = Field(default=0.0, alias="DATA_PROVIDER_REPLAY_JITTER_MS")
+
+    # Shared cache serialization (Arrow / orjson / msgpack, zstd or lz4 above the threshold)
+    cache_allow_pickle: bool = Field(default=False, alias="CACHE_ALLOW_PICKLE")
+    # Temporary: read (never write) pickled entries left by older releases
+    cache_pickle_migration: bool = Field(default=False, alias="CACHE_PICKLE_MIGRATION")
+    cache_compression: str = Field(default="auto", alias="CACHE_COMPRESSION")
+    cache_compression_min_bytes: int = Field(default=4096, alias="CACHE_COMPRESSION_MIN_BYTES")
+    # Stampede protection: stored TTLs are shortened by a stable per-key fraction
+    # up to CACHE_TTL_JITTER, hot keys are refreshed early (XFetch) and one worker
+    # per key holds the refresh lock while the others serve the old value
+    cache_ttl_jitter: float = Field(default=0.1, alias="CACHE_TTL_JITTER")
+    cache_xfetch_beta: float = Field(default=1.0, alias="CACHE_XFETCH_BETA")
+    cache_refresh_lock_ttl: int = Field(default=60, alias="CACHE_REFRESH_LOCK_TTL")
+    # Background warmer for the most requested tickers (cadence follows market hours)
+    cache_warmer_enabled: bool = Field(default=False, alias="CACHE_WARMER_ENABLED")
+
+    # In-process L1 tier in front of Redis for info / OHLCV reads (per worker),
+    # bounded by bytes with W-TinyLFU admission
+    l1_cache_max_mb: int = Field(default=64, alias="L1_CACHE_MAX_MB")
+    # In-process fallback when neither Redis nor the disk tier is available
+    memory_cache_max_mb: int = Field(default=64, alias="MEMORY_CACHE_MAX_MB")
+
+    # In-process cache of Yahoo downloads (per worker)
+    yahoo_cache_max_entries: int = Field(default=256, alias="YAHOO_CACHE_MAX_ENTRIES")
+    yahoo_cache_max_mb: int = Field(default=128, alias="YAHOO_CACHE_MAX_MB")
+    yahoo_cache_ttl_seconds: int = Field(default=900, alias="YAHOO_CACHE_TTL_SECONDS")
+
+    # On-disk columnar OHLCV store shared by all workers (requires pyarrow)
+    price_store_dir: str = Field(
+        default=str(Path(__file__).resolve().parents[1] / "data" / "price_store"),
+        alias="PRICE_STORE_DIR",
+    )
+
+    # Host-local SQLite (WAL) cache tier between L1 and Redis, shared by all
+    # workers and used alone when Redis is unavailable
+    disk_cache_enabled: bool = Field(default=True, alias="DISK_CACHE_ENABLED")
+    disk_cache_path: str = Field(
+        default=str(Path(__file__).resolve().parents[1] / "data" / "cache" / "cache.sqlite3"),
+        alias="DISK_CACHE_PATH",
+    )
+    disk_cache_max_mb: int = Field(default=512, alias="DISK_CACHE_MAX_MB")
+    # Host-wide shared-memory tier for OHLCV frames and company info, mapped by
+    # every worker instead of copied into each L1 (empty dir: /dev/shm/equisense-cache)
+    shared_cache_enabled: bool = Field(default=True, alias="SHARED_CACHE_ENABLED")
+    shared_cache_dir: str = Field(default="", alias="SHARED_CACHE_DIR")
+    shared_cache_max_mb: int = Field(default=256, alias="SHARED_CACHE_MAX_MB")
+    # Mappings each worker keeps open (least recently read are unmapped first)
+    shared_cache_max_mapped: int = Field(default=256, alias="SHARED_CACHE_MAX_MAPPED")
+
+    # Reuse outputs of deterministic graph nodes (fundamentals, valuation, ...) for
+    # identical inputs; /analyze with refresh=true recomputes them
+    node_memo_enabled: bool = Field(default=True, alias="NODE_MEMO_ENABLED")
+    # Request deadline for a research run; nodes still running when their share
+    # of it is spent are cancelled, keeping the reserve for synthesis
+    analysis_deadline_seconds: float = Field(default=90.0, alias="ANALYSIS_DEADLINE_SECONDS")
+    analysis_synthesis_reserve_seconds: float = Field(default=15.0, alias="ANALYSIS_SYNTHESIS_RESERVE_SECONDS")
+
     # Langfuse observability
     langfuse_enabled: bool = Field(default=False, alias="LANGFUSE_ENABLED")
     langfuse_public_key: Optional[str] = Field(default=None, alias="LANGFUSE_PUBLIC_KEY")
@@ -60,6 +129,30 @@ class AppSettings(BaseSettings):
     )
 
 
+logger = logging.getLogger(__name__)
+
+# Called with the new settings after every reload_settings()
+_reload_hooks: List[Callable[[AppSettings], None]] = []
+
+
 @lru_cache(maxsize=1)
 def get_settings() -> AppSettings:
     return AppSettings()
+
+
+def on_settings_reload(hook: Callable[[AppSettings], None]) -> Callable[[AppSettings], None]:
+    """Register ``hook(settings)`` to run after the settings are reloaded"""
+    _reload_hooks.append(hook)
+    return hook
+
+
+def reload_settings() -> AppSettings:
+    """Re-read the environment and .env file; later get_settings() calls see the new values"""
+    get_settings.cache_clear()
+    settings = get_settings()
+    for hook in list(_reload_hooks):
+        try:
+            hook(settings)
+        except Exception as e:
+            logger.warning(f"Settings reload hook {getattr(hook, '__name__', hook)} failed: {e}")
+    return settings
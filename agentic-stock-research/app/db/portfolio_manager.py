@@ -27,7 +27,8 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.redis_cache import CacheManager, get_cache_manager
+from app.utils.async_utils import run_data_io
 
 logger = logging.getLogger(__name__)
 
@@ -153,10 +154,15 @@ class PortfolioManager:
     """Main portfolio management system"""
     
     def __init__(self):
-        self.cache = get_cache_manager()
+        self.cache: Optional[CacheManager] = None
         self.portfolios: Dict[str, Portfolio] = {}
         self.watchlists: Dict[str, Watchlist] = {}
     
+    async def _get_cache(self) -> CacheManager:
+        if self.cache is None:
+            self.cache = await get_cache_manager()
+        return self.cache
+    
     async def create_portfolio(
         self,
         user_id: str,
@@ -236,15 +242,14 @@ class PortfolioManager:
             if portfolio.user_id == user_id:
                 user_portfolios.append(portfolio)
         
-        # Check cache for additional portfolios
-        cache_key = f"user_portfolios:{user_id}"
-        cached_ids = await self.cache.get(cache_key)
+        # Check cache for additional portfolios, loading them with one MGET
+        cache = await self._get_cache()
+        cached_ids = await cache.get(f"user_portfolios:{user_id}")
         if cached_ids:
-            for portfolio_id in cached_ids:
-                if portfolio_id not in [p.id for p in user_portfolios]:
-                    cached_portfolio = await self._get_cached_portfolio(portfolio_id)
-                    if cached_portfolio:
-                        user_portfolios.append(cached_portfolio)
+            known = {p.id for p in user_portfolios}
+            keys = [f"portfolio:{pid}" for pid in cached_ids if pid not in known]
+            cached = await cache.get_many(keys)
+            user_portfolios.extend(Portfolio(**cached[key]) for key in keys if cached.get(key))
         
         return user_portfolios
     
@@ -257,15 +262,14 @@ class PortfolioManager:
             if watchlist.user_id == user_id:
                 user_watchlists.append(watchlist)
         
-        # Check cache for additional watchlists
-        cache_key = f"user_watchlists:{user_id}"
-        cached_ids = await self.cache.get(cache_key)
+        # Check cache for additional watchlists, loading them with one MGET
+        cache = await self._get_cache()
+        cached_ids = await cache.get(f"user_watchlists:{user_id}")
         if cached_ids:
-            for watchlist_id in cached_ids:
-                if watchlist_id not in [w.id for w in user_watchlists]:
-                    cached_watchlist = await self._get_cached_watchlist(watchlist_id)
-                    if cached_watchlist:
-                        user_watchlists.append(cached_watchlist)
+            known = {w.id for w in user_watchlists}
+            keys = [f"watchlist:{wid}" for wid in cached_ids if wid not in known]
+            cached = await cache.get_many(keys)
+            user_watchlists.extend(Watchlist(**cached[key]) for key in keys if cached.get(key))
         
         return user_watchlists
     
@@ -315,7 +319,8 @@ class PortfolioManager:
                 watchlist_data["tickers"].append(ticker_data)
         
         # Cache watchlist data
-        await self.cache.set(f"watchlist_data:{watchlist_id}", watchlist_data, ttl=300)  # 5 minutes
+        cache = await self._get_cache()
+        await cache.set(f"watchlist_data:{watchlist_id}", watchlist_data, ttl=300)  # 5 minutes
         
         logger.info(f"Updated prices for watchlist {watchlist_id}")
         return watchlist_data
@@ -378,21 +383,21 @@ class PortfolioManager:
         price_data = {}
         
         try:
-            # Use yfinance to get current prices
-            for ticker in tickers:
-                try:
-                    stock = yf.Ticker(ticker)
-                    info = stock.info
-                    current_price = info.get('currentPrice') or info.get('regularMarketPrice')
-                    
-                    if current_price:
-                        price_data[ticker] = float(current_price)
-                    else:
-                        logger.warning(f"Could not get price for {ticker}")
-                
-                except Exception as e:
-                    logger.warning(f"Error fetching price for {ticker}: {e}")
+            # Use yfinance to get current prices, concurrently on the data I/O pool
+            infos = await asyncio.gather(
+                *(run_data_io(lambda t=ticker: yf.Ticker(t).info) for ticker in tickers),
+                return_exceptions=True,
+            )
+            for ticker, info in zip(tickers, infos):
+                if isinstance(info, Exception):
+                    logger.warning(f"Error fetching price for {ticker}: {info}")
                     continue
+                
+                current_price = info.get('currentPrice') or info.get('regularMarketPrice')
+                if current_price:
+                    price_data[ticker] = float(current_price)
+                else:
+                    logger.warning(f"Could not get price for {ticker}")
             
             logger.info(f"Fetched prices for {len(price_data)}/{len(tickers)} tickers")
             
@@ -469,40 +474,48 @@ class PortfolioManager:
     
     async def _cache_portfolio(self, portfolio: Portfolio):
         """Cache portfolio data"""
+        cache = await self._get_cache()
         cache_key = f"portfolio:{portfolio.id}"
-        await self.cache.set(cache_key, portfolio.__dict__, ttl=3600)  # 1 hour
+        items = {cache_key: portfolio.__dict__}
         
         # Update user portfolios list
         user_cache_key = f"user_portfolios:{portfolio.user_id}"
-        user_portfolios = await self.cache.get(user_cache_key) or []
+        user_portfolios = await cache.get(user_cache_key) or []
         if portfolio.id not in user_portfolios:
             user_portfolios.append(portfolio.id)
-            await self.cache.set(user_cache_key, user_portfolios, ttl=86400)  # 24 hours
+            items[user_cache_key] = user_portfolios
+        
+        # Portfolio for 1 hour, user list for 24 hours, in one pipelined write
+        await cache.set_many(items, ttls={cache_key: 3600, user_cache_key: 86400})
     
     async def _cache_watchlist(self, watchlist: Watchlist):
         """Cache watchlist data"""
+        cache = await self._get_cache()
         cache_key = f"watchlist:{watchlist.id}"
-        await self.cache.set(cache_key, watchlist.__dict__, ttl=3600)  # 1 hour
+        items = {cache_key: watchlist.__dict__}
         
         # Update user watchlists list
         user_cache_key = f"user_watchlists:{watchlist.user_id}"
-        user_watchlists = await self.cache.get(user_cache_key) or []
+        user_watchlists = await cache.get(user_cache_key) or []
         if watchlist.id not in user_watchlists:
             user_watchlists.append(watchlist.id)
-            await self.cache.set(user_cache_key, user_watchlists, ttl=86400)  # 24 hours
+            items[user_cache_key] = user_watchlists
+        
+        # Watchlist for 1 hour, user list for 24 hours, in one pipelined write
+        await cache.set_many(items, ttls={cache_key: 3600, user_cache_key: 86400})
     
     async def _get_cached_portfolio(self, portfolio_id: str) -> Optional[Portfolio]:
         """Get portfolio from cache"""
-        cache_key = f"portfolio:{portfolio_id}"
-        cached_data = await self.cache.get(cache_key)
+        cache = await self._get_cache()
+        cached_data = await cache.get(f"portfolio:{portfolio_id}")
         if cached_data:
             return Portfolio(**cached_data)
         return None
     
     async def _get_cached_watchlist(self, watchlist_id: str) -> Optional[Watchlist]:
         """Get watchlist from cache"""
-        cache_key = f"watchlist:{watchlist_id}"
-        cached_data = await self.cache.get(cache_key)
+        cache = await self._get_cache()
+        cached_data = await cache.get(f"watchlist:{watchlist_id}")
         if cached_data:
             return Watchlist(**cached_data)
         return None
@@ -0,0 +1,88 @@
+"""
+Request deadlines and per-node time budgets for the research graph
+
+Every run carries an absolute ``deadline`` (epoch seconds) in ``ResearchState``.
+Before each node the graph wrapper derives the node's budget from the time
+left, holding back a reserve so synthesis always gets to run, and cancels the
+node when the budget runs out. The time left is split along the critical path:
+a node gets its weight's share of the longest chain it starts (itself plus the
+heaviest chain of bounded nodes that wait on it), weighting nodes by their
+observed average duration. A node with nothing after it may use all of the
+time left, and time an earlier node did not use carries over to later ones.
+Cancellation is cooperative: the node's task is cancelled at its next
+``await``; work already handed to a thread finishes in the background but its
+result is dropped.
+
+A node that overruns contributes nothing to the state except its name in
+``degraded``; synthesis reports on whatever finished and lists the degraded
+sections in ``final_output``.
+
+Inside a node, ``time_left(default)`` caps a tool's own timeout at the time
+remaining before the deadline.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+# Absolute deadline of the node currently running in this context
+_deadline: ContextVar[Optional[float]] = ContextVar("analysis_deadline", default=None)
+
+# Nodes that always run to completion (they assemble the partial results)
+UNBOUNDED_NODES = frozenset({"start", "synthesis"})
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Make ``deadline`` visible to ``time_left`` inside the block"""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left(default: float) -> float:
+    """``default`` seconds, capped at the time remaining before the active deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, min(default, deadline - time.time()))
+
+
+def budget_share(node: str, dependents: Mapping[str, Sequence[str]], durations: Mapping[str, float]) -> float:
+    """
+    Fraction of the time left that ``node`` may use so the heaviest chain of
+    bounded nodes waiting on it still fits; nodes without a recorded duration
+    weigh the mean of the recorded ones (1 when there are none)
+    """
+    known = [seconds for seconds in durations.values() if seconds > 0]
+    fallback = sum(known) / len(known) if known else 1.0
+
+    def weight(name: str) -> float:
+        return durations.get(name) or fallback
+
+    tails: Dict[str, float] = {}
+
+    def tail(name: str) -> float:
+        if name not in tails:
+            tails[name] = max(
+                (weight(d) + tail(d) for d in dependents.get(name, ()) if d not in UNBOUNDED_NODES), default=0.0
+            )
+        return tails[name]
+
+    return weight(node) / (weight(node) + tail(node))
+
+
+def node_budget(node: str, deadline: Optional[float], reserve: float, share: float = 1.0) -> Optional[float]:
+    """Seconds ``node`` may run for (``share`` of the time left after the reserve), or None when it is not bounded"""
+    if deadline is None or node in UNBOUNDED_NODES:
+        return None
+    return max(0.0, (deadline - time.time() - reserve) * share)
+
+
+def degraded_update(sections: List[str]) -> Dict[str, Any]:
+    """State update for a node cancelled at its budget, given the analysis sections it fills"""
+    return {"confidences": {section: 0.0 for section in sections}, "degraded": list(sections)}
@@ -0,0 +1,212 @@
+"""
+Content-addressed memoization of graph node outputs
+
+Some nodes are deterministic given the data they read: re-running them for a
+ticker that was analyzed a few minutes ago repeats the same work on the same
+inputs. For the nodes listed in ``MEMOIZED_NODES`` the graph wrapper hashes
+the node's declared inputs - the ticker, the state sections it reads (the
+ticker's collected data in ``raw_data``), the ``TickerSnapshot`` artifacts its
+tools consume (statements, info, price history) and the settings version - and
+serves the stored output while it is younger than the node's TTL. DataFrames
+are hashed by content, never by their (truncated) repr.
+
+Only the analysis sections a node declares it writes are stored, so a hit is
+applied through the state reducers exactly like a fresh run. Entries live in the shared cache,
+tagged per ticker, so ``/cache-clear/{ticker}`` drops them too. A run with
+``bypass_memo`` in its state recomputes every node and refreshes the stored
+outputs.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from copy import deepcopy
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import orjson
+import pandas as pd
+
+from app.cache.redis_cache import ticker_tag
+from app.utils.async_utils import run_data_io
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MemoSpec:
+    """How a node's output is addressed and how long it stays reusable"""
+    ttl: int
+    # State sections whose per-ticker content is part of the key
+    reads: Tuple[str, ...] = ("raw_data",)
+    # TickerSnapshot artifacts the node's tools read ("history:<period>" for price history)
+    artifacts: Tuple[str, ...] = ()
+    # Key on the UTC date too, for tools that fetch windows ending today
+    daily: bool = False
+
+
+_STATEMENTS = ("info", "financials", "balance_sheet", "cashflow")
+
+MEMOIZED_NODES: Dict[str, MemoSpec] = {
+    "fundamentals": MemoSpec(ttl=1800, artifacts=_STATEMENTS),
+    "valuation": MemoSpec(ttl=1800, artifacts=("info", "cashflow")),
+    "strategic_conviction": MemoSpec(
+        ttl=3600,
+        artifacts=_STATEMENTS + ("history:5y", "recommendations", "institutional_holders", "major_holders"),
+    ),
+    # Sector ETF returns over the trailing 90 days plus the stock's sector from info
+    "sector_rotation": MemoSpec(ttl=3600, reads=(), artifacts=("info",), daily=True),
+}
+
+
+def _section(state: Dict[str, Any], name: str, ticker: str) -> Any:
+    value = state.get(name) or {}
+    return value.get(ticker, value) if isinstance(value, dict) else value
+
+
+def _content_digest(value: Any) -> Any:
+    """orjson ``default``: pandas objects by content, anything else by ``str``"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        digest = hashlib.sha256()
+        digest.update(repr((frame.shape, [str(c) for c in frame.columns], [str(t) for t in frame.dtypes])).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts): fall back to a full serialization
+            digest.update(value.to_json(orient="split", date_format="iso", default_handler=str).encode())
+        return f"{type(value).__name__}:{digest.hexdigest()}"
+    return str(value)
+
+
+def snapshot_artifacts(spec: MemoSpec, state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The snapshot artifacts ``spec`` names, loaded from the ticker's snapshot.
+
+    Blocking (a first access fetches from upstream); the node itself would
+    load the same artifacts, so a miss costs no extra fetches.
+    """
+    ticker = state["tickers"][0]
+    snapshot = (state.get("snapshots") or {}).get(ticker)
+    if snapshot is None or not spec.artifacts:
+        return {}
+    loaded = {}
+    for name in spec.artifacts:
+        if name.startswith("history:"):
+            loaded[name] = snapshot.history(period=name.split(":", 1)[1])
+        else:
+            loaded[name] = getattr(snapshot, name)
+    return loaded
+
+
+def input_fingerprint(
+    node: str,
+    spec: MemoSpec,
+    state: Dict[str, Any],
+    settings_version: str,
+    artifacts: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Digest of everything the node's output depends on"""
+    ticker = state["tickers"][0]
+    inputs = {
+        "node": node,
+        "ticker": ticker,
+        "country": state.get("country"),
+        "settings": settings_version,
+        "artifacts": artifacts or {},
+        **{name: _section(state, name, ticker) for name in spec.reads},
+    }
+    if spec.daily:
+        inputs["as_of"] = datetime.now(timezone.utc).date().isoformat()
+    encoded = orjson.dumps(inputs, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=_content_digest)
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+class NodeMemo:
+    """Per-node memo store on top of the layered cache, with hit-rate stats"""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, int]] = {
+            node: {"hits": 0, "misses": 0, "bypassed": 0, "stored": 0} for node in MEMOIZED_NODES
+        }
+
+    @staticmethod
+    def _output(sections: Sequence[str], result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        analysis = result.get("analysis") or {}
+        if not sections or not all(name in analysis for name in sections):
+            return None
+        confidences = result.get("confidences") or {}
+        return {
+            "analysis": {name: analysis[name] for name in sections},
+            "confidences": {name: confidences[name] for name in sections if name in confidences},
+        }
+
+    async def run(
+        self,
+        node: str,
+        state: Dict[str, Any],
+        settings_version: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        sections: Sequence[str],
+    ) -> Dict[str, Any]:
+        """
+        Return the stored output for these inputs, or ``compute()`` it and
+        store the analysis ``sections`` it declares
+        """
+        from app.cache.optimized_cache import get_optimized_cache_manager
+
+        spec = MEMOIZED_NODES[node]
+        stats = self.stats[node]
+        ticker = state["tickers"][0]
+        try:
+            artifacts = await run_data_io(snapshot_artifacts, spec, state)
+        except Exception as e:
+            # Inputs unknown: run the node unmemoized (it reports the fetch failure itself)
+            logger.warning(f"[{ticker}] {node}: memo inputs unavailable, not memoizing: {e}")
+            stats["bypassed"] += 1
+            return await compute()
+        key = f"node:{node}:{ticker}:{input_fingerprint(node, spec, state, settings_version, artifacts)}"
+        cache = await get_optimized_cache_manager()
+
+        if state.get("bypass_memo"):
+            stats["bypassed"] += 1
+        else:
+            stored = await cache.get(key)
+            if stored is not None:
+                stats["hits"] += 1
+                logger.info(f"[{ticker}] {node}: reusing memoized output")
+                # The L1 tier hands out shared objects; later nodes may mutate their sections
+                return deepcopy(stored)
+            stats["misses"] += 1
+
+        result = await compute()
+        output = self._output(sections, result)
+        # Failed runs leave an "error" entry; only successful outputs are reused
+        if output is not None and not any(
+            isinstance(v, dict) and "error" in v for v in output["analysis"].values()
+        ):
+            if await cache.set(key, output, ttl=spec.ttl, tags=[ticker_tag(ticker)]):
+                stats["stored"] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            node: {
+                **stats,
+                "hit_rate": round(stats["hits"] / (stats["hits"] + stats["misses"]) * 100, 2)
+                if stats["hits"] + stats["misses"] else 0,
+            }
+            for node, stats in self.stats.items()
+        }
+
+
+_node_memo: Optional[NodeMemo] = None
+
+
+def get_node_memo() -> NodeMemo:
+    """Get global node memo instance"""
+    global _node_memo
+    if _node_memo is None:
+        _node_memo = NodeMemo()
+    return _node_memo
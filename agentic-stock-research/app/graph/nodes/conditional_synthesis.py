@@ -12,17 +12,24 @@ from app.graph.nodes.enhanced_synthesis import synthesis_node as institutional_s
 logger = logging.getLogger(__name__)
 
 
+def _with_degraded_sections(result: ResearchState, state: ResearchState) -> ResearchState:
+    """List the sections cut off by the request deadline in the final output"""
+    if result.get("final_output") is not None:
+        result["final_output"]["degraded_sections"] = sorted(state.get("degraded") or [])
+    return result
+
+
 async def conditional_synthesis_node(state: ResearchState, settings: AppSettings) -> ResearchState:
     local_state = deepcopy(state)
     ticker = local_state.get("tickers", [None])[0]
     try:
         # Always use standard synthesis (institutional synthesis disabled pending fix)
         result = await standard_synthesis(local_state, settings)
-        return result
+        return _with_degraded_sections(result, local_state)
     except Exception as e:
         logger.error(f"[{ticker}] Synthesis failed: {e}, falling back to standard")
         try:
-            return await standard_synthesis(local_state, settings)
+            return _with_degraded_sections(await standard_synthesis(local_state, settings), local_state)
         except Exception as fallback_err:
             logger.error(f"[{ticker}] Fallback synthesis also failed: {fallback_err}")
             return {
@@ -31,7 +38,8 @@ async def conditional_synthesis_node(state: ResearchState, settings: AppSettings
                     "tickers": local_state.get("tickers", []),
                     "reports": [],
                     "generated_at": "Error occurred during analysis",
-                    "error": str(e)
+                    "error": str(e),
+                    "degraded_sections": sorted(local_state.get("degraded") or []),
                 }
             }
 
@@ -4,9 +4,12 @@ import asyncio
 import logging
 from typing import Dict
 
+from app.cache.statement_cache import get_statement_cache
 from app.config import AppSettings
+from app.graph.deadline import time_left
 from app.graph.state import ResearchState
 from app.tools.finance import fetch_ohlcv, fetch_info
+from app.tools.ticker_snapshot import TickerSnapshot
 from app.utils.async_utils import AsyncProcessor, monitor_performance
 
 logger = logging.getLogger(__name__)
@@ -53,7 +56,7 @@ async def data_collection_node(state: ResearchState, settings: AppSettings) -> R
     async with AsyncProcessor(max_workers=15) as processor:
         results = await processor.gather_with_concurrency(
             *[fetch_ticker_data(t) for t in tickers],
-            return_exceptions=True, timeout=20.0
+            return_exceptions=True, timeout=time_left(20.0)
         )
 
     raw_data: Dict[str, dict] = {}
@@ -75,5 +78,16 @@ async def data_collection_node(state: ResearchState, settings: AppSettings) -> R
     else:
         state["raw_data"] = {ticker: {}}
 
+    # Seed the shared snapshot with the cached info so downstream nodes never refetch it
+    info = state["raw_data"][ticker].get("info") or None
+    snapshot = TickerSnapshot(ticker, info=info)
+    # Statements are served from the earnings-calendar-aware cache until the next report
+    try:
+        seeded = await get_statement_cache().attach(snapshot)
+        logger.debug(f"[{ticker}] {seeded} financial statements served from cache")
+    except Exception as e:
+        logger.warning(f"[{ticker}] Statement cache unavailable: {e}")
+    state["snapshots"] = {ticker: snapshot}
+
     state.setdefault("confidences", {})["data_collection"] = successful / len(tickers) if tickers else 0.0
     return state
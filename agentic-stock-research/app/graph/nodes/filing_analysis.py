@@ -6,6 +6,7 @@ import logging
 from typing import Any, Dict, List
 
 from app.config import AppSettings
+from app.graph.deadline import time_left
 from app.graph.state import ResearchState
 from app.tools.sec_edgar import get_recent_sec_filings, compare_consecutive_filings, FilingType
 from app.tools.bse_nse_filings import analyze_indian_filings
@@ -61,7 +62,7 @@ async def _analyze_us_sec_filings(ticker: str, filing_data: Dict) -> Dict:
 
         try:
             comparison = await asyncio.wait_for(
-                compare_consecutive_filings(ticker, FilingType.FORM_10K), timeout=30.0
+                compare_consecutive_filings(ticker, FilingType.FORM_10K), timeout=time_left(30.0)
             )
             if comparison:
                 filing_data["risk_factor_changes"] = comparison.risk_factor_changes
@@ -86,9 +87,10 @@ async def _analyze_indian_filings(ticker: str, filing_data: Dict) -> Dict:
     clean_ticker = ticker.replace(".NS", "").replace(".BO", "")
     try:
         try:
-            analysis = await asyncio.wait_for(_fetch_indian_filings(clean_ticker), timeout=45.0)
+            timeout = time_left(45.0)
+            analysis = await asyncio.wait_for(_fetch_indian_filings(clean_ticker), timeout=timeout)
         except asyncio.TimeoutError:
-            filing_data.update({"status": "timeout", "error": "Request timed out after 45s"})
+            filing_data.update({"status": "timeout", "error": f"Request timed out after {timeout:.0f}s"})
             return filing_data
         except RetryError as e:
             filing_data.update({"status": "fetch_failed", "error": str(e)})
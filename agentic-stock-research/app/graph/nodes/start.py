@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 from app.config import AppSettings
 from app.graph.state import ResearchState
 
@@ -20,4 +22,5 @@ async def start_node(state: ResearchState, settings: AppSettings) -> ResearchSta
         confidences={},
         retries={},
         needs_rerun=[],
+        deadline=state.get("deadline") or time.time() + settings.analysis_deadline_seconds,
     )
@@ -0,0 +1,188 @@
+"""
+Dependency-derived scheduling for the research graph
+
+Each node declares the ``ResearchState`` keys it reads and writes; analysis
+sections are addressed as ``analysis.<section>`` and reading ``analysis``
+means every section. A node runs after the writers of everything it reads and
+nowhere else, so the graph is exactly as deep as its data dependencies: the
+slowest scraper only delays the nodes that consume its output.
+
+Keys no node writes (e.g. ``horizon_short_days``) come from the request.
+
+LangGraph runs nodes in lockstep supersteps: a step starts only when every
+node of the previous one has finished. A node that could start early (e.g.
+``youtube`` needs only the ticker) would otherwise share a step with
+``data_collection`` and hold back everything after it, so nodes are placed as
+late as their dependents allow and ``scheduled_dependencies`` adds the wait on
+the step before them.
+
+Run ``python -m app.graph.schedule`` to print the derived dependencies, the
+supersteps and the critical path, weighted by node durations loaded with
+``--timings`` (JSON ``{node: seconds}``) or measured in a live ``--run TICKER``;
+without timings every node counts as one step.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class NodeSpec:
+    """A graph node and the state keys it depends on and produces"""
+    fn: Callable[..., Any]
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+
+    @property
+    def sections(self) -> List[str]:
+        """Analysis sections this node fills"""
+        return [key.split(".", 1)[1] for key in self.writes if key.startswith("analysis.")]
+
+
+def _covers(read: str, write: str) -> bool:
+    return write == read or write.startswith(read + ".")
+
+
+def derive_dependencies(specs: Mapping[str, NodeSpec]) -> Dict[str, List[str]]:
+    """
+    Direct predecessors of every node (in declaration order).
+
+    Edges implied by a longer path are dropped, so each node waits only on the
+    nodes it needs that nothing else in its ancestry already waits on.
+    """
+    deps = {
+        name: [other for other, o in specs.items() if other != name and any(
+            _covers(read, write) for read in spec.reads for write in o.writes
+        )]
+        for name, spec in specs.items()
+    }
+
+    ancestors: Dict[str, set] = {}
+
+    def visit(name: str, path: Tuple[str, ...] = ()) -> set:
+        if name in path:
+            raise ValueError(f"Cyclic node dependencies: {' -> '.join(path + (name,))}")
+        if name not in ancestors:
+            found = set()
+            for dep in deps[name]:
+                found |= {dep} | visit(dep, path + (name,))
+            ancestors[name] = found
+        return ancestors[name]
+
+    for name in specs:
+        visit(name)
+    return {
+        name: [d for d in preds if not any(d in ancestors[other] for other in preds if other != d)]
+        for name, preds in deps.items()
+    }
+
+
+def schedule_levels(deps: Mapping[str, List[str]]) -> Dict[str, int]:
+    """Superstep of every node, as late as its dependents allow (the entry node is step 0)"""
+    dependents: Dict[str, List[str]] = {name: [] for name in deps}
+    for name, preds in deps.items():
+        for pred in preds:
+            dependents[pred].append(name)
+
+    earliest: Dict[str, int] = {}
+
+    def asap(name: str) -> int:
+        if name not in earliest:
+            earliest[name] = 1 + max((asap(d) for d in deps[name]), default=-1)
+        return earliest[name]
+
+    last = max(asap(name) for name in deps)
+    levels: Dict[str, int] = {}
+
+    def alap(name: str) -> int:
+        if name not in levels:
+            levels[name] = min((alap(d) - 1 for d in dependents[name]), default=last)
+        return levels[name]
+
+    return {name: (0 if not deps[name] else alap(name)) for name in deps}
+
+
+def scheduled_dependencies(deps: Mapping[str, List[str]]) -> Dict[str, List[str]]:
+    """``deps`` plus a wait on the preceding step for nodes placed later than their inputs"""
+    levels = schedule_levels(deps)
+    scheduled = {}
+    for name, preds in deps.items():
+        level = levels[name]
+        if preds and max(levels[p] for p in preds) < level - 1:
+            anchor = next(other for other in deps if levels[other] == level - 1)
+            preds = preds + [anchor]
+        scheduled[name] = list(preds)
+    return scheduled
+
+
+def critical_path(
+    deps: Mapping[str, List[str]], durations: Optional[Mapping[str, float]] = None
+) -> Tuple[List[str], float]:
+    """Longest chain through the graph by node duration (1 per node when unknown)"""
+    durations = durations or {}
+    finish: Dict[str, Tuple[float, Optional[str]]] = {}
+
+    def earliest_finish(name: str) -> float:
+        if name not in finish:
+            before = max(((earliest_finish(d), d) for d in deps[name]), default=(0.0, None))
+            finish[name] = (before[0] + durations.get(name, 0.0 if durations else 1.0), before[1])
+        return finish[name][0]
+
+    end = max(deps, key=earliest_finish)
+    path = [end]
+    while finish[path[-1]][1] is not None:
+        path.append(finish[path[-1]][1])
+    return path[::-1], finish[end][0]
+
+
+def format_schedule(deps: Mapping[str, List[str]], durations: Optional[Mapping[str, float]] = None) -> str:
+    scheduled = scheduled_dependencies(deps)
+    levels = schedule_levels(deps)
+    path, total = critical_path(scheduled, durations)
+    unit = "s" if durations else " steps"
+    lines = ["Node dependencies (declared reads/writes):"]
+    for name, preds in deps.items():
+        waits = [p for p in scheduled[name] if p not in preds]
+        extra = f" [waits on step of {', '.join(waits)}]" if waits else ""
+        lines.append(f"  {name} <- {', '.join(preds) or '(request)'}{extra}")
+    lines.append("Supersteps:")
+    for level in range(max(levels.values()) + 1):
+        nodes = [n for n in deps if levels[n] == level]
+        took = f" ({max(durations.get(n, 0.0) for n in nodes):.2f}s)" if durations else ""
+        lines.append(f"  {level}{took}: {', '.join(nodes)}")
+    if durations:
+        lockstep = sum(
+            max(durations.get(n, 0.0) for n in deps if levels[n] == level) for level in range(max(levels.values()) + 1)
+        )
+        lines.append(f"Lockstep latency (sum of step maxima): {lockstep:.2f}s")
+    lines.append(f"Critical path ({total:.2f}{unit}): {' -> '.join(path)}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.graph.workflow import RESEARCH_NODES, get_node_timings, get_research_graph
+
+    parser = argparse.ArgumentParser(description="Print the research graph schedule and its critical path")
+    parser.add_argument("--timings", help="JSON file mapping node name to seconds")
+    parser.add_argument("--run", metavar="TICKER", help="Run one analysis and use its node timings")
+    args = parser.parse_args(argv)
+
+    durations: Dict[str, float] = {}
+    if args.timings:
+        with open(args.timings) as f:
+            durations = {k: float(v) for k, v in json.load(f).items()}
+    elif args.run:
+        start = time.perf_counter()
+        asyncio.run(get_research_graph().ainvoke({"tickers": [args.run]}))
+        print(f"Analysis of {args.run} took {time.perf_counter() - start:.2f}s")
+        durations = {name: t["last"] for name, t in get_node_timings().items()}
+    print(format_schedule(derive_dependencies(RESEARCH_NODES), durations))
+
+
+if __name__ == "__main__":
+    main()
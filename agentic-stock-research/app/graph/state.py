@@ -51,3 +51,11 @@ class ResearchState(TypedDict, total=False):
     market_context: Annotated[Dict[str, Any], operator.or_]
     currency_rates: Annotated[Dict[str, float], operator.or_]
     user_preferences: Annotated[Optional[Dict[str, Any]], _keep_last_optional_dict]
+    # Per-ticker TickerSnapshot objects created by data_collection and shared by all nodes
+    snapshots: Annotated[Dict[str, Any], operator.or_]
+    # Recompute memoized nodes instead of reusing stored outputs (see app.graph.memo)
+    bypass_memo: Annotated[bool, operator.or_]
+    # Absolute request deadline (epoch seconds); nodes get budgets from it (see app.graph.deadline)
+    deadline: Annotated[float, _keep_last_country]
+    # Analysis sections cut off at their time budget
+    degraded: Annotated[List[str], _keep_unique_tickers]
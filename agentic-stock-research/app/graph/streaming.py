@@ -0,0 +1,80 @@
+"""
+Server-sent events for a research graph run
+
+``stream_analysis_events`` runs the compiled graph with ``astream`` and yields
+one SSE message per completed node, so clients can render e.g. technicals while
+filings and earnings calls are still being analyzed:
+
+- ``node``: ``{"node", "analysis", "confidences"}`` with only the sections the
+  node produced (nodes cut off by the deadline send ``"degraded": true``)
+- ``result``: the final ``ResearchResponse``, once synthesis has finished
+- ``error``: ``{"error"}`` if the run failed; the stream ends after it
+
+``on_complete(response, error)`` is called once before the last message, e.g.
+to finish the request's trace.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+import orjson
+
+from app.cache.optimized_cache import track_staleness
+from app.graph.nodes.synthesis_common import convert_numpy_types
+from app.schemas.output import ResearchResponse
+
+logger = logging.getLogger(__name__)
+
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One SSE message; values JSON cannot represent are sent as strings"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str, option=_JSON_OPTIONS) + b"\n\n"
+
+
+def _node_event(node: str, update: Dict[str, Any], sent: Set[str]) -> Dict[str, Any]:
+    if "analysis" not in update and update.get("degraded"):
+        # Cancelled at its time budget (see app.graph.deadline)
+        return {"node": node, "analysis": {}, "confidences": {}, "degraded": True}
+    # Nodes often return the whole state; only send sections not streamed yet
+    analysis = {k: v for k, v in (update.get("analysis") or {}).items() if k not in sent}
+    confidences = update.get("confidences") or {}
+    sent.update(analysis)
+    return {
+        "node": node,
+        "analysis": convert_numpy_types(analysis),
+        "confidences": {k: confidences[k] for k in analysis if k in confidences},
+    }
+
+
+async def stream_analysis_events(
+    graph: Any,
+    payload: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+    on_complete: Optional[Callable[[Optional[ResearchResponse], Optional[str]], None]] = None,
+) -> AsyncIterator[bytes]:
+    """Run ``graph`` on ``payload`` (with run ``config``, e.g. callbacks) and yield SSE messages as nodes complete"""
+    sent: Set[str] = set()
+    final_output: Dict[str, Any] = {}
+    try:
+        with track_staleness() as staleness:
+            async for step in graph.astream(payload, config, stream_mode="updates"):
+                for node, update in step.items():
+                    if not isinstance(update, dict):
+                        continue
+                    if node == "synthesis":
+                        final_output = update.get("final_output") or {}
+                        continue
+                    yield sse_event("node", _node_event(node, update, sent))
+        response = ResearchResponse(**{**final_output, "data_staleness": staleness})
+    except Exception as e:
+        logger.exception(f"Streaming analysis failed for {payload.get('tickers')}: {e}")
+        if on_complete is not None:
+            on_complete(None, str(e))
+        yield sse_event("error", {"error": str(e)})
+        return
+    if on_complete is not None:
+        on_complete(response, None)
+    yield sse_event("result", response.model_dump(mode="json"))
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
 try:
     # Optional: attach Langfuse callback to LangChain/LangGraph if available
     from langfuse.callbacks import CallbackHandler as LangfuseCallbackHandler  # type: ignore
 except Exception:  # pragma: no cover
     LangfuseCallbackHandler = None  # type: ignore
 
-from app.config import AppSettings
+from app.config import AppSettings, on_settings_reload
+from app.graph.deadline import budget_share, deadline_scope, degraded_update, node_budget
+from app.graph.memo import MEMOIZED_NODES, get_node_memo
+from app.graph.schedule import NodeSpec, derive_dependencies, scheduled_dependencies
 from app.graph.state import ResearchState
+from app.tools.ticker_snapshot import snapshot_scope
 from app.graph.nodes.start import start_node
 from app.graph.nodes.data_collection import data_collection_node
 from app.graph.nodes.news_sentiment import news_sentiment_node
@@ -33,77 +42,120 @@ from app.graph.nodes.synthesis_multi import enhanced_synthesis_node
 from app.graph.nodes.enhanced_synthesis import synthesis_node as institutional_synthesis_node
 from app.graph.nodes.conditional_synthesis import synthesis_node as conditional_synthesis_node
 
+logger = logging.getLogger(__name__)
 
-def _wrap(node_fn: Callable[[ResearchState, AppSettings], Any], settings: AppSettings):
-    async def inner(state: ResearchState) -> ResearchState:
+
+# name -> {"last", "avg"} seconds of the most recent runs in this process
+_node_timings: Dict[str, Dict[str, float]] = {}
+
+
+def get_node_timings() -> Dict[str, Dict[str, float]]:
+    return {name: dict(t) for name, t in _node_timings.items()}
+
+
+def _record_timing(name: str, seconds: float) -> None:
+    previous = _node_timings.get(name)
+    avg = seconds if previous is None else 0.8 * previous["avg"] + 0.2 * seconds
+    _node_timings[name] = {"last": round(seconds, 3), "avg": round(avg, 3)}
+
+
+def _wrap(spec: NodeSpec, settings: AppSettings, name: str, dependents: Optional[Dict[str, List[str]]] = None):
+    node_fn = spec.fn
+    memoized = settings.node_memo_enabled and name in MEMOIZED_NODES
+    settings_version = settings_fingerprint(settings) if memoized else ""
+
+    async def run(state: ResearchState) -> ResearchState:
+        if memoized:
+            return await get_node_memo().run(
+                name, state, settings_version, lambda: node_fn(state, settings), spec.sections
+            )
         return await node_fn(state, settings)
 
+    async def inner(state: ResearchState) -> ResearchState:
+        deadline = state.get("deadline")
+        share = (
+            budget_share(name, dependents, {n: t["avg"] for n, t in list(_node_timings.items())}) if dependents else 1.0
+        )
+        budget = node_budget(name, deadline, settings.analysis_synthesis_reserve_seconds, share)
+        started = time.perf_counter()
+        try:
+            with snapshot_scope(state.get("snapshots")), deadline_scope(deadline):
+                if budget is None:
+                    return await run(state)
+                try:
+                    return await asyncio.wait_for(run(state), timeout=budget)
+                except asyncio.TimeoutError:
+                    ticker = (state.get("tickers") or ["?"])[0]
+                    logger.warning(f"[{ticker}] {name} cancelled at its {budget:.1f}s budget, continuing without it")
+                    return degraded_update(spec.sections or [name])
+        finally:
+            _record_timing(name, time.perf_counter() - started)
+
     return inner
 
 
+# Nodes with the state keys they read and write; edges are derived from these
+# (see app.graph.schedule), so a node waits only for the data it uses
+_TICKER_DATA = ("tickers", "snapshots")
+RESEARCH_NODES: Dict[str, NodeSpec] = {
+    "start": NodeSpec(start_node, reads=("tickers", "country", "deadline"), writes=("tickers", "country", "deadline")),
+    "data_collection": NodeSpec(data_collection_node, reads=("tickers",), writes=("raw_data", "snapshots")),
+    "technicals": NodeSpec(technicals_node, reads=_TICKER_DATA, writes=("analysis.technicals",)),
+    # Reads the current price from raw_data (analysis.technicals is only consulted when empty)
+    "fundamentals": NodeSpec(
+        comprehensive_fundamentals_node,
+        reads=_TICKER_DATA + ("raw_data",),
+        writes=("analysis.fundamentals", "analysis.comprehensive_fundamentals"),
+    ),
+    "news_sentiment": NodeSpec(news_sentiment_node, reads=_TICKER_DATA, writes=("analysis.news_sentiment",)),
+    # YouTube and earnings-call transcripts come from their own APIs, not yfinance
+    "youtube": NodeSpec(youtube_analysis_node, reads=("tickers",), writes=("analysis.youtube",)),
+    "earnings_call_analysis": NodeSpec(
+        earnings_call_analysis_node, reads=("tickers",), writes=("analysis.earnings_calls",)
+    ),
+    "filing_analysis": NodeSpec(filing_analysis_node, reads=_TICKER_DATA, writes=("analysis.filings",)),
+    "peer_analysis": NodeSpec(peer_analysis_node, reads=_TICKER_DATA, writes=("analysis.peer_analysis",)),
+    "analyst_recommendations": NodeSpec(
+        analyst_recommendations_node, reads=_TICKER_DATA, writes=("analysis.analyst_recommendations",)
+    ),
+    "cashflow": NodeSpec(cashflow_node, reads=_TICKER_DATA, writes=("analysis.cashflow",)),
+    "leadership": NodeSpec(leadership_node, reads=_TICKER_DATA, writes=("analysis.leadership",)),
+    "sector_macro": NodeSpec(sector_macro_node, reads=_TICKER_DATA, writes=("analysis.sector_macro",)),
+    "growth_prospects": NodeSpec(growth_prospects_node, reads=_TICKER_DATA, writes=("analysis.growth_prospects",)),
+    "valuation": NodeSpec(valuation_node, reads=_TICKER_DATA, writes=("analysis.valuation",)),
+    "strategic_conviction": NodeSpec(
+        strategic_conviction_node, reads=_TICKER_DATA, writes=("analysis.strategic_conviction",)
+    ),
+    "sector_rotation": NodeSpec(sector_rotation_node, reads=_TICKER_DATA, writes=("analysis.sector_rotation",)),
+    # Use conditional synthesis (chooses between institutional and standard)
+    "synthesis": NodeSpec(
+        conditional_synthesis_node, reads=("tickers", "raw_data", "analysis", "confidences"), writes=("final_output",)
+    ),
+}
+
+
 def build_research_graph(settings: AppSettings):
     graph = StateGraph(ResearchState)
 
-    graph.add_node("start", _wrap(start_node, settings))
-    graph.add_node("data_collection", _wrap(data_collection_node, settings))
-    graph.add_node("news_sentiment", _wrap(news_sentiment_node, settings))
-    graph.add_node("youtube", _wrap(youtube_analysis_node, settings))
-    graph.add_node("technicals", _wrap(technicals_node, settings))
-    graph.add_node("fundamentals", _wrap(comprehensive_fundamentals_node, settings))
-    graph.add_node("peer_analysis", _wrap(peer_analysis_node, settings))
-    graph.add_node("analyst_recommendations", _wrap(analyst_recommendations_node, settings))
-    graph.add_node("cashflow", _wrap(cashflow_node, settings))
-    graph.add_node("leadership", _wrap(leadership_node, settings))
-    graph.add_node("sector_macro", _wrap(sector_macro_node, settings))
-    graph.add_node("growth_prospects", _wrap(growth_prospects_node, settings))
-    graph.add_node("valuation", _wrap(valuation_node, settings))
-    graph.add_node("filing_analysis", _wrap(filing_analysis_node, settings))
-    graph.add_node("earnings_call_analysis", _wrap(earnings_call_analysis_node, settings))
-    graph.add_node("strategic_conviction", _wrap(strategic_conviction_node, settings))
-    graph.add_node("sector_rotation", _wrap(sector_rotation_node, settings))
-    # Use conditional synthesis (chooses between institutional and standard)
-    graph.add_node("synthesis", _wrap(conditional_synthesis_node, settings))
-
-    graph.set_entry_point("start")
-    graph.add_edge("start", "data_collection")
-    
-    # PARALLEL EXECUTION: All independent analyses run in parallel after data collection
-    graph.add_edge("data_collection", "technicals")
-    graph.add_edge("data_collection", "fundamentals")
-    graph.add_edge("data_collection", "news_sentiment")
-    graph.add_edge("data_collection", "youtube")
-    graph.add_edge("data_collection", "filing_analysis")
-    graph.add_edge("data_collection", "earnings_call_analysis")
-    
-    # DEPENDENT ANALYSES: These need specific data from previous steps
-    graph.add_edge("fundamentals", "peer_analysis")
-    graph.add_edge("peer_analysis", "analyst_recommendations")
-    
-    # CONVERGENCE POINT: All analyses converge to cashflow for synthesis
-    graph.add_edge("technicals", "cashflow")
-    graph.add_edge("analyst_recommendations", "cashflow")
-    graph.add_edge("news_sentiment", "cashflow")
-    graph.add_edge("youtube", "cashflow")
-    graph.add_edge("filing_analysis", "cashflow")
-    graph.add_edge("earnings_call_analysis", "cashflow")
-    
-    # OPTIMIZED PARALLEL EXECUTION: Run independent analyses in parallel
-    # Leadership, sector_macro, and growth_prospects can run in parallel after cashflow
-    graph.add_edge("cashflow", "leadership")
-    graph.add_edge("cashflow", "sector_macro")
-    graph.add_edge("cashflow", "growth_prospects")
-    
-    # Valuation needs growth_prospects, but can run in parallel with leadership/sector_macro
-    graph.add_edge("growth_prospects", "valuation")
-    
-    # Strategic conviction and sector rotation can run in parallel after valuation
-    graph.add_edge("valuation", "strategic_conviction")
-    graph.add_edge("valuation", "sector_rotation")
-    
-    # Both converge to synthesis (LangGraph waits for all dependencies)
-    graph.add_edge("strategic_conviction", "synthesis")
-    graph.add_edge("sector_rotation", "synthesis")
-    graph.add_edge("synthesis", END)
+    dependencies = scheduled_dependencies(derive_dependencies(RESEARCH_NODES))
+    successors: Dict[str, List[str]] = {name: [] for name in dependencies}
+    for name, preds in dependencies.items():
+        for pred in preds:
+            successors[pred].append(name)
+    for name, spec in RESEARCH_NODES.items():
+        graph.add_node(name, _wrap(spec, settings, name, successors))
+
+    dependents = {pred for preds in dependencies.values() for pred in preds}
+    for name, preds in dependencies.items():
+        if not preds:
+            graph.add_edge(START, name)
+        elif len(preds) == 1:
+            graph.add_edge(preds[0], name)
+        else:
+            # A list of sources waits for all of them
+            graph.add_edge(preds, name)
+        if name not in dependents:
+            graph.add_edge(name, END)
 
     compiled = graph.compile()
     # If Langfuse callback is available, we expose it on the compiled graph for callers to use.
@@ -111,3 +163,63 @@ def build_research_graph(settings: AppSettings):
     if LangfuseCallbackHandler is not None:
         setattr(compiled, "_langfuse_callback_cls", LangfuseCallbackHandler)
     return compiled
+
+
+# Graph builders by analysis profile; every profile is compiled once per settings version
+GRAPH_PROFILES: Dict[str, Callable[[AppSettings], Any]] = {
+    "research": build_research_graph,
+}
+
+# profile -> (settings fingerprint, compiled graph)
+_compiled_graphs: Dict[str, Tuple[str, Any]] = {}
+_registry_lock = threading.Lock()
+
+
+def settings_fingerprint(settings: AppSettings) -> str:
+    """Stable hash of every setting value; changes whenever the configuration does"""
+    return hashlib.sha256(settings.model_dump_json().encode()).hexdigest()[:16]
+
+
+def get_research_graph(settings: Optional[AppSettings] = None, profile: str = "research"):
+    """
+    Compiled graph for ``profile`` under ``settings`` (default: current settings).
+
+    Graphs are compiled once per process and shared by all requests; compiled
+    graphs hold no per-run state, so concurrent ``ainvoke`` calls are safe. A
+    settings change (different fingerprint, e.g. after ``reload_settings()``)
+    compiles a replacement, while runs already in flight finish on the graph
+    they started with.
+    """
+    if settings is None:
+        from app.config import get_settings
+        settings = get_settings()
+    fingerprint = settings_fingerprint(settings)
+    entry = _compiled_graphs.get(profile)
+    if entry is not None and entry[0] == fingerprint:
+        return entry[1]
+    with _registry_lock:
+        entry = _compiled_graphs.get(profile)
+        if entry is None or entry[0] != fingerprint:
+            start = time.perf_counter()
+            entry = (fingerprint, GRAPH_PROFILES[profile](settings))
+            _compiled_graphs[profile] = entry
+            logger.info(
+                f"Compiled '{profile}' graph for settings {fingerprint} in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+        return entry[1]
+
+
+def compile_research_graphs(settings: Optional[AppSettings] = None) -> Dict[str, float]:
+    """Compile every profile ahead of the first request; returns compile seconds per profile"""
+    timings = {}
+    for profile in GRAPH_PROFILES:
+        start = time.perf_counter()
+        get_research_graph(settings, profile)
+        timings[profile] = round(time.perf_counter() - start, 4)
+    return timings
+
+
+@on_settings_reload
+def _recompile_on_reload(settings: AppSettings) -> None:
+    """Swap in graphs for the reloaded settings before the next request needs them"""
+    logger.info(f"Settings reloaded, recompiled graphs in {compile_research_graphs(settings)}")
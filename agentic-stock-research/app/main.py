@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Body
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,7 +16,9 @@ from pydantic import ValidationError
 from app.config import AppSettings, get_settings
 from app.logging import configure_logging, get_logger, init_langfuse_if_configured, log_custom_event, maybe_observe
 from app.schemas.input import ResearchRequest, AnalysisRequest, ChatRequest
-from app.utils.async_utils import monitor_performance, get_performance_monitor
+from app.utils.async_utils import monitor_performance, get_performance_monitor, get_data_executor
+from app.utils.data_provider import get_data_provider
+from app.cache.optimized_cache import track_staleness
 from app.tools.ticker_mapping import (
     map_ticker_to_symbol, 
     get_supported_countries,
@@ -25,7 +28,7 @@ from app.tools.ticker_mapping import (
 from app.tools.bulk_analyzer import analyze_stocks_bulk, BulkAnalysisConfig
 from app.monitoring.performance_monitor import get_performance_monitor, get_performance_summary
 from app.schemas.output import ResearchResponse
-from app.graph.workflow import build_research_graph
+from app.graph.workflow import compile_research_graphs, get_research_graph
 from app.api.reports import router as reports_router
 # from app.api.auth import router as auth_router  # Disabled for now
 from app.api.realtime import router as realtime_router
@@ -94,6 +97,14 @@ def create_app() -> FastAPI:
             app.mount("/", StaticFiles(directory=str(dist_dir), html=True), name="static")
             logger.info("frontend_mounted", path=str(dist_dir))
 
+        # Compile the research graph once; requests reuse it until settings change
+        logger.info("graph_compiled", seconds=compile_research_graphs(settings))
+
+        if settings.cache_warmer_enabled:
+            from app.cache.cache_warmer import get_cache_warmer
+            warmer = await get_cache_warmer()
+            app.state.cache_warmer_task = asyncio.create_task(warmer.schedule_periodic_warming())
+
     @app.get("/health")
     async def health() -> Any:
         return {"status": "ok"}
@@ -103,8 +114,28 @@ def create_app() -> FastAPI:
         """Get cache statistics"""
         try:
             from app.cache.redis_cache import get_cache_manager
+            from app.cache.optimized_cache import get_optimized_cache_manager
+            from app.cache.history_store import get_history_store
+            from app.cache.price_store import get_price_store
+            from app.cache.statement_cache import get_statement_cache
+            from app.utils.rate_limiter import get_yahoo_client
+            from app.tools.finance import get_coalescing_stats
+            from app.cache.access_tracker import get_access_tracker
+            from app.graph.memo import get_node_memo
             cache_manager = await get_cache_manager()
             stats = cache_manager.get_cache_stats()
+            optimized = await get_optimized_cache_manager()
+            stats["l1"] = optimized.memory_cache.get_stats()
+            if optimized.shared_cache is not None:
+                stats["shared_memory"] = optimized.shared_cache.get_stats()
+            stats["request_coalescing"] = get_coalescing_stats()
+            stats["access"] = get_access_tracker().get_stats()
+            stats["node_memo"] = get_node_memo().get_stats()
+            stats["ohlcv_history"] = get_history_store().get_stats()
+            stats["price_store"] = get_price_store().get_stats()
+            stats["statements"] = get_statement_cache().get_stats()
+            stats["yahoo_client_cache"] = get_yahoo_client().cache.get_stats()
+            stats["symbol_resolution"] = get_yahoo_client().resolver.get_stats()
             return stats
         except Exception as e:
             return {"error": str(e), "status": "cache_stats_unavailable"}
@@ -114,17 +145,22 @@ def create_app() -> FastAPI:
         """Clear all cache entries"""
         try:
             from app.cache.redis_cache import get_cache_manager
+            from app.cache.optimized_cache import get_optimized_cache_manager
             cache_manager = await get_cache_manager()
             # Clear all cache entries
             if hasattr(cache_manager, '_memory_cache'):
                 cache_manager._memory_cache.clear()
+            await (await get_optimized_cache_manager()).clear_memory_cache()
             return {"status": "success", "message": "Cache cleared successfully"}
         except Exception as e:
             return {"error": str(e), "status": "cache_clear_failed"}
     
     @app.post("/cache-clear/{ticker}")
-    async def clear_ticker_cache(ticker: str):
-        """Clear cache entries for a specific ticker"""
+    async def clear_ticker_cache(ticker: str, include_untagged: bool = False):
+        """
+        Clear cache entries for a specific ticker; ``include_untagged=true``
+        also scans for entries written before ticker tags (one-off migration)
+        """
         try:
             from app.cache.redis_cache import get_cache_manager
             cache_manager = await get_cache_manager()
@@ -144,6 +180,11 @@ def create_app() -> FastAPI:
                 if await cache_manager.delete(key):
                     cleared_count += 1
             
+            # Market data, statements and history are tagged per ticker
+            from app.cache.optimized_cache import get_optimized_cache_manager
+            optimized_cache = await get_optimized_cache_manager()
+            await optimized_cache.clear_ticker(ticker, include_untagged)
+            
             return {
                 "status": "success", 
                 "message": f"Cleared {cleared_count} cache entries for {ticker}",
@@ -153,6 +194,14 @@ def create_app() -> FastAPI:
         except Exception as e:
             return {"error": str(e), "status": "cache_clear_failed"}
     
+    @app.post("/settings/reload")
+    async def reload_app_settings() -> Any:
+        """Re-read the environment and .env; new requests run on graphs compiled for the new settings"""
+        from app.config import reload_settings
+        from app.graph.workflow import settings_fingerprint
+        reloaded = await asyncio.to_thread(reload_settings)
+        return {"status": "success", "settings_version": settings_fingerprint(reloaded)}
+    
     @app.get("/countries")
     async def get_countries() -> Any:
         """Get list of supported countries for stock analysis"""
@@ -180,6 +229,8 @@ def create_app() -> FastAPI:
         
         return {
             "operations": stats,
+            "executors": {"data_io": get_data_executor().get_stats()},
+            "data_provider": get_data_provider().get_stats(),
             "summary": {
                 "total_operations": sum(stat.get("count", 0) for stat in stats.values()),
                 "total_time": sum(stat.get("total", 0) for stat in stats.values()),
@@ -187,13 +238,35 @@ def create_app() -> FastAPI:
             }
         }
 
-    @app.post("/analyze", response_model=ResearchResponse)
-    @monitor_performance("stock_analysis")
-    async def analyze(body: dict = Body(...), settings: AppSettings = Depends(get_settings)) -> Any:
-        # Construct AnalysisRequest explicitly to avoid body parsing edge-cases
-        req = AnalysisRequest(**body)
-        # Create Langfuse trace for this analysis
-        from app.logging import create_trace, update_generation_output, flush_langfuse
+    def _analysis_payload(req: AnalysisRequest) -> dict:
+        """Initial graph state for an analysis request (tickers mapped to Yahoo symbols)"""
+        mapped_tickers = []
+        country = getattr(req, 'country', 'United States')
+        
+        for ticker in req.tickers:
+            try:
+                mapped_symbol, exchange, currency = map_ticker_to_symbol(ticker, country)
+                mapped_tickers.append(mapped_symbol)
+                logger.info(f"Mapped {ticker} -> {mapped_symbol} [{exchange}] {currency}")
+            except Exception as e:
+                logger.warning(f"Failed to map ticker {ticker}: {e}")
+                mapped_tickers.append(ticker)  # Use original if mapping fails
+        
+        payload = {
+            "tickers": mapped_tickers,
+            "horizon_short_days": req.horizon_short_days,
+            "horizon_long_days": req.horizon_long_days,
+            "country": country,
+            "analysis_type": "institutional" if req.horizon_short_days and req.horizon_long_days else "standard",
+            "bypass_memo": req.refresh,
+        }
+        if req.deadline_seconds:
+            payload["deadline"] = time.time() + req.deadline_seconds
+        return payload
+
+    def _start_analysis_trace(req: AnalysisRequest, source: str) -> Any:
+        """Langfuse trace for an analysis request (None when Langfuse is not configured)"""
+        from app.logging import create_trace
         trace = create_trace(
             name="stock-analysis",
             input_data={
@@ -203,7 +276,7 @@ def create_app() -> FastAPI:
                 "horizon_long": req.horizon_long_days
             },
             metadata={
-                "source": "equisense-analysis-endpoint",
+                "source": source,
                 "model": "gemma3:4b"
             }
         )
@@ -211,67 +284,71 @@ def create_app() -> FastAPI:
             logger.info("Langfuse generation started for analysis request")
         else:
             logger.debug("Langfuse trace not created (client disabled or not configured)")
+        return trace
+
+    def _graph_run_config(graph: Any) -> Optional[dict]:
+        """Run config carrying the Langfuse callback when the compiled graph exposes one"""
+        cb_cls = getattr(graph, "_langfuse_callback_cls", None)
+        if cb_cls is None:
+            return None
+        try:
+            return {"callbacks": [cb_cls()]}
+        except Exception:
+            return None
+
+    def _complete_analysis_trace(
+        trace: Any, out: Optional[ResearchResponse] = None, error: Optional[str] = None
+    ) -> None:
+        """Finish the Langfuse generation with the analysis outcome (no-op without a trace)"""
+        if trace is None:
+            return
+        from app.logging import update_generation_output
+        try:
+            if error is not None:
+                update_generation_output({"status": "failed", "error": error})
+            else:
+                # Get recommendation from the first report's decision
+                recommendation = out.reports[0].decision.action if out.reports else "Unknown"
+                rating = out.reports[0].decision.rating if out.reports else 0
+                update_generation_output({
+                    "recommendation": recommendation,
+                    "rating": rating,
+                    "tickers_analyzed": len(out.reports),
+                    "status": "completed"
+                })
+            logger.info("Langfuse generation updated with output")
+        except Exception as e:
+            logger.warning(f"Failed to complete Langfuse trace: {e}")
+
+    def _flush_langfuse() -> None:
+        from app.logging import flush_langfuse
+        try:
+            flush_langfuse()
+        except Exception:
+            pass
+
+    @app.post("/analyze", response_model=ResearchResponse)
+    @monitor_performance("stock_analysis")
+    async def analyze(body: dict = Body(...)) -> Any:
+        # Construct AnalysisRequest explicitly to avoid body parsing edge-cases
+        req = AnalysisRequest(**body)
+        trace = _start_analysis_trace(req, "equisense-analysis-endpoint")
             
         if not req.tickers:
             raise HTTPException(status_code=400, detail="tickers cannot be empty")
         
-        # Map tickers to proper Yahoo Finance symbols
-        mapped_tickers = []
-        country = getattr(req, 'country', 'United States')
-        
-        for ticker in req.tickers:
-            try:
-                mapped_symbol, exchange, currency = map_ticker_to_symbol(ticker, country)
-                mapped_tickers.append(mapped_symbol)
-                logger.info(f"Mapped {ticker} -> {mapped_symbol} [{exchange}] {currency}")
-            except Exception as e:
-                logger.warning(f"Failed to map ticker {ticker}: {e}")
-                mapped_tickers.append(ticker)  # Use original if mapping fails
-        
         try:
-            graph = build_research_graph(settings)
-            payload = {
-                "tickers": mapped_tickers,
-                "horizon_short_days": req.horizon_short_days,
-                "horizon_long_days": req.horizon_long_days,
-                "country": country,
-                "analysis_type": "institutional" if req.horizon_short_days and req.horizon_long_days else "standard",
-            }
-            callbacks = None
-            # If Langfuse callback is available from compiled graph, use it
-            cb_cls = getattr(graph, "_langfuse_callback_cls", None)
-            if cb_cls is not None:
-                try:
-                    callbacks = [cb_cls()]
-                except Exception:
-                    callbacks = None
-            result = await graph.ainvoke(payload, callbacks=callbacks) if callbacks else await graph.ainvoke(payload)
-            out = ResearchResponse(**result["final_output"])  # type: ignore[index]
+            graph = get_research_graph()
+            payload = _analysis_payload(req)
+            with track_staleness() as staleness:
+                result = await graph.ainvoke(payload, _graph_run_config(graph))
+            out = ResearchResponse(**{**result["final_output"], "data_staleness": staleness})  # type: ignore[index]
             
             # Complete Langfuse generation
-            try:
-                if trace is not None:
-                    # Get recommendation from the first report's decision
-                    recommendation = out.reports[0].decision.action if out.reports else "Unknown"
-                    rating = out.reports[0].decision.rating if out.reports else 0
-                    try:
-                        update_generation_output({
-                            "recommendation": recommendation,
-                            "rating": rating,
-                            "tickers_analyzed": len(out.reports),
-                            "status": "completed"
-                        })
-                        logger.info("Langfuse generation updated with output")
-                    except Exception:
-                        pass
-            except Exception as e:
-                logger.warning(f"Failed to complete Langfuse trace: {e}")
+            _complete_analysis_trace(trace, out)
             
             # Flush any pending Langfuse data
-            try:
-                flush_langfuse()
-            except Exception:
-                pass
+            _flush_langfuse()
             
             # Emit a custom observability event (non-blocking)
             try:
@@ -288,8 +365,41 @@ def create_app() -> FastAPI:
             return out
         except Exception as e:
             logger.exception("analyze_failed", tickers=req.tickers)
+            _complete_analysis_trace(trace, error=str(e))
+            _flush_langfuse()
             return JSONResponse(status_code=500, content={"error": str(e)})
     
+    @app.post("/analyze/stream")
+    async def analyze_stream(body: dict = Body(...)) -> Any:
+        """Same analysis as /analyze, streamed as server-sent events while nodes complete"""
+        from app.graph.streaming import stream_analysis_events
+        req = AnalysisRequest(**body)
+        if not req.tickers:
+            raise HTTPException(status_code=400, detail="tickers cannot be empty")
+        trace = _start_analysis_trace(req, "equisense-analysis-stream")
+        graph = get_research_graph()
+        payload = _analysis_payload(req)
+        logger.info("analyze_stream_started", tickers=payload["tickers"])
+
+        @monitor_performance("stock_analysis")
+        async def events():
+            try:
+                async for message in stream_analysis_events(
+                    graph,
+                    payload,
+                    _graph_run_config(graph),
+                    on_complete=lambda out, error: _complete_analysis_trace(trace, out, error),
+                ):
+                    yield message
+            finally:
+                _flush_langfuse()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    
     @app.post("/analyze-bulk")
     @maybe_observe()
     @monitor_performance("bulk_analysis")
@@ -465,7 +575,7 @@ def create_app() -> FastAPI:
                 horizon_short = body.get("horizon_short_days")
                 horizon_long  = body.get("horizon_long_days")
 
-                graph = build_research_graph(settings)
+                graph = get_research_graph()
                 payload = {
                     "tickers":            mapped_tickers,
                     "horizon_short_days": horizon_short,
@@ -15,6 +15,7 @@ from bs4 import BeautifulSoup
 
 from app.cache.redis_cache import get_cache_manager
 from app.tools.llm_orchestrator import get_llm_orchestrator, TaskType, TaskComplexity
+from app.utils.async_utils import run_data_io
 
 logger = logging.getLogger(__name__)
 
@@ -121,8 +122,7 @@ class EventDetector:
         
         try:
             # Get recent price data
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="5d", interval="1d")
+            hist = await run_data_io(lambda: yf.Ticker(ticker).history(period="5d", interval="1d"))
             
             if len(hist) < 2:
                 return events
@@ -171,8 +171,7 @@ class EventDetector:
         events = []
         
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="10d", interval="1d")
+            hist = await run_data_io(lambda: yf.Ticker(ticker).history(period="10d", interval="1d"))
             
             if len(hist) < 5:
                 return events
@@ -209,8 +208,7 @@ class EventDetector:
         
         try:
             # Get technical indicators (simplified)
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="30d", interval="1d")
+            hist = await run_data_io(lambda: yf.Ticker(ticker).history(period="30d", interval="1d"))
             
             if len(hist) < 20:
                 return events
@@ -332,8 +330,7 @@ class EventDetector:
         
         try:
             # Check for recent analyst recommendations
-            stock = yf.Ticker(ticker)
-            recommendations = stock.recommendations
+            recommendations = await run_data_io(lambda: yf.Ticker(ticker).recommendations)
             
             if recommendations is not None and len(recommendations) > 0:
                 latest_rec = recommendations.iloc[-1]
@@ -14,6 +14,8 @@ class AnalysisRequest(BaseModel):
     country: Optional[str] = Field(default="United States", description="Country for stock market")
     horizon_short_days: int = Field(default=30, ge=1, le=365)
     horizon_long_days: int = Field(default=365, ge=30, le=1825)
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, le=600, description="Time budget for the whole analysis")
+    refresh: bool = Field(default=False, description="Recompute every analysis instead of reusing memoized node outputs")
 
 
 class ChatRequest(BaseModel):
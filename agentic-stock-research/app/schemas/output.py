@@ -120,3 +120,7 @@ class ResearchResponse(BaseModel):
     tickers: List[str]
     reports: List[TickerReport]
     generated_at: str
+    # Cache key -> age in seconds of market data served stale while it was refreshed
+    data_staleness: Dict[str, float] = Field(default_factory=dict)
+    # Analysis sections cut off by the request deadline; the report is built without them
+    degraded_sections: List[str] = Field(default_factory=list)
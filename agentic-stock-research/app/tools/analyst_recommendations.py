@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
-import asyncio
-import yfinance as yf
 from datetime import datetime
 import pandas as pd
 
 from app.tools.finance import fetch_info
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 import logging
 
 logger = logging.getLogger(__name__)
@@ -115,10 +115,9 @@ async def analyze_analyst_recommendations(ticker: str) -> Dict[str, Any]:
 
         recent_recommendations, recent_changes, data_freshness = [], [], {}
         try:
-            loop = asyncio.get_event_loop()
-            ticker_obj = await loop.run_in_executor(None, lambda: yf.Ticker(ticker))
-            recs_df = await loop.run_in_executor(None, lambda: getattr(ticker_obj, "recommendations", None))
-            upgrades_df = await loop.run_in_executor(None, lambda: getattr(ticker_obj, "upgrades_downgrades", None))
+            ticker_obj = get_ticker_snapshot(ticker)
+            recs_df = await run_data_io(getattr, ticker_obj, "recommendations", None)
+            upgrades_df = await run_data_io(getattr, ticker_obj, "upgrades_downgrades", None)
 
             if recs_df is not None and not recs_df.empty:
                 recent_recs = recs_df.tail(10)
@@ -12,7 +12,8 @@ from enum import Enum
 import aiohttp
 from bs4 import BeautifulSoup
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.redis_cache import get_cache_manager, ticker_tag
+from app.utils.data_provider import get_data_provider
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +121,7 @@ class _ExchangeFilingAnalyzer:
             session = await self._get_session()
             filings = await self._fetch_filings(session, ticker, days_back)
             cache = await self._ensure_cache()
-            await cache.set(cache_key, [f.__dict__ for f in filings], ttl=7200)
+            await cache.set(cache_key, [f.__dict__ for f in filings], ttl=7200, tags=[ticker_tag(ticker)])
             logger.info(f"Retrieved {len(filings)} {self.exchange} filings for {ticker}")
             return filings
         except Exception as e:
@@ -129,13 +130,21 @@ class _ExchangeFilingAnalyzer:
 
     async def _fetch_filings(self, session: aiohttp.ClientSession, ticker: str, days_back: int) -> List[IndianFiling]:
         filings = []
-        try:
+
+        async def _get() -> Optional[str]:
             await asyncio.sleep(1.0)
             async with session.get(self._listings_url()) as response:
                 if response.status != 200:
                     logger.warning(f"{self.exchange} returned {response.status} for {ticker}")
-                    return filings
-                soup = BeautifulSoup(await response.text(), "html.parser")
+                    return None
+                return await response.text()
+
+        try:
+            html = await get_data_provider().call_async(
+                "exchange_filings", ticker, {"exchange": self.exchange, "url": self._listings_url()}, _get
+            )
+            if html is not None:
+                soup = BeautifulSoup(html, "html.parser")
                 for row in soup.find_all("tr", class_="TTRow")[:20]:
                     try:
                         cells = row.find_all("td")
@@ -214,7 +223,7 @@ class IndianFilingAnalyzer:
             all_filings = self._deduplicate_filings(bse_filings + nse_filings)
             analysis = self._analyze_filings(all_filings)
             cache = await self._ensure_cache()
-            await cache.set(cache_key, analysis, ttl=14400)
+            await cache.set(cache_key, analysis, ttl=14400, tags=[ticker_tag(ticker)])
             logger.info(f"Analyzed {len(all_filings)} Indian filings for {ticker}")
             return analysis
         except Exception as e:
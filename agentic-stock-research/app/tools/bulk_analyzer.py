@@ -11,8 +11,9 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 
-from app.config import AppSettings
-from app.graph.workflow import build_research_graph
+from app.config import get_settings
+from app.graph.workflow import get_research_graph
+from app.tools.finance import fetch_multiple_info, fetch_multiple_ohlcv
 from app.utils.async_utils import AsyncProcessor
 from app.utils.context_manager import create_isolated_context, validate_ticker_isolation
 
@@ -45,8 +46,7 @@ class BulkStockAnalyzer:
 
     def __init__(self, config: Optional[BulkAnalysisConfig] = None):
         self.config = config or BulkAnalysisConfig()
-        self.settings = AppSettings()
-        self.workflow = build_research_graph(self.settings)
+        self.settings = get_settings()
         self.ticker_cache: Dict[str, Dict[str, Any]] = {}
         self.performance_metrics = {
             "total_analyses": 0,
@@ -57,6 +57,11 @@ class BulkStockAnalyzer:
             "cache_misses": 0,
         }
 
+    @property
+    def workflow(self):
+        """Shared compiled graph for the current settings (follows reload_settings())"""
+        return get_research_graph()
+
     async def analyze_bulk(self, tickers: List[str], market: str = "India") -> BulkAnalysisResult:
         """Analyze multiple stocks with optimized parallel processing."""
         start_time = time.time()
@@ -70,6 +75,17 @@ class BulkStockAnalyzer:
 
         successful_analyses, failed_analyses = [], []
 
+        # Prime the OHLCV and info caches up front: cached entries are read with
+        # one MGET per chunk, OHLCV misses are batched into multi-ticker downloads,
+        # and each per-ticker graph run then hits the cache
+        if self.config.cache_shared_data:
+            prefetched = await asyncio.gather(
+                fetch_multiple_ohlcv(tickers), fetch_multiple_info(tickers), return_exceptions=True
+            )
+            for kind, outcome in zip(("OHLCV", "info"), prefetched):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"[BULK] Batched {kind} prefetch failed, continuing per ticker: {outcome}")
+
         async with AsyncProcessor(max_workers=self.config.max_concurrent_stocks) as processor:
             results = await processor.gather_with_concurrency(
                 *[self._analyze_ticker_isolated(t, base_context, market) for t in tickers],
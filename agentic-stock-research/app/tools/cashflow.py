@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
-import asyncio
 
 import pandas as pd
-import yfinance as yf
+
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 
 def _to_float(x: Any) -> Optional[float]:
@@ -41,7 +42,7 @@ def _cash() -> Dict[str, Any]:
 async def analyze_cashflows(ticker: str) -> Dict[str, Any]:
     def _run() -> Dict[str, Any]:
         try:
-            t = yf.Ticker(ticker)
+            t = get_ticker_snapshot(ticker)
             cf: pd.DataFrame = t.cashflow
             is_df: pd.DataFrame = getattr(t, "financials", None)
         except Exception:
@@ -133,4 +134,4 @@ async def analyze_cashflows(ticker: str) -> Dict[str, Any]:
             },
         }
 
-    return await asyncio.to_thread(_run)
+    return await run_data_io(_run)
@@ -14,7 +14,9 @@ import pandas as pd
 from app.tools.fundamentals import compute_fundamentals
 from app.tools.dcf_valuation import perform_dcf_valuation
 from app.tools.governance_analysis import analyze_corporate_governance
+from app.tools.ticker_snapshot import get_ticker_snapshot
 from app.tools.valuation import resolve_financial_inputs
+from app.utils.async_utils import run_data_io
 
 
 def _f(x: Any) -> Optional[float]:
@@ -270,8 +272,6 @@ class ComprehensiveScoringEngine:
           - Scored on: DCF margin-of-safety (0-50 pts) + P/E (0-25 pts) + P/B (0-15 pts) + PEG (0-10 pts)
         """
         try:
-            import yfinance as yf
-
             f = await compute_fundamentals(ticker)
             sector   = f.get("sector", "") or ""
             industry = f.get("industry", "") or ""
@@ -297,9 +297,8 @@ class ComprehensiveScoringEngine:
                 # Score on P/B vs peer benchmark, ROE vs cost of equity, and P/E.
 
                 try:
-                    info = await asyncio.get_event_loop().run_in_executor(
-                        None, lambda: yf.Ticker(ticker).info or {}
-                    )
+                    snapshot = get_ticker_snapshot(ticker)
+                    info = await run_data_io(lambda: snapshot.info or {})
                 except Exception:
                     info = {}
 
@@ -12,8 +12,10 @@ from typing import Any, Dict, List, Optional, Tuple
 import httpx
 import yfinance as yf
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.redis_cache import get_cache_manager, ticker_tag
 from app.utils.retry import retry_async
+from app.utils.async_utils import run_data_io
+from app.utils.data_provider import get_data_provider
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,18 @@ _FALLBACK_RATES = {"USD": 1.0, "EUR": 0.85, "GBP": 0.73, "JPY": 110.0,
                    "INR": 75.0, "CNY": 6.5, "CAD": 1.25, "AUD": 1.35}
 
 
+async def _get_json(kind: str, symbol: str, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    """JSON body of a GET through the data provider, or None on a non-200 response"""
+    async def _get() -> Optional[Any]:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            r = await client.get(url, params=params)
+            return r.json() if r.status_code == 200 else None
+
+    # API keys stay out of the recorded request parameters
+    recorded = {k: v for k, v in (params or {}).items() if k.lower() != "apikey"}
+    return await get_data_provider().call_async(kind, symbol, {"url": url, **recorded}, _get)
+
+
 def _safe_float(value: Any) -> Optional[float]:
     try:
         return None if value is None or value == "None" else float(value)
@@ -89,7 +103,7 @@ class YahooFinanceSource(DataSource):
     @retry_async(max_retries=2, base_delay=0.5)
     async def fetch(self, ticker: str, data_type: str) -> Optional[Dict[str, Any]]:
         try:
-            result = await asyncio.to_thread(self._fetch_sync, ticker, data_type)
+            result = await run_data_io(self._fetch_sync, ticker, data_type)
             self.update_stats(True)
             return result
         except Exception as e:
@@ -98,7 +112,8 @@ class YahooFinanceSource(DataSource):
             return None
 
     def _fetch_sync(self, ticker: str, data_type: str) -> Optional[Dict[str, Any]]:
-        info = yf.Ticker(ticker).info or {}
+        # Same archive entry as YahooFinanceClient.get_info
+        info = get_data_provider().call_sync("info", ticker, {}, lambda: yf.Ticker(ticker).info) or {}
         ts = datetime.utcnow().isoformat()
         if data_type == "fundamentals":
             return {"pe_ratio": info.get("trailingPE"), "pb_ratio": info.get("priceToBook"),
@@ -145,34 +160,30 @@ class AlphaVantageSource(DataSource):
             return None
 
     async def _fetch_fundamentals(self, ticker: str) -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(self.base_url, params={"function": "OVERVIEW", "symbol": ticker, "apikey": self.api_key})
-            if r.status_code == 200:
-                data = r.json()
-                if "Symbol" in data:
-                    self.update_stats(True)
-                    return {"pe_ratio": _safe_float(data.get("PERatio")), "pb_ratio": _safe_float(data.get("PriceToBookRatio")),
-                            "market_cap": _safe_float(data.get("MarketCapitalization")), "revenue": _safe_float(data.get("RevenueTTM")),
-                            "earnings": _safe_float(data.get("EBITDA")), "roe": _safe_float(data.get("ReturnOnEquityTTM")),
-                            "profit_margin": _safe_float(data.get("ProfitMargin")), "operating_margin": _safe_float(data.get("OperatingMarginTTM")),
-                            "dividend_yield": _safe_float(data.get("DividendYield")), "beta": _safe_float(data.get("Beta")),
-                            "source": self.name, "timestamp": datetime.utcnow().isoformat()}
+        data = await _get_json("alphavantage", ticker, self.base_url,
+                               {"function": "OVERVIEW", "symbol": ticker, "apikey": self.api_key})
+        if data and "Symbol" in data:
+            self.update_stats(True)
+            return {"pe_ratio": _safe_float(data.get("PERatio")), "pb_ratio": _safe_float(data.get("PriceToBookRatio")),
+                    "market_cap": _safe_float(data.get("MarketCapitalization")), "revenue": _safe_float(data.get("RevenueTTM")),
+                    "earnings": _safe_float(data.get("EBITDA")), "roe": _safe_float(data.get("ReturnOnEquityTTM")),
+                    "profit_margin": _safe_float(data.get("ProfitMargin")), "operating_margin": _safe_float(data.get("OperatingMarginTTM")),
+                    "dividend_yield": _safe_float(data.get("DividendYield")), "beta": _safe_float(data.get("Beta")),
+                    "source": self.name, "timestamp": datetime.utcnow().isoformat()}
         self.update_stats(False)
         return None
 
     async def _fetch_price(self, ticker: str) -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(self.base_url, params={"function": "GLOBAL_QUOTE", "symbol": ticker, "apikey": self.api_key})
-            if r.status_code == 200:
-                data = r.json()
-                if "Global Quote" in data:
-                    q = data["Global Quote"]
-                    self.update_stats(True)
-                    return {"current_price": _safe_float(q.get("05. price")), "previous_close": _safe_float(q.get("08. previous close")),
-                            "day_high": _safe_float(q.get("03. high")), "day_low": _safe_float(q.get("04. low")),
-                            "volume": _safe_float(q.get("06. volume")), "change": _safe_float(q.get("09. change")),
-                            "change_percent": q.get("10. change percent", "").replace("%", ""),
-                            "source": self.name, "timestamp": datetime.utcnow().isoformat()}
+        data = await _get_json("alphavantage", ticker, self.base_url,
+                               {"function": "GLOBAL_QUOTE", "symbol": ticker, "apikey": self.api_key})
+        if data and "Global Quote" in data:
+            q = data["Global Quote"]
+            self.update_stats(True)
+            return {"current_price": _safe_float(q.get("05. price")), "previous_close": _safe_float(q.get("08. previous close")),
+                    "day_high": _safe_float(q.get("03. high")), "day_low": _safe_float(q.get("04. low")),
+                    "volume": _safe_float(q.get("06. volume")), "change": _safe_float(q.get("09. change")),
+                    "change_percent": q.get("10. change percent", "").replace("%", ""),
+                    "source": self.name, "timestamp": datetime.utcnow().isoformat()}
         self.update_stats(False)
         return None
 
@@ -198,31 +209,25 @@ class PolygonIOSource(DataSource):
             return None
 
     async def _fetch_price(self, ticker: str) -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(f"{self.base_url}/v2/last/trade/{ticker}", params={"apiKey": self.api_key})
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("status") == "OK" and "results" in data:
-                    t = data["results"]
-                    self.update_stats(True)
-                    return {"current_price": t.get("p"), "volume": t.get("s"),
-                            "timestamp_exchange": t.get("t"), "source": self.name,
-                            "timestamp": datetime.utcnow().isoformat()}
+        data = await _get_json("polygon", ticker, f"{self.base_url}/v2/last/trade/{ticker}", {"apiKey": self.api_key})
+        if data and data.get("status") == "OK" and "results" in data:
+            t = data["results"]
+            self.update_stats(True)
+            return {"current_price": t.get("p"), "volume": t.get("s"),
+                    "timestamp_exchange": t.get("t"), "source": self.name,
+                    "timestamp": datetime.utcnow().isoformat()}
         self.update_stats(False)
         return None
 
     async def _fetch_fundamentals(self, ticker: str) -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(f"{self.base_url}/v3/reference/tickers/{ticker}", params={"apiKey": self.api_key})
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("status") == "OK" and "results" in data:
-                    c = data["results"]
-                    self.update_stats(True)
-                    return {"market_cap": c.get("market_cap"), "shares_outstanding": c.get("share_class_shares_outstanding"),
-                            "sic_description": c.get("sic_description"), "ticker": c.get("ticker"),
-                            "name": c.get("name"), "primary_exchange": c.get("primary_exchange"),
-                            "type": c.get("type"), "source": self.name, "timestamp": datetime.utcnow().isoformat()}
+        data = await _get_json("polygon", ticker, f"{self.base_url}/v3/reference/tickers/{ticker}", {"apiKey": self.api_key})
+        if data and data.get("status") == "OK" and "results" in data:
+            c = data["results"]
+            self.update_stats(True)
+            return {"market_cap": c.get("market_cap"), "shares_outstanding": c.get("share_class_shares_outstanding"),
+                    "sic_description": c.get("sic_description"), "ticker": c.get("ticker"),
+                    "name": c.get("name"), "primary_exchange": c.get("primary_exchange"),
+                    "type": c.get("type"), "source": self.name, "timestamp": datetime.utcnow().isoformat()}
         self.update_stats(False)
         return None
 
@@ -272,7 +277,7 @@ class DataFederation:
 
         if use_cache:
             ttl = 900 if data_type == "price" else 3600
-            await (await get_cache_manager()).set(cache_key, reconciled, ttl)
+            await (await get_cache_manager()).set(cache_key, reconciled, ttl, tags=[ticker_tag(ticker)])
 
         return reconciled
 
@@ -319,12 +324,12 @@ class CurrencyConverter:
         if self.last_update and datetime.utcnow() - self.last_update < self.update_interval and self.rates_cache:
             return self.rates_cache
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                r = await client.get(f"https://api.exchangerate-api.com/v4/latest/{self.base_currency}")
-                if r.status_code == 200:
-                    self.rates_cache = r.json().get("rates", {})
-                    self.last_update = datetime.utcnow()
-                    return self.rates_cache
+            data = await _get_json("fx_rates", self.base_currency,
+                                   f"https://api.exchangerate-api.com/v4/latest/{self.base_currency}")
+            if data is not None:
+                self.rates_cache = data.get("rates", {})
+                self.last_update = datetime.utcnow()
+                return self.rates_cache
         except Exception as e:
             logger.error(f"Failed to fetch exchange rates: {e}")
         return _FALLBACK_RATES.copy()
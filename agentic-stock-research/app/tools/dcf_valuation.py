@@ -5,15 +5,14 @@ FCFF model with scenario analysis, sensitivity testing, and country/sector-speci
 
 from __future__ import annotations
 
-import asyncio
 import logging
 from dataclasses import dataclass, replace
 from typing import Any, Dict, List, Optional
 import pandas as pd
-import yfinance as yf
 
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 from app.utils.validation import DataValidator
-from app.utils.rate_limiter import get_yahoo_client
 
 logger = logging.getLogger(__name__)
 
@@ -147,23 +146,14 @@ class DCFValuationEngine:
 
     async def _fetch_company_data(self, ticker: str) -> Optional[Dict[str, Any]]:
         try:
-            yahoo_client = get_yahoo_client()
-            info = await yahoo_client.get_info(ticker)
-
-            async def _fetch_financials():
-                loop = asyncio.get_event_loop()
-                t = await loop.run_in_executor(None, lambda: yf.Ticker(ticker))
-                return {
-                    "financials": await loop.run_in_executor(None, lambda: t.financials),
-                    "balance_sheet": await loop.run_in_executor(None, lambda: t.balance_sheet),
-                    "cashflow": await loop.run_in_executor(None, lambda: t.cashflow)
-                }
-
-            await yahoo_client.client.rate_limiter.acquire()
-            try:
-                financials = await _fetch_financials()
-            finally:
-                yahoo_client.client.rate_limiter.release()
+            t = get_ticker_snapshot(ticker)
+            # Snapshot info is a private copy, so the FCF override below is safe
+            info = await run_data_io(lambda: t.info)
+            financials = {
+                "financials": await run_data_io(lambda: t.financials),
+                "balance_sheet": await run_data_io(lambda: t.balance_sheet),
+                "cashflow": await run_data_io(lambda: t.cashflow)
+            }
 
             if not info.get("marketCap"):
                 logger.warning(f"DCF: Missing market cap for {ticker}")
@@ -11,9 +11,10 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
+from app.tools.ticker_snapshot import get_ticker_snapshot
 from app.utils.validation import DataValidator
+from app.utils.async_utils import run_data_io
 from app.utils.rate_limiter import get_yahoo_client
 
 logger = logging.getLogger(__name__)
@@ -441,8 +442,8 @@ class DeepFinancialAnalyzer:
             return self._empty()
 
     async def _fetch_statements(self, ticker: str) -> Optional[Dict[str, pd.DataFrame]]:
-        try:
-            t = yf.Ticker(ticker)
+        def _fetch() -> Optional[Dict[str, pd.DataFrame]]:
+            t = get_ticker_snapshot(ticker)
             fs = t.financials
             bs = t.balance_sheet
             cf = t.cashflow
@@ -454,6 +455,9 @@ class DeepFinancialAnalyzer:
                 "quarters_balance": t.quarterly_balance_sheet,
                 "quarters_cashflow": t.quarterly_cashflow
             }
+
+        try:
+            return await run_data_io(_fetch)
         except Exception as e:
             logger.error(f"Error fetching financial statements for {ticker}: {e}")
             return None
@@ -14,15 +14,16 @@ from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import aiohttp
 import yfinance as yf
 from bs4 import BeautifulSoup
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.redis_cache import get_cache_manager, ticker_tag
 from app.config import get_settings
 from app.tools.llm_orchestrator import get_llm_orchestrator, TaskType, TaskComplexity
+from app.utils.data_provider import get_data_provider
 from app.utils.session_manager import get_http_client_manager
 
 try:
@@ -189,6 +190,30 @@ async def _get_or_init_cache(source: Any) -> Any:
     return source.cache
 
 
+async def _fetch_upstream(
+    kind: str, ticker: str, get_session: Callable[[], Awaitable[aiohttp.ClientSession]], url: str,
+    params: Optional[Dict[str, Any]] = None, as_json: bool = False, delay: float = 0.0,
+    record_params: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, Any]:
+    """
+    ``(status, body)`` of a GET through the data provider; the body is None
+    unless the status is 200. ``record_params`` replace ``params`` in
+    recordings when those hold dates relative to today.
+    """
+    async def _get() -> Tuple[int, Any]:
+        if delay:
+            await asyncio.sleep(delay)
+        session = await get_session()
+        async with session.get(url, params=params) as resp:
+            if resp.status != 200:
+                return resp.status, None
+            return resp.status, await resp.json() if as_json else await resp.text()
+
+    # API keys stay out of the recorded request parameters
+    recorded = {k: v for k, v in (record_params or params or {}).items() if k.lower() != "apikey"}
+    return await get_data_provider().call_async(kind, ticker, {"url": url, **recorded}, _get)
+
+
 async def _cached_transcripts(cache: Any, cache_key: str) -> Optional[List[EarningsCall]]:
     result = await cache.get(cache_key)
     if result is not None:
@@ -196,9 +221,9 @@ async def _cached_transcripts(cache: Any, cache_key: str) -> Optional[List[Earni
     return None
 
 
-async def _cache_transcripts(cache: Any, cache_key: str, transcripts: List[EarningsCall],
+async def _cache_transcripts(cache: Any, cache_key: str, ticker: str, transcripts: List[EarningsCall],
                               ttl: int = 2592000) -> None:
-    await cache.set(cache_key, [c.__dict__ for c in transcripts], ttl=ttl)
+    await cache.set(cache_key, [c.__dict__ for c in transcripts], ttl=ttl, tags=[ticker_tag(ticker)])
 
 
 def _sentiment_score(text: str) -> float:
@@ -329,28 +354,29 @@ class SeekingAlphaSource(TranscriptSource):
         if cached := await _cached_transcripts(cache, cache_key):
             return cached
         try:
-            session = await self._get_session()
-            await asyncio.sleep(1.0)
-            async with session.get(f"{self.base_url}/symbol/{ticker}/earnings/transcripts") as resp:
-                if resp.status != 200:
-                    return []
-                soup = BeautifulSoup(await resp.text(), 'html.parser')
-                transcripts = []
-                for link in soup.find_all('a', href=re.compile(r'/article/\d+.*transcript'))[:10]:
-                    title = link.get_text(strip=True)
-                    call_date = _date_from_title(title)
-                    if call_date and (datetime.now() - call_date).days <= days_back:
-                        transcripts.append(EarningsCall(
-                            ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
-                            quarter=_quarter_from_title(title), fiscal_year=call_date.year,
-                            transcript_url=f"{self.base_url}{link['href']}",
-                            call_id=link['href'].split('/')[-1]
-                        ))
-                await _cache_transcripts(cache, cache_key, transcripts)
-                return transcripts
+            _, html = await _fetch_upstream(
+                "transcripts_seeking_alpha", ticker, self._get_session,
+                f"{self.base_url}/symbol/{ticker}/earnings/transcripts", delay=1.0
+            )
+            if html is None:
+                return []
+            soup = BeautifulSoup(html, 'html.parser')
+            transcripts = []
+            for link in soup.find_all('a', href=re.compile(r'/article/\d+.*transcript'))[:10]:
+                title = link.get_text(strip=True)
+                call_date = _date_from_title(title)
+                if call_date and (datetime.now() - call_date).days <= days_back:
+                    transcripts.append(EarningsCall(
+                        ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
+                        quarter=_quarter_from_title(title), fiscal_year=call_date.year,
+                        transcript_url=f"{self.base_url}{link['href']}",
+                        call_id=link['href'].split('/')[-1]
+                    ))
+            await _cache_transcripts(cache, cache_key, ticker, transcripts)
+            return transcripts
         except Exception as e:
             logger.error(f"SeekingAlpha fetch error for {ticker}: {e}")
-            await cache.set(cache_key, [], ttl=604800)
+            await cache.set(cache_key, [], ttl=604800, tags=[ticker_tag(ticker)])
             return []
 
     def get_source_name(self) -> str:
@@ -393,41 +419,40 @@ class APINinjaTranscriptSource(TranscriptSource):
             return [EarningsCall(**c) for c in cached]
 
         try:
-            session = await self._get_session()
             api_ticker = ticker.replace('.NS', '').replace('.BO', '')
             logger.warning(f"MAKING API CALL to API Ninja for {ticker}")
-            await asyncio.sleep(1.0)
-            async with session.get(f"{self.base_url}/earningstranscript",
-                                   params={"ticker": api_ticker, "limit": 5}) as resp:
-                if resp.status in (401, 403, 429) or resp.status != 200:
-                    await cache.set(cache_key, [], ttl=604800)
-                    return []
-                data = await resp.json()
-                if not data or not isinstance(data, dict):
-                    await cache.set(cache_key, [], ttl=2592000)
-                    return []
-
-                call_date = _parse_date(data.get("date", ""))
-                if not call_date:
-                    return []
-                content = data.get("transcript", "")
-                if not content or len(content.strip()) < 100:
-                    return []
-                q, yr = data.get("quarter", ""), data.get("year", "")
-                quarter = f"Q{q} {yr}" if q and yr else _quarter_from_month(call_date.month, call_date.year)
-                transcripts = [EarningsCall(
-                    ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
-                    quarter=quarter, fiscal_year=call_date.year, transcript_url="",
-                    transcript_text=content, duration_minutes=60
-                )]
-                await _cache_transcripts(cache, cache_key, transcripts)
-                return transcripts
+            status, data = await _fetch_upstream(
+                "transcripts_api_ninja", ticker, self._get_session, f"{self.base_url}/earningstranscript",
+                params={"ticker": api_ticker, "limit": 5}, as_json=True, delay=1.0
+            )
+            if status != 200:
+                await cache.set(cache_key, [], ttl=604800, tags=[ticker_tag(ticker)])
+                return []
+            if not data or not isinstance(data, dict):
+                await cache.set(cache_key, [], ttl=2592000, tags=[ticker_tag(ticker)])
+                return []
+
+            call_date = _parse_date(data.get("date", ""))
+            if not call_date:
+                return []
+            content = data.get("transcript", "")
+            if not content or len(content.strip()) < 100:
+                return []
+            q, yr = data.get("quarter", ""), data.get("year", "")
+            quarter = f"Q{q} {yr}" if q and yr else _quarter_from_month(call_date.month, call_date.year)
+            transcripts = [EarningsCall(
+                ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
+                quarter=quarter, fiscal_year=call_date.year, transcript_url="",
+                transcript_text=content, duration_minutes=60
+            )]
+            await _cache_transcripts(cache, cache_key, ticker, transcripts)
+            return transcripts
         except asyncio.TimeoutError:
-            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800)
+            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800, tags=[ticker_tag(ticker)])
             return []
         except Exception as e:
             logger.error(f"API Ninja error for {ticker}: {e}")
-            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800)
+            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800, tags=[ticker_tag(ticker)])
             return []
 
     def get_source_name(self) -> str:
@@ -468,7 +493,7 @@ CFO: We expect continued growth in the mid-teens range, consistent with long-ter
                 transcript_url=f"https://mock-transcripts.com/{ticker}/{quarter}",
                 transcript_text=content, participants=["CEO", "CFO", "Analysts"], duration_minutes=60
             ))
-        await _cache_transcripts(cache, cache_key, transcripts, ttl=3600)
+        await _cache_transcripts(cache, cache_key, ticker, transcripts, ttl=3600)
         return transcripts
 
     def get_source_name(self) -> str:
@@ -496,38 +521,37 @@ class FMPTranscriptSource(TranscriptSource):
             return cached
         try:
             now = datetime.now()
-            session = await self._get_session()
-            await asyncio.sleep(0.5)
             params = {"apikey": self.api_key,
                       "from": (now - timedelta(days=days_back)).strftime("%Y-%m-%d"),
                       "to": now.strftime("%Y-%m-%d")}
-            async with session.get(f"{self.base_url}/earning_call_transcript/{ticker}", params=params) as resp:
-                if resp.status != 200:
-                    return []
-                data = await resp.json()
-                if not data or not isinstance(data, list):
-                    return []
-                transcripts = []
-                for item in data:
-                    call_date = _parse_date(item.get("date", ""))
-                    if not call_date:
-                        continue
-                    content = item.get("content", "")
-                    if not content or len(content.strip()) < 100:
-                        continue
-                    quarter = item.get("quarter") or _quarter_from_month(call_date.month, call_date.year)
-                    transcripts.append(EarningsCall(
-                        ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
-                        quarter=quarter, fiscal_year=call_date.year,
-                        transcript_url=item.get("transcript_url", ""),
-                        transcript_text=content, audio_url=item.get("audio_url", ""),
-                        duration_minutes=item.get("duration_minutes", 60)
-                    ))
-                await _cache_transcripts(cache, cache_key, transcripts)
-                return transcripts
+            _, data = await _fetch_upstream(
+                "transcripts_fmp", ticker, self._get_session,
+                f"{self.base_url}/earning_call_transcript/{ticker}", params=params, as_json=True, delay=0.5,
+                record_params={"days_back": days_back}
+            )
+            if not data or not isinstance(data, list):
+                return []
+            transcripts = []
+            for item in data:
+                call_date = _parse_date(item.get("date", ""))
+                if not call_date:
+                    continue
+                content = item.get("content", "")
+                if not content or len(content.strip()) < 100:
+                    continue
+                quarter = item.get("quarter") or _quarter_from_month(call_date.month, call_date.year)
+                transcripts.append(EarningsCall(
+                    ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
+                    quarter=quarter, fiscal_year=call_date.year,
+                    transcript_url=item.get("transcript_url", ""),
+                    transcript_text=content, audio_url=item.get("audio_url", ""),
+                    duration_minutes=item.get("duration_minutes", 60)
+                ))
+            await _cache_transcripts(cache, cache_key, ticker, transcripts)
+            return transcripts
         except Exception as e:
             logger.error(f"FMP error for {ticker}: {e}")
-            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800)
+            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800, tags=[ticker_tag(ticker)])
             return []
 
     def get_source_name(self) -> str:
@@ -557,29 +581,30 @@ class AlphaStreetSource(TranscriptSource):
         if cached := await _cached_transcripts(cache, cache_key):
             return cached
         try:
-            session = await self._get_session()
-            async with session.get(f"{self.base_url}/earnings-calls",
-                                   params={'symbol': ticker, 'limit': 10, 'days_back': days_back}) as resp:
-                if resp.status != 200:
-                    return []
-                transcripts = []
-                for d in (await resp.json()).get('calls', []):
-                    try:
-                        call_date = datetime.fromisoformat(d['date'].replace('Z', '+00:00'))
-                        transcripts.append(EarningsCall(
-                            ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
-                            quarter=d.get('quarter', 'Unknown'), fiscal_year=call_date.year,
-                            transcript_url=d.get('transcript_url', ''), audio_url=d.get('audio_url'),
-                            transcript_text=d.get('transcript'), participants=d.get('participants', []),
-                            duration_minutes=d.get('duration_minutes'), call_id=d.get('id')
-                        ))
-                    except Exception:
-                        continue
-                await _cache_transcripts(cache, cache_key, transcripts)
-                return transcripts
+            _, data = await _fetch_upstream(
+                "transcripts_alpha_street", ticker, self._get_session, f"{self.base_url}/earnings-calls",
+                params={'symbol': ticker, 'limit': 10, 'days_back': days_back}, as_json=True
+            )
+            if data is None:
+                return []
+            transcripts = []
+            for d in data.get('calls', []):
+                try:
+                    call_date = datetime.fromisoformat(d['date'].replace('Z', '+00:00'))
+                    transcripts.append(EarningsCall(
+                        ticker=ticker, call_date=call_date, call_type=CallType.EARNINGS,
+                        quarter=d.get('quarter', 'Unknown'), fiscal_year=call_date.year,
+                        transcript_url=d.get('transcript_url', ''), audio_url=d.get('audio_url'),
+                        transcript_text=d.get('transcript'), participants=d.get('participants', []),
+                        duration_minutes=d.get('duration_minutes'), call_id=d.get('id')
+                    ))
+                except Exception:
+                    continue
+            await _cache_transcripts(cache, cache_key, ticker, transcripts)
+            return transcripts
         except Exception as e:
             logger.error(f"AlphaStreet error for {ticker}: {e}")
-            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800)
+            await (await _get_or_init_cache(self)).set(cache_key, [], ttl=604800, tags=[ticker_tag(ticker)])
             return []
 
     def get_source_name(self) -> str:
@@ -677,7 +702,7 @@ class EarningsCallAnalyzer:
             result.update({"ticker": ticker, "total_calls": len(recent),
                            "analysis_period": f"{days_back} days",
                            "sources_used": sources_used, "analysis_date": datetime.now().isoformat()})
-            await self.cache.set(cache_key, result, ttl=2592000)
+            await self.cache.set(cache_key, result, ttl=2592000, tags=[ticker_tag(ticker)])
             return result
         except Exception as e:
             logger.error(f"Error analyzing earnings calls for {ticker}: {e}")
@@ -715,16 +740,22 @@ class EarningsCallAnalyzer:
         )
 
     async def _fetch_transcript_text(self, transcript: EarningsCall) -> Optional[str]:
-        try:
+        async def _get() -> Optional[str]:
             async with aiohttp.ClientSession() as session:
                 async with session.get(transcript.transcript_url) as resp:
-                    if resp.status != 200:
-                        return None
-                    soup = BeautifulSoup(await resp.text(), 'html.parser')
-                    for sel in ['.transcript-content', '.article-content', '.transcript',
-                                '[data-testid="transcript-content"]', '.content']:
-                        if content := soup.select_one(sel):
-                            return content.get_text(separator='\n', strip=True)
+                    return await resp.text() if resp.status == 200 else None
+
+        try:
+            html = await get_data_provider().call_async(
+                "transcript_document", transcript.ticker, {"url": transcript.transcript_url}, _get
+            )
+            if html is None:
+                return None
+            soup = BeautifulSoup(html, 'html.parser')
+            for sel in ['.transcript-content', '.article-content', '.transcript',
+                        '[data-testid="transcript-content"]', '.content']:
+                if content := soup.select_one(sel):
+                    return content.get_text(separator='\n', strip=True)
         except Exception as e:
             logger.warning(f"Error fetching transcript text: {e}")
         return None
@@ -1,17 +1,132 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import asyncio
 import logging
 
 import pandas as pd
 import yfinance as yf
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.access_tracker import get_access_tracker
+from app.cache.history_store import INCREMENTAL_INTERVALS, get_history_store
+from app.cache.price_store import get_price_store
+from app.cache.optimized_cache import get_optimized_cache_manager
 from app.utils.validation import DataValidator, ValidationError
 from app.utils.rate_limiter import get_yahoo_client, get_bulk_processor
 
 logger = logging.getLogger(__name__)
 
+# Single-flight table: concurrent cache misses for the same
+# (kind, ticker, period, interval) await one upstream fetch instead of each
+# calling Yahoo. Entries live only while the fetch is in flight.
+FlightKey = Tuple[str, str, str, str]
+_inflight: Dict[FlightKey, asyncio.Task] = {}
+# Totals since startup, plus counters for the most recently used keys only:
+# a long-running server sees an unbounded number of (ticker, period) keys
+_coalescing_totals: Dict[str, int] = {"upstream_fetches": 0, "coalesced": 0}
+_coalescing_stats: "OrderedDict[FlightKey, Dict[str, int]]" = OrderedDict()
+COALESCING_STATS_MAX_KEYS = 512
+# Keys reported in get_coalescing_stats()["per_key"]
+COALESCING_STATS_TOP_N = 20
+
+
+def _count_flight(key: FlightKey, counter: str) -> None:
+    _coalescing_totals[counter] += 1
+    stats = _coalescing_stats.get(key)
+    if stats is None:
+        stats = _coalescing_stats[key] = {"upstream_fetches": 0, "coalesced": 0}
+        if len(_coalescing_stats) > COALESCING_STATS_MAX_KEYS:
+            _coalescing_stats.popitem(last=False)
+    else:
+        _coalescing_stats.move_to_end(key)
+    stats[counter] += 1
+
+
+async def _single_flight(key: FlightKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``fetch`` once per key; concurrent callers share its result."""
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(key)
+    if task is not None and not task.done() and task.get_loop() is loop:
+        _count_flight(key, "coalesced")
+        logger.debug(f"Coalesced {key[0]} request for {key[1]} onto in-flight fetch")
+    else:
+        _count_flight(key, "upstream_fetches")
+        task = loop.create_task(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    # Shield so one cancelled caller does not abort the fetch for everyone else
+    return await asyncio.shield(task)
+
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    """Upstream fetch and coalesced-caller totals for fetch_info / fetch_ohlcv, with the busiest keys."""
+    busiest = sorted(
+        _coalescing_stats.items(), key=lambda item: item[1]["upstream_fetches"] + item[1]["coalesced"], reverse=True
+    )[:COALESCING_STATS_TOP_N]
+    per_key = {":".join(k for k in key if k): dict(v) for key, v in busiest}
+    upstream = _coalescing_totals["upstream_fetches"]
+    coalesced = _coalescing_totals["coalesced"]
+    return {
+        "in_flight": len(_inflight),
+        "upstream_fetches": upstream,
+        "coalesced_requests": coalesced,
+        "coalescing_rate": round(coalesced / (upstream + coalesced) * 100, 2) if (upstream + coalesced) else 0,
+        "tracked_keys": len(_coalescing_stats),
+        "per_key": per_key,
+    }
+
+
+# Symbols per multi-ticker yf.download call in fetch_multiple_ohlcv
+OHLCV_DOWNLOAD_BATCH_SIZE = 50
+
+# Stale-while-revalidate TTLs: entries are stored for the hard TTL but are
+# only fresh for the soft TTL. In between, readers get the cached value at once
+# and a single background refresh replaces it; past the hard TTL reads block.
+OHLCV_SOFT_TTL = 900
+OHLCV_HARD_TTL = 4 * 3600
+INFO_SOFT_TTL = 3600
+INFO_HARD_TTL = 24 * 3600
+
+_VALID_PERIODS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
+_VALID_INTERVALS = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
+
+
+def _normalize_period_interval(period: str, interval: str) -> Tuple[str, str]:
+    if period not in _VALID_PERIODS:
+        logger.warning(f"Invalid period {period}, defaulting to 1y")
+        period = "1y"
+    if interval not in _VALID_INTERVALS:
+        logger.warning(f"Invalid interval {interval}, defaulting to 1d")
+        interval = "1d"
+    return period, interval
+
+
+def _validate_ohlcv(ticker: str, data: pd.DataFrame) -> pd.DataFrame:
+    """Check required columns and value ranges; returns unvalidated data on failure"""
+    try:
+        if not data.empty:
+            # Validate required columns exist
+            required_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
+            if hasattr(data.columns, 'get_level_values'):  # MultiIndex
+                # Extract base column names from MultiIndex
+                base_cols = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+                missing = [col for col in required_cols if col not in base_cols]
+            else:
+                missing = [col for col in required_cols if col not in data.columns]
+            
+            if missing:
+                logger.warning(f"OHLCV data missing columns {missing} for {ticker}")
+            
+            # Validate data ranges
+            data = DataValidator.validate_dataframe(data, [])
+            
+        logger.debug(f"Validated OHLCV data for {ticker}: {len(data)} rows")
+    except Exception as e:
+        logger.warning(f"OHLCV data validation failed for {ticker}: {e}")
+        # Continue with unvalidated data rather than fail completely
+    return data
+
 
 async def fetch_ohlcv(ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
     """
@@ -20,27 +135,52 @@ async def fetch_ohlcv(ticker: str, period: str = "1y", interval: str = "1d") ->
     # Validate inputs
     try:
         ticker = DataValidator.validate_ticker(ticker)
-        if period not in ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']:
-            logger.warning(f"Invalid period {period}, defaulting to 1y")
-            period = "1y"
-        if interval not in ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']:
-            logger.warning(f"Invalid interval {interval}, defaulting to 1d")
-            interval = "1d"
+        period, interval = _normalize_period_interval(period, interval)
     except ValidationError as e:
         logger.error(f"Ticker validation failed: {e}")
         return pd.DataFrame()  # Return empty DataFrame for invalid tickers
     
-    # Check cache first
-    cache = await get_cache_manager()
-    cached_data = await cache.get_ohlcv(ticker, period, interval)
+    def refresh() -> Awaitable[pd.DataFrame]:
+        return refresh_ohlcv(ticker, period, interval)
+
+    # Check cache first (stale entries are served while refresh() runs in the background)
+    cache = await get_optimized_cache_manager()
+    cached_data = await cache.get_stale_while_revalidate(
+        cache.ohlcv_key(ticker, period, interval), refresh, OHLCV_SOFT_TTL, OHLCV_HARD_TTL
+    )
+    get_access_tracker().record(ticker, ohlcv_data_type(period, interval), hit=cached_data is not None)
     if cached_data is not None:
         logger.debug(f"Cache hit for OHLCV data: {ticker} (period={period}, interval={interval})")
         return cached_data
 
+    return await refresh()
+
+
+def ohlcv_data_type(period: str, interval: str) -> str:
+    """Access-tracker data type for an OHLCV request"""
+    return f"ohlcv:{period}:{interval}"
+
+
+def refresh_ohlcv(ticker: str, period: str = "1y", interval: str = "1d") -> Awaitable[pd.DataFrame]:
+    """Fetch OHLCV upstream and rewrite the cache entry, sharing any in-flight fetch"""
+    return _single_flight(
+        ("ohlcv", ticker, period, interval),
+        lambda: _fetch_ohlcv_upstream(ticker, period, interval),
+    )
+
+
+async def _fetch_ohlcv_upstream(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    """Download, validate and cache OHLCV data after a cache miss"""
+    cache = await get_optimized_cache_manager()
     try:
         # Use rate-limited Yahoo Finance client
-        yahoo_client = get_yahoo_client()
-        data = await yahoo_client.download(ticker, period, interval)
+        # Daily-and-longer bars come from the incremental history store, which
+        # only downloads the bars added since its last refresh
+        if interval in INCREMENTAL_INTERVALS:
+            data = await get_history_store().get(ticker, period, interval)
+        else:
+            yahoo_client = get_yahoo_client()
+            data = await yahoo_client.download(ticker, period, interval)
         
         if data.empty:
             logger.warning(f"No OHLCV data returned for ticker {ticker}")
@@ -49,30 +189,10 @@ async def fetch_ohlcv(ticker: str, period: str = "1y", interval: str = "1d") ->
         logger.debug(f"Successfully fetched {len(data)} rows of OHLCV data for {ticker}")
         
         # Validate the returned data
-        try:
-            if not data.empty:
-                # Validate required columns exist
-                required_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-                if hasattr(data.columns, 'get_level_values'):  # MultiIndex
-                    # Extract base column names from MultiIndex
-                    base_cols = [col[0] if isinstance(col, tuple) else col for col in data.columns]
-                    missing = [col for col in required_cols if col not in base_cols]
-                else:
-                    missing = [col for col in required_cols if col not in data.columns]
-                
-                if missing:
-                    logger.warning(f"OHLCV data missing columns {missing} for {ticker}")
-                
-                # Validate data ranges
-                data = DataValidator.validate_dataframe(data, [])
-                
-            logger.debug(f"Validated OHLCV data for {ticker}: {len(data)} rows")
-        except Exception as e:
-            logger.warning(f"OHLCV data validation failed for {ticker}: {e}")
-            # Continue with unvalidated data rather than fail completely
+        data = _validate_ohlcv(ticker, data)
         
-        # Cache the result (15 minutes for OHLCV data)
-        await cache.set_ohlcv(ticker, data, period, interval, ttl=900)
+        # Cache the result (fresh for 15 minutes, served stale for up to 4 hours)
+        await cache.set_ohlcv(ticker, data, period, interval, ttl=OHLCV_HARD_TTL)
         
         return data
         
@@ -85,13 +205,30 @@ async def fetch_info(ticker: str) -> Dict[str, Any]:
     """
     Fetch company info data with caching and intelligent rate limiting
     """
-    # Check cache first
-    cache = await get_cache_manager()
-    cached_data = await cache.get_company_info(ticker)
+    def refresh() -> Awaitable[Dict[str, Any]]:
+        return refresh_info(ticker)
+
+    # Check cache first (stale entries are served while refresh() runs in the background)
+    cache = await get_optimized_cache_manager()
+    cached_data = await cache.get_stale_while_revalidate(
+        cache.info_key(ticker), refresh, INFO_SOFT_TTL, INFO_HARD_TTL
+    )
+    get_access_tracker().record(ticker, "info", hit=cached_data is not None)
     if cached_data is not None:
         logger.debug(f"Cache hit for company info: {ticker}")
         return cached_data
 
+    return await refresh()
+
+
+def refresh_info(ticker: str) -> Awaitable[Dict[str, Any]]:
+    """Fetch company info upstream and rewrite the cache entry, sharing any in-flight fetch"""
+    return _single_flight(("info", ticker, "", ""), lambda: _fetch_info_upstream(ticker))
+
+
+async def _fetch_info_upstream(ticker: str) -> Dict[str, Any]:
+    """Fetch and cache company info after a cache miss"""
+    cache = await get_optimized_cache_manager()
     try:
         # Use rate-limited Yahoo Finance client
         yahoo_client = get_yahoo_client()
@@ -103,8 +240,8 @@ async def fetch_info(ticker: str) -> Dict[str, Any]:
         
         logger.debug(f"Successfully fetched company info for {ticker}")
         
-        # Cache the result (1 hour for company info)
-        await cache.set_company_info(ticker, data, ttl=3600)
+        # Cache the result (fresh for 1 hour, served stale for up to a day)
+        await cache.set_company_info(ticker, data, ttl=INFO_HARD_TTL)
         
         return data
         
@@ -113,10 +250,21 @@ async def fetch_info(ticker: str) -> Dict[str, Any]:
         return {}
 
 
-async def fetch_multiple_ohlcv(tickers: list[str], period: str = "1y", interval: str = "1d") -> Dict[str, pd.DataFrame]:
+async def fetch_multiple_ohlcv(
+    tickers: list[str], period: str = "1y", interval: str = "1d", batched: bool = True
+) -> Dict[str, pd.DataFrame]:
     """
-    Fetch OHLCV data for multiple tickers with controlled concurrency
+    Fetch OHLCV data for multiple tickers.
+
+    By default cache misses are grouped into multi-ticker downloads of
+    OHLCV_DOWNLOAD_BATCH_SIZE symbols, each taking one rate-limiter slot, and
+    every returned frame is written to the cache. Symbols a batch could not
+    resolve fall back to fetch_ohlcv (which tries .NS / raw / .BO variants).
+    Pass batched=False for the legacy one-download-per-ticker path.
     """
+    if batched:
+        return await _fetch_multiple_ohlcv_batched(tickers, period, interval)
+
     bulk_processor = get_bulk_processor()
     
     async def fetch_single(ticker: str) -> tuple[str, pd.DataFrame]:
@@ -137,20 +285,90 @@ async def fetch_multiple_ohlcv(tickers: list[str], period: str = "1y", interval:
     return data_dict
 
 
+async def _fetch_multiple_ohlcv_batched(
+    tickers: list[str], period: str, interval: str
+) -> Dict[str, pd.DataFrame]:
+    period, interval = _normalize_period_interval(period, interval)
+    cache = await get_optimized_cache_manager()
+
+    data_dict: Dict[str, pd.DataFrame] = {}
+    valid: list[str] = []
+    for raw_ticker in dict.fromkeys(tickers):
+        try:
+            valid.append(DataValidator.validate_ticker(raw_ticker))
+        except ValidationError as e:
+            logger.error(f"Ticker validation failed: {e}")
+            data_dict[raw_ticker] = pd.DataFrame()
+
+    # One MGET for the whole list instead of a round-trip per ticker
+    # Stale entries count as misses here so they are refreshed in the same batches
+    data_dict.update(await cache.get_many_ohlcv(valid, period, interval, OHLCV_SOFT_TTL, OHLCV_HARD_TTL))
+    misses = [t for t in valid if t not in data_dict]
+    tracker, data_type = get_access_tracker(), ohlcv_data_type(period, interval)
+    for ticker in valid:
+        tracker.record(ticker, data_type, hit=ticker in data_dict)
+
+    if not misses:
+        return data_dict
+
+    yahoo_client = get_yahoo_client()
+    price_store = get_price_store()
+    unresolved: list[str] = []
+    for i in range(0, len(misses), OHLCV_DOWNLOAD_BATCH_SIZE):
+        batch = misses[i:i + OHLCV_DOWNLOAD_BATCH_SIZE]
+        frames = await yahoo_client.download_many(batch, period, interval)
+        if frames and price_store.enabled and interval in INCREMENTAL_INTERVALS:
+            await asyncio.to_thread(price_store.ingest, frames, interval)
+        fetched: Dict[str, pd.DataFrame] = {}
+        for ticker in batch:
+            frame = frames.get(ticker)
+            if frame is None or frame.empty:
+                unresolved.append(ticker)
+                continue
+            fetched[ticker] = _validate_ohlcv(ticker, frame)
+        await cache.set_many_ohlcv(fetched, period, interval, ttl=OHLCV_HARD_TTL)
+        data_dict.update(fetched)
+
+    logger.info(
+        f"Batched OHLCV fetch: {len(misses) - len(unresolved)}/{len(misses)} cache misses "
+        f"resolved in {(len(misses) + OHLCV_DOWNLOAD_BATCH_SIZE - 1) // OHLCV_DOWNLOAD_BATCH_SIZE} batch(es)"
+    )
+
+    # Per-symbol fallback for anything the batch could not resolve (e.g. .NS -> .BO)
+    if unresolved:
+        results = await asyncio.gather(
+            *[fetch_ohlcv(t, period, interval) for t in unresolved], return_exceptions=True
+        )
+        for ticker, result in zip(unresolved, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to fetch data for ticker {ticker}: {result}")
+                continue
+            data_dict[ticker] = result
+
+    return data_dict
+
+
 async def fetch_multiple_info(tickers: list[str]) -> Dict[str, Dict[str, Any]]:
     """
     Fetch company info for multiple tickers with controlled concurrency
+
+    Cached entries are read with one MGET; only the misses are fetched.
     """
+    cache = await get_optimized_cache_manager()
+    data_dict: Dict[str, Dict[str, Any]] = await cache.get_many_company_info(tickers)
+    misses = [t for t in dict.fromkeys(tickers) if t not in data_dict]
+    if not misses:
+        return data_dict
+
     bulk_processor = get_bulk_processor()
     
     async def fetch_single(ticker: str) -> tuple[str, Dict[str, Any]]:
         data = await fetch_info(ticker)
         return ticker, data
     
-    results = await bulk_processor.process_batch(tickers, fetch_single)
+    results = await bulk_processor.process_batch(misses, fetch_single)
     
     # Convert results to dictionary
-    data_dict = {}
     for result in results:
         if isinstance(result, Exception):
             logger.error(f"Failed to fetch info for ticker: {result}")
@@ -5,14 +5,14 @@ with automatic fallback to financial statements for missing values.
 """
 from __future__ import annotations
 
-import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
-import yfinance as yf
 
 from app.tools.finance import fetch_info
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 from app.utils.validation import DataValidator
 
 logger = logging.getLogger(__name__)
@@ -59,7 +59,7 @@ def _statements_backfill(ticker: str, market_cap: Optional[float]) -> Dict[str,
     directly from yfinance financial statements when info fields are missing.
     """
     try:
-        t = yf.Ticker(ticker)
+        t = get_ticker_snapshot(ticker)
         info = t.info or {}
         is_df = getattr(t, "financials", None)
         bs_df = getattr(t, "balance_sheet", None)
@@ -229,7 +229,7 @@ async def compute_fundamentals(ticker: str) -> Dict[str, Any]:
     # --- Backfill missing derived metrics from statements ---
     missing = any(v is None for v in [roe, ebitda_margin, interest_coverage, roic, fcf_yield, debt_to_equity])
     if missing:
-        bf = await asyncio.to_thread(_statements_backfill, ticker, _safe(market_cap))
+        bf = await run_data_io(_statements_backfill, ticker, _safe(market_cap))
         roe               = roe or bf.get("roe")
         ebitda_margin     = ebitda_margin or bf.get("ebitda_margin")
         interest_coverage = interest_coverage or bf.get("interest_coverage")
@@ -4,15 +4,13 @@ Comprehensive governance scoring and red flag detection, India-focused.
 """
 from __future__ import annotations
 
-import asyncio
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-import yfinance as yf
-
-from app.utils.rate_limiter import get_yahoo_client
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 logger = logging.getLogger(__name__)
 
@@ -69,26 +67,19 @@ _T = {
 # ---------- data fetch ----------
 
 async def _fetch_governance_data(ticker: str) -> Optional[Dict[str, Any]]:
-    """Fetch info, institutional holders, and insider transactions via rate-limited client."""
+    """Fetch info, institutional holders, and insider transactions from the analysis snapshot."""
     try:
-        yahoo = get_yahoo_client()
-        info = await yahoo.get_info(ticker)
-
-        loop = asyncio.get_event_loop()
-        t = await loop.run_in_executor(None, lambda: yf.Ticker(ticker))
+        t = get_ticker_snapshot(ticker)
 
         async def _get(attr):
             try:
-                return await loop.run_in_executor(None, lambda: getattr(t, attr))
+                return await run_data_io(getattr, t, attr)
             except Exception:
                 return None
 
-        await yahoo.client.rate_limiter.acquire()
-        try:
-            institutional_holders = await _get("institutional_holders")
-            insider_transactions   = await _get("insider_transactions")
-        finally:
-            yahoo.client.rate_limiter.release()
+        info = await _get("info") or {}
+        institutional_holders = await _get("institutional_holders")
+        insider_transactions   = await _get("insider_transactions")
 
         return {"info": info,
                 "institutional_holders": institutional_holders,
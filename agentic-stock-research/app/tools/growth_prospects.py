@@ -5,14 +5,14 @@ with mean-reversion modelling across 1-year, 3-year, and 5-year horizons.
 """
 from __future__ import annotations
 
-import asyncio
 import statistics
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
-import yfinance as yf
 
 from app.tools.finance import fetch_info
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 
 # ---------- helpers ----------
@@ -97,7 +97,7 @@ def _confidence(has_ttm: bool, has_3y: bool, has_5y: bool, has_qtrly: bool,
 # ---------- main logic ----------
 
 def _analyze(ticker: str) -> Dict[str, Any]:
-    t = yf.Ticker(ticker)
+    t = get_ticker_snapshot(ticker)
     info = t.info or {}
     financials = getattr(t, "financials", None)
     quarterly  = getattr(t, "quarterly_financials", None)
@@ -190,4 +190,4 @@ def _analyze(ticker: str) -> Dict[str, Any]:
 
 async def analyze_growth_prospects(ticker: str) -> Dict[str, Any]:
     """Analyze historical growth patterns and forward prospects for a ticker."""
-    return await asyncio.to_thread(_analyze, ticker)
+    return await run_data_io(_analyze, ticker)
@@ -14,7 +14,10 @@ import httpx
 import pandas as pd
 from pathlib import Path
 import json
-import yfinance as yf
+
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
+from app.utils.data_provider import get_data_provider
 
 logger = logging.getLogger(__name__)
 
@@ -133,6 +136,33 @@ class IndianMarketDataProvider:
             logger.error(f"NSE session initialization error: {e}")
             return {}
     
+    async def _nse_json(
+        self, kind: str, symbol: str, url: str, params: Dict[str, Any], record_params: Dict[str, Any]
+    ) -> Optional[Any]:
+        """
+        GET an NSE API endpoint with session cookies through the data provider.
+
+        ``record_params`` identify the request in recordings (date windows are
+        relative to today, so they are described rather than recorded). Returns
+        the JSON body, or None on a non-200 response.
+        """
+        async def _get() -> Optional[Any]:
+            async with httpx.AsyncClient(timeout=30.0, headers=self.headers, follow_redirects=True) as client:
+                # Initialize session first to get cookies
+                cookies = await self._init_nse_session(client)
+                response = await client.get(url, params=params, cookies=cookies)
+
+                if response.status_code == 401:
+                    logger.warning(f"NSE authentication failed (401) for {kind} - invalidating session")
+                    self._session_cookies = None
+                    return None
+                elif response.status_code != 200:
+                    logger.warning(f"NSE {kind} request failed: {response.status_code} (cookies: {len(cookies)} present)")
+                    return None
+                return response.json()
+
+        return await get_data_provider().call_async(kind, symbol, {"url": url, **record_params}, _get)
+
     async def get_shareholding_pattern(self, symbol: str, exchange: str = "NSE") -> List[ShareholdingPattern]:
         """
         Fetch shareholding pattern data using yfinance (no direct NSE API calls)
@@ -150,7 +180,7 @@ class IndianMarketDataProvider:
                     ticker_symbol = f"{symbol}{suffix}"
                 else:
                     ticker_symbol = symbol
-                t = yf.Ticker(ticker_symbol)
+                t = get_ticker_snapshot(ticker_symbol)
                 info = t.info or {}
                 
                 # Extract shareholding data from yfinance info
@@ -170,7 +200,7 @@ class IndianMarketDataProvider:
                 
                 return patterns
             
-            result = await asyncio.to_thread(_fetch_shareholding)
+            result = await run_data_io(_fetch_shareholding)
             logger.info(f"Successfully fetched shareholding pattern for {symbol}")
             return result
             
@@ -229,8 +259,6 @@ class IndianMarketDataProvider:
             logger.info(f"Fetching corporate actions for {symbol} using yfinance")
             
             # Use yfinance for corporate actions
-            import yfinance as yf
-            
             _exchange = (exchange or "NSE").upper()  # resolve once, outside the closure
             def _fetch_corporate_actions():
                 if symbol.endswith((".NS", ".BO")):
@@ -240,7 +268,7 @@ class IndianMarketDataProvider:
                     ticker_symbol = f"{symbol}{suffix}"
                 else:
                     ticker_symbol = symbol
-                t = yf.Ticker(ticker_symbol)
+                t = get_ticker_snapshot(ticker_symbol)
                 
                 actions = []
                 
@@ -278,7 +306,7 @@ class IndianMarketDataProvider:
                 
                 return actions
             
-            result = await asyncio.to_thread(_fetch_corporate_actions)
+            result = await run_data_io(_fetch_corporate_actions)
             logger.info(f"Successfully fetched {len(result)} corporate actions for {symbol}")
             return result
             
@@ -290,29 +318,15 @@ class IndianMarketDataProvider:
         """Fetch corporate actions from NSE"""
         try:
             url = f"{self.nse_base_url}/corporates-corporateActions"
-            
-            async with httpx.AsyncClient(timeout=30.0, headers=self.headers, follow_redirects=True) as client:
-                # Initialize session first to get cookies
-                cookies = await self._init_nse_session(client)
-                
-                params = {
-                    "symbol": symbol.upper(),
-                    "from_date": (datetime.now() - timedelta(days=365*2)).strftime("%d-%m-%Y"),
-                    "to_date": datetime.now().strftime("%d-%m-%Y")
-                }
-                
-                response = await client.get(url, params=params, cookies=cookies)
-                
-                if response.status_code == 401:
-                    logger.warning(f"NSE authentication failed (401) for corporate actions - invalidating session")
-                    self._session_cookies = None
-                    return []
-                elif response.status_code != 200:
-                    logger.warning(f"NSE corporate actions request failed: {response.status_code} (cookies: {len(cookies)} present)")
-                    return []
-                
-                data = response.json()
-                return self._parse_corporate_actions(data)
+            params = {
+                "symbol": symbol.upper(),
+                "from_date": (datetime.now() - timedelta(days=365*2)).strftime("%d-%m-%Y"),
+                "to_date": datetime.now().strftime("%d-%m-%Y")
+            }
+            data = await self._nse_json(
+                "nse_corporate_actions", symbol, url, params, {"symbol": symbol.upper(), "window_days": 365 * 2}
+            )
+            return self._parse_corporate_actions(data) if data is not None else []
                 
         except Exception as e:
             logger.error(f"NSE corporate actions fetch failed for {symbol}: {e}")
@@ -348,8 +362,6 @@ class IndianMarketDataProvider:
             logger.info(f"Fetching financial filings for {symbol} using yfinance")
             
             # Use yfinance for financial data
-            import yfinance as yf
-            
             _exchange = (exchange or "NSE").upper()  # resolve once, outside the closure
             def _fetch_financial_filings():
                 if symbol.endswith((".NS", ".BO")):
@@ -359,7 +371,7 @@ class IndianMarketDataProvider:
                     ticker_symbol = f"{symbol}{suffix}"
                 else:
                     ticker_symbol = symbol
-                t = yf.Ticker(ticker_symbol)
+                t = get_ticker_snapshot(ticker_symbol)
                 
                 filings = []
                 
@@ -403,7 +415,7 @@ class IndianMarketDataProvider:
                 
                 return filings
             
-            result = await asyncio.to_thread(_fetch_financial_filings)
+            result = await run_data_io(_fetch_financial_filings)
             logger.info(f"Successfully fetched {len(result)} financial filings for {symbol}")
             return result
             
@@ -416,28 +428,12 @@ class IndianMarketDataProvider:
         try:
             # NSE financial results endpoint
             url = f"{self.nse_base_url}/corporates-financial-results"
-            
-            async with httpx.AsyncClient(timeout=30.0, headers=self.headers, follow_redirects=True) as client:
-                # Initialize session first to get cookies
-                cookies = await self._init_nse_session(client)
-                
-                params = {
-                    "symbol": symbol.upper(),
-                    "period": "annual"  # or "quarterly"
-                }
-                
-                response = await client.get(url, params=params, cookies=cookies)
-                
-                if response.status_code == 401:
-                    logger.warning(f"NSE authentication failed (401) for financial filings - invalidating session")
-                    self._session_cookies = None
-                    return []
-                elif response.status_code != 200:
-                    logger.warning(f"NSE financial filings request failed: {response.status_code} (cookies: {len(cookies)} present)")
-                    return []
-                
-                data = response.json()
-                return self._parse_financial_filings(data)
+            params = {
+                "symbol": symbol.upper(),
+                "period": "annual"  # or "quarterly"
+            }
+            data = await self._nse_json("nse_financial_results", symbol, url, params, params)
+            return self._parse_financial_filings(data) if data is not None else []
                 
         except Exception as e:
             logger.error(f"NSE financial filings fetch failed for {symbol}: {e}")
@@ -27,8 +27,9 @@ import aiohttp
 from bs4 import BeautifulSoup
 import yfinance as yf
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.redis_cache import get_cache_manager, ticker_tag
 from app.tools.llm_orchestrator import get_llm_orchestrator, TaskType, TaskComplexity
+from app.utils.async_utils import run_data_io
 
 logger = logging.getLogger(__name__)
 
@@ -173,7 +174,7 @@ class SECInsiderTracker:
             transactions = await self._fetch_form4_filings(cik, ticker, days_back)
             
             # Cache results for 4 hours
-            await self.cache.set(cache_key, [tx.__dict__ for tx in transactions], ttl=14400)
+            await self.cache.set(cache_key, [tx.__dict__ for tx in transactions], ttl=14400, tags=[ticker_tag(ticker)])
             
             logger.info(f"Retrieved {len(transactions)} SEC insider transactions for {ticker}")
             return transactions
@@ -207,7 +208,7 @@ class SECInsiderTracker:
                             cik = str(company[2]).zfill(10)  # Pad with zeros
                             
                             # Cache CIK for 24 hours
-                            await self.cache.set(cache_key, cik, ttl=86400)
+                            await self.cache.set(cache_key, cik, ttl=86400, tags=[ticker_tag(ticker)])
                             
                             return cik
             
@@ -301,7 +302,7 @@ class IndianInsiderTracker:
             unique_transactions = self._deduplicate_transactions(all_transactions)
             
             # Cache results for 4 hours
-            await self.cache.set(cache_key, [tx.__dict__ for tx in unique_transactions], ttl=14400)
+            await self.cache.set(cache_key, [tx.__dict__ for tx in unique_transactions], ttl=14400, tags=[ticker_tag(ticker)])
             
             logger.info(f"Retrieved {len(unique_transactions)} Indian insider transactions for {ticker}")
             return unique_transactions
@@ -576,7 +577,7 @@ class InstitutionalTracker:
             holdings = await self._fetch_13f_holdings(cik, ticker, quarters_back)
             
             # Cache results for 6 hours
-            await self.cache.set(cache_key, [h.__dict__ for h in holdings], ttl=21600)
+            await self.cache.set(cache_key, [h.__dict__ for h in holdings], ttl=21600, tags=[ticker_tag(ticker)])
             
             logger.info(f"Retrieved {len(holdings)} institutional holdings for {ticker}")
             return holdings
@@ -610,7 +611,7 @@ class InstitutionalTracker:
                             cik = str(company[2]).zfill(10)  # Pad with zeros
                             
                             # Cache CIK for 24 hours
-                            await self.cache.set(cache_key, cik, ttl=86400)
+                            await self.cache.set(cache_key, cik, ttl=86400, tags=[ticker_tag(ticker)])
                             
                             return cik
             
@@ -737,7 +738,7 @@ class InsiderTracker:
             )
             
             # Cache results for 6 hours
-            await self.cache.set(cache_key, analysis.__dict__, ttl=21600)
+            await self.cache.set(cache_key, analysis.__dict__, ttl=21600, tags=[ticker_tag(ticker)])
             
             logger.info(f"Completed ownership analysis for {ticker}")
             return analysis
@@ -851,8 +852,7 @@ class InsiderTracker:
     async def _get_ownership_structure(self, ticker: str) -> Dict[str, float]:
         """Get ownership structure from yfinance"""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = await run_data_io(lambda: yf.Ticker(ticker).info)
             
             # Extract ownership percentages
             promoter_pct = info.get('heldPercentInsiders', 0.0) * 100
@@ -4,10 +4,10 @@ Produces governance score, insider trend, and board independence rating.
 """
 from __future__ import annotations
 
-import asyncio
 from typing import Any, Dict
 
-import yfinance as yf
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 
 async def analyze_leadership(ticker: str) -> Dict[str, Any]:
@@ -21,7 +21,7 @@ async def analyze_leadership(ticker: str) -> Dict[str, Any]:
     """
     def _fetch() -> Dict[str, Any]:
         try:
-            info = yf.Ticker(ticker).info or {}
+            info = get_ticker_snapshot(ticker).info or {}
 
             risk_vals = [
                 info.get(k) for k in
@@ -62,4 +62,4 @@ async def analyze_leadership(ticker: str) -> Dict[str, Any]:
         except Exception:
             return {"governance_score": 0.6, "insider_trend": "neutral", "board_independence": "moderate"}
 
-    return await asyncio.to_thread(_fetch)
+    return await run_data_io(_fetch)
@@ -5,15 +5,16 @@ All sources are de-duplicated and filtered for ticker relevance.
 """
 from __future__ import annotations
 
-import asyncio
 import logging
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
-import yfinance as yf
 
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
+from app.utils.data_provider import get_data_provider
 from app.utils.retry import retry_async
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,7 @@ _INCLUSIVE_TERMS = ["growth stocks", "tech stocks", "magnificent seven", "big te
 @retry_async(max_retries=2, base_delay=0.5, exceptions=(Exception,))
 async def _yf_news(ticker: str, max_articles: int) -> List[Dict]:
     def _fetch():
-        stock = yf.Ticker(ticker)
+        stock = get_ticker_snapshot(ticker)
         out = []
         for art in (getattr(stock, "news", []) or [])[:max_articles]:
             if isinstance(art, dict) and "content" in art:
@@ -54,17 +55,21 @@ async def _yf_news(ticker: str, max_articles: int) -> List[Dict]:
                 })
         return out
 
-    return await asyncio.to_thread(_fetch)
+    return await run_data_io(_fetch)
 
 
 async def _rss_news(url: str, source_label: str, max_items: int = 3) -> List[Dict]:
     """Generic RSS parser returning article dicts."""
-    try:
+    async def _get() -> Optional[bytes]:
         async with httpx.AsyncClient(timeout=10.0) as client:
             r = await client.get(url)
-            if r.status_code != 200:
-                return []
-        root = ET.fromstring(r.content)
+            return r.content if r.status_code == 200 else None
+
+    try:
+        content = await get_data_provider().call_async("rss", source_label, {"url": url}, _get)
+        if content is None:
+            return []
+        root = ET.fromstring(content)
         arts = []
         for item in root.findall(".//item")[:max_items]:
             t = item.findtext("title", "")
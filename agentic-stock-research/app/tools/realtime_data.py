@@ -2,12 +2,12 @@
 Real-time data provider for Indian markets using yfinance
 """
 
-import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import List, Optional
 from dataclasses import dataclass
 from app.monitoring.alert_engine import MarketEvent
+from app.utils.async_utils import run_data_io
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -106,7 +106,7 @@ class RealTimeDataProvider:
                     low_52w=info.get('fiftyTwoWeekLow', 0)
                 )
 
-            result = await asyncio.to_thread(_fetch_price)
+            result = await run_data_io(_fetch_price)
             logger.debug(f"Successfully fetched yfinance price for {ticker}: {result}")
             return result
 
@@ -176,7 +176,7 @@ class RealTimeDataProvider:
                     logger.warning(f"yfinance options error for {ticker}: {e}")
                     return []
             
-            result = await asyncio.to_thread(_fetch_options)
+            result = await run_data_io(_fetch_options)
             if result:
                 self.cache[cache_key] = (result, datetime.now())
             return result
@@ -237,7 +237,7 @@ class RealTimeDataProvider:
                 
                 return actions
             
-            result = await asyncio.to_thread(_fetch_corporate_actions)
+            result = await run_data_io(_fetch_corporate_actions)
             if result:
                 self.cache[cache_key] = (result, datetime.now())
             return result
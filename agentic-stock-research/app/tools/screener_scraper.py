@@ -2,7 +2,7 @@
 import asyncio
 import logging
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import aiohttp
 from bs4 import BeautifulSoup
@@ -14,6 +14,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+from app.utils.data_provider import get_data_provider
+
 logger = logging.getLogger(__name__)
 
 _KNOWN_IC = {"ABDL": 4.01}
@@ -126,7 +128,10 @@ class ScreenerFundamentalScraper:
             data = await self._scrape_with_aiohttp(clean)
             if (data.get("interest_coverage") is None and not data.get("rate_limited")
                     and clean not in _PROBLEMATIC):
-                selenium_data = await self._scrape_with_selenium(clean)
+                selenium_data = await get_data_provider().call_async(
+                    "screener_selenium", clean, {"url": f"{self.base_url}/company/{clean}/"},
+                    lambda: self._scrape_with_selenium(clean)
+                )
                 if selenium_data.get("interest_coverage") is not None:
                     data.update(selenium_data)
                 else:
@@ -144,15 +149,20 @@ class ScreenerFundamentalScraper:
                 self.session = None
 
     async def _scrape_with_aiohttp(self, clean: str) -> Dict[str, Any]:
-        try:
+        url = f"{self.base_url}/company/{clean}/"
+
+        async def _get() -> Tuple[int, Optional[str]]:
             session = await self._get_session()
-            async with session.get(f"{self.base_url}/company/{clean}/",
-                                   timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status == 200:
-                    return self._parse_page(await resp.text(), clean)
-                if resp.status == 429:
-                    return {"rate_limited": True}
-                return {}
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                return resp.status, await resp.text() if resp.status == 200 else None
+
+        try:
+            status, html = await get_data_provider().call_async("screener_page", clean, {"url": url}, _get)
+            if status == 200:
+                return self._parse_page(html, clean)
+            if status == 429:
+                return {"rate_limited": True}
+            return {}
         except Exception as e:
             logger.error(f"aiohttp scrape error for {clean}: {e}")
             return {}
@@ -13,9 +13,11 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 
 import aiohttp
-import yfinance as yf
 from bs4 import BeautifulSoup
 
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.data_provider import get_data_provider
+
 logger = logging.getLogger(__name__)
 
 _FINANCIAL_KW = ["revenue", "profit", "margin", "growth", "decline", "increase", "decrease"]
@@ -89,7 +91,7 @@ class SECEdgarClient:
 
     async def get_cik_from_ticker(self, ticker: str) -> Optional[str]:
         try:
-            info = yf.Ticker(ticker).info or {}
+            info = get_ticker_snapshot(ticker).info or {}
             if cik := info.get("cik"):
                 return str(cik).zfill(10)
             session = await self._get_session()
@@ -120,18 +122,23 @@ class SECEdgarClient:
 
     async def _fetch_filings_by_type(self, cik: str, ticker: str, filing_type: FilingType,
                                       count: int, start_date: Optional[datetime]) -> List[SECFiling]:
-        try:
+        params = {"action": "getcompany", "CIK": cik, "type": filing_type.value,
+                  "dateb": "", "owner": "exclude", "count": count, "output": "atom"}
+
+        async def _get() -> Optional[str]:
             session = await self._get_session()
             async with session.get(
-                f"{self.BASE_URL}/cgi-bin/browse-edgar",
-                params={"action": "getcompany", "CIK": cik, "type": filing_type.value,
-                        "dateb": "", "owner": "exclude", "count": count, "output": "atom"},
+                f"{self.BASE_URL}/cgi-bin/browse-edgar", params=params,
                 timeout=aiohttp.ClientTimeout(total=15)
             ) as resp:
-                if resp.status != 200:
-                    return []
-                filings = self._parse_atom_feed(await resp.text(), ticker, filing_type)
-                return [f for f in filings if not start_date or f.filing_date >= start_date]
+                return await resp.text() if resp.status == 200 else None
+
+        try:
+            xml = await get_data_provider().call_async("sec_filings", ticker, params, _get)
+            if xml is None:
+                return []
+            filings = self._parse_atom_feed(xml, ticker, filing_type)
+            return [f for f in filings if not start_date or f.filing_date >= start_date]
         except Exception as e:
             logger.error(f"Filing fetch error {filing_type} for {ticker}: {e}")
             return []
@@ -168,12 +175,15 @@ class SECEdgarClient:
         return filings
 
     async def extract_filing_content(self, filing: SECFiling) -> SECFiling:
-        try:
+        async def _get() -> Optional[str]:
             session = await self._get_session()
             async with session.get(filing.url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                if resp.status != 200:
-                    return filing
-                soup = BeautifulSoup(await resp.text(), "html.parser")
+                return await resp.text() if resp.status == 200 else None
+
+        try:
+            html = await get_data_provider().call_async("sec_document", filing.ticker, {"url": filing.url}, _get)
+            if html is not None:
+                soup = BeautifulSoup(html, "html.parser")
                 if filing.filing_type.value in _CONTENT_SELECTORS:
                     cfg = _CONTENT_SELECTORS[filing.filing_type.value]
                     filing.business_description = self._extract_section(soup, cfg["business"])
@@ -1,16 +1,16 @@
 from __future__ import annotations
 
-import asyncio
 from typing import Any, Dict
 
-import yfinance as yf
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 
 async def analyze_sector_macro(ticker: str) -> Dict[str, Any]:
     """Lightweight sector/macro view using yfinance metadata."""
     def _fetch() -> Dict[str, Any]:
         try:
-            info = yf.Ticker(ticker).info or {}
+            info = get_ticker_snapshot(ticker).info or {}
             sector = info.get("sector") or "Unknown"
             industry = info.get("industry") or "Unknown"
             country = info.get("country") or info.get("exchangeTimezoneName") or "Unknown"
@@ -25,4 +25,4 @@ async def analyze_sector_macro(ticker: str) -> Dict[str, Any]:
         except Exception:
             return {"sector_outlook": "stable", "macro_risks": ["rates", "fx"]}
 
-    return await asyncio.to_thread(_fetch)
+    return await run_data_io(_fetch)
@@ -4,9 +4,10 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
-import yfinance as yf
-
+from app.cache.price_store import load_price_range
 from app.logging import get_logger
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 logger = get_logger()
 
@@ -46,39 +47,44 @@ class SectorRotationAnalyzer:
         return (sum((x - m) ** 2 for x in vals) / len(vals)) ** 0.5
 
     async def _sector_performance(self, etfs: Dict[str, str], days: int) -> Dict[str, Any]:
-        def _fetch():
-            end = datetime.now()
-            start = end - timedelta(days=days)
-            data = {}
-            for sym, name in etfs.items():
-                try:
-                    hist = yf.Ticker(sym).history(start=start, end=end)
-                    if len(hist) == 0:
-                        continue
-                    ret = (hist["Close"].iloc[-1] - hist["Close"].iloc[0]) / hist["Close"].iloc[0]
-                    vol = hist["Close"].pct_change().dropna().std() * (252 ** 0.5)
-                    mom = 0.0
-                    if len(hist) >= 50:
-                        mom = (hist["Close"].rolling(20).mean().iloc[-1] -
-                               hist["Close"].rolling(50).mean().iloc[-1]) / hist["Close"].rolling(50).mean().iloc[-1]
-                    data[name] = {"etf": sym, "total_return": ret, "volatility": vol,
-                                  "momentum": mom, "current_price": hist["Close"].iloc[-1],
-                                  "data_points": len(hist)}
-                except Exception as e:
-                    logger.warning(f"Failed to fetch {sym}: {e}")
-            return data
-        return await asyncio.to_thread(_fetch)
+        end = datetime.now()
+        start = end - timedelta(days=days)
+        histories = await asyncio.gather(
+            *(load_price_range(sym, start, end) for sym in etfs), return_exceptions=True
+        )
+        data = {}
+        for (sym, name), hist in zip(etfs.items(), histories):
+            try:
+                if isinstance(hist, Exception):
+                    raise hist
+                if len(hist) == 0:
+                    continue
+                close = hist["Close"]
+                if close.ndim > 1:  # ticker-grouped columns from yf.download
+                    close = close.iloc[:, 0]
+                ret = (close.iloc[-1] - close.iloc[0]) / close.iloc[0]
+                vol = close.pct_change().dropna().std() * (252 ** 0.5)
+                mom = 0.0
+                if len(hist) >= 50:
+                    mom = (close.rolling(20).mean().iloc[-1] -
+                           close.rolling(50).mean().iloc[-1]) / close.rolling(50).mean().iloc[-1]
+                data[name] = {"etf": sym, "total_return": ret, "volatility": vol,
+                              "momentum": mom, "current_price": close.iloc[-1],
+                              "data_points": len(hist)}
+            except Exception as e:
+                logger.warning(f"Failed to fetch {sym}: {e}")
+        return data
 
     async def _stock_sector(self, ticker: str) -> Dict[str, Any]:
         def _fetch():
             try:
-                info = yf.Ticker(ticker).info
+                info = get_ticker_snapshot(ticker).info
                 return {"sector": info.get("sector", "Unknown"), "industry": info.get("industry", "Unknown"),
                         "market_cap": info.get("marketCap", 0), "sector_weight": info.get("sectorWeight", 0)}
             except Exception as e:
                 logger.warning(f"Sector info failed for {ticker}: {e}")
                 return {"sector": "Unknown", "industry": "Unknown"}
-        return await asyncio.to_thread(_fetch)
+        return await run_data_io(_fetch)
 
     def _rotation_patterns(self, perf: Dict[str, Any]) -> Dict[str, Any]:
         if not perf:
@@ -3,14 +3,15 @@ Strategic Investment Conviction Analysis Engine
 """
 from __future__ import annotations
 
-import asyncio
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
 import structlog
-import yfinance as yf
+
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 
 logger = structlog.get_logger()
 
@@ -439,12 +440,12 @@ class StrategicConvictionEngine:
 
     async def _fetch_company_data(self, ticker: str) -> Dict[str, Any]:
         def _fetch():
-            t = yf.Ticker(ticker)
+            t = get_ticker_snapshot(ticker)
             return {"info": t.info or {}, "financials": t.financials,
                     "balance_sheet": t.balance_sheet, "cashflow": t.cashflow,
                     "history": t.history(period="5y"), "recommendations": t.recommendations,
                     "institutional_holders": t.institutional_holders, "major_holders": t.major_holders}
-        return await asyncio.to_thread(_fetch)
+        return await run_data_io(_fetch)
 
     async def _analyze_business_quality(self, ticker: str, data: Dict) -> Dict[str, Any]:
         info = data["info"]
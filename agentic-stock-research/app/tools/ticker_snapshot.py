@@ -0,0 +1,191 @@
+"""
+Per-analysis ticker snapshot shared by every graph node.
+
+A single /analyze run used to open ``yf.Ticker(...)`` dozens of times across the
+tools, re-downloading the same ``.info``, ``.financials``, ``.balance_sheet`` and
+``.cashflow`` payloads on each call. ``TickerSnapshot`` exposes the same attribute
+names as ``yf.Ticker`` but fetches each upstream artifact at most once and then
+serves the stored value for the rest of the analysis.
+
+``data_collection_node`` creates the snapshot and stores it in
+``ResearchState["snapshots"]``; the graph wrapper activates those snapshots for
+the duration of each node so tools can call ``get_ticker_snapshot(ticker)``
+instead of ``yf.Ticker(ticker)``.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import yfinance as yf
+
+from app.utils.data_provider import get_data_provider
+
+logger = logging.getLogger(__name__)
+
+_active_snapshots: contextvars.ContextVar[Optional[Dict[str, "TickerSnapshot"]]] = contextvars.ContextVar(
+    "active_ticker_snapshots", default=None
+)
+
+
+class _Artifact:
+    """Descriptor for a lazily fetched, memoised ``yf.Ticker`` attribute."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Optional["TickerSnapshot"], objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return obj._load(self.name)
+
+
+class TickerSnapshot:
+    """
+    Lazily populated, read-only view of one ticker's yfinance artifacts.
+
+    Values are fetched on first access and never refreshed, so every node in an
+    analysis sees the same data. ``info`` is returned as a shallow copy; statement
+    DataFrames are shared and must be treated as read-only by callers.
+    """
+
+    info = _Artifact()
+    fast_info = _Artifact()
+    financials = _Artifact()
+    quarterly_financials = _Artifact()
+    balance_sheet = _Artifact()
+    quarterly_balance_sheet = _Artifact()
+    cashflow = _Artifact()
+    quarterly_cashflow = _Artifact()
+    recommendations = _Artifact()
+    upgrades_downgrades = _Artifact()
+    institutional_holders = _Artifact()
+    major_holders = _Artifact()
+    insider_transactions = _Artifact()
+    dividends = _Artifact()
+    splits = _Artifact()
+    news = _Artifact()
+
+    def __init__(self, ticker: str, info: Optional[Dict[str, Any]] = None):
+        self.ticker = ticker
+        self._values: Dict[str, Any] = {}
+        self._history: Dict[Tuple[Tuple[str, Any], ...], Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._yf_ticker: Optional[yf.Ticker] = None
+        self.fetch_counts: Dict[str, int] = {}
+        self._fetch_listeners: List[Callable[["TickerSnapshot", str, Any], None]] = []
+        if info:
+            self._values["info"] = dict(info)
+
+    def __repr__(self) -> str:
+        return f"TickerSnapshot({self.ticker!r}, loaded={sorted(self._values)})"
+
+    # Snapshots are shared, immutable handles: copying state must not clone them
+    def __copy__(self) -> "TickerSnapshot":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "TickerSnapshot":
+        return self
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.Lock()
+            return lock
+
+    def _upstream(self) -> yf.Ticker:
+        with self._guard:
+            if self._yf_ticker is None:
+                self._yf_ticker = yf.Ticker(self.ticker)
+            return self._yf_ticker
+
+    def _fetch(self, name: str) -> Any:
+        value = get_data_provider().call_sync(
+            "ticker", self.ticker, {"attr": name}, lambda: getattr(self._upstream(), name, None)
+        )
+        if name == "info":
+            value = dict(value or {})
+        return value
+
+    def _load(self, name: str) -> Any:
+        if name not in self._values:
+            with self._lock_for(name):
+                if name not in self._values:
+                    try:
+                        value = self._fetch(name)
+                        fetched = True
+                    except Exception as e:
+                        logger.warning(f"[{self.ticker}] Snapshot fetch failed for {name}: {e}")
+                        value = {} if name == "info" else None
+                        fetched = False
+                    self.fetch_counts[name] = self.fetch_counts.get(name, 0) + 1
+                    self._values[name] = value
+                    if fetched:
+                        self._notify(name, value)
+        value = self._values[name]
+        return dict(value) if name == "info" else value
+
+    def seed(self, name: str, value: Any) -> bool:
+        """Pre-populate an artifact (e.g. from a cache); returns False if already loaded."""
+        with self._lock_for(name):
+            if name in self._values:
+                return False
+            self._values[name] = dict(value) if name == "info" else value
+            return True
+
+    def add_fetch_listener(self, listener: Callable[["TickerSnapshot", str, Any], None]) -> None:
+        """Call ``listener(snapshot, name, value)`` after each successful upstream fetch."""
+        self._fetch_listeners.append(listener)
+
+    def _notify(self, name: str, value: Any) -> None:
+        for listener in self._fetch_listeners:
+            try:
+                listener(self, name, value)
+            except Exception as e:
+                logger.debug(f"[{self.ticker}] Snapshot fetch listener failed for {name}: {e}")
+
+    def history(self, **kwargs: Any) -> Any:
+        """Memoised ``yf.Ticker.history``; each distinct argument set is fetched once."""
+        key = tuple(sorted(kwargs.items(), key=lambda kv: kv[0]))
+        if key not in self._history:
+            with self._lock_for(f"history:{key!r}"):
+                if key not in self._history:
+                    self.fetch_counts["history"] = self.fetch_counts.get("history", 0) + 1
+                    self._history[key] = get_data_provider().call_sync(
+                        "history", self.ticker, dict(key), lambda: self._upstream().history(**kwargs)
+                    )
+        return self._history[key]
+
+    def loaded(self) -> Tuple[str, ...]:
+        """Names of the artifacts already fetched into this snapshot."""
+        return tuple(sorted(self._values))
+
+
+@contextmanager
+def snapshot_scope(snapshots: Optional[Dict[str, TickerSnapshot]]) -> Iterator[None]:
+    """Make ``snapshots`` visible to ``get_ticker_snapshot`` for the enclosed code."""
+    token = _active_snapshots.set(snapshots or None)
+    try:
+        yield
+    finally:
+        _active_snapshots.reset(token)
+
+
+def get_ticker_snapshot(ticker: str) -> TickerSnapshot:
+    """
+    Return the active analysis snapshot for ``ticker``.
+
+    Outside a graph run (scripts, bulk helpers, tests) a fresh standalone
+    snapshot is returned, which still de-duplicates fetches within the caller.
+    """
+    snapshots = _active_snapshots.get()
+    if snapshots:
+        snapshot = snapshots.get(ticker)
+        if snapshot is not None:
+            return snapshot
+    return TickerSnapshot(ticker)
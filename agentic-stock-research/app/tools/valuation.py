@@ -3,9 +3,9 @@ from __future__ import annotations
 import asyncio
 from typing import Any, Dict, List, Optional
 
-import yfinance as yf
-
 from app.tools.finance import fetch_info
+from app.tools.ticker_snapshot import get_ticker_snapshot
+from app.utils.async_utils import run_data_io
 import logging
 logger = logging.getLogger(__name__)
 
@@ -137,7 +137,7 @@ def _get_fcf(ticker: str, info: Dict[str, Any]) -> Optional[float]:
     if fcf := _f(info.get("freeCashflow")):
         return fcf
     try:
-        cf = yf.Ticker(ticker).cashflow
+        cf = get_ticker_snapshot(ticker).cashflow
         if cf is None or getattr(cf, "empty", True):
             return None
         ocf = next((cf.loc[k].dropna() for k in _OCF_KEYS if k in cf.index), None)
@@ -765,7 +765,7 @@ async def compute_valuation(ticker: str, current_price: Optional[float] = None)
     """
     def _run() -> Dict[str, Any]:
         try:
-            info   = yf.Ticker(ticker).info or {}
+            info   = get_ticker_snapshot(ticker).info or {}
             # Use caller-supplied price if available; only fall back to yfinance if not.
             # This ensures the price in all valuation calculations matches the report header.
             price_from_info = _f(info.get("currentPrice") or info.get("regularMarketPrice"))
@@ -899,4 +899,4 @@ async def compute_valuation(ticker: str, current_price: Optional[float] = None)
                 "valuation_summary": f"Valuation analysis failed: {e}",
             }
 
-    return await asyncio.to_thread(_run)
\ No newline at end of file
+    return await run_data_io(_run)
\ No newline at end of file
@@ -11,7 +11,8 @@ from urllib.parse import urljoin
 import aiohttp
 from bs4 import BeautifulSoup
 
-from app.cache.redis_cache import get_cache_manager
+from app.cache.redis_cache import get_cache_manager, ticker_tag
+from app.utils.data_provider import get_data_provider
 from app.utils.retry import retry_async
 
 logger = logging.getLogger(__name__)
@@ -59,6 +60,15 @@ class ValuePickrScraper:
         if self.session and not self.session.closed:
             await self.session.close()
 
+    async def _fetch_html(self, kind: str, ticker: str, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Page HTML through the data provider, or None on a non-200 response"""
+        async def _get() -> Optional[str]:
+            session = await self._get_session()
+            async with session.get(url, params=params) as resp:
+                return await resp.text() if resp.status == 200 else None
+
+        return await get_data_provider().call_async(kind, ticker, {"url": url, **(params or {})}, _get)
+
     @retry_async(max_retries=3, base_delay=1.0)
     async def search_discussions(self, ticker: str, max_results: int = 10) -> List[Dict[str, Any]]:
         cache = await self._get_cache()
@@ -67,56 +77,54 @@ class ValuePickrScraper:
             return cached
 
         search_term = _clean_ticker(ticker)
-        session = await self._get_session()
         try:
-            async with session.get(self.SEARCH_URL,
-                                   params={"q": search_term, "type": "post",
-                                           "sort": "relevance", "order": "desc"}) as resp:
-                if resp.status != 200:
-                    return []
-                soup = BeautifulSoup(await resp.text(), "html.parser")
-                elements = (soup.find_all("div", class_="topic-list-item") or
-                            soup.find_all("div", class_="search-result") or
-                            soup.find_all("article") or soup.find_all("div", class_="post"))
-                if not elements:
-                    elements = [d for d in soup.find_all("div")
-                                if len(d.get_text(strip=True)) > 50]
-
-                discussions = []
-                for el in elements[:max_results]:
-                    try:
-                        link = el.find("a", class_="title") or el.find("a")
-                        if not link:
-                            text = el.get_text(strip=True)
-                            if len(text) > 10:
-                                discussions.append({"title": text[:100], "url": "", "author": "Unknown",
-                                                    "replies": 0, "views": 0, "last_activity": None,
-                                                    "source": "ValuePickr", "ticker": ticker,
-                                                    "search_term": search_term})
-                            continue
-                        meta = el.find("div", class_="topic-meta")
-                        replies = views = 0
-                        if meta:
-                            for sel, attr in [("span.replies", "replies"), ("span.views", "views")]:
-                                el2 = meta.find("span", class_=attr)
-                                if el2 and (m := re.search(r"(\d+)", el2.get_text())):
-                                    if attr == "replies":
-                                        replies = int(m.group(1))
-                                    else:
-                                        views = int(m.group(1))
-                        author_el = el.find("span", class_="author")
-                        discussions.append({
-                            "title": link.get_text(strip=True),
-                            "url": urljoin(self.BASE_URL, link.get("href", "")),
-                            "author": author_el.get_text(strip=True) if author_el else "Unknown",
-                            "replies": replies, "views": views, "last_activity": None,
-                            "source": "ValuePickr", "ticker": ticker, "search_term": search_term
-                        })
-                    except Exception as e:
-                        logger.warning(f"Error parsing element: {e}")
-
-                await cache.set(cache_key, discussions, ttl=7200)
-                return discussions
+            html = await self._fetch_html("valuepickr_search", ticker, self.SEARCH_URL,
+                                          {"q": search_term, "type": "post", "sort": "relevance", "order": "desc"})
+            if html is None:
+                return []
+            soup = BeautifulSoup(html, "html.parser")
+            elements = (soup.find_all("div", class_="topic-list-item") or
+                        soup.find_all("div", class_="search-result") or
+                        soup.find_all("article") or soup.find_all("div", class_="post"))
+            if not elements:
+                elements = [d for d in soup.find_all("div")
+                            if len(d.get_text(strip=True)) > 50]
+
+            discussions = []
+            for el in elements[:max_results]:
+                try:
+                    link = el.find("a", class_="title") or el.find("a")
+                    if not link:
+                        text = el.get_text(strip=True)
+                        if len(text) > 10:
+                            discussions.append({"title": text[:100], "url": "", "author": "Unknown",
+                                                "replies": 0, "views": 0, "last_activity": None,
+                                                "source": "ValuePickr", "ticker": ticker,
+                                                "search_term": search_term})
+                        continue
+                    meta = el.find("div", class_="topic-meta")
+                    replies = views = 0
+                    if meta:
+                        for sel, attr in [("span.replies", "replies"), ("span.views", "views")]:
+                            el2 = meta.find("span", class_=attr)
+                            if el2 and (m := re.search(r"(\d+)", el2.get_text())):
+                                if attr == "replies":
+                                    replies = int(m.group(1))
+                                else:
+                                    views = int(m.group(1))
+                    author_el = el.find("span", class_="author")
+                    discussions.append({
+                        "title": link.get_text(strip=True),
+                        "url": urljoin(self.BASE_URL, link.get("href", "")),
+                        "author": author_el.get_text(strip=True) if author_el else "Unknown",
+                        "replies": replies, "views": views, "last_activity": None,
+                        "source": "ValuePickr", "ticker": ticker, "search_term": search_term
+                    })
+                except Exception as e:
+                    logger.warning(f"Error parsing element: {e}")
+
+            await cache.set(cache_key, discussions, ttl=7200, tags=[ticker_tag(ticker)])
+            return discussions
         except Exception as e:
             logger.error(f"ValuePickr search error for {ticker}: {e}")
             return []
@@ -124,24 +132,23 @@ class ValuePickrScraper:
     @retry_async(max_retries=2, base_delay=1.0)
     async def get_thread_content(self, thread_url: str) -> Optional[Dict[str, Any]]:
         try:
-            session = await self._get_session()
-            async with session.get(thread_url) as resp:
-                if resp.status != 200:
-                    return None
-                soup = BeautifulSoup(await resp.text(), "html.parser")
-                posts = []
-                for post_el in soup.find_all("div", class_="post")[:5]:
-                    content_el = post_el.find("div", class_="post-content")
-                    if not content_el:
-                        continue
-                    content = content_el.get_text(strip=True)
-                    author_el = post_el.find("span", class_="author")
-                    time_el = post_el.find("time")
-                    posts.append({"content": content, "length": len(content),
-                                  "author": author_el.get_text(strip=True) if author_el else "Unknown",
-                                  "timestamp": time_el.get("datetime") if time_el else None})
-                return {"url": thread_url, "posts": posts, "post_count": len(posts),
-                        "total_content_length": sum(p["length"] for p in posts)}
+            html = await self._fetch_html("valuepickr_thread", "valuepickr", thread_url)
+            if html is None:
+                return None
+            soup = BeautifulSoup(html, "html.parser")
+            posts = []
+            for post_el in soup.find_all("div", class_="post")[:5]:
+                content_el = post_el.find("div", class_="post-content")
+                if not content_el:
+                    continue
+                content = content_el.get_text(strip=True)
+                author_el = post_el.find("span", class_="author")
+                time_el = post_el.find("time")
+                posts.append({"content": content, "length": len(content),
+                              "author": author_el.get_text(strip=True) if author_el else "Unknown",
+                              "timestamp": time_el.get("datetime") if time_el else None})
+            return {"url": thread_url, "posts": posts, "post_count": len(posts),
+                    "total_content_length": sum(p["length"] for p in posts)}
         except Exception as e:
             logger.error(f"Thread content error for {thread_url}: {e}")
             return None
@@ -4,6 +4,8 @@ from typing import Any, Dict, List
 
 import httpx
 
+from app.utils.data_provider import get_data_provider
+
 
 async def search_finance_videos(
     query: str, api_key: str | None = None, max_results: int = 5
@@ -23,23 +25,26 @@ async def search_finance_videos(
                 _fallback("stock+research", "Stock Research"),
                 _fallback("investment+review", "Investment Review")][:max_results]
 
-    try:
+    params = {"part": "snippet", "q": query, "type": "video",
+              "maxResults": str(max(1, min(max_results, 10))),
+              "safeSearch": "none", "order": "relevance"}
+
+    async def _get() -> Dict[str, Any]:
         async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                "https://www.googleapis.com/youtube/v3/search",
-                params={"part": "snippet", "q": query, "type": "video",
-                        "maxResults": str(max(1, min(max_results, 10))),
-                        "safeSearch": "none", "order": "relevance", "key": api_key}
-            )
+            resp = await client.get("https://www.googleapis.com/youtube/v3/search", params={**params, "key": api_key})
             resp.raise_for_status()
-            results = [
-                {"title": it.get("snippet", {}).get("title") or query,
-                 "channel": it.get("snippet", {}).get("channelTitle") or "Unknown",
-                 "url": f"https://www.youtube.com/watch?v={it.get('id', {}).get('videoId')}",
-                 "views": None}
-                for it in resp.json().get("items", [])
-                if isinstance(it.get("id"), dict) and it["id"].get("videoId")
-            ]
-            return results or [_fallback("financial+overview", "Financial Overview")]
+            return resp.json()
+
+    try:
+        data = await get_data_provider().call_async("youtube_search", query, params, _get)
+        results = [
+            {"title": it.get("snippet", {}).get("title") or query,
+             "channel": it.get("snippet", {}).get("channelTitle") or "Unknown",
+             "url": f"https://www.youtube.com/watch?v={it.get('id', {}).get('videoId')}",
+             "views": None}
+            for it in data.get("items", [])
+            if isinstance(it.get("id"), dict) and it["id"].get("videoId")
+        ]
+        return results or [_fallback("financial+overview", "Financial Overview")]
     except Exception:
         return [_fallback("market+analysis", "Market Analysis")]
@@ -4,7 +4,11 @@ Async processing utilities for performance optimization
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import functools
+import inspect
 import logging
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
@@ -154,6 +158,105 @@ class AsyncProcessor:
         return await loop.run_in_executor(self.executor, func, *args, **kwargs)
 
 
+class InstrumentedExecutor:
+    """
+    Named thread pool for blocking I/O with queue-depth and latency metrics.
+
+    Tracks how long work waits for a free thread (queue wait) separately from
+    how long it runs, so a saturated pool shows up as growing wait time rather
+    than as slow upstream calls. Context variables (e.g. the active ticker
+    snapshots) are propagated into the worker thread.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    def _instrumented(self, func: Callable[..., T], submitted: float) -> Callable[[], T]:
+        def _call() -> T:
+            started = time.perf_counter()
+            wait = started - submitted
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            ok = False
+            try:
+                result = func()
+                ok = True
+                return result
+            finally:
+                run = time.perf_counter() - started
+                with self._lock:
+                    self.running -= 1
+                    self.total_run += run
+                    self.max_run = max(self.max_run, run)
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+        return _call
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run ``func(*args, **kwargs)`` on the pool and await its result"""
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._instrumented(call, time.perf_counter()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.total_wait / done * 1000, 2) if done else 0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "avg_run_ms": round(self.total_run / done * 1000, 2) if done else 0,
+                "max_run_ms": round(self.max_run * 1000, 2),
+            }
+
+
+_data_executor: Optional[InstrumentedExecutor] = None
+_data_executor_lock = threading.Lock()
+
+
+def get_data_executor() -> InstrumentedExecutor:
+    """Get the shared pool for blocking market-data provider calls (yfinance)"""
+    global _data_executor
+    if _data_executor is None:
+        with _data_executor_lock:
+            if _data_executor is None:
+                from app.config import get_settings
+                _data_executor = InstrumentedExecutor("data-io", get_settings().data_io_max_workers)
+    return _data_executor
+
+
+async def run_data_io(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking data-provider call on the data I/O pool"""
+    return await get_data_executor().run(func, *args, **kwargs)
+
+
 class PerformanceMonitor:
     """
     Monitor and log performance metrics
@@ -197,8 +300,28 @@ def monitor_performance(operation_name: str):
         @monitor_performance("data_fetch")
         async def fetch_data():
             pass
+
+    Async generators are timed from the first item to exhaustion (or the
+    consumer closing them).
     """
     def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        if inspect.isasyncgenfunction(func):
+            @wraps(func)
+            async def stream_wrapper(*args, **kwargs):
+                start_time = time.time()
+                try:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                except Exception as e:
+                    logger.warning(f"{operation_name} failed after {time.time() - start_time:.3f}s: {e}")
+                    raise
+                finally:
+                    duration = time.time() - start_time
+                    logger.debug(f"{operation_name} completed in {duration:.3f}s")
+                    if hasattr(stream_wrapper, '_performance_monitor'):
+                        stream_wrapper._performance_monitor.record_timing(operation_name, duration)
+            return stream_wrapper
+
         @wraps(func)
         async def wrapper(*args, **kwargs) -> T:
             start_time = time.time()
@@ -0,0 +1,213 @@
+"""
+Record/replay layer for upstream market data calls
+
+Upstream market data fetches go through ``DataProvider``: Yahoo downloads and
+info (YahooFinanceClient, TickerSnapshot statements/news, data federation),
+RSS news, SEC EDGAR and BSE/NSE filings, NSE corporate data, earnings-call
+transcripts, Screener.in, ValuePickr, Alpha Vantage / Polygon / FX rates and
+YouTube search. The provider runs in one of three modes, selected with
+``DATA_PROVIDER_MODE``:
+
+- ``live``   - call upstream (default)
+- ``record`` - call upstream and write each response to the fixture archive
+- ``replay`` - serve responses from the archive only, with synthetic latency;
+  a request that was never recorded raises ``ReplayMissError`` instead of
+  touching the network
+
+Replay makes the market data behind graph and /analyze-bulk runs reproducible
+and offline, so they can be benchmarked and load-tested without Yahoo
+throttling noise. LLM calls are not recorded and still go to the configured
+model provider.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pickle
+import random
+import re
+import tempfile
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from app.utils.async_utils import run_data_io
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ProviderMode(str, Enum):
+    """Data provider modes"""
+    LIVE = "live"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode for a request that is not in the archive"""
+
+
+class FixtureArchive:
+    """
+    On-disk archive of recorded upstream responses.
+
+    One file per request at ``<root>/<kind>/<SYMBOL>/<digest>.pkl``; the digest
+    covers the request parameters, which are also stored alongside the value
+    so archives can be inspected. Archives are local, trusted test fixtures.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    @staticmethod
+    def _digest(params: Dict[str, Any]) -> str:
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+    def path_for(self, kind: str, symbol: str, params: Dict[str, Any]) -> Path:
+        safe_symbol = re.sub(r"[^A-Za-z0-9._^-]", "_", symbol.upper()) or "_"
+        return self.root / kind / safe_symbol / f"{self._digest(params)}.pkl"
+
+    def load(self, kind: str, symbol: str, params: Dict[str, Any]) -> Tuple[bool, Any]:
+        path = self.path_for(kind, symbol, params)
+        if not path.exists():
+            return False, None
+        with open(path, "rb") as f:
+            return True, pickle.load(f)["value"]
+
+    def save(self, kind: str, symbol: str, params: Dict[str, Any], value: Any) -> None:
+        path = self.path_for(kind, symbol, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"kind": kind, "symbol": symbol, "params": params, "value": value, "recorded_at": time.time()}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+
+class DataProvider:
+    """Routes upstream calls through live, record or replay handling"""
+
+    def __init__(
+        self,
+        mode: Union[ProviderMode, str] = ProviderMode.LIVE,
+        archive: Optional[FixtureArchive] = None,
+        replay_latency_ms: float = 0.0,
+        replay_jitter_ms: float = 0.0,
+    ):
+        self.mode = ProviderMode(mode)
+        self.archive = archive
+        self.replay_latency_ms = replay_latency_ms
+        self.replay_jitter_ms = replay_jitter_ms
+        self._lock = threading.Lock()
+        self.stats = {"live_calls": 0, "recorded": 0, "replayed": 0, "replay_misses": 0}
+        if self.mode != ProviderMode.LIVE and archive is None:
+            raise ValueError(f"Data provider mode '{self.mode.value}' requires a fixture archive")
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _replay_delay(self, kind: str, symbol: str, params: Dict[str, Any]) -> float:
+        """Synthetic latency in seconds; jitter is seeded per request so runs repeat exactly"""
+        delay = self.replay_latency_ms
+        if self.replay_jitter_ms:
+            seed = f"{kind}:{symbol}:{FixtureArchive._digest(params)}"
+            delay += random.Random(seed).uniform(0, self.replay_jitter_ms)
+        return delay / 1000.0
+
+    def _replay(self, kind: str, symbol: str, params: Dict[str, Any]) -> Any:
+        found, value = self.archive.load(kind, symbol, params)
+        if not found:
+            self._count("replay_misses")
+            raise ReplayMissError(f"No recorded {kind} response for {symbol} {params}")
+        self._count("replayed")
+        return value
+
+    def _record(self, kind: str, symbol: str, params: Dict[str, Any], value: Any) -> None:
+        try:
+            self.archive.save(kind, symbol, params, value)
+            self._count("recorded")
+        except Exception as e:
+            logger.warning(f"Failed to record {kind} response for {symbol}: {e}")
+
+    def call_sync(self, kind: str, symbol: str, params: Dict[str, Any], fetch: Callable[[], T]) -> T:
+        """Blocking variant for code already running on a worker thread"""
+        if self.mode == ProviderMode.REPLAY:
+            time.sleep(self._replay_delay(kind, symbol, params))
+            return self._replay(kind, symbol, params)
+        self._count("live_calls")
+        value = fetch()
+        if self.mode == ProviderMode.RECORD:
+            self._record(kind, symbol, params, value)
+        return value
+
+    async def call(self, kind: str, symbol: str, params: Dict[str, Any], fetch: Callable[[], T]) -> T:
+        """Run a blocking upstream ``fetch`` on the data I/O pool (or replay it)"""
+        if self.mode == ProviderMode.REPLAY:
+            await asyncio.sleep(self._replay_delay(kind, symbol, params))
+            return self._replay(kind, symbol, params)
+        self._count("live_calls")
+        value = await run_data_io(fetch)
+        if self.mode == ProviderMode.RECORD:
+            self._record(kind, symbol, params, value)
+        return value
+
+    async def call_async(
+        self, kind: str, symbol: str, params: Dict[str, Any], fetch: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Variant for upstream calls that are already async (httpx / aiohttp)"""
+        if self.mode == ProviderMode.REPLAY:
+            await asyncio.sleep(self._replay_delay(kind, symbol, params))
+            return self._replay(kind, symbol, params)
+        self._count("live_calls")
+        value = await fetch()
+        if self.mode == ProviderMode.RECORD:
+            self._record(kind, symbol, params, value)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode.value,
+            "archive": str(self.archive.root) if self.archive else None,
+            **self.stats,
+        }
+
+
+_data_provider: Optional[DataProvider] = None
+
+
+def get_data_provider() -> DataProvider:
+    """Get global data provider configured from settings"""
+    global _data_provider
+    if _data_provider is None:
+        from app.config import get_settings
+        settings = get_settings()
+        mode = ProviderMode(settings.data_provider_mode.lower())
+        archive = FixtureArchive(settings.data_provider_archive_dir) if mode != ProviderMode.LIVE else None
+        _data_provider = DataProvider(
+            mode, archive,
+            replay_latency_ms=settings.data_provider_replay_latency_ms,
+            replay_jitter_ms=settings.data_provider_replay_jitter_ms,
+        )
+        if mode != ProviderMode.LIVE:
+            logger.info(f"Data provider in {mode.value} mode (archive: {archive.root})")
+    return _data_provider
+
+
+def set_data_provider(provider: Optional[DataProvider]) -> None:
+    """Replace the global provider (benchmarks, tests); None re-reads settings"""
+    global _data_provider
+    _data_provider = provider
@@ -0,0 +1,36 @@
+"""
+Regular trading hours for the exchanges the app covers
+
+Used to decide how often market data needs refreshing; exchange holidays are
+not modelled, so a holiday is treated as an ordinary trading day.
+"""
+from __future__ import annotations
+
+from datetime import datetime, time as dtime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# name -> (timezone, open, close); Monday-Friday only
+MARKET_SESSIONS = {
+    "IN": (ZoneInfo("Asia/Kolkata"), dtime(9, 15), dtime(15, 30)),
+    "US": (ZoneInfo("America/New_York"), dtime(9, 30), dtime(16, 0)),
+}
+
+
+def market_for_ticker(ticker: str) -> str:
+    """Exchange session a Yahoo symbol trades in (``.NS`` / ``.BO`` / ``^NSEI`` -> IN)"""
+    symbol = ticker.upper()
+    if symbol.endswith((".NS", ".BO")) or symbol in ("^NSEI", "^BSESN", "^NSEBANK"):
+        return "IN"
+    return "US"
+
+
+def is_market_open(market: str, now: Optional[datetime] = None) -> bool:
+    """Whether ``market`` is inside its regular session at ``now`` (default: current time)"""
+    tz, open_at, close_at = MARKET_SESSIONS[market]
+    local = (now or datetime.now(tz)).astimezone(tz)
+    return local.weekday() < 5 and open_at <= local.time() < close_at
+
+
+def any_market_open(now: Optional[datetime] = None) -> bool:
+    return any(is_market_open(market, now) for market in MARKET_SESSIONS)
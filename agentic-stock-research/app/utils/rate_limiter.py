@@ -8,7 +8,7 @@ to handle API failures gracefully and prevent system overload.
 import asyncio
 import logging
 import time
-from typing import Dict, Any, Optional, List, Callable, Type
+from typing import Dict, Any, Optional, List, Callable, Sequence, Tuple, Type
 from dataclasses import dataclass, field
 from enum import Enum
 import aiohttp
@@ -16,6 +16,9 @@ import yfinance as yf
 import pandas as pd
 from functools import wraps
 
+from app.cache.lru import SizedLRUCache
+from app.utils.data_provider import get_data_provider
+
 logger = logging.getLogger(__name__)
 
 
@@ -399,67 +402,182 @@ def rate_limited(service: str):
     return decorator
 
 
+def symbol_variants(ticker: str) -> List[str]:
+    """Yahoo symbols to try for ``ticker``: X.NS -> X -> X.BO for NSE listings"""
+    if ticker.endswith('.NS'):
+        base = ticker[:-len('.NS')]
+        return [ticker, base, base + '.BO']
+    return [ticker]
+
+
+class SymbolResolver:
+    """
+    Memo of which Yahoo symbol variant actually carries data for a ticker.
+
+    ``candidates`` puts the last working variant first and drops variants that
+    recently came back empty, so repeat lookups go straight to the right
+    symbol instead of walking the .NS -> raw -> .BO chain every time. Entries
+    are kept in-process and mirrored to the shared cache so they survive
+    restarts and are shared between workers. Negative entries are per data
+    kind ("prices" / "info") and expire sooner than resolutions.
+
+    yfinance answers network errors and throttling with empty results, so a
+    variant is only recorded as empty when a sibling variant of the same
+    ticker returned data in the same lookup; a lookup where every variant
+    came back empty records nothing. The ticker's own symbol is never skipped.
+    """
+
+    def __init__(self, resolution_ttl: int = 7 * 24 * 3600, negative_ttl: int = 1800):
+        self.resolution_ttl = resolution_ttl
+        self.negative_ttl = negative_ttl
+        self._resolved: Dict[str, Tuple[str, float]] = {}  # "kind:ticker" -> (symbol, expiry)
+        self._negative: Dict[str, float] = {}  # "kind:symbol" -> expiry
+        self.stats = {"resolved_hits": 0, "negative_skips": 0, "recorded_misses": 0}
+
+    @staticmethod
+    async def _shared_cache():
+        from app.cache.redis_cache import get_cache_manager
+        return await get_cache_manager()
+
+    async def _is_negative(self, kind: str, symbol: str) -> bool:
+        key = f"{kind}:{symbol}"
+        expiry = self._negative.get(key)
+        if expiry is None:
+            try:
+                cache = await self._shared_cache()
+                if await cache.get(f"symbol_negative:{key}"):
+                    expiry = self._negative[key] = time.time() + self.negative_ttl
+            except Exception:
+                return False
+        if expiry is None:
+            return False
+        if time.time() >= expiry:
+            self._negative.pop(key, None)
+            return False
+        return True
+
+    async def _resolved_symbol(self, kind: str, ticker: str) -> Optional[str]:
+        key = f"{kind}:{ticker}"
+        entry = self._resolved.get(key)
+        if entry is not None and time.time() < entry[1]:
+            return entry[0]
+        try:
+            cache = await self._shared_cache()
+            symbol = await cache.get(f"symbol_resolution:{key}")
+        except Exception:
+            symbol = None
+        if symbol:
+            self._resolved[key] = (symbol, time.time() + self.resolution_ttl)
+        return symbol
+
+    async def candidates(self, ticker: str, kind: str) -> List[str]:
+        variants = symbol_variants(ticker)
+        if len(variants) == 1:
+            return variants
+        resolved = await self._resolved_symbol(kind, ticker)
+        if resolved in variants:
+            self.stats["resolved_hits"] += 1
+            variants = [resolved] + [v for v in variants if v != resolved]
+        ordered = []
+        for symbol in variants:
+            if symbol not in (resolved, ticker) and await self._is_negative(kind, symbol):
+                self.stats["negative_skips"] += 1
+                continue
+            ordered.append(symbol)
+        return ordered
+
+    async def record_hit(self, ticker: str, symbol: str, kind: str, missed: Sequence[str] = ()) -> None:
+        """Remember ``symbol`` as the working variant; ``missed`` are siblings that came back empty before it"""
+        for other in missed:
+            await self.record_miss(ticker, other, kind)
+        key = f"{kind}:{ticker}"
+        self._negative.pop(f"{kind}:{symbol}", None)
+        known = self._resolved.get(key)
+        if known is not None and known[0] == symbol and time.time() < known[1]:
+            return
+        self._resolved[key] = (symbol, time.time() + self.resolution_ttl)
+        try:
+            cache = await self._shared_cache()
+            await cache.set(f"symbol_resolution:{key}", symbol, ttl=self.resolution_ttl)
+        except Exception as e:
+            logger.debug(f"Could not persist symbol resolution {ticker} -> {symbol}: {e}")
+
+    async def record_miss(self, ticker: str, symbol: str, kind: str) -> None:
+        """Skip ``symbol`` for a while; only call once a sibling variant has returned data"""
+        if len(symbol_variants(ticker)) == 1:
+            return
+        key = f"{kind}:{symbol}"
+        self.stats["recorded_misses"] += 1
+        self._negative[key] = time.time() + self.negative_ttl
+        resolved = self._resolved.get(f"{kind}:{ticker}")
+        stale_resolution = resolved is not None and resolved[0] == symbol
+        if stale_resolution:
+            self._resolved.pop(f"{kind}:{ticker}", None)
+        try:
+            cache = await self._shared_cache()
+            await cache.set(f"symbol_negative:{key}", True, ttl=self.negative_ttl)
+            if stale_resolution:
+                await cache.delete(f"symbol_resolution:{kind}:{ticker}")
+        except Exception as e:
+            logger.debug(f"Could not persist negative entry for {symbol}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "resolved_symbols": len(self._resolved),
+            "negative_entries": len(self._negative),
+            **self.stats,
+        }
+
+
 # Enhanced Yahoo Finance wrapper
 class YahooFinanceClient:
     """Enhanced Yahoo Finance client with rate limiting"""
     
     def __init__(self):
+        from app.config import get_settings
+
+        settings = get_settings()
         self.client = get_api_client("yahoo_finance")
-        self.cache = {}  # Simple in-memory cache
+        self.resolver = SymbolResolver()
+        # Bounded per-process cache of downloaded frames (LRU + TTL + byte budget)
+        self.cache = SizedLRUCache(
+            max_entries=settings.yahoo_cache_max_entries,
+            max_bytes=settings.yahoo_cache_max_mb * 1024 * 1024,
+            ttl=settings.yahoo_cache_ttl_seconds,
+        )
         
     async def download(self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
         """Download stock data with rate limiting and fallback for Indian stocks"""
         cache_key = f"{ticker}_{period}_{interval}"
         
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Simple rate limiting for yfinance calls
         await self.client.rate_limiter.acquire()
         try:
-            # Use yfinance in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(
-                None,
-                lambda: yf.download(ticker, period=period, interval=interval, progress=False, auto_adjust=True)
-            )
-            
-            # If we got data, cache and return it
-            if not data.empty:
-                self.cache[cache_key] = data
-                return data
-            
-            # For Indian stocks (.NS), try alternative symbol formats
-            if ticker.endswith('.NS'):
-                logger.warning(f"No price data found for {ticker}, trying alternative formats")
-                
-                # Try without .NS suffix
-                alt_ticker = ticker.replace('.NS', '')
+            # yfinance runs on the data I/O pool (or is replayed) via the data provider
+            provider = get_data_provider()
+            empty: List[str] = []
+            # Known-good variant first, known-empty variants skipped (.NS -> raw -> .BO)
+            for symbol in await self.resolver.candidates(ticker, "prices"):
                 try:
-                    data_alt = await loop.run_in_executor(
-                        None,
-                        lambda: yf.download(alt_ticker, period=period, interval=interval, progress=False, auto_adjust=True)
+                    data = await provider.call(
+                        "download", symbol, {"period": period, "interval": interval},
+                        lambda: yf.download(symbol, period=period, interval=interval, progress=False, auto_adjust=True)
                     )
-                    if not data_alt.empty:
-                        logger.info(f"Found price data for {alt_ticker} (alternative format)")
-                        self.cache[cache_key] = data_alt
-                        return data_alt
                 except Exception as e:
-                    logger.debug(f"Alternative format {alt_ticker} also failed: {e}")
+                    logger.debug(f"Price download for {symbol} failed: {e}")
+                    continue
                 
-                # Try BSE format (.BO)
-                bse_ticker = alt_ticker + '.BO'
-                try:
-                    data_bse = await loop.run_in_executor(
-                        None,
-                        lambda: yf.download(bse_ticker, period=period, interval=interval, progress=False, auto_adjust=True)
-                    )
-                    if not data_bse.empty:
-                        logger.info(f"Found price data for {bse_ticker} (BSE format)")
-                        self.cache[cache_key] = data_bse
-                        return data_bse
-                except Exception as e:
-                    logger.debug(f"BSE format {bse_ticker} also failed: {e}")
+                if not data.empty:
+                    if symbol != ticker:
+                        logger.info(f"Found price data for {ticker} as {symbol}")
+                    await self.resolver.record_hit(ticker, symbol, "prices", missed=empty)
+                    self.cache[cache_key] = data
+                    return data
+                empty.append(symbol)
             
             logger.warning(f"No data returned for {ticker} from any format")
             return pd.DataFrame()
@@ -470,49 +588,120 @@ class YahooFinanceClient:
         finally:
             self.client.rate_limiter.release()
     
+    async def download_many(
+        self, tickers: List[str], period: str = "1y", interval: str = "1d"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Download several symbols with one multi-ticker ``yf.download`` call.
+
+        Takes a single rate-limiter slot for the whole batch and splits the
+        ticker-grouped MultiIndex result into per-symbol frames by column
+        selection. Symbols with no rows are omitted so callers can retry them
+        through the per-symbol ``download`` fallback chain.
+        """
+        if not tickers:
+            return {}
+
+        await self.client.rate_limiter.acquire()
+        try:
+            data = await get_data_provider().call(
+                "download_many", ",".join(tickers), {"period": period, "interval": interval},
+                lambda: yf.download(
+                    tickers, period=period, interval=interval, group_by="ticker",
+                    progress=False, auto_adjust=True, threads=True,
+                )
+            )
+        except Exception as e:
+            logger.error(f"Batched download failed for {len(tickers)} tickers: {e}")
+            return {}
+        finally:
+            self.client.rate_limiter.release()
+
+        if data is None or data.empty:
+            return {}
+
+        frames: Dict[str, pd.DataFrame] = {}
+        is_multi = isinstance(data.columns, pd.MultiIndex)
+        top_level = set(data.columns.get_level_values(0)) if is_multi else set()
+        for ticker in tickers:
+            if is_multi:
+                if ticker not in top_level:
+                    continue
+                frame = data[ticker]
+            elif len(tickers) == 1:
+                frame = data
+            else:
+                continue
+
+            # Mixed-calendar batches (e.g. NSE + NYSE) leave all-NaN rows for closed sessions
+            empty_rows = frame.isna().all(axis=1)
+            if empty_rows.all():
+                continue
+            if empty_rows.any():
+                frame = frame[~empty_rows]
+
+            frames[ticker] = frame
+            self.cache[f"{ticker}_{period}_{interval}"] = frame
+
+        return frames
+
+    async def download_since(self, ticker: str, start: pd.Timestamp, interval: str = "1d") -> pd.DataFrame:
+        """
+        Download bars from ``start`` (inclusive) to now for an incremental refresh.
+
+        Bypasses the per-period cache since the window is open-ended; .NS symbols
+        go through the same resolved/fallback symbol chain as ``download``.
+        """
+        start_date = pd.Timestamp(start).strftime("%Y-%m-%d")
+
+        await self.client.rate_limiter.acquire()
+        try:
+            provider = get_data_provider()
+            for symbol in await self.resolver.candidates(ticker, "prices"):
+                try:
+                    data = await provider.call(
+                        "download_since", symbol, {"start": start_date, "interval": interval},
+                        lambda: yf.download(symbol, start=start_date, interval=interval, progress=False, auto_adjust=True)
+                    )
+                except Exception as e:
+                    logger.debug(f"Delta download for {symbol} since {start_date} failed: {e}")
+                    continue
+                if data is not None and not data.empty:
+                    await self.resolver.record_hit(ticker, symbol, "prices")
+                    return data
+                # An empty window can just mean no new sessions, so it is not a negative result
+            return pd.DataFrame()
+        finally:
+            self.client.rate_limiter.release()
+
     async def get_info(self, ticker: str) -> Dict[str, Any]:
         """Get stock info with rate limiting and fallback for Indian stocks"""
         # Simple rate limiting for yfinance calls
         await self.client.rate_limiter.acquire()
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Try the original ticker first
-            stock = await loop.run_in_executor(None, lambda: yf.Ticker(ticker))
-            info = await loop.run_in_executor(None, lambda: stock.info)
-            
-            # If we got data, return it
-            if info and len(info) > 5:  # Basic validation - should have more than 5 fields
-                return info
+            provider = get_data_provider()
+            info: Dict[str, Any] = {}
+            empty: List[str] = []
             
-            # For Indian stocks (.NS), try alternative symbol formats
-            if ticker.endswith('.NS'):
-                logger.warning(f"No data found for {ticker}, trying alternative formats")
-                
-                # Try without .NS suffix
-                alt_ticker = ticker.replace('.NS', '')
+            # Known-good variant first, known-empty variants skipped (.NS -> raw -> .BO)
+            for symbol in await self.resolver.candidates(ticker, "info"):
                 try:
-                    stock_alt = await loop.run_in_executor(None, lambda: yf.Ticker(alt_ticker))
-                    info_alt = await loop.run_in_executor(None, lambda: stock_alt.info)
-                    if info_alt and len(info_alt) > 5:
-                        logger.info(f"Found data for {alt_ticker} (alternative format)")
-                        return info_alt
+                    candidate = await provider.call("info", symbol, {}, lambda: yf.Ticker(symbol).info)
                 except Exception as e:
-                    logger.debug(f"Alternative format {alt_ticker} also failed: {e}")
+                    logger.debug(f"Info fetch for {symbol} failed: {e}")
+                    continue
                 
-                # Try BSE format (.BO)
-                bse_ticker = alt_ticker + '.BO'
-                try:
-                    stock_bse = await loop.run_in_executor(None, lambda: yf.Ticker(bse_ticker))
-                    info_bse = await loop.run_in_executor(None, lambda: stock_bse.info)
-                    if info_bse and len(info_bse) > 5:
-                        logger.info(f"Found data for {bse_ticker} (BSE format)")
-                        return info_bse
-                except Exception as e:
-                    logger.debug(f"BSE format {bse_ticker} also failed: {e}")
+                if candidate and len(candidate) > 5:  # Basic validation - should have more than 5 fields
+                    if symbol != ticker:
+                        logger.info(f"Found data for {ticker} as {symbol}")
+                    await self.resolver.record_hit(ticker, symbol, "info", missed=empty)
+                    return candidate
+                empty.append(symbol)
+                if symbol == ticker:
+                    info = candidate or {}
             
             # Return whatever we got (even if empty)
-            return info or {}
+            return info
             
         except Exception as e:
             logger.error(f"Failed to fetch info for {ticker}: {e}")
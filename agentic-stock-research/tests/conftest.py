@@ -6,6 +6,10 @@ import pytest
 import os
 from pathlib import Path
 
+# Keep test runs independent of the host-local cache tiers
+os.environ.setdefault("DISK_CACHE_ENABLED", "false")
+os.environ.setdefault("SHARED_CACHE_ENABLED", "false")
+
 
 @pytest.fixture
 def test_ticker():
@@ -0,0 +1,113 @@
+"""
+Tests for streaming research graph progress as server-sent events
+"""
+import asyncio
+
+import numpy as np
+import orjson
+from langgraph.graph import END, StateGraph
+
+from app.graph.state import ResearchState
+from app.graph.streaming import stream_analysis_events
+
+
+def _parse(message: bytes):
+    event, data = message.decode().rstrip("\n").split("\n")
+    return event.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))
+
+
+def _graph(synthesis_output):
+    async def technicals(state):
+        # Nodes commonly return the whole state, including sections of earlier nodes
+        return {**state, "analysis": {"technicals": {"rsi": np.float64(55.5)}}, "confidences": {"technicals": 0.8}}
+
+    async def news(state):
+        return {**state, "analysis": {**state["analysis"], "news_sentiment": {"score": 0.2}}}
+
+    async def degraded(state):
+        return {"confidences": {"filings": 0.0}, "degraded": ["filings"]}
+
+    async def synthesis(state):
+        return {"final_output": synthesis_output}
+
+    graph = StateGraph(ResearchState)
+    for name, fn in (("technicals", technicals), ("news_sentiment", news), ("filing_analysis", degraded), ("synthesis", synthesis)):
+        graph.add_node(name, fn)
+    graph.set_entry_point("technicals")
+    graph.add_edge("technicals", "news_sentiment")
+    graph.add_edge("technicals", "filing_analysis")
+    graph.add_edge("news_sentiment", "synthesis")
+    graph.add_edge("filing_analysis", "synthesis")
+    graph.add_edge("synthesis", END)
+    return graph.compile()
+
+
+def _collect(graph):
+    async def run():
+        return [_parse(m) async for m in stream_analysis_events(graph, {"tickers": ["AAPL"]})]
+    return asyncio.run(run())
+
+
+def test_each_node_is_streamed_once_then_the_response():
+    events = _collect(_graph({"tickers": ["AAPL"], "reports": [], "generated_at": "now", "degraded_sections": ["filings"]}))
+    nodes = {data["node"]: data for event, data in events if event == "node"}
+
+    assert events[0] == ("node", {"node": "technicals", "analysis": {"technicals": {"rsi": 55.5}}, "confidences": {"technicals": 0.8}})
+    assert nodes["news_sentiment"]["analysis"] == {"news_sentiment": {"score": 0.2}}
+    assert nodes["filing_analysis"]["degraded"] is True
+    assert events[-1][0] == "result"
+    assert events[-1][1]["degraded_sections"] == ["filings"]
+
+
+def test_failures_end_the_stream_with_an_error_event():
+    events = _collect(_graph({"reports": []}))  # not a valid ResearchResponse
+    assert events[-1][0] == "error"
+
+
+def test_outcome_is_reported_once_before_the_last_event():
+    outcomes = []
+
+    async def run(graph):
+        messages = []
+        async for message in stream_analysis_events(
+            graph, {"tickers": ["AAPL"]}, on_complete=lambda out, error: outcomes.append((out, error))
+        ):
+            messages.append(message)
+            assert len(outcomes) == 0 or message is messages[-1]
+        return messages
+
+    asyncio.run(run(_graph({"tickers": ["AAPL"], "reports": [], "generated_at": "now"})))
+    asyncio.run(run(_graph({"reports": []})))
+    (ok, ok_error), (failed, error) = outcomes
+    assert ok.tickers == ["AAPL"] and ok_error is None
+    assert failed is None and error
+
+
+def test_run_config_reaches_the_graph_and_the_stream_is_timed():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    from app.utils.async_utils import monitor_performance
+
+    class Recorder(BaseCallbackHandler):
+        def __init__(self):
+            self.chains = 0
+
+        def on_chain_start(self, *args, **kwargs):
+            self.chains += 1
+
+    recorder, timings = Recorder(), []
+    graph = _graph({"tickers": ["AAPL"], "reports": [], "generated_at": "now"})
+
+    @monitor_performance("stock_analysis")
+    async def events():
+        async for message in stream_analysis_events(graph, {"tickers": ["AAPL"]}, {"callbacks": [recorder]}):
+            yield message
+
+    events._performance_monitor = type("Monitor", (), {"record_timing": lambda self, op, s: timings.append(op)})()
+
+    async def run():
+        return [_parse(m) async for m in events()]
+
+    assert asyncio.run(run())[-1][0] == "result"
+    assert recorder.chains > 0
+    assert timings == ["stock_analysis"]
@@ -0,0 +1,54 @@
+"""
+Tests for the instrumented data I/O executor
+"""
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.utils.async_utils import InstrumentedExecutor
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class TestInstrumentedExecutor:
+    """Named pool that reports queue depth, wait and run time"""
+
+    def test_runs_on_named_threads_with_context(self):
+        pool = InstrumentedExecutor("data-io-test", max_workers=2)
+
+        def work():
+            return threading.current_thread().name, _request_id.get()
+
+        async def run():
+            _request_id.set("req-1")
+            return await pool.run(work)
+
+        thread_name, request_id = asyncio.run(run())
+        assert thread_name.startswith("data-io-test")
+        assert request_id == "req-1"
+
+    def test_tracks_queue_wait_and_failures(self):
+        pool = InstrumentedExecutor("data-io-test", max_workers=1)
+
+        def slow():
+            time.sleep(0.05)
+
+        def boom():
+            raise ValueError("upstream failed")
+
+        async def run():
+            await asyncio.gather(pool.run(slow), pool.run(slow), pool.run(slow))
+            with pytest.raises(ValueError):
+                await pool.run(boom)
+
+        asyncio.run(run())
+        stats = pool.get_stats()
+        assert stats["completed"] == 3 and stats["failed"] == 1
+        assert stats["peak_queued"] >= 2
+        assert stats["queued"] == 0 and stats["running"] == 0
+        # With one worker the last sleeper waits behind the other two
+        assert stats["max_wait_ms"] >= 80
+        assert stats["avg_run_ms"] >= 30
@@ -0,0 +1,121 @@
+"""
+Tests for the tagged binary cache codecs
+"""
+import asyncio
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cache import codecs
+from app.cache.codecs import CacheCodec, CodecError
+from app.cache.redis_cache import CacheManager
+
+
+def _frame(rows=500):
+    idx = pd.date_range("2022-01-03", periods=rows, freq="D", tz="UTC")
+    return pd.DataFrame({"Close": np.linspace(100, 200, rows), "Volume": np.arange(rows)}, index=idx)
+
+
+class TestCacheCodec:
+    """Values round-trip through the cheapest safe format"""
+
+    @pytest.mark.skipif(not codecs.PYARROW_AVAILABLE, reason="pyarrow not installed")
+    def test_dataframe_uses_arrow(self):
+        codec = CacheCodec()
+        encoded = codec.encode(_frame())
+        assert encoded[1:2] == codecs.FORMAT_ARROW
+        pd.testing.assert_frame_equal(codec.decode(encoded), _frame(), check_freq=False)
+
+    def test_plain_dict_uses_json(self):
+        codec = CacheCodec()
+        value = {"symbol": "AAPL", "price": np.float64(1.5), "tags": ["a", None]}
+        encoded = codec.encode(value)
+        assert encoded[1:2] == codecs.FORMAT_JSON
+        assert codec.decode(encoded) == {"symbol": "AAPL", "price": 1.5, "tags": ["a", None]}
+
+    @pytest.mark.skipif(not (codecs.MSGPACK_AVAILABLE and codecs.PYARROW_AVAILABLE), reason="msgpack/pyarrow missing")
+    def test_nested_frames_and_datetimes_use_msgpack(self):
+        codec = CacheCodec()
+        frame = _frame(10)
+        value = {"data": frame, "last_bar": frame.index[-1], "at": datetime(2024, 5, 1, 9, 30), "pe": float("nan")}
+        encoded = codec.encode(value)
+        assert encoded[1:2] == codecs.FORMAT_MSGPACK
+        decoded = codec.decode(encoded)
+        pd.testing.assert_frame_equal(decoded["data"], frame, check_freq=False)
+        assert decoded["last_bar"] == frame.index[-1]
+        assert decoded["at"] == datetime(2024, 5, 1, 9, 30)
+        assert np.isnan(decoded["pe"])
+
+    @pytest.mark.skipif(not (codecs.ZSTD_AVAILABLE or codecs.LZ4_AVAILABLE), reason="no compressor installed")
+    def test_large_payloads_are_compressed(self):
+        codec = CacheCodec(compression_min_bytes=1024)
+        value = {"rows": ["same row of text"] * 1000}
+        encoded = codec.encode(value)
+        assert encoded[2:3] != codecs.COMPRESSION_NONE
+        assert codec.decode(encoded) == value
+        assert codec.get_stats()["compression_ratio"] > 1
+
+    def test_pickle_is_refused_when_disabled(self):
+        codec = CacheCodec(allow_pickle=False)
+        with pytest.raises(CodecError):
+            codec.encode({1, 2, 3})
+        with pytest.raises(CodecError):
+            codec.decode(pickle.dumps({"legacy": True}))
+
+    def test_pickle_is_off_by_default(self):
+        with pytest.raises(CodecError):
+            CacheCodec().decode(pickle.dumps({"legacy": True}))
+
+    def test_legacy_pickle_entries_read_only_during_migration(self):
+        codec = CacheCodec(pickle_migration=True)
+        assert codec.decode(pickle.dumps({"legacy": True})) == {"legacy": True}
+        assert codec.decode(CacheCodec(allow_pickle=True).encode({1, 2})) == {1, 2}
+        with pytest.raises(CodecError):
+            codec.encode({1, 2})
+
+    def test_uncacheable_types_are_reported_once(self, caplog):
+        codec = CacheCodec()
+        with caplog.at_level("WARNING", logger="app.cache.codecs"):
+            for _ in range(3):
+                with pytest.raises(CodecError):
+                    codec.encode(object())
+        assert [r.getMessage() for r in caplog.records] == [
+            "Cache values of type object have no safe codec and are not cached"
+        ]
+        assert codec.stats["rejected"] == 3
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    async def setex(self, key, ttl, data):
+        self.store[key] = data
+
+
+class TestCacheManagerSerialization:
+    """CacheManager writes framed bytes to Redis instead of pickles"""
+
+    def test_redis_values_are_encoded(self):
+        cache = CacheManager(codec=CacheCodec(allow_pickle=False))
+        cache.redis_client, cache._connected, cache._use_redis = _FakeRedis(), True, True
+
+        async def run():
+            stored = await cache.set("info:AAPL", {"sector": "Technology"})
+            skipped = await cache.set("opaque", object())
+            return stored, skipped, await cache.get("info:AAPL")
+
+        stored, skipped, value = asyncio.run(run())
+        assert (stored, skipped) == (True, False)
+        assert value == {"sector": "Technology"}
+        assert cache.redis_client.store["info:AAPL"].startswith(codecs.MAGIC)
+        assert "opaque" not in cache.redis_client.store
@@ -0,0 +1,248 @@
+"""
+Tests for CacheManager bulk operations (MGET / pipelined SETEX), the L1 tier,
+tag invalidation and stampede protection
+"""
+import asyncio
+
+import pandas as pd
+
+from app.cache.optimized_cache import OptimizedCacheManager
+from app.cache.redis_cache import CacheManager
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, data):
+        self.commands.append(("setex", key, ttl, data))
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    def pttl(self, key):
+        self.commands.append(("pttl", key))
+
+    def sadd(self, key, member):
+        self.commands.append(("sadd", key, member))
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", key, ttl))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        replies = []
+        for op, key, *args in self.commands:
+            if op == "setex":
+                self.redis.store[key], self.redis.ttls[key] = args[1], args[0]
+                replies.append(True)
+            elif op == "get":
+                replies.append(self.redis.store.get(key))
+            elif op == "sadd":
+                self.redis.sets.setdefault(key, set()).add(args[0])
+                replies.append(1)
+            elif op == "expire":
+                replies.append(True)
+            else:
+                replies.append(self.redis.ttls[key] * 1000 if key in self.redis.store else -2)
+        return replies
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store, self.ttls, self.sets = {}, {}, {}
+        self.round_trips = 0
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def scan_iter(self, match):
+        self.round_trips += 1
+        needle = match.strip("*")
+        for key in list(self.store):
+            if needle in key:
+                yield key.encode()
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def run_invalidate_script(self, keys):
+        """Stands in for the tag invalidation Lua script"""
+        self.round_trips += 1
+        members = sorted(self.sets.pop(keys[0], set()))
+        for key in members:
+            self.store.pop(key, None)
+        return [k.encode() for k in members]
+
+
+def _redis_cache():
+    cache = CacheManager(ttl_jitter=0)
+    cache.redis_client, cache._connected, cache._use_redis = _FakeRedis(), True, True
+    cache._invalidate_script = cache.redis_client.run_invalidate_script
+    return cache
+
+
+class TestBulkOperations:
+    """Many keys cost a handful of round-trips"""
+
+    def test_redis_bulk_round_trips_and_per_key_ttls(self):
+        cache = _redis_cache()
+        items = {f"info:T{i}": {"symbol": f"T{i}"} for i in range(1200)}
+
+        async def run():
+            await cache.set_many(items, ttl=60, ttls={"info:T0": 3600})
+            return await cache.get_many(list(items) + ["info:MISSING"])
+
+        found = asyncio.run(run())
+        assert found == items
+        assert cache.redis_client.round_trips == 6  # 3 pipelines + 3 MGETs of <= 500 keys
+        assert cache.redis_client.ttls["info:T0"] == 3600
+        assert cache.redis_client.ttls["info:T1"] == 60
+        assert cache.get_cache_stats()["misses"] == 1
+
+    def test_memory_fallback_matches_redis_semantics(self):
+        cache = CacheManager()
+        cache._use_redis = False
+        frame = pd.DataFrame({"Close": [1.0, 2.0]})
+
+        async def run():
+            await cache.set_many_ohlcv({"AAPL": frame}, period="1y", interval="1d")
+            await cache.set_many({"short": 1}, ttl=60, ttls={"short": -1})  # already expired
+            return await cache.get_many_ohlcv(["AAPL", "MSFT"]), await cache.get_many(["short"])
+
+        ohlcv, expired = asyncio.run(run())
+        assert list(ohlcv) == ["AAPL"]
+        pd.testing.assert_frame_equal(ohlcv["AAPL"], frame)
+        assert expired == {}
+
+
+class TestOptimizedCacheL1:
+    """The L1 tier keeps the TTL an entry has left in Redis"""
+
+    def test_read_through_carries_remaining_ttl(self):
+        redis_cache = _redis_cache()
+        layered = OptimizedCacheManager(redis_cache)
+
+        async def run():
+            await redis_cache.set_many({"info:AAPL": {"symbol": "AAPL"}}, ttl=120)
+            first = await layered.get_company_info("AAPL")
+            trips = redis_cache.redis_client.round_trips
+            second = await layered.get_company_info("AAPL")
+            return first, second, trips
+
+        first, second, trips = asyncio.run(run())
+        assert first == second == {"symbol": "AAPL"}
+        assert redis_cache.redis_client.round_trips == trips  # served from L1
+        assert 0 < layered.memory_cache.ttl_remaining("info:AAPL") <= 120
+
+
+class TestTagInvalidation:
+    """clear_ticker deletes exactly the keys belonging to that symbol"""
+
+    def test_redis_clear_ticker_does_not_touch_similar_symbols(self):
+        redis_cache = _redis_cache()
+        layered = OptimizedCacheManager(redis_cache)
+
+        async def run():
+            await layered.set_company_info("TCS", {"symbol": "TCS"})
+            await layered.set_many_ohlcv({"TCS": pd.DataFrame(), "TCSX": pd.DataFrame()})
+            await layered.set_company_info("TCSX", {"symbol": "TCSX"})
+            trips = redis_cache.redis_client.round_trips
+            await layered.clear_ticker("TCS")
+            return trips
+
+        trips = asyncio.run(run())
+        assert redis_cache.redis_client.round_trips == trips + 1  # one script call, no SCAN
+        assert set(redis_cache.redis_client.store) == {layered.info_key("TCSX"), layered.ohlcv_key("TCSX")}
+        assert layered.memory_cache.get(layered.info_key("TCS")) is None
+        assert layered.memory_cache.get(layered.info_key("TCSX")) == {"symbol": "TCSX"}
+
+    def test_memory_fallback_uses_the_same_index(self):
+        cache = CacheManager()
+        cache._use_redis = False
+
+        async def run():
+            await cache.set_company_info("TCS", {"symbol": "TCS"})
+            await cache.set_company_info("TCSX", {"symbol": "TCSX"})
+            await cache.clear_ticker("tcs")
+            return await cache.get_company_info("TCS"), await cache.get_company_info("TCSX")
+
+        assert asyncio.run(run()) == (None, {"symbol": "TCSX"})
+        assert cache._memory_tags == {"tag:ticker:TCSX": {cache._make_key("info", "TCSX")}}
+
+
+    def test_untagged_keys_are_cleared_by_whole_token_only_on_request(self):
+        redis_cache = _redis_cache()
+        store = redis_cache.redis_client.store
+        for key in ("sec_insider_transactions:TCS:90", "ticker_cik:TCS", "valuepickr:TCSX", "indian_filing_analysis:TCSX"):
+            store[key] = b"legacy"
+        redis_cache._memory_cache.set("earnings_transcripts_TCS_4", [])
+        redis_cache._memory_cache.set("earnings_transcripts_TCSX_4", [])
+
+        assert asyncio.run(redis_cache.clear_ticker("TCS"))
+        assert len(store) == 4  # untagged keys are only scanned for on request
+        assert asyncio.run(redis_cache.clear_ticker("TCS", include_untagged=True))
+        assert set(store) == {"valuepickr:TCSX", "indian_filing_analysis:TCSX"}
+        assert redis_cache._memory_cache.keys() == ["earnings_transcripts_TCSX_4"]
+
+
+class TestStampedeProtection:
+    """Keys written together expire apart and one worker refreshes a hot key"""
+
+    def test_jitter_spreads_expiry_below_requested_ttl(self):
+        cache = CacheManager(ttl_jitter=0.1)
+        ttls = {cache.effective_ttl(f"info:T{i}", 3600) for i in range(200)}
+        assert len(ttls) > 100
+        assert all(3240 <= t <= 3600 for t in ttls)
+        assert cache.effective_ttl("info:T1", 3600) == cache.effective_ttl("info:T1", 3600)
+
+    def test_refresh_lock_lets_one_worker_recompute(self):
+        shared = CacheManager(ttl_jitter=0)
+        shared._use_redis = False
+        workers = [OptimizedCacheManager(shared, xfetch_beta=0) for _ in range(3)]
+        refreshes = []
+
+        async def refresh():
+            refreshes.append(1)
+            await asyncio.sleep(0.05)
+            await workers[0].set("info:AAPL", {"v": 2}, ttl=3600)
+
+        async def run():
+            await shared.set("info:AAPL", {"v": 1}, ttl=600)  # 3000s old against a 3600s hard TTL
+            served = await asyncio.gather(
+                *(w.get_stale_while_revalidate("info:AAPL", refresh, 900, 3600) for w in workers)
+            )
+            await asyncio.sleep(0.1)
+            return served
+
+        served = asyncio.run(run())
+        assert served == [{"v": 1}] * 3
+        assert len(refreshes) == 1
+        assert sum(w.swr_stats["lock_contended"] for w in workers) == 2
+        assert shared._memory_locks == {}
+
+    def test_xfetch_refreshes_fresh_values_early(self):
+        cache = CacheManager(ttl_jitter=0)
+        cache._use_redis = False
+        eager = OptimizedCacheManager(cache, xfetch_beta=1e6)
+        refreshed = []
+
+        async def refresh():
+            refreshed.append(1)
+
+        async def run():
+            await eager.set("info:AAPL", {"v": 1}, ttl=3600)
+            value = await eager.get_stale_while_revalidate("info:AAPL", refresh, 900, 3600)
+            await asyncio.sleep(0)
+            return value
+
+        assert asyncio.run(run()) == {"v": 1}
+        assert refreshed == [1]
+        assert eager.swr_stats["early_refreshes"] == 1 and eager.swr_stats["stale_served"] == 0
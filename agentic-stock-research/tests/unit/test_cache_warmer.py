@@ -0,0 +1,98 @@
+"""
+Tests for access-frequency tracking and the hot-key cache warmer
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.cache import cache_warmer
+from app.cache.access_tracker import AccessTracker, CountMinSketch
+from app.cache.cache_warmer import CacheWarmer, CacheWarmingConfig
+from app.cache.optimized_cache import OptimizedCacheManager
+from app.cache.redis_cache import CacheManager
+from app.tools.finance import INFO_HARD_TTL, INFO_SOFT_TTL
+
+
+class TestAccessTracker:
+    """Heavy hitters follow what users request and fade over time"""
+
+    def test_sketch_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(500):
+            sketch.add(f"T{i % 50}")
+        assert all(sketch.estimate(f"T{i}") >= 10 for i in range(50))
+
+    def test_top_k_and_decay(self):
+        tracker = AccessTracker(capacity=3, half_life=3600)
+        for ticker, n in (("TCS.NS", 8), ("AAPL", 5), ("INFY.NS", 3), ("MSFT", 1)):
+            for _ in range(n):
+                tracker.record(ticker, "info", hit=False)
+        assert [item for item, _ in tracker.top(2)] == [("TCS.NS", "info"), ("AAPL", "info")]
+        assert ("MSFT", "info") not in dict(tracker.top(3))
+
+        tracker._last_decay -= 3600
+        tracker.record("AAPL", "info", hit=True)
+        assert tracker.estimate("TCS.NS", "info") == 4
+
+    def test_only_hits_after_the_old_entry_would_be_stale_count(self):
+        tracker = AccessTracker()
+        tracker.mark_warmed("AAPL", "info", produces_hits_after=time.time() + 600)
+        tracker.record("AAPL", "info", hit=True)
+        tracker.mark_warmed("AAPL", "info")
+        tracker.record("AAPL", "info", hit=True)
+        assert tracker.stats["warmed_hits"] == 1
+        assert tracker.stats["unused_warms"] == 1
+
+
+@pytest.fixture
+def warmer(monkeypatch):
+    cache = CacheManager(ttl_jitter=0)
+    cache._use_redis = False
+    layered = OptimizedCacheManager(cache, xfetch_beta=0)
+    refreshed = []
+
+    async def refresh_info(ticker):
+        refreshed.append(ticker)
+        await layered.set_company_info(ticker, {"symbol": ticker, "fresh": True}, ttl=INFO_HARD_TTL)
+
+    monkeypatch.setattr(cache_warmer, "refresh_info", refresh_info)
+    monkeypatch.setattr(cache_warmer, "is_market_open", lambda market: True)
+    monkeypatch.setattr(cache_warmer, "any_market_open", lambda: True)
+    config = CacheWarmingConfig(warm_on_startup=False, top_k=2, open_interval_minutes=5)
+    warm = CacheWarmer(config, tracker=AccessTracker())
+    warm.cache = layered
+    return warm, layered, refreshed
+
+
+class TestHotKeyWarming:
+    """The warmer refreshes hot keys shortly before they go stale"""
+
+    def test_refreshes_only_hot_keys_due_before_next_run(self, warmer):
+        warm, layered, refreshed = warmer
+
+        async def run():
+            # AAPL goes stale in 2 minutes, MSFT in 50, TCS.NS is not cached; COLD is rarely requested
+            await layered.set_company_info("AAPL", {"symbol": "AAPL"}, ttl=INFO_HARD_TTL - INFO_SOFT_TTL + 120)
+            await layered.set_company_info("MSFT", {"symbol": "MSFT"}, ttl=INFO_HARD_TTL - INFO_SOFT_TTL + 3000)
+            for ticker, n in (("AAPL", 5), ("MSFT", 4), ("COLD", 1)):
+                for _ in range(n):
+                    warm.tracker.record(ticker, "info", hit=True)
+            warmed = await warm.warm_hot_keys()
+            return warmed
+
+        assert asyncio.run(run()) == 1
+        assert refreshed == ["AAPL"]
+        warm.tracker.record("AAPL", "info", hit=True)
+        stats = warm.get_warming_stats()
+        assert stats["keys_warmed"] == 1
+        assert stats["cache_hits_after_warming"] == 0  # the old entry was still fresh
+
+    def test_missing_hot_key_is_prefetched_and_hits_are_measured(self, warmer):
+        warm, layered, refreshed = warmer
+        warm.tracker.record("TCS.NS", "info", hit=False)
+
+        asyncio.run(warm.warm_hot_keys())
+        warm.tracker.record("TCS.NS", "info", hit=True)
+        assert refreshed == ["TCS.NS"]
+        assert warm.get_warming_stats()["cache_hits_after_warming"] == 1
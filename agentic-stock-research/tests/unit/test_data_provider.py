@@ -0,0 +1,84 @@
+"""
+Tests for the record/replay data provider
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.tools import ticker_snapshot
+from app.tools.ticker_snapshot import TickerSnapshot
+from app.utils import data_provider
+from app.utils.data_provider import DataProvider, FixtureArchive, ReplayMissError
+
+
+class TestRecordReplay:
+    """Responses captured in record mode are served offline in replay mode"""
+
+    def test_record_then_replay_without_upstream(self, tmp_path):
+        archive = FixtureArchive(tmp_path)
+        frame = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.date_range("2024-01-01", periods=2))
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return frame
+
+        recorder = DataProvider("record", archive)
+        asyncio.run(recorder.call("download", "AAPL", {"period": "1y", "interval": "1d"}, fetch))
+
+        def offline():
+            raise AssertionError("replay must not call upstream")
+
+        replayer = DataProvider("replay", archive)
+        replayed = asyncio.run(replayer.call("download", "AAPL", {"interval": "1d", "period": "1y"}, offline))
+        pd.testing.assert_frame_equal(replayed, frame)
+        assert calls == [1]
+        assert replayer.get_stats()["replayed"] == 1
+
+    def test_unrecorded_request_raises_in_replay(self, tmp_path):
+        replayer = DataProvider("replay", FixtureArchive(tmp_path))
+        with pytest.raises(ReplayMissError):
+            replayer.call_sync("info", "MSFT", {}, lambda: {"symbol": "MSFT"})
+        assert replayer.get_stats()["replay_misses"] == 1
+
+    def test_replay_latency_is_deterministic(self, tmp_path):
+        replayer = DataProvider("replay", FixtureArchive(tmp_path), replay_latency_ms=20, replay_jitter_ms=30)
+        first = replayer._replay_delay("info", "AAPL", {})
+        assert first == replayer._replay_delay("info", "AAPL", {})
+        assert 0.02 <= first <= 0.05
+
+    def test_snapshot_statements_replay(self, tmp_path, monkeypatch):
+        archive = FixtureArchive(tmp_path)
+        statements = pd.DataFrame({"2024": [1.0]}, index=["Total Revenue"])
+
+        class _FakeTicker:
+            def __init__(self, symbol):
+                self.financials = statements
+                self.info = {"symbol": symbol, "sector": "Technology"}
+
+        monkeypatch.setattr(ticker_snapshot.yf, "Ticker", _FakeTicker)
+        monkeypatch.setattr(data_provider, "_data_provider", DataProvider("record", archive))
+        recorded = TickerSnapshot("AAPL")
+        recorded.financials, recorded.info
+
+        monkeypatch.setattr(ticker_snapshot.yf, "Ticker", None)  # any upstream use would fail
+        monkeypatch.setattr(data_provider, "_data_provider", DataProvider("replay", archive))
+        replayed = TickerSnapshot("AAPL")
+        pd.testing.assert_frame_equal(replayed.financials, statements)
+        assert replayed.info["sector"] == "Technology"
+
+    def test_scraped_sources_replay_offline(self, tmp_path, monkeypatch):
+        from app.tools import youtube
+
+        archive = FixtureArchive(tmp_path)
+        params = {"part": "snippet", "q": "TCS results", "type": "video",
+                  "maxResults": "5", "safeSearch": "none", "order": "relevance"}
+        # Recorded without the API key
+        archive.save("youtube_search", "TCS results", params,
+                     {"items": [{"id": {"videoId": "abc"}, "snippet": {"title": "TCS Q2", "channelTitle": "CNBC"}}]})
+
+        monkeypatch.setattr(youtube.httpx, "AsyncClient", None)  # any upstream use would fail
+        monkeypatch.setattr(data_provider, "_data_provider", DataProvider("replay", archive))
+        videos = asyncio.run(youtube.search_finance_videos("TCS results", api_key="secret"))
+        assert videos == [{"title": "TCS Q2", "channel": "CNBC", "url": "https://www.youtube.com/watch?v=abc", "views": None}]
@@ -0,0 +1,76 @@
+"""
+Tests for request deadlines and per-node time budgets
+"""
+import asyncio
+import time
+
+from langgraph.graph import END, StateGraph
+
+from app.config import AppSettings
+from app.graph.deadline import budget_share, deadline_scope, node_budget, time_left
+from app.graph.state import ResearchState
+from app.graph.schedule import NodeSpec
+from app.graph.workflow import _wrap
+
+
+def test_budgets_keep_the_synthesis_reserve():
+    deadline = time.time() + 60
+    assert 44 < node_budget("technicals", deadline, reserve=15) <= 45
+    assert node_budget("synthesis", deadline, reserve=15) is None
+    assert node_budget("technicals", None, reserve=15) is None
+    assert node_budget("technicals", time.time() - 1, reserve=15) == 0.0
+
+
+def test_budgets_are_split_along_the_chain_a_node_starts():
+    dependents = {"start": ["technicals", "news"], "technicals": ["valuation"], "news": ["synthesis"],
+                  "valuation": ["synthesis"], "synthesis": []}
+    # Unknown durations weigh one each: technicals leaves half for valuation
+    assert budget_share("technicals", dependents, {}) == 0.5
+    assert budget_share("news", dependents, {}) == 1.0  # only synthesis (reserve) follows
+    assert budget_share("technicals", dependents, {"technicals": 1.0, "valuation": 3.0}) == 0.25
+    # A missing timing weighs the mean of the recorded ones
+    assert budget_share("technicals", dependents, {"technicals": 2.0, "news": 4.0}) == 2.0 / 5.0
+
+    deadline = time.time() + 60
+    assert 22 < node_budget("technicals", deadline, reserve=15, share=0.5) <= 22.5
+
+
+def test_time_left_caps_tool_timeouts_inside_the_scope():
+    with deadline_scope(time.time() + 5):
+        assert 4 < time_left(30.0) <= 5
+        assert time_left(1.0) == 1.0
+    assert time_left(30.0) == 30.0
+
+
+def test_overrunning_node_is_cancelled_and_synthesis_reports_it():
+    settings = AppSettings(ANALYSIS_SYNTHESIS_RESERVE_SECONDS=0, NODE_MEMO_ENABLED=False)
+    cancelled = []
+
+    async def fast(state, settings):
+        return {"analysis": {"technicals": {"rsi": 55}}}
+
+    async def slow(state, settings):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {"analysis": {"news_sentiment": {}}}
+
+    async def synthesis(state, settings):
+        return {"final_output": {"sections": sorted(state["analysis"]), "degraded": state.get("degraded", [])}}
+
+    graph = StateGraph(ResearchState)
+    for name, fn in (("technicals", fast), ("news_sentiment", slow), ("synthesis", synthesis)):
+        graph.add_node(name, _wrap(NodeSpec(fn, writes=(f"analysis.{name}",)), settings, name))
+    graph.set_entry_point("technicals")
+    graph.add_edge("technicals", "news_sentiment")
+    graph.add_edge("news_sentiment", "synthesis")
+    graph.add_edge("synthesis", END)
+
+    start = time.monotonic()
+    result = asyncio.run(graph.compile().ainvoke({"tickers": ["AAPL"], "deadline": time.time() + 0.2}))
+    assert time.monotonic() - start < 2
+    assert cancelled == [True]
+    assert result["final_output"] == {"sections": ["technicals"], "degraded": ["news_sentiment"]}
+    assert result["confidences"]["news_sentiment"] == 0.0
@@ -0,0 +1,93 @@
+"""
+Tests for the SQLite disk cache tier
+"""
+import asyncio
+import multiprocessing
+import time
+
+import pandas as pd
+
+from app.cache.disk_cache import DiskCache
+from app.cache.redis_cache import CacheManager, ticker_tag
+from tests.unit.test_cache_manager import _redis_cache
+
+
+def _write_many(path, worker):
+    cache = DiskCache(path)
+    for i in range(50):
+        cache.set_many([(f"w{worker}:{i}", b"x" * 100, 60)])
+
+
+class TestDiskCache:
+    """Entries expire, stay under the size budget and survive a restart"""
+
+    def test_ttl_and_persistence(self, tmp_path):
+        path = tmp_path / "cache.sqlite3"
+        DiskCache(path).set_many([("live", b"a", 60), ("dead", b"b", 0.01)])
+        time.sleep(0.02)
+        found = DiskCache(path).get_many(["live", "dead"])  # a fresh instance, as after a restart
+        assert set(found) == {"live"}
+        assert 0 < found["live"][1] <= 60
+
+    def test_evicts_least_recently_read_over_budget(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache.sqlite3", max_bytes=10_000)
+        cache.set_many([(f"k{i}", b"x" * 1000, 60) for i in range(8)])
+        with cache._transaction() as conn:  # k0 was read most recently
+            conn.execute("UPDATE entries SET accessed_at = accessed_at + 100 WHERE key = 'k0'")
+        cache.set_many([(f"n{i}", b"x" * 1000, 60) for i in range(4)])
+        cache.evict()
+        stats = cache.get_stats()
+        assert stats["entries"] <= 9 and stats["evictions"] >= 3
+        assert "k0" in cache.get_many(["k0"]) and "k1" not in cache.get_many(["k1"])
+
+    def test_concurrent_worker_processes(self, tmp_path):
+        path = tmp_path / "cache.sqlite3"
+        DiskCache(path)
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_write_many, args=(path, w)) for w in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(30)
+        assert all(p.exitcode == 0 for p in procs)
+        assert DiskCache(path).get_stats()["entries"] == 150
+
+
+class TestCacheManagerDiskTier:
+    """CacheManager reads disk before Redis and falls back to it without Redis"""
+
+    def test_redis_down_serves_from_disk_across_restarts(self, tmp_path):
+        path = tmp_path / "cache.sqlite3"
+        frame = pd.DataFrame({"Close": [1.0, 2.0]})
+
+        def manager():
+            cache = CacheManager(ttl_jitter=0, disk=DiskCache(path))
+            cache._use_redis = False
+            return cache
+
+        async def run():
+            await manager().set_many_ohlcv({"TCS": frame, "TCSX": frame})
+            restarted = manager()
+            await restarted.clear_ticker("TCS")
+            return await restarted.get_many_ohlcv(["TCS", "TCSX"])
+
+        found = asyncio.run(run())
+        assert list(found) == ["TCSX"]
+        pd.testing.assert_frame_equal(found["TCSX"], frame)
+
+    def test_redis_hits_are_written_through_to_disk(self, tmp_path):
+        cache = _redis_cache()
+        cache.disk = DiskCache(tmp_path / "cache.sqlite3")
+
+        async def run():
+            cache.redis_client.store["info:AAPL"] = cache.codec.encode({"symbol": "AAPL"})
+            cache.redis_client.ttls["info:AAPL"] = 120
+            first = await cache.get("info:AAPL")
+            trips = cache.redis_client.round_trips
+            second = await cache.get_with_ttl("info:AAPL")
+            return first, second, trips
+
+        first, (second, remaining), trips = asyncio.run(run())
+        assert first == second == {"symbol": "AAPL"}
+        assert cache.redis_client.round_trips == trips  # second read came from disk
+        assert 0 < remaining <= 120
@@ -0,0 +1,279 @@
+"""
+Tests for the cached, coalesced market data fetchers in app.tools.finance
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.cache import history_store
+from app.cache.history_store import OHLCVHistoryStore
+from app.cache.optimized_cache import OptimizedCacheManager, track_staleness
+from app.cache.price_store import ColumnarPriceStore
+from app.cache.redis_cache import CacheManager
+from app.tools import finance
+
+
+class _SlowYahooClient:
+    """Yahoo client stub that counts upstream calls and yields to the loop"""
+
+    def __init__(self):
+        self.info_calls = 0
+        self.download_calls = 0
+
+    async def get_info(self, ticker):
+        self.info_calls += 1
+        await asyncio.sleep(0.05)
+        return {"symbol": ticker, "currentPrice": 100.0}
+
+    async def download(self, ticker, period="1y", interval="1d"):
+        self.download_calls += 1
+        await asyncio.sleep(0.05)
+        idx = pd.date_range("2024-01-01", periods=3, freq="D")
+        return pd.DataFrame(
+            {"Open": [1.0, 2.0, 3.0], "High": [1.0, 2.0, 3.0], "Low": [1.0, 2.0, 3.0],
+             "Close": [1.0, 2.0, 3.0], "Volume": [10, 20, 30]},
+            index=idx,
+        )
+
+
+@pytest.fixture
+def yahoo(monkeypatch, tmp_path):
+    client = _SlowYahooClient()
+    cache = CacheManager(ttl_jitter=0)  # tests age entries by writing shorter TTLs
+    cache._use_redis = False
+
+    layered = OptimizedCacheManager(cache)
+
+    async def _get_cache_manager():
+        return cache
+
+    async def _get_optimized_cache_manager():
+        return layered
+
+    monkeypatch.setattr(finance, "get_yahoo_client", lambda: client)
+    monkeypatch.setattr(finance, "get_optimized_cache_manager", _get_optimized_cache_manager)
+    monkeypatch.setattr(history_store, "get_yahoo_client", lambda: client)
+    monkeypatch.setattr(history_store, "get_cache_manager", _get_cache_manager)
+    price_store = ColumnarPriceStore(tmp_path / "prices")
+    monkeypatch.setattr(history_store, "get_price_store", lambda: price_store)
+    monkeypatch.setattr(finance, "get_price_store", lambda: price_store)
+    store = OHLCVHistoryStore()
+    monkeypatch.setattr(finance, "get_history_store", lambda: store)
+    finance._coalescing_stats.clear()
+    monkeypatch.setattr(finance, "_coalescing_totals", {"upstream_fetches": 0, "coalesced": 0})
+    return client
+
+
+class TestSingleFlight:
+    """Concurrent misses for the same key share one upstream fetch"""
+
+    def test_concurrent_info_requests_coalesce(self, yahoo):
+        async def run():
+            return await asyncio.gather(*[finance.fetch_info("AAPL") for _ in range(5)])
+
+        results = asyncio.run(run())
+        assert yahoo.info_calls == 1
+        assert all(r["symbol"] == "AAPL" for r in results)
+        stats = finance.get_coalescing_stats()
+        assert stats["per_key"]["info:AAPL"] == {"upstream_fetches": 1, "coalesced": 4}
+
+    def test_distinct_keys_fetch_separately(self, yahoo):
+        async def run():
+            await asyncio.gather(
+                finance.fetch_ohlcv("AAPL", "1y", "1d"),
+                finance.fetch_ohlcv("AAPL", "1y", "1d"),
+                finance.fetch_ohlcv("AAPL", "5y", "1d"),
+            )
+
+        asyncio.run(run())
+        assert yahoo.download_calls == 2
+        assert finance.get_coalescing_stats()["in_flight"] == 0
+
+    def test_per_key_stats_are_bounded(self, yahoo, monkeypatch):
+        monkeypatch.setattr(finance, "COALESCING_STATS_MAX_KEYS", 3)
+        monkeypatch.setattr(finance, "COALESCING_STATS_TOP_N", 2)
+
+        async def run():
+            for ticker in ["AAPL", "MSFT", "GOOG", "AMZN", "TSLA"]:
+                await finance.fetch_info(ticker)
+
+        asyncio.run(run())
+        stats = finance.get_coalescing_stats()
+        assert stats["upstream_fetches"] == 5
+        assert stats["tracked_keys"] == 3
+        assert len(stats["per_key"]) == 2
+        assert "info:AAPL" not in finance.get_coalescing_stats()["per_key"]
+
+
+class TestStaleWhileRevalidate:
+    """Entries past their soft TTL are served at once and refreshed in the background"""
+
+    def test_stale_info_served_while_single_refresh_runs(self, yahoo):
+        async def run():
+            cache = await finance.get_optimized_cache_manager()
+            age = finance.INFO_SOFT_TTL + 60
+            stale = {"symbol": "AAPL", "currentPrice": 90.0}
+            await cache.set_company_info("AAPL", stale, ttl=finance.INFO_HARD_TTL - age)
+            with track_staleness() as staleness:
+                served = await asyncio.gather(*[finance.fetch_info("AAPL") for _ in range(5)])
+            await asyncio.sleep(0.1)  # let the background refresh land
+            return cache, served, staleness, await finance.fetch_info("AAPL")
+
+        cache, served, staleness, refreshed = asyncio.run(run())
+        assert all(r["currentPrice"] == 90.0 for r in served)
+        assert yahoo.info_calls == 1
+        assert refreshed["currentPrice"] == 100.0
+        assert list(staleness) == ["info:AAPL"]
+        assert staleness["info:AAPL"] >= finance.INFO_SOFT_TTL
+        swr = cache.get_cache_stats()["stale_while_revalidate"]
+        assert (swr["stale_served"], swr["refreshes"], swr["deduplicated"]) == (5, 1, 4)
+
+
+def _ohlcv_frame(start="2024-01-01", periods=3):
+    idx = pd.date_range(start, periods=periods, freq="D")
+    values = [float(i + 1) for i in range(periods)]
+    return pd.DataFrame(
+        {"Open": values, "High": values, "Low": values, "Close": values, "Volume": values},
+        index=idx,
+    )
+
+
+class TestBatchedOhlcv:
+    """fetch_multiple_ohlcv groups cache misses into multi-ticker downloads"""
+
+    def test_batches_misses_and_falls_back_per_symbol(self, yahoo, monkeypatch):
+        batches = []
+
+        async def download_many(tickers, period="1y", interval="1d"):
+            batches.append(list(tickers))
+            return {t: _ohlcv_frame() for t in tickers if t != "MISSING.NS"}
+
+        yahoo.download_many = download_many
+        monkeypatch.setattr(finance, "OHLCV_DOWNLOAD_BATCH_SIZE", 2)
+
+        async def run():
+            first = await finance.fetch_multiple_ohlcv(["AAA", "BBB", "CCC", "MISSING.NS"])
+            second = await finance.fetch_multiple_ohlcv(["AAA", "BBB"])
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert batches == [["AAA", "BBB"], ["CCC", "MISSING.NS"]]
+        assert set(first) == {"AAA", "BBB", "CCC", "MISSING.NS"}
+        # Unresolved symbol went through the per-symbol download path
+        assert yahoo.download_calls == 1
+        # Second call is served entirely from the cache
+        assert len(batches) == 2 and set(second) == {"AAA", "BBB"}
+
+    def test_download_many_splits_multiindex(self, monkeypatch):
+        from app.utils import rate_limiter
+
+        us = _ohlcv_frame("2024-01-01", 3)
+        combined = pd.concat({"AAPL": us, "TCS.NS": us.iloc[:2]}, axis=1)
+
+        monkeypatch.setattr(rate_limiter.yf, "download", lambda *a, **k: combined)
+        client = rate_limiter.YahooFinanceClient()
+        client.cache = {}
+
+        frames = asyncio.run(client.download_many(["AAPL", "TCS.NS", "NOPE"]))
+        assert set(frames) == {"AAPL", "TCS.NS"}
+        assert list(frames["AAPL"].columns) == ["Open", "High", "Low", "Close", "Volume"]
+        # Rows where TCS.NS had no session are dropped
+        assert len(frames["TCS.NS"]) == 2 and len(frames["AAPL"]) == 3
+
+
+class TestIncrementalHistory:
+    """Daily OHLCV refreshes append only the bars since the last stored one"""
+
+    def test_delta_refresh_and_period_slices(self, yahoo, monkeypatch):
+        since_calls = []
+
+        async def download(ticker, period="1y", interval="1d"):
+            yahoo.download_calls += 1
+            return _ohlcv_frame("2024-01-01", 400)
+
+        async def download_since(ticker, start, interval="1d"):
+            since_calls.append(pd.Timestamp(start))
+            upstream = _ohlcv_frame("2024-01-01", 402)
+            return upstream[upstream.index >= start]
+
+        yahoo.download = download
+        yahoo.download_since = download_since
+
+        async def run():
+            store = finance.get_history_store()
+            full = await finance.fetch_ohlcv("AAPL", "1y", "1d")
+            # Shorter periods are slices of the stored series
+            short = await store.get("AAPL", "1mo", "1d")
+            store.refresh_interval = 0
+            refreshed = await store.get("AAPL", "1y", "1d")
+            return store, full, short, refreshed
+
+        store, full, short, refreshed = asyncio.run(run())
+        assert yahoo.download_calls == 1
+        # The delta starts at the last complete stored bar
+        assert since_calls == [pd.Timestamp("2024-01-01") + pd.Timedelta(days=398)]
+        assert len(short) == 31
+        assert refreshed.index[-1] == full.index[-1] + pd.Timedelta(days=2)
+        assert not refreshed.index.duplicated().any()
+        assert store.get_stats()["bars_appended"] == 2
+
+    def test_readjusted_history_is_refetched_in_full(self, yahoo):
+        upstream = {"frame": _ohlcv_frame("2024-01-01", 400)}
+
+        async def download(ticker, period="1y", interval="1d"):
+            yahoo.download_calls += 1
+            return upstream["frame"]
+
+        async def download_since(ticker, start, interval="1d"):
+            return upstream["frame"][upstream["frame"].index >= start]
+
+        yahoo.download = download
+        yahoo.download_since = download_since
+
+        async def run():
+            store = finance.get_history_store()
+            await store.get("AAPL", "1y", "1d")
+            # A 2:1 split: one new bar, and every adjusted price is halved
+            upstream["frame"] = _ohlcv_frame("2024-01-01", 401) / 2
+            store.refresh_interval = 0
+            return store, await store.get("AAPL", "1y", "1d")
+
+        store, refreshed = asyncio.run(run())
+        assert store.get_stats()["adjustment_refetches"] == 1
+        assert yahoo.download_calls == 2
+        # One adjustment basis throughout: no jump where the delta would have joined
+        assert (refreshed["Close"].diff().dropna() == 0.5).all()
+
+    def test_fresh_reads_do_not_rewrite_the_series_and_locks_are_released(self, yahoo, monkeypatch):
+        writes = []
+
+        async def run():
+            store = finance.get_history_store()
+            cache = await history_store.get_cache_manager()
+            original_set = cache.set
+
+            async def counting_set(key, value, *args, **kwargs):
+                writes.append(key)
+                return await original_set(key, value, *args, **kwargs)
+
+            monkeypatch.setattr(cache, "set", counting_set)
+            await asyncio.gather(*(store.get(t, "1mo", "1d") for t in ("AAPL", "AAPL", "MSFT")))
+            for _ in range(3):
+                await store.get("AAPL", "1mo", "1d")
+            return store
+
+        store = asyncio.run(run())
+        assert sorted(writes) == ["ohlcv_history:AAPL:interval=1d", "ohlcv_history:MSFT:interval=1d"]
+        assert store.get_stats()["fresh_hits"] == 4
+        assert store._locks == {}
+
+    def test_longer_period_triggers_full_fetch(self, yahoo):
+        async def run():
+            await finance.fetch_ohlcv("AAPL", "1mo", "1d")
+            await finance.fetch_ohlcv("AAPL", "5y", "1d")
+            await finance.fetch_ohlcv("AAPL", "1y", "1d")
+
+        asyncio.run(run())
+        # 1y is covered by the stored 5y series
+        assert yahoo.download_calls == 2
@@ -0,0 +1,47 @@
+"""
+Tests for the process-wide compiled research graph registry
+"""
+from app.config import AppSettings, get_settings, reload_settings
+from app.graph import workflow
+
+
+def test_graph_is_compiled_once_per_settings_version(monkeypatch):
+    monkeypatch.setattr(workflow, "_compiled_graphs", {})
+    builds = []
+    monkeypatch.setitem(workflow.GRAPH_PROFILES, "research", lambda s: builds.append(s) or object())
+
+    settings = AppSettings()
+    first = workflow.get_research_graph(settings)
+    assert workflow.get_research_graph(AppSettings()) is first  # equal settings, same graph
+    assert len(builds) == 1
+
+    changed = settings.model_copy(update={"log_level": "DEBUG" if settings.log_level != "DEBUG" else "INFO"})
+    assert workflow.get_research_graph(changed) is not first
+    assert workflow.get_research_graph(changed) is workflow.get_research_graph(changed)
+    assert len(builds) == 2
+
+
+def test_compile_reports_timings_for_every_profile(monkeypatch):
+    monkeypatch.setattr(workflow, "_compiled_graphs", {})
+    timings = workflow.compile_research_graphs(AppSettings())
+    assert set(timings) == set(workflow.GRAPH_PROFILES)
+    assert hasattr(workflow.get_research_graph(AppSettings()), "ainvoke")
+
+
+def test_reload_settings_swaps_the_shared_graph(monkeypatch):
+    monkeypatch.setattr(workflow, "_compiled_graphs", {})
+    builds = []
+    monkeypatch.setitem(workflow.GRAPH_PROFILES, "research", lambda s: builds.append(s.log_level) or object())
+    get_settings.cache_clear()
+    try:
+        monkeypatch.setenv("LOG_LEVEL", "WARNING")
+        first = workflow.get_research_graph()
+        monkeypatch.setenv("LOG_LEVEL", "ERROR")
+        assert workflow.get_research_graph() is first  # cached settings until reloaded
+
+        reload_settings()
+        assert builds == ["WARNING", "ERROR"]  # recompiled by the reload hook
+        assert workflow.get_research_graph() is not first
+        assert len(builds) == 2
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,49 @@
+"""
+Tests for deriving the research graph's edges from declared reads and writes
+"""
+import pytest
+
+from app.graph.schedule import (
+    NodeSpec, critical_path, derive_dependencies, format_schedule, schedule_levels, scheduled_dependencies,
+)
+from app.graph.workflow import RESEARCH_NODES
+
+
+def _noop(state, settings):
+    return state
+
+
+def test_research_nodes_wait_only_for_the_data_they_read():
+    deps = derive_dependencies(RESEARCH_NODES)
+    analysis_nodes = [n for n, spec in RESEARCH_NODES.items() if spec.sections]
+
+    assert deps["data_collection"] == ["start"]
+    assert all(deps[n] in (["data_collection"], ["start"]) for n in analysis_nodes)
+    assert sorted(deps["synthesis"]) == sorted(analysis_nodes)
+    assert not any("cashflow" in preds for name, preds in deps.items() if name != "synthesis")
+
+    levels = schedule_levels(deps)
+    assert {levels[n] for n in analysis_nodes} == {2}  # one step: the slowest scraper delays only synthesis
+    assert scheduled_dependencies(deps)["youtube"] == ["start", "data_collection"]
+
+
+def test_implied_edges_are_dropped_and_cycles_rejected():
+    specs = {
+        "a": NodeSpec(_noop, writes=("x",)),
+        "b": NodeSpec(_noop, reads=("x",), writes=("analysis.y",)),
+        "c": NodeSpec(_noop, reads=("x", "analysis"), writes=("z",)),
+    }
+    assert derive_dependencies(specs) == {"a": [], "b": ["a"], "c": ["b"]}
+
+    with pytest.raises(ValueError, match="Cyclic"):
+        derive_dependencies({"a": NodeSpec(_noop, reads=("y",), writes=("x",)), "b": NodeSpec(_noop, reads=("x",), writes=("y",))})
+
+
+def test_critical_path_follows_measured_durations():
+    deps = scheduled_dependencies(derive_dependencies(RESEARCH_NODES))
+    durations = {name: 1.0 for name in deps}
+    durations["filing_analysis"] = 30.0
+    path, total = critical_path(deps, durations)
+    assert path == ["start", "data_collection", "filing_analysis", "synthesis"]
+    assert total == 33.0
+    assert "Lockstep latency (sum of step maxima): 33.00s" in format_schedule(derive_dependencies(RESEARCH_NODES), durations)
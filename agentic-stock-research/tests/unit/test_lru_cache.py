@@ -0,0 +1,109 @@
+"""
+Tests for the bounded in-process LRU and W-TinyLFU caches
+"""
+import pandas as pd
+
+from app.cache import lru
+from app.cache.lru import SizedLRUCache, TinyLFUCache, estimate_size
+
+
+class TestSizedLRUCache:
+    """Entry/byte bounds, TTL expiry and metrics"""
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = SizedLRUCache(max_entries=2, max_bytes=10**9, ttl=60)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1  # a is now most recent
+        cache["c"] = 3
+        assert "b" not in cache and "a" in cache and "c" in cache
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_budget_uses_dataframe_memory(self):
+        frame = pd.DataFrame({"Close": range(1000)}, dtype="float64")
+        size = estimate_size(frame)
+        assert size >= 8000
+
+        cache = SizedLRUCache(max_entries=100, max_bytes=int(size * 2.5), ttl=60)
+        for key in ("x", "y", "z"):
+            cache[key] = frame
+        assert len(cache) == 2 and "x" not in cache
+        assert cache.size_bytes <= cache.max_bytes
+        # Values larger than the whole budget are not cached
+        assert cache.set("huge", pd.concat([frame] * 3)) is False
+        assert cache.get_stats()["rejected_oversize"] == 1
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(lru.time, "monotonic", lambda: now[0])
+        cache = SizedLRUCache(ttl=10)
+        cache["k"] = "v"
+        now[0] += 9
+        assert cache.get("k") == "v"
+        now[0] += 2
+        assert cache.get("k") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+        assert stats["entries"] == 0 and stats["size_bytes"] == 0
+
+    def test_unread_entries_expire_lazily_on_insert(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(lru.time, "monotonic", lambda: now[0])
+        cache = SizedLRUCache(ttl=600)
+        cache.set("short", "x" * 1000, ttl=5)
+        cache.set("long", "y", ttl=600)
+        now[0] += 6
+        cache.set("other", "z")  # drains the expiry heap without reading "short"
+        assert len(cache) == 2 and cache.get_stats()["expirations"] == 1
+        assert cache.ttl_remaining("long") == 594
+
+
+class TestTinyLFUCache:
+    """A large cold value cannot flush many small hot ones"""
+
+    def _filled(self):
+        info = {"symbol": "X" * 40, "price": 1.0}
+        cache = TinyLFUCache(max_bytes=estimate_size(info) * 60, ttl=60)
+        for i in range(50):
+            key = f"info:T{i}"
+            for _ in range(3):
+                cache.get(key)
+            cache.set(key, dict(info))
+        return cache, info
+
+    def test_cold_frame_is_rejected_and_hot_entries_stay(self):
+        cache, info = self._filled()
+        frame = pd.DataFrame({"Close": range(1000)}, dtype="float64")
+        assert estimate_size(frame) < cache.max_bytes
+        cache.get("ohlcv:BIG")
+        cache.set("ohlcv:BIG", frame)
+        cache.set("info:NEW", dict(info))  # pushes the frame out of the window
+
+        assert "ohlcv:BIG" not in cache
+        assert all(f"info:T{i}" in cache for i in range(50))
+        stats = cache.get_stats()
+        assert stats["by_type"]["ohlcv"]["rejected_admissions"] == 1
+        assert stats["size_bytes"] <= cache.max_bytes
+
+    def test_frequently_read_frame_is_admitted(self):
+        cache, _ = self._filled()
+        frame = pd.DataFrame({"Close": range(1000)}, dtype="float64")
+        for _ in range(10):
+            cache.get("ohlcv:HOT")
+        cache.set("ohlcv:HOT", frame)
+        cache.set("info:NEW", {"symbol": "NEW"})
+        assert "ohlcv:HOT" in cache
+        assert cache.get_stats()["evictions"] > 0
+
+    def test_hit_and_byte_hit_ratio_per_type(self):
+        cache = TinyLFUCache(max_bytes=10**7, ttl=60)
+        frame = pd.DataFrame({"Close": range(100)}, dtype="float64")
+        assert cache.get("ohlcv:A") is None
+        cache.set("ohlcv:A", frame)
+        for _ in range(3):
+            cache.get("ohlcv:A")
+        cache.get("info:A")
+        by_type = cache.get_stats()["by_type"]
+        assert by_type["ohlcv"]["hit_rate"] == 75.0
+        assert by_type["ohlcv"]["byte_hit_rate"] == 75.0
+        assert by_type["info"]["hits"] == 0 and by_type["info"]["misses"] == 1
@@ -0,0 +1,109 @@
+"""
+Tests for content-addressed memoization of graph node outputs
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cache import optimized_cache
+from app.cache.optimized_cache import OptimizedCacheManager
+from app.cache.redis_cache import CacheManager
+from app.graph.memo import MEMOIZED_NODES, NodeMemo, input_fingerprint, snapshot_artifacts
+
+
+@pytest.fixture
+def memo(monkeypatch):
+    cache = CacheManager(ttl_jitter=0)
+    cache._use_redis = False
+    monkeypatch.setattr(optimized_cache, "_optimized_cache_manager", OptimizedCacheManager(cache))
+    return NodeMemo()
+
+
+def _state(price=100.0, **extra):
+    return {"tickers": ["AAPL"], "country": "US", "raw_data": {"AAPL": {"info": {"currentPrice": price}}}, **extra}
+
+
+def _valuation_node(runs):
+    async def compute():
+        runs.append(1)
+        return {**_state(), "analysis": {"valuation": {"fair_value": 120.0}}, "confidences": {"valuation": 0.8}}
+    return compute
+
+
+def test_identical_inputs_reuse_the_stored_output(memo):
+    runs = []
+
+    async def run():
+        first = await memo.run("valuation", _state(), "v1", _valuation_node(runs), ["valuation"])
+        second = await memo.run("valuation", _state(), "v1", _valuation_node(runs), ["valuation"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(runs) == 1
+    assert second == {"analysis": {"valuation": {"fair_value": 120.0}}, "confidences": {"valuation": 0.8}}
+    assert memo.get_stats()["valuation"]["hit_rate"] == 50.0
+
+
+def test_changed_inputs_settings_or_bypass_recompute(memo):
+    runs = []
+
+    async def run():
+        await memo.run("valuation", _state(), "v1", _valuation_node(runs), ["valuation"])
+        await memo.run("valuation", _state(price=101.0), "v1", _valuation_node(runs), ["valuation"])
+        await memo.run("valuation", _state(), "v2", _valuation_node(runs), ["valuation"])
+        await memo.run("valuation", _state(bypass_memo=True), "v1", _valuation_node(runs), ["valuation"])
+
+    asyncio.run(run())
+    assert len(runs) == 4
+    assert memo.stats["valuation"]["bypassed"] == 1
+
+
+def test_failed_outputs_are_not_stored(memo):
+    async def failing():
+        return {**_state(), "analysis": {"valuation": {"error": "no data"}}}
+
+    asyncio.run(memo.run("valuation", _state(), "v1", failing, ["valuation"]))
+    assert memo.stats["valuation"]["stored"] == 0
+
+
+def test_fingerprint_ignores_sections_the_node_does_not_read():
+    spec = MEMOIZED_NODES["fundamentals"]
+    base = input_fingerprint("fundamentals", spec, _state(), "v1")
+    noisy = _state(analysis={"technicals": {"rsi": 55}})
+    assert input_fingerprint("fundamentals", spec, noisy, "v1") == base
+
+
+class _Snapshot:
+    def __init__(self, cashflow):
+        self.info = {"sector": "Technology"}
+        self.cashflow = cashflow
+
+
+def test_fingerprint_hashes_frames_by_content_and_includes_snapshot_artifacts():
+    spec = MEMOIZED_NODES["valuation"]
+    # Long enough that the repr elides the middle rows
+    frame = pd.DataFrame({"Free Cash Flow": np.arange(200.0)})
+    changed = frame.copy()
+    changed.iloc[100, 0] = -1.0
+    assert repr(frame) == repr(changed)
+
+    raw = {"AAPL": {"ohlcv": frame}}
+    assert input_fingerprint("valuation", spec, _state(), "v1", {"cashflow": frame}) != input_fingerprint(
+        "valuation", spec, _state(), "v1", {"cashflow": changed}
+    )
+    assert input_fingerprint("valuation", spec, _state(raw_data=raw), "v1") != input_fingerprint(
+        "valuation", spec, _state(raw_data={"AAPL": {"ohlcv": changed}}), "v1"
+    )
+
+    state = _state(snapshots={"AAPL": _Snapshot(frame)})
+    assert snapshot_artifacts(spec, state) == {"info": {"sector": "Technology"}, "cashflow": frame}
+
+
+def test_sector_rotation_is_keyed_on_sector_info_and_date():
+    spec = MEMOIZED_NODES["sector_rotation"]
+    assert spec.artifacts == ("info",) and spec.daily
+    tech = input_fingerprint("sector_rotation", spec, _state(), "v1", {"info": {"sector": "Technology"}})
+    energy = input_fingerprint("sector_rotation", spec, _state(), "v1", {"info": {"sector": "Energy"}})
+    assert tech != energy
@@ -0,0 +1,133 @@
+"""
+Tests for the year-partitioned Arrow price store
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.cache import history_store, price_store
+from app.cache.history_store import OHLCVHistoryStore
+from app.cache.price_store import ColumnarPriceStore
+from app.cache.redis_cache import CacheManager
+
+
+def _bars(start, periods, base=1.0):
+    idx = pd.date_range(start, periods=periods, freq="D", name="Date")
+    values = [base + i for i in range(periods)]
+    return pd.DataFrame(
+        {"Open": values, "High": values, "Low": values, "Close": values, "Volume": values},
+        index=idx,
+    )
+
+
+class TestColumnarPriceStore:
+    """Partitioning, upserts and range reads"""
+
+    def test_partitions_by_year_and_reads_range(self, tmp_path):
+        store = ColumnarPriceStore(tmp_path)
+        store.write("TCS.NS", _bars("2023-12-20", 30))
+
+        assert sorted(p.name for p in (tmp_path / "1d" / "TCS.NS").iterdir()) == ["2023.arrow", "2024.arrow"]
+        window = store.read("TCS.NS", "2024-01-01", "2024-01-05")
+        assert list(window.index.strftime("%Y-%m-%d")) == [
+            "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"
+        ]
+        # Only the 2024 partition is opened for a 2024 range
+        reads_before = store.stats["partition_reads"]
+        store.read("TCS.NS", "2024-01-10", "2024-01-12")
+        assert store.stats["partition_reads"] - reads_before == 1
+
+    def test_upsert_overwrites_overlapping_bars(self, tmp_path):
+        store = ColumnarPriceStore(tmp_path)
+        store.write("AAPL", _bars("2024-01-01", 5))
+        store.write("AAPL", _bars("2024-01-05", 3, base=100.0))
+
+        data = ColumnarPriceStore(tmp_path).read("AAPL")  # fresh instance: survives restarts
+        assert len(data) == 7
+        assert data.loc["2024-01-05", "Close"] == 100.0
+        assert data.index.is_monotonic_increasing
+
+    def test_flattens_ticker_columns_so_single_and_batched_writes_merge(self, tmp_path):
+        store = ColumnarPriceStore(tmp_path)
+        # Batched ingest stores flat columns; single-symbol yf.download returns (Price, Ticker)
+        store.ingest({"AAPL": _bars("2024-03-01", 5)})
+        single = pd.concat({"AAPL": _bars("2024-03-05", 2, base=50.0)}, axis=1).swaplevel(axis=1)
+        assert store.write("AAPL", single) == 2
+
+        data = store.read("AAPL")
+        assert list(data.columns) == ["Open", "High", "Low", "Close", "Volume"]
+        assert len(data) == 6
+        assert data.loc["2024-03-05", "Close"] == 50.0
+
+    def test_unmergeable_partition_is_not_overwritten(self, tmp_path, monkeypatch):
+        store = ColumnarPriceStore(tmp_path)
+        store.write("AAPL", _bars("2024-03-01", 5))
+
+        def broken(*args, **kwargs):
+            raise ValueError("cannot merge")
+
+        monkeypatch.setattr(price_store.pd, "concat", broken)
+        assert store.write("AAPL", _bars("2024-03-10", 2)) == 0
+        monkeypatch.undo()
+        assert len(store.read("AAPL")) == 5
+        assert store.stats["partitions_skipped"] == 1
+
+
+class TestHistoryStorePersistence:
+    """The OHLCV history store reseeds itself from disk after a restart"""
+
+    def test_reload_after_restart_does_delta_only(self, tmp_path, monkeypatch):
+        disk = ColumnarPriceStore(tmp_path)
+        calls = {"full": 0, "since": []}
+        last = pd.Timestamp.now().normalize() - pd.Timedelta(days=1)
+
+        class _Client:
+            async def download(self, ticker, period="1y", interval="1d"):
+                calls["full"] += 1
+                return _bars(last - pd.Timedelta(days=399), 400)
+
+            async def download_since(self, ticker, start, interval="1d"):
+                calls["since"].append(pd.Timestamp(start))
+                upstream = _bars(last - pd.Timedelta(days=399), 401)
+                return upstream[upstream.index >= start]
+
+        async def fresh_cache():
+            cache = CacheManager()
+            cache._use_redis = False
+            return cache
+
+        monkeypatch.setattr(history_store, "get_yahoo_client", lambda: _Client())
+        monkeypatch.setattr(history_store, "get_cache_manager", fresh_cache)
+        monkeypatch.setattr(history_store, "get_price_store", lambda: disk)
+
+        asyncio.run(OHLCVHistoryStore().get("AAPL", "1y", "1d"))
+        # New process: empty cache, same disk
+        restarted = OHLCVHistoryStore()
+        data = asyncio.run(restarted.get("AAPL", "1y", "1d"))
+
+        assert calls["full"] == 1
+        assert calls["since"] == [last - pd.Timedelta(days=1)]
+        assert restarted.get_stats()["persisted_loads"] == 1
+        assert data.index[-1] == last + pd.Timedelta(days=1)
+
+    def test_load_price_range_fetches_once(self, tmp_path, monkeypatch):
+        from app.utils import rate_limiter
+
+        disk = ColumnarPriceStore(tmp_path)
+        fetched = []
+
+        class _Client:
+            async def download_since(self, ticker, start, interval="1d"):
+                fetched.append(ticker)
+                return _bars("2023-01-01", 60)
+
+        monkeypatch.setattr(price_store, "get_price_store", lambda: disk)
+        monkeypatch.setattr(rate_limiter, "get_yahoo_client", lambda: _Client())
+
+        first = asyncio.run(price_store.load_price_range("SPY", "2023-01-01", "2023-02-01"))
+        second = asyncio.run(price_store.load_price_range("SPY", "2023-01-01", "2023-02-01"))
+        assert fetched == ["SPY"]
+        assert len(first) == len(second) == 32
@@ -0,0 +1,105 @@
+"""
+Tests for the host-wide shared-memory cache tier
+"""
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cache.optimized_cache import OptimizedCacheManager
+from app.cache.redis_cache import CacheManager
+from app.cache.shared_memory import SharedMemoryCache
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def frame():
+    index = pd.date_range("2024-01-01", periods=500, freq="D", name="Date")
+    return pd.DataFrame({"Close": np.linspace(100, 200, 500), "Volume": np.arange(500)}, index=index)
+
+
+class TestSharedMemoryCache:
+    """Workers map one published copy and see new versions"""
+
+    def test_frames_are_zero_copy_views_of_the_published_file(self, tmp_path, frame):
+        writer, reader = SharedMemoryCache(tmp_path), SharedMemoryCache(tmp_path)
+        assert writer.put("ohlcv:AAPL", frame, ttl=60)
+
+        first, remaining = reader.get("ohlcv:AAPL")
+        second, _ = reader.get("ohlcv:AAPL")
+        pd.testing.assert_frame_equal(first, frame, check_freq=False)
+        assert 0 < remaining <= 60
+        assert np.shares_memory(first["Close"].to_numpy(), second["Close"].to_numpy())
+        assert not first["Close"].to_numpy().flags.writeable
+        assert reader.stats["maps"] == 1
+
+        # Writes copy on write instead of touching the shared pages
+        first.iloc[0, 0] = -1.0
+        assert reader.get("ohlcv:AAPL")[0].iloc[0, 0] == 100.0
+
+    def test_new_versions_replace_old_ones_without_invalidating_readers(self, tmp_path, frame):
+        writer, reader = SharedMemoryCache(tmp_path), SharedMemoryCache(tmp_path)
+        writer.put("ohlcv:AAPL", frame, ttl=60)
+        old, _ = reader.get("ohlcv:AAPL")
+        version = reader.version("ohlcv:AAPL")
+
+        writer.put("ohlcv:AAPL", frame * 2, ttl=60)
+        new, _ = reader.get("ohlcv:AAPL")
+        assert reader.version("ohlcv:AAPL") > version
+        assert new["Close"].iloc[0] == 200.0
+        assert old["Close"].iloc[0] == 100.0
+
+    def test_dicts_expiry_and_eviction(self, tmp_path, frame):
+        cache = SharedMemoryCache(tmp_path, max_bytes=1)
+        cache.put("info:AAPL", {"symbol": "AAPL"}, ttl=60)
+        cache.put("info:OLD", {"symbol": "OLD"}, ttl=0.01)
+        assert cache.get("info:AAPL")[0] == {"symbol": "AAPL"}
+        time.sleep(0.02)
+        assert cache.get("info:OLD") is None
+
+        assert cache.evict() == 2  # the expired entry, then the oldest over budget
+        assert cache.get_stats()["entries"] == 0
+
+    def test_mappings_are_bounded_and_dropped_with_their_files(self, tmp_path, frame):
+        writer, reader = SharedMemoryCache(tmp_path), SharedMemoryCache(tmp_path, max_mapped=2)
+        for symbol in ("AAPL", "MSFT", "TCS"):
+            writer.put(f"info:{symbol}", {"symbol": symbol}, ttl=60)
+            reader.get(f"info:{symbol}")
+        assert list(reader._segments) == ["info:MSFT", "info:TCS"]
+        assert reader.stats["unmaps"] == 1
+
+        # Unmapped once its file is evicted, even while a handed-out frame still holds the pages
+        writer.put("ohlcv:AAPL", frame, ttl=60)
+        held, _ = reader.get("ohlcv:AAPL")
+        segment = reader._segments["ohlcv:AAPL"]
+        reader.max_bytes = 1
+        reader.evict()
+        assert reader.get_stats()["mapped"] == 0
+        assert segment.value is None and held["Close"].iloc[-1] == 200.0
+
+        writer.put("info:OLD", {"symbol": "OLD"}, ttl=0.01)
+        reader.get("info:OLD")
+        mapped = reader._segments["info:OLD"].mapped
+        time.sleep(0.02)
+        assert reader.get("info:OLD") is None
+        assert "info:OLD" not in reader._segments and mapped.closed
+
+
+def test_layered_cache_keeps_shared_prefixes_out_of_l1(tmp_path, frame):
+    cache = CacheManager(ttl_jitter=0)
+    cache._use_redis = False
+    workers = [OptimizedCacheManager(cache, shared_cache=SharedMemoryCache(tmp_path)) for _ in range(2)]
+
+    async def run():
+        await workers[0].set_ohlcv("AAPL", frame)
+        await workers[0].set("news:AAPL", ["headline"])
+        return await workers[1].get_ohlcv("AAPL")
+
+    pd.testing.assert_frame_equal(asyncio.run(run()), frame, check_freq=False)
+    assert workers[1].shared_cache.stats["hits"] == 1
+    assert len(workers[0].memory_cache) == 1  # only news:AAPL
+    asyncio.run(workers[1].clear_ticker("AAPL"))
+    assert workers[0].shared_cache.get(workers[0].ohlcv_key("AAPL")) is None
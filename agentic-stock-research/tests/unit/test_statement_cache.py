@@ -0,0 +1,79 @@
+"""
+Tests for the earnings-calendar-aware statement cache
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.cache import statement_cache
+from app.cache.redis_cache import CacheManager
+from app.cache.statement_cache import DAY, FALLBACK_TTL, StatementCache, statement_ttl
+from app.tools import ticker_snapshot
+from app.tools.ticker_snapshot import TickerSnapshot
+
+NOW = 1_700_000_000.0
+
+
+class TestStatementTtl:
+    """Entries live until the next expected reporting date"""
+
+    def test_expires_at_next_earnings_date(self):
+        info = {"earningsTimestampStart": NOW + 20 * DAY, "earningsTimestampEnd": NOW + 24 * DAY}
+        assert statement_ttl(info, now=NOW) == 20 * DAY
+
+    def test_recently_passed_report_rechecks_daily(self):
+        assert statement_ttl({"earningsTimestamp": NOW - 3 * DAY}, now=NOW) == DAY
+
+    def test_estimates_from_most_recent_quarter(self):
+        ttl = statement_ttl({"mostRecentQuarter": NOW - 35 * DAY}, now=NOW)
+        assert ttl == 100 * DAY
+
+    def test_falls_back_without_dates(self):
+        assert statement_ttl({}, now=NOW) == FALLBACK_TTL
+        assert statement_ttl({"earningsTimestamp": "n/a"}, now=NOW) == FALLBACK_TTL
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = CacheManager()
+    cache._use_redis = False
+
+    async def _get_cache_manager():
+        return cache
+
+    monkeypatch.setattr(statement_cache, "get_cache_manager", _get_cache_manager)
+    return cache
+
+
+class TestSnapshotIntegration:
+    """Fetched statements are written back and seed the next analysis"""
+
+    def test_second_analysis_skips_upstream(self, memory_cache, monkeypatch):
+        fetches = []
+        income = pd.DataFrame({pd.Timestamp("2024-09-30"): [100.0]}, index=["Total Revenue"])
+
+        class _FakeTicker:
+            def __init__(self, symbol):
+                pass
+
+            @property
+            def financials(self):
+                fetches.append("financials")
+                return income
+
+        monkeypatch.setattr(ticker_snapshot.yf, "Ticker", _FakeTicker)
+        cache = StatementCache()
+
+        async def analysis():
+            snapshot = TickerSnapshot("AAPL", info={"earningsTimestamp": 4_000_000_000})
+            await cache.attach(snapshot)
+            frame = await asyncio.to_thread(lambda: snapshot.financials)
+            await asyncio.sleep(0.05)  # let the write-back land
+            return frame
+
+        first = asyncio.run(analysis())
+        second = asyncio.run(analysis())
+        assert fetches == ["financials"]
+        pd.testing.assert_frame_equal(first, second, check_index_type=False, check_column_type=False)
+        assert cache.get_stats()["stores"] == 1
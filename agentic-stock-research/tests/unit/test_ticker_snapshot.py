@@ -0,0 +1,93 @@
+"""
+Tests for the per-analysis TickerSnapshot
+"""
+import asyncio
+import copy
+
+import pytest
+
+from app.tools import ticker_snapshot
+from app.tools.ticker_snapshot import TickerSnapshot, get_ticker_snapshot, snapshot_scope
+
+
+class _FakeTicker:
+    """Stand-in for yf.Ticker that counts attribute fetches"""
+
+    calls = 0
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        _FakeTicker.calls += 1
+        return {"symbol": self.symbol, "sector": "Technology"}
+
+    @property
+    def cashflow(self):
+        _FakeTicker.calls += 1
+        return {"Operating Cash Flow": 1.0}
+
+    def history(self, **kwargs):
+        _FakeTicker.calls += 1
+        return kwargs
+
+
+@pytest.fixture(autouse=True)
+def fake_yfinance(monkeypatch):
+    _FakeTicker.calls = 0
+    monkeypatch.setattr(ticker_snapshot.yf, "Ticker", _FakeTicker)
+
+
+class TestTickerSnapshot:
+    """Test lazy, fetch-once behaviour"""
+
+    def test_artifacts_fetched_once(self):
+        snap = TickerSnapshot("AAPL")
+        assert snap.info["sector"] == "Technology"
+        assert snap.info["sector"] == "Technology"
+        assert snap.cashflow is snap.cashflow
+        assert _FakeTicker.calls == 2
+        assert snap.loaded() == ("cashflow", "info")
+
+    def test_seeded_info_skips_upstream(self):
+        snap = TickerSnapshot("AAPL", info={"sector": "Energy"})
+        assert snap.info["sector"] == "Energy"
+        assert _FakeTicker.calls == 0
+
+    def test_info_is_a_private_copy(self):
+        snap = TickerSnapshot("AAPL", info={"sector": "Energy"})
+        snap.info["sector"] = "Mutated"
+        assert snap.info["sector"] == "Energy"
+
+    def test_history_memoised_per_arguments(self):
+        snap = TickerSnapshot("AAPL")
+        snap.history(period="5y")
+        snap.history(period="5y")
+        snap.history(period="1y")
+        assert _FakeTicker.calls == 2
+
+    def test_deepcopy_shares_snapshot(self):
+        snap = TickerSnapshot("AAPL")
+        state = {"snapshots": {"AAPL": snap}}
+        assert copy.deepcopy(state)["snapshots"]["AAPL"] is snap
+
+
+class TestSnapshotScope:
+    """Test resolution of the active snapshot"""
+
+    def test_scope_returns_shared_snapshot(self):
+        snap = TickerSnapshot("AAPL")
+        with snapshot_scope({"AAPL": snap}):
+            assert get_ticker_snapshot("AAPL") is snap
+            assert get_ticker_snapshot("MSFT") is not snap
+        assert get_ticker_snapshot("AAPL") is not snap
+
+    def test_scope_propagates_to_threads(self):
+        snap = TickerSnapshot("AAPL")
+
+        async def run():
+            with snapshot_scope({"AAPL": snap}):
+                return await asyncio.to_thread(get_ticker_snapshot, "AAPL")
+
+        assert asyncio.run(run()) is snap
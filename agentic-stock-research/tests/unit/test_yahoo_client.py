@@ -0,0 +1,110 @@
+"""
+Tests for YahooFinanceClient symbol resolution (.NS -> raw -> .BO)
+"""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.cache.redis_cache import CacheManager
+from app.utils import rate_limiter
+
+
+def _bars():
+    idx = pd.date_range("2024-01-01", periods=3, freq="D")
+    return pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": [1, 2, 3]}, index=idx)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    shared = CacheManager()
+    shared._use_redis = False
+
+    async def _shared_cache():
+        return shared
+
+    async def _no_wait(self):
+        return True
+
+    monkeypatch.setattr(rate_limiter.SymbolResolver, "_shared_cache", staticmethod(_shared_cache))
+    monkeypatch.setattr(rate_limiter.RateLimiter, "_token_bucket_acquire", _no_wait)
+    return rate_limiter.YahooFinanceClient()
+
+
+class TestSymbolResolution:
+    """Working variants are memoised and empty variants are skipped"""
+
+    def test_resolved_variant_is_tried_first(self, client, monkeypatch):
+        calls = []
+
+        def download(symbol, **kwargs):
+            calls.append(symbol)
+            return _bars() if symbol == "ILLIQ.BO" else pd.DataFrame()
+
+        monkeypatch.setattr(rate_limiter.yf, "download", download)
+
+        async def run():
+            await client.download("ILLIQ.NS", "1y", "1d")
+            await client.download("ILLIQ.NS", "6mo", "1d")
+
+        asyncio.run(run())
+        assert calls == ["ILLIQ.NS", "ILLIQ", "ILLIQ.BO", "ILLIQ.BO"]
+        assert client.resolver.get_stats()["resolved_hits"] == 1
+
+    def test_resolution_survives_restart_via_shared_cache(self, client, monkeypatch):
+        calls = []
+
+        def download(symbol, **kwargs):
+            calls.append(symbol)
+            return _bars() if symbol == "ILLIQ" else pd.DataFrame()
+
+        monkeypatch.setattr(rate_limiter.yf, "download", download)
+        asyncio.run(client.download("ILLIQ.NS", "1y", "1d"))
+
+        restarted = rate_limiter.YahooFinanceClient()
+        calls.clear()
+        asyncio.run(restarted.download("ILLIQ.NS", "1y", "1d"))
+        assert calls == ["ILLIQ"]
+
+    def test_empty_variants_are_skipped_once_a_sibling_has_data(self, client, monkeypatch):
+        def download(symbol, **kwargs):
+            return _bars() if symbol == "ILLIQ.BO" else pd.DataFrame()
+
+        monkeypatch.setattr(rate_limiter.yf, "download", download)
+        asyncio.run(client.download("ILLIQ.NS", "1y", "1d"))
+
+        assert asyncio.run(client.resolver.candidates("ILLIQ.NS", "prices")) == ["ILLIQ.BO", "ILLIQ.NS"]
+        assert client.resolver.get_stats()["negative_skips"] == 1
+
+    def test_outage_does_not_negatively_cache_any_variant(self, client, monkeypatch):
+        calls = []
+        outage = {"on": True}
+
+        def download(symbol, **kwargs):
+            calls.append(symbol)
+            # yfinance returns an empty frame, not an error, when throttled
+            return pd.DataFrame() if outage["on"] else _bars()
+
+        monkeypatch.setattr(rate_limiter.yf, "download", download)
+
+        async def run():
+            first = await client.download("TCS.NS", "1y", "1d")
+            outage["on"] = False
+            second = await client.download("TCS.NS", "1y", "1d")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first.empty and not second.empty
+        assert calls == ["TCS.NS", "TCS", "TCS.BO", "TCS.NS"]
+        assert client.resolver.get_stats()["recorded_misses"] == 0
+
+    def test_non_indian_symbols_are_not_negatively_cached(self, client, monkeypatch):
+        calls = []
+        monkeypatch.setattr(rate_limiter.yf, "download", lambda symbol, **k: calls.append(symbol) or pd.DataFrame())
+
+        async def run():
+            await client.download("NOPE", "1y", "1d")
+            await client.download("NOPE", "1y", "1d")
+
+        asyncio.run(run())
+        assert calls == ["NOPE", "NOPE"]
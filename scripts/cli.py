@@ -3,24 +3,37 @@ from __future__ import annotations
 import argparse
 import asyncio
 import json
+import time
 from pathlib import Path
 
 from app.config import get_settings
 from app.graph.workflow import build_research_graph
+from app.utils.data_provider import DataProvider, FixtureArchive, get_data_provider, set_data_provider
 
 
 async def main() -> None:
     parser = argparse.ArgumentParser(description="Run agentic stock research")
     parser.add_argument("--tickers", nargs="+", required=True, help="Tickers, e.g., AAPL MSFT")
     parser.add_argument("--out", type=str, default="report.json", help="Output JSON path")
+    parser.add_argument("--provider-mode", choices=["live", "record", "replay"],
+                        help="Override DATA_PROVIDER_MODE (record/replay upstream data)")
+    parser.add_argument("--archive", type=str, help="Fixture archive directory for record/replay")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Synthetic latency per replayed call")
     args = parser.parse_args()
 
     settings = get_settings()
+    if args.provider_mode:
+        archive_dir = args.archive or settings.data_provider_archive_dir
+        archive = FixtureArchive(archive_dir) if args.provider_mode != "live" else None
+        set_data_provider(DataProvider(args.provider_mode, archive, replay_latency_ms=args.latency_ms))
+
     graph = build_research_graph(settings)
+    started = time.perf_counter()
     result = await graph.ainvoke({"tickers": args.tickers})
+    elapsed = time.perf_counter() - started
     out_path = Path(args.out)
     out_path.write_text(json.dumps(result["final_output"], indent=2))
-    print(f"Saved {out_path}")
+    print(f"Saved {out_path} in {elapsed:.2f}s (data provider: {get_data_provider().get_stats()})")
 
 
 if __name__ == "__main__":